@@ -8,6 +8,7 @@ import logging
 import os
 import re
 import sys
+import threading
 from typing import Any
 
 import boto3
@@ -15,11 +16,14 @@ from boto3.dynamodb.conditions import Key
 
 # AgentCore Runtime ではCloudWatchメトリクス送信を有効化
 os.environ.setdefault("EMIT_CLOUDWATCH_METRICS", "true")
+# AgentCore Runtime では /ping を契機にエージェントを先に初期化する
+os.environ.setdefault("AGENT_WARMUP_ON_PING", "true")
 
 # ツール承認をバイパス（自動化のため）
 os.environ["BYPASS_TOOL_CONSENT"] = "true"
 
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
+from warmup import WARMUP_ON_PING, get_warmup
 
 # ロギング設定
 logging.basicConfig(
@@ -33,17 +37,19 @@ logger.info("Agent module loading started")
 app = BedrockAgentCoreApp()
 logger.info("BedrockAgentCoreApp created")
 
-# エージェントは遅延初期化（初回呼び出し時に初期化）
+# エージェントは遅延初期化（ウォームアップまたは初回呼び出し時に初期化）
 # NOTE: AgentCore Runtime は各セッションを独立した microVM で実行するため、
-# 並行リクエストによる競合状態（race condition）は発生しない。
-# スレッドロックは不要。
+# 並行リクエストによる競合は発生しないが、ウォームアップのスレッドと
+# 初回呼び出しが重なりうるため初期化はロックで1回にする。
 _agent = None
+_agent_lock = threading.Lock()
 
 
 def _create_agent(system_prompt: str, tools: list) -> Any:
     """指定されたシステムプロンプトとツールでエージェントを作成する."""
     from strands import Agent
     from strands.models import BedrockModel
+    from tools.tracing import TracingHooks
 
     bedrock_model = BedrockModel(
         model_id=os.environ.get("BEDROCK_MODEL_ID", "jp.anthropic.claude-haiku-4-5-20251001-v1:0"),
@@ -55,6 +61,7 @@ def _create_agent(system_prompt: str, tools: list) -> Any:
         model=bedrock_model,
         system_prompt=system_prompt,
         tools=tools,
+        hooks=[TracingHooks()],
     )
     logger.info(f"Agent created successfully with {len(tools)} tools")
     return agent
@@ -64,13 +71,49 @@ def _get_agent() -> Any:
     """エージェントを遅延初期化して取得する."""
     global _agent
     if _agent is None:
-        logger.info("Lazy initializing agent...")
-        from prompts.bet_proposal import BET_PROPOSAL_SYSTEM_PROMPT
-        from tool_router import get_tools
-        _agent = _create_agent(BET_PROPOSAL_SYSTEM_PROMPT, tools=get_tools())
+        with _agent_lock:
+            if _agent is None:
+                logger.info("Lazy initializing agent...")
+                from prompts.bet_proposal import build_bet_proposal_prompt
+                from tool_router import get_tools
+                from tools import compact_payload
+                from tools.narrator_client import prewarm_narrator_client
+                system_prompt = build_bet_proposal_prompt(compact_payload.COMPACT_TOOL_RESULTS)
+                _agent = _create_agent(system_prompt, tools=get_tools())
+                # 買い目提案のナレーション用クライアントを先に用意しておく
+                prewarm_narrator_client()
     return _agent
 
 
+def _warm_up_clients() -> None:
+    """ツールが使う AWS / HTTP クライアントを生成しておく（サービス定義の読み込みを含む）."""
+    from tools import ai_prediction, speed_index
+    from tools.http_client import get_http_client
+    from tools.narrator_client import get_narrator_client
+
+    get_narrator_client()
+    ai_prediction.get_dynamodb_table()
+    speed_index.get_dynamodb_table()
+    get_http_client()
+
+
+WARMUP_STEPS = {
+    "agent": _get_agent,
+    "clients": _warm_up_clients,
+}
+
+
+@app.ping
+def ping():
+    """ヘルスチェック. 初回の ping でウォームアップを開始する.
+
+    ステータスは返さず、SDK の自動判定（HEALTHY / HEALTHY_BUSY）に任せる。
+    """
+    if WARMUP_ON_PING and not get_warmup().started:
+        get_warmup().start(WARMUP_STEPS)
+    return None
+
+
 @app.entrypoint
 def invoke(payload: dict, context: Any) -> dict:
     """エージェント呼び出しハンドラー.
@@ -82,8 +125,27 @@ def invoke(payload: dict, context: Any) -> dict:
     {
         "race_id": "...",  # レースID
         "user_id": "...",  # ユーザー識別子（"user:xxx" or "guest:xxx"）
+        "debug_trace": false,  # true なら応答に trace_summary（遅いスパン）を含める
     }
+
+    事前計算ジョブ（LLM を呼ばない）:
+    {"action": "precompute", "race_ids": [...]} または {"action": "precompute", "date": "20260201"}
     """
+    from tools.tracing import start_trace
+
+    if payload.get("action") == "precompute":
+        from tools.precompute import run_precompute
+        return run_precompute(race_ids=payload.get("race_ids"), date=payload.get("date"))
+
+    with start_trace("invoke", race_id=payload.get("race_id", "")) as trace:
+        response = _invoke(payload, context)
+    if payload.get("debug_trace"):
+        response["trace_summary"] = trace.summary()
+    return response
+
+
+def _invoke(payload: dict, context: Any) -> dict:
+    """invoke の本体（トレースの内側で実行する）."""
     race_id = payload.get("race_id", "")
     user_id = payload.get("user_id", "")
 
@@ -102,12 +164,39 @@ def invoke(payload: dict, context: Any) -> dict:
     logger.debug("betting_preference=%s", betting_preference)
     set_betting_preference(betting_preference)
 
+    # ゲスト・好み設定が既定のユーザーは、オッズが動くまで応答を共有する
+    from tools.proposal_cache import current_odds_version, get_proposal_cache
+    proposal_cache = get_proposal_cache() if not betting_preference else None
+    version = current_odds_version(race_id) if proposal_cache is not None else None
+    if version is None:
+        response = _run_agent(race_id, context)
+    else:
+        response = proposal_cache.get_or_compute(
+            proposal_cache.make_key(race_id, version, betting_preference),
+            lambda: _run_agent(race_id, context),
+            _is_shareable_response,
+        )
+
+    return {**response, "session_id": getattr(context, "session_id", None)}
+
+
+def _run_agent(race_id: str, context: Any) -> dict:
+    """エージェントを実行し、応答（message / suggested_questions / bet_actions）を返す."""
     # プロンプトを内部構築
     user_message = f"レースID {race_id} について買い目提案を生成してください。"
 
-    # エージェント実行
+    # エージェント実行（ツールが溜めたメトリクスは応答後にまとめて書き出す）
+    # 同じセッション内の同じ引数のツール呼び出しは結果を使い回す
+    from tools.metrics import flush_metrics
+    from tools.tool_memo import get_tool_memo
     agent = _get_agent()
-    result = agent(user_message)
+    tool_memo = get_tool_memo()
+    tool_memo.begin_session(getattr(context, "session_id", None))
+    try:
+        result = agent(user_message)
+    finally:
+        tool_memo.end_session()
+        flush_metrics()
 
     # レスポンスからテキストを抽出
     message_text = _extract_message_text(result.message)
@@ -123,12 +212,18 @@ def invoke(payload: dict, context: Any) -> dict:
 
     return {
         "message": message_text,
-        "session_id": getattr(context, "session_id", None),
         "suggested_questions": suggested_questions,
         "bet_actions": bet_actions,
     }
 
 
+def _is_shareable_response(response: dict) -> bool:
+    """他の呼び出しと共有してよい応答か（買い目JSONを含む応答に限る）."""
+    from response_utils import BET_PROPOSALS_SEPARATOR
+
+    return BET_PROPOSALS_SEPARATOR in response.get("message", "")
+
+
 def _extract_message_text(message) -> str:
     """Strands Agent のレスポンスからテキストを抽出する."""
     if isinstance(message, str):
@@ -280,7 +375,9 @@ def _fetch_agent_data(user_id: str) -> dict | None:
 
     global _dynamodb_resource
     if _dynamodb_resource is None:
+        from tools.tracing import trace_aws_client
         _dynamodb_resource = boto3.resource("dynamodb", region_name=_AWS_REGION)
+        trace_aws_client(_dynamodb_resource.meta.client)
     table = _dynamodb_resource.Table(_AGENT_TABLE_NAME)
 
     response = table.query(
@@ -1,5 +1,5 @@
 """システムプロンプト定義."""
 
-from .bet_proposal import BET_PROPOSAL_SYSTEM_PROMPT
+from .bet_proposal import BET_PROPOSAL_SYSTEM_PROMPT, build_bet_proposal_prompt
 
-__all__ = ["BET_PROPOSAL_SYSTEM_PROMPT"]
+__all__ = ["BET_PROPOSAL_SYSTEM_PROMPT", "build_bet_proposal_prompt"]
@@ -20,7 +20,7 @@ BET_PROPOSAL_SYSTEM_PROMPT = """あなたは競馬の買い目提案を生成す
 分析結果を見て、各馬の勝率（win_probabilities）を判断する。
 
 **判断の指針:**
-- 各馬の `ai_predictions` を見て、各ソースのスコアと順位から総合的に勝率を判断する
+- 各馬のAI予想を見て、各ソースのスコアと順位から総合的に勝率を判断する
   - 複数ソースで上位に来ている馬は勝率を高くする
   - ソース間で評価が割れている馬は `consensus` の `divergence_horses` を参考にする
 - `running_style_summary` と各馬の `running_style` からペースを自ら判断し、勝率に反映する
@@ -76,3 +76,23 @@ propose_bets(
 
 提案は「データ分析に基づく提案」としてフレーミングし、最終判断はユーザーに委ねること。
 """
+
+# ツール結果がコンパクト表現（tools/compact_payload.py）のときの horses の読み方
+HORSES_TABLE_GUIDE = """`horses` は `columns` と `rows` の表で、1行が1頭。`sources` に各ソース列の意味がある
+（AI予想の列は [順位, スコア]、スピード指数の列は指数値。データがない馬は null）。
+
+"""
+
+_HORSES_TABLE_GUIDE_ANCHOR = "**判断の指針:**"
+
+
+def build_bet_proposal_prompt(compact_tool_results: bool) -> str:
+    """ツール結果の表現に合わせた買い目提案のシステムプロンプトを返す.
+
+    コンパクト表現のときだけ、horses の表（columns / rows）の読み方を加える。
+    """
+    if not compact_tool_results:
+        return BET_PROPOSAL_SYSTEM_PROMPT
+    return BET_PROPOSAL_SYSTEM_PROMPT.replace(
+        _HORSES_TABLE_GUIDE_ANCHOR, HORSES_TABLE_GUIDE + _HORSES_TABLE_GUIDE_ANCHOR, 1,
+    )
@@ -0,0 +1,157 @@
+"""エージェントの起動時間プロファイラ.
+
+新しいインタプリタで ``python -X importtime`` を実行し、モジュール・パッケージごとの
+import 時間を集計する。あわせて、初回リクエストが負担する初期化時間
+（エージェント生成・ツール import・クライアント生成）をウォームアップの有無で計測する。
+
+実行: ``python startup_profile.py [--top 20] [--cold-start]``（agentcore ディレクトリから）
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+AGENTCORE_DIR = Path(__file__).resolve().parent
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)$")
+
+
+@dataclass(frozen=True)
+class ImportRecord:
+    """1モジュールの import 時間.
+
+    Attributes:
+        module: モジュール名
+        self_us: そのモジュール自身の実行時間（マイクロ秒）
+        cumulative_us: 依存モジュールを含む時間（マイクロ秒）
+        depth: import の入れ子の深さ（0 がトップレベル）
+    """
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> list[ImportRecord]:
+    """``-X importtime`` の出力（標準エラー）を解析する."""
+    records = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        records.append(ImportRecord(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return records
+
+
+def _subprocess_env() -> dict:
+    env = dict(os.environ)
+    # クライアント生成にリージョンが必要（ネットワークには接続しない）
+    env.setdefault("AWS_DEFAULT_REGION", "ap-northeast-1")
+    return env
+
+
+def profile_imports(statement: str = "import agent") -> list[ImportRecord]:
+    """新しいインタプリタで statement を実行し、import 時間を計測する."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=AGENTCORE_DIR,
+        env=_subprocess_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(completed.stderr)
+
+
+def package_totals(records: list[ImportRecord]) -> dict[str, float]:
+    """トップレベルパッケージごとの import 時間（ミリ秒、自身の時間の合計）を降順で返す."""
+    totals: dict[str, int] = {}
+    for r in records:
+        package = r.module.split(".")[0]
+        totals[package] = totals.get(package, 0) + r.self_us
+    return {k: round(v / 1000, 1) for k, v in sorted(totals.items(), key=lambda kv: -kv[1])}
+
+
+def format_report(records: list[ImportRecord], top: int = 20) -> str:
+    """import 時間のレポートを文字列にする."""
+    total_us = sum(r.self_us for r in records)
+    lines = [f"total import time: {total_us / 1000:.1f}ms ({len(records)} modules)", ""]
+    lines.append(f"{'package':<32}{'ms':>10}")
+    for package, ms in list(package_totals(records).items())[:top]:
+        lines.append(f"{package:<32}{ms:>10.1f}")
+    lines += ["", f"{'module (self time)':<48}{'self ms':>10}{'cum ms':>10}"]
+    for r in sorted(records, key=lambda r: -r.self_us)[:top]:
+        lines.append(f"{r.module:<48}{r.self_us / 1000:>10.1f}{r.cumulative_us / 1000:>10.1f}")
+    return "\n".join(lines)
+
+
+# 初回リクエストまでの時間を新しいインタプリタで計測するスクリプト
+_COLD_START_SCRIPT = """
+import json, time
+t0 = time.perf_counter()
+import agent
+t1 = time.perf_counter()
+warm_up_ms = None
+if {warm_up}:
+    agent.ping()
+    agent.get_warmup().wait()
+    warm_up_ms = (time.perf_counter() - t1) * 1000
+t2 = time.perf_counter()
+agent._get_agent()
+agent._warm_up_clients()
+t3 = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (t1 - t0) * 1000,
+    "warm_up_ms": warm_up_ms,
+    "first_request_init_ms": (t3 - t2) * 1000,
+}}))
+"""
+
+
+def measure_cold_start(*, warm_up: bool) -> dict:
+    """プロセス起動から初回リクエストの初期化までの時間を計測する.
+
+    Args:
+        warm_up: True なら初期化の前に ping でウォームアップを済ませる
+
+    Returns:
+        import_ms（agent モジュールの import）、warm_up_ms（ウォームアップ、なしなら None）、
+        first_request_init_ms（初回リクエストが負担する初期化）
+    """
+    env = _subprocess_env()
+    env["AGENT_WARMUP_ON_PING"] = "true"
+    completed = subprocess.run(
+        [sys.executable, "-c", _COLD_START_SCRIPT.format(warm_up=warm_up)],
+        cwd=AGENTCORE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {k: round(v, 1) if v is not None else None for k, v in result.items()}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="エージェントの起動時間プロファイラ")
+    parser.add_argument("--statement", default="import agent; import tool_router; tool_router.get_tools()")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--cold-start", action="store_true", help="初回リクエストの初期化時間も計測する")
+    args = parser.parse_args(argv)
+
+    print(format_report(profile_imports(args.statement), top=args.top))
+    if args.cold_start:
+        print()
+        for warm_up in (False, True):
+            print(f"warm_up={warm_up}: {measure_cold_start(warm_up=warm_up)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,23 @@
-"""AgentCore カスタムツール."""
-
-from .bet_analysis import analyze_bet_selection
-from .odds_analysis import analyze_odds_movement
-from .ai_prediction import get_ai_prediction, list_ai_predictions_for_date
-
-__all__ = [
-    "analyze_bet_selection",
-    "analyze_odds_movement",
-    "get_ai_prediction",
-    "list_ai_predictions_for_date",
-]
+"""AgentCore カスタムツール.
+
+エクスポートするツールは参照されたときに import する。
+tools.X を import するたびに使わないツールモジュールまで読み込まないようにするため。
+"""
+
+import importlib
+
+_EXPORTS = {
+    "analyze_bet_selection": ".bet_analysis",
+    "analyze_odds_movement": ".odds_analysis",
+    "get_ai_prediction": ".ai_prediction",
+    "list_ai_predictions_for_date": ".ai_prediction",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
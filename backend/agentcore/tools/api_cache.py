@@ -2,12 +2,15 @@
 
 AgentCore Runtimeは各セッションを独立したmicroVMで実行するため、
 このキャッシュはセッションスコープ（リクエスト完了で破棄）。
+セッションをまたぐ共有層は shared_cache を参照。
 """
 
 import hashlib
 import json
 import logging
+import threading
 import time
+from collections import OrderedDict, defaultdict
 
 logger = logging.getLogger("agentcore.tools.api_cache")
 
@@ -29,8 +32,31 @@ def _infer_data_type(url: str) -> str:
     return "default"
 
 
+def make_cache_key(url: str, params: dict | None = None) -> str:
+    """URLとパラメータからキャッシュキーを生成."""
+    key_data = url
+    if params:
+        key_data += json.dumps(params, sort_keys=True)
+    return hashlib.md5(key_data.encode(), usedforsecurity=False).hexdigest()
+
+
+def _approx_size(data: object) -> int:
+    """デコード済みデータの概算サイズ（JSONのバイト数）."""
+    try:
+        return len(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode())
+    except (TypeError, ValueError):
+        return 0
+
+
 class SessionCache:
-    """TTL付きセッション内メモリキャッシュ."""
+    """TTL付きのサイズ上限つきLRUセッション内キャッシュ.
+
+    値にはデコード済みのJSON（dict/list）を保持する。取り出した値は
+    キャッシュと共有されるため、呼び出し側で変更しないこと。
+    エントリ数が MAX_ENTRIES を、概算サイズ（JSONのバイト数）の合計が
+    MAX_BYTES を超えたら、期限切れ → 最も長く使われていない順に追い出す。
+    並列取得（fan_out）のワーカースレッドから同時に呼ばれるため、操作はロックで直列化する。
+    """
 
     DEFAULT_TTL = {
         "race_info": 3600,
@@ -43,38 +69,64 @@ class SessionCache:
     }
 
     MAX_ENTRIES = 1000
+    MAX_BYTES = 16 * 1024 * 1024
 
     def __init__(self):
-        self._cache: dict[str, tuple[float, object]] = {}
+        # key -> (有効期限, データ種別, 概算バイト数, データ)
+        self._cache: OrderedDict[str, tuple[float, str, int, object]] = OrderedDict()
+        self._bytes = 0
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
+        self._type_hits: dict[str, int] = defaultdict(int)
+        self._type_misses: dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
 
     def _make_key(self, url: str, params: dict | None = None) -> str:
         """URLとパラメータからキャッシュキーを生成."""
-        key_data = url
-        if params:
-            key_data += json.dumps(params, sort_keys=True)
-        return hashlib.md5(key_data.encode(), usedforsecurity=False).hexdigest()
+        return make_cache_key(url, params)
 
     def get(self, url: str, params: dict | None = None) -> object | None:
         """キャッシュからデータを取得. ヒット時はデータ、ミス時はNone."""
         key = self._make_key(url, params)
-        if key in self._cache:
-            expiry, data = self._cache[key]
-            if time.time() < expiry:
-                self._hits += 1
-                logger.debug("Cache hit: %s", url)
-                return data
-            del self._cache[key]
-        self._misses += 1
-        return None
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                expiry, data_type, _, data = entry
+                if time.time() < expiry:
+                    self._cache.move_to_end(key)
+                    self._hits += 1
+                    self._type_hits[data_type] += 1
+                    logger.debug("Cache hit: %s", url)
+                    return data
+                self._remove(key)
+            self._misses += 1
+            self._type_misses[_infer_data_type(url)] += 1
+            return None
+
+    def _remove(self, key: str) -> None:
+        """エントリを削除してサイズを差し引く（ロックを取った状態で呼ぶ）."""
+        _, _, size, _ = self._cache.pop(key)
+        self._bytes -= size
 
     def _evict_expired(self) -> None:
-        """期限切れエントリを削除."""
+        """期限切れエントリを削除（ロックを取った状態で呼ぶ）."""
         now = time.time()
-        expired = [k for k, (expiry, _) in self._cache.items() if expiry <= now]
+        expired = [k for k, (expiry, _, _, _) in self._cache.items() if expiry <= now]
         for k in expired:
-            del self._cache[k]
+            self._remove(k)
+
+    def _enforce_limits(self) -> None:
+        """上限を超えていれば期限切れ → LRU の順に追い出す（ロックを取った状態で呼ぶ）."""
+        if len(self._cache) <= self.MAX_ENTRIES and self._bytes <= self.MAX_BYTES:
+            return
+        self._evict_expired()
+        while len(self._cache) > self.MAX_ENTRIES or (
+            self._bytes > self.MAX_BYTES and len(self._cache) > 1
+        ):
+            key = next(iter(self._cache))
+            self._remove(key)
+            self._evictions += 1
 
     def set(
         self,
@@ -82,26 +134,67 @@ class SessionCache:
         data: object,
         params: dict | None = None,
         data_type: str | None = None,
+        size: int | None = None,
+        ttl: float | None = None,
     ) -> None:
-        """キャッシュにデータを保存."""
+        """キャッシュにデータを保存.
+
+        Args:
+            url: リクエストURL
+            data: デコード済みのレスポンス
+            params: クエリパラメータ
+            data_type: データ種別（省略時はURLから推定）
+            size: 概算バイト数（省略時はJSONにシリアライズして測る）
+            ttl: 有効秒数（省略時はデータ種別のTTL。共有層の残りTTLを引き継ぐ場合に指定）
+        """
         if data_type is None:
             data_type = _infer_data_type(url)
+        if size is None:
+            size = _approx_size(data)
         key = self._make_key(url, params)
-        ttl = self.DEFAULT_TTL.get(data_type, self.DEFAULT_TTL["default"])
-        self._cache[key] = (time.time() + ttl, data)
-        if len(self._cache) > self.MAX_ENTRIES:
-            self._evict_expired()
+        type_ttl = self.DEFAULT_TTL.get(data_type, self.DEFAULT_TTL["default"])
+        ttl = type_ttl if ttl is None else min(ttl, type_ttl)
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+            self._cache[key] = (time.time() + ttl, data_type, size, data)
+            self._bytes += size
+            self._enforce_limits()
 
     @property
     def stats(self) -> dict:
         """キャッシュ統計を返す."""
-        total = self._hits + self._misses
-        return {
-            "hits": self._hits,
-            "misses": self._misses,
-            "hit_rate": self._hits / total if total > 0 else 0,
-            "cache_size": len(self._cache),
-        }
+        with self._lock:
+            total = self._hits + self._misses
+            by_type = {}
+            for data_type in sorted(set(self._type_hits) | set(self._type_misses)):
+                hits = self._type_hits[data_type]
+                misses = self._type_misses[data_type]
+                by_type[data_type] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": hits / (hits + misses) if hits + misses > 0 else 0,
+                }
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total > 0 else 0,
+                "cache_size": len(self._cache),
+                "cache_bytes": self._bytes,
+                "evictions": self._evictions,
+                "by_type": by_type,
+            }
+
+    def clear(self) -> None:
+        """全エントリと統計をリセット."""
+        with self._lock:
+            self._cache.clear()
+            self._bytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._type_hits.clear()
+            self._type_misses.clear()
 
 
 _session_cache = SessionCache()
@@ -5,10 +5,9 @@ JRA統計に基づく券種別確率、出走頭数補正、レース条件補
 合成オッズ計算、AI指数内訳分析、資金配分最適化を含む。
 """
 
-import math
-
 from strands import tool
 
+from .budget_allocation import allocate_proportional
 from .common import log_tool_execution
 
 # 券種の日本語表示名
@@ -908,32 +907,19 @@ def _optimize_fund_allocation(
     if not allocations:
         return {"allocations": [], "strategy": "有効なオッズデータがないため配分不可"}
 
-    # ケリー比率に基づいて配分
+    # ケリー比率に基づいて100円単位で配分（全馬マイナス期待値なら均等配分）
     if total_kelly > 0:
         for alloc in allocations:
-            ratio = alloc["kelly_fraction"] / total_kelly
-            raw_amount = total_budget * ratio
-            # 100円単位に丸める
-            alloc["suggested_amount"] = max(100, int(math.floor(raw_amount / 100) * 100))
-            alloc["allocation_ratio"] = round(ratio * 100, 1)
+            alloc["allocation_ratio"] = round(alloc["kelly_fraction"] / total_kelly * 100, 1)
+        weights = [alloc["kelly_fraction"] for alloc in allocations]
     else:
-        # ケリー基準で全馬マイナス期待値の場合
-        equal_amount = max(100, int(math.floor(total_budget / len(allocations) / 100) * 100))
         for alloc in allocations:
-            alloc["suggested_amount"] = equal_amount
             alloc["allocation_ratio"] = round(100 / len(allocations), 1)
-
-    # 配分合計を算出
-    total_allocated = sum(a["suggested_amount"] for a in allocations)
-
-    # 100円単位への丸めにより発生した残額を、期待値が最も高い馬に再配分する
-    remaining_budget = total_budget - total_allocated
-    if allocations and remaining_budget >= 100:
-        extra_amount = int(math.floor(remaining_budget / 100) * 100)
-        if extra_amount >= 100:
-            best_allocation = max(allocations, key=lambda x: x["expected_return"])
-            best_allocation["suggested_amount"] += extra_amount
-            total_allocated = sum(a["suggested_amount"] for a in allocations)
+        weights = [0.0] * len(allocations)
+    amounts = allocate_proportional(weights, total_budget)
+    for alloc, amount in zip(allocations, amounts, strict=True):
+        alloc["suggested_amount"] = amount
+    total_allocated = sum(amounts)
 
     strategy_parts = []
     ev_positive = [a for a in allocations if a["expected_return"] >= 1.0]
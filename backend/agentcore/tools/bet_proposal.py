@@ -7,9 +7,8 @@
 import json
 import logging
 import math
-import os
+from concurrent.futures import Future
 
-import boto3
 import requests
 from botocore.exceptions import BotoCoreError, ClientError
 from strands import tool
@@ -20,6 +19,11 @@ from .bet_analysis import (
     _harville_exacta,
     _harville_trifecta,
 )
+from .budget_allocation import allocate_dutching, allocate_proportional
+from .common import log_tool_execution
+from .metrics import phase
+from .narration import get_narrator, with_late_narration
+from .narrator_client import NarrationBudgetExceededError, get_narrator_client
 
 # =============================================================================
 # ツール結果キャッシュ（セパレータ復元用）
@@ -28,14 +32,21 @@ from .bet_analysis import (
 # NOTE: AgentCore Runtime は各セッションを独立した microVM で実行するため、
 # 並行リクエストによる競合状態は発生しない。
 _last_proposal_result: dict | None = None
+# 期限を過ぎて実行中の proposal_reasoning のナレーション
+_pending_narration: Future | None = None
 
 
 def get_last_proposal_result() -> dict | None:
-    """キャッシュされた最新のツール結果を取得し、キャッシュをクリアする."""
-    global _last_proposal_result
-    result = _last_proposal_result
-    _last_proposal_result = None
-    return result
+    """キャッシュされた最新のツール結果を取得し、キャッシュをクリアする.
+
+    期限後に完了したナレーションがあれば proposal_reasoning に反映した新しい dict を返す。
+    """
+    global _last_proposal_result, _pending_narration
+    result, pending = _last_proposal_result, _pending_narration
+    _last_proposal_result = _pending_narration = None
+    if result is None:
+        return None
+    return with_late_narration(result, pending, "proposal_reasoning")
 
 
 # =============================================================================
@@ -68,13 +79,6 @@ MAX_RACE_BUDGET_RATIO = 0.10
 # デフォルト基本投入率
 DEFAULT_BASE_RATE = 0.03
 
-# LLMナレーション: モデルID・リージョン（環境変数で上書き可能）
-NARRATOR_MODEL_ID = os.environ.get(
-    "BEDROCK_NARRATOR_MODEL_ID",
-    "jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-)
-NARRATOR_REGION = os.environ.get("AWS_REGION", "ap-northeast-1")
-
 # LLMナレーション: システムプロンプト
 NARRATOR_SYSTEM_PROMPT = """あなたは競馬データアナリストです。
 以下のデータを元に、買い目提案の根拠を4セクションで書いてください。
@@ -682,7 +686,7 @@ def _generate_bet_reasoning(
 def _allocate_budget(bets: list[dict], budget: int) -> list[dict]:
     """予算をEV比例で配分する.
 
-    100円単位に丸め、最低100円保証。
+    100円単位・最低100円保証で、予算内の100円単位を使い切る（最大剰余法）。
 
     Args:
         bets: 買い目候補リスト
@@ -706,45 +710,11 @@ def _allocate_budget(bets: list[dict], budget: int) -> list[dict]:
         bets.sort(key=lambda b: -b.get("expected_value", 0))
         bets = bets[:max_affordable]
 
-    # EV比例配分
-    evs = [max(0, b.get("expected_value", 0)) for b in bets]
-    total_ev = sum(evs)
-    if total_ev > 0:
-        for i, bet in enumerate(bets):
-            raw = budget * evs[i] / total_ev
-            bet["amount"] = max(unit, int(math.floor(raw / unit) * unit))
-    else:
-        per_bet = max(unit, int(math.floor(budget / len(bets) / unit) * unit))
-        for bet in bets:
-            bet["amount"] = per_bet
-
-    # 予算超過時はEV低い順に削減
-    total_amount = sum(b.get("amount", 0) for b in bets)
-    if total_amount > budget:
-        overage = total_amount - budget
-        sorted_by_ev = sorted(bets, key=lambda b: b.get("expected_value", 0))
-        for b in sorted_by_ev:
-            if overage <= 0:
-                break
-            reducible = b["amount"] - unit
-            if reducible > 0:
-                reduction = min(reducible, overage)
-                reduction = (reduction // unit) * unit
-                if reduction > 0:
-                    b["amount"] -= reduction
-                    overage -= reduction
-
-    # 余剰予算をEV比率で追加配分
-    remaining = budget - sum(b.get("amount", 0) for b in bets if "amount" in b)
-    if remaining >= unit and total_ev > 0:
-        initial_remaining = remaining
-        for i, bet in enumerate(bets):
-            if remaining < unit:
-                break
-            share = int(math.floor(initial_remaining * evs[i] / total_ev / unit) * unit)
-            if share >= unit:
-                bet["amount"] += share
-                remaining -= share
+    amounts = allocate_proportional(
+        [b.get("expected_value", 0) for b in bets], budget, unit=unit,
+    )
+    for bet, amount in zip(bets, amounts, strict=True):
+        bet["amount"] = amount
 
     return bets
 
@@ -753,7 +723,7 @@ def _allocate_budget_dutching(bets: list[dict], budget: int) -> list[dict]:
     """ダッチング方式で予算を配分する.
 
     どの買い目が的中しても同額の払い戻しになるように、
-    オッズの逆数に比例して配分する。
+    オッズの逆数に比例して配分する。100円に満たない高オッズの買い目は除外する。
 
     Args:
         bets: 買い目候補リスト（composite_odds, expected_value キーを持つ）
@@ -773,28 +743,14 @@ def _allocate_budget_dutching(bets: list[dict], budget: int) -> list[dict]:
     if not eligible:
         return []
 
-    inv_odds_sum = sum(1.0 / float(b["composite_odds"]) for b in eligible)
-    composite_odds = 1.0 / inv_odds_sum
-
-    unit = MIN_BET_AMOUNT
-    for bet in eligible:
-        raw = budget * composite_odds / float(bet["composite_odds"])
-        bet["amount"] = max(unit, int(math.floor(raw / unit) * unit))
-
-    funded = [b for b in eligible if b.get("amount", 0) >= unit]
-
-    # 合計が予算を超える場合、配分額が最小の買い目を除外して再帰
-    total = sum(b["amount"] for b in funded)
-    if total > budget and len(funded) > 1:
-        funded.sort(key=lambda x: x["amount"])
-        return _allocate_budget_dutching(funded[1:], budget)
-
-    if len(funded) < len(eligible):
-        return _allocate_budget_dutching(funded, budget)
-
-    remaining = budget - total
-    if remaining >= unit and funded:
-        funded[0]["amount"] += int(remaining // unit) * unit
+    amounts = allocate_dutching(
+        [float(b["composite_odds"]) for b in eligible], budget, unit=MIN_BET_AMOUNT,
+    )
+    funded = []
+    for bet, amount in zip(eligible, amounts, strict=True):
+        if amount > 0:
+            bet["amount"] = amount
+            funded.append(bet)
 
     final_inv_sum = sum(1.0 / float(b["composite_odds"]) for b in funded)
     final_composite = round(1.0 / final_inv_sum, 2) if final_inv_sum > 0 else 0
@@ -1085,6 +1041,7 @@ def _generate_bet_proposal_impl(
     Returns:
         統合提案結果
     """
+    global _pending_narration
     race_conditions = race_conditions or []
     running_styles = running_styles or []
 
@@ -1150,8 +1107,8 @@ def _generate_bet_proposal_impl(
     # AI合議レベル
     ai_consensus = _assess_ai_consensus(ai_predictions, unified_probs=unified_probs)
 
-    # 提案根拠テキスト生成
-    proposal_reasoning = _generate_proposal_reasoning(
+    # 提案根拠テキスト生成（ナレーションが期限内に返らなければテンプレート）
+    proposal_reasoning, pending_narration = _generate_proposal_reasoning_with_pending(
         axis_horses=selected_axis,
         ai_consensus=ai_consensus,
         bets=bets,
@@ -1186,6 +1143,9 @@ def _generate_bet_proposal_impl(
             total_amount / bankroll * 100, 2
         ) if bankroll > 0 else 0
 
+    # 期限後に届いたナレーションはツール結果キャッシュの取り出し時に反映する
+    _pending_narration = pending_narration
+
     return result
 
 
@@ -1272,27 +1232,9 @@ def _build_narration_context(
     return ctx
 
 
-_bedrock_runtime_client = None
-
-
-def _get_bedrock_runtime_client():
-    """Bedrock Runtime クライアントを遅延初期化で取得する."""
-    global _bedrock_runtime_client
-    if _bedrock_runtime_client is None:
-        _bedrock_runtime_client = boto3.client("bedrock-runtime", region_name=NARRATOR_REGION)
-    return _bedrock_runtime_client
-
-
 def _call_bedrock_haiku(system_prompt: str, user_message: str) -> str:
-    """Bedrock Converse API で Haiku を呼び出す."""
-    client = _get_bedrock_runtime_client()
-    response = client.converse(
-        modelId=NARRATOR_MODEL_ID,
-        system=[{"text": system_prompt}],
-        messages=[{"role": "user", "content": [{"text": user_message}]}],
-        inferenceConfig={"maxTokens": 1024, "temperature": 0.7},
-    )
-    return response["output"]["message"]["content"][0]["text"]
+    """Bedrock ConverseStream で Haiku を呼び出す（共有クライアント経由）."""
+    return get_narrator_client().complete(system_prompt, user_message)
 
 
 def _invoke_haiku_narrator(context: dict) -> str | None:
@@ -1309,7 +1251,7 @@ def _invoke_haiku_narrator(context: dict) -> str | None:
             return text.strip()
         logger.warning("LLMナレーション: 4セクション不足。フォールバックへ。")
         return None
-    except (BotoCoreError, ClientError, KeyError, TypeError) as e:
+    except (BotoCoreError, ClientError, NarrationBudgetExceededError, KeyError, TypeError) as e:
         logger.warning("LLMナレーション: Bedrock呼び出し失敗（%s）。フォールバックへ。", type(e).__name__)
         return None
 
@@ -1471,6 +1413,34 @@ def _generate_proposal_reasoning(
     speed_index_data: dict | None = None,
 ) -> str:
     """提案根拠テキストを4セクションで生成する（LLMナレーション版）."""
+    text, _ = _generate_proposal_reasoning_with_pending(
+        axis_horses=axis_horses,
+        ai_consensus=ai_consensus,
+        bets=bets,
+        preferred_bet_types=preferred_bet_types,
+        ai_predictions=ai_predictions,
+        runners_data=runners_data,
+        speed_index_data=speed_index_data,
+    )
+    return text
+
+
+def _generate_proposal_reasoning_with_pending(
+    axis_horses: list[dict],
+    ai_consensus: str,
+    bets: list[dict],
+    preferred_bet_types: list[str] | None,
+    ai_predictions: list[dict],
+    runners_data: list[dict],
+    speed_index_data: dict | None = None,
+) -> tuple[str, Future | None]:
+    """提案根拠テキストと、期限を過ぎて実行中のナレーションを返す.
+
+    ナレーションが期限内に得られなければテンプレート版を返す。
+
+    Returns:
+        (提案根拠テキスト, 実行中ナレーションの Future または None)
+    """
     context = _build_narration_context(
         axis_horses=axis_horses,
         ai_consensus=ai_consensus,
@@ -1480,9 +1450,10 @@ def _generate_proposal_reasoning(
         runners_data=runners_data,
         speed_index_data=speed_index_data,
     )
-    result = _invoke_haiku_narrator(context)
+    with phase("narrate"):
+        result, pending = get_narrator().narrate(context, _invoke_haiku_narrator)
     if result is not None:
-        return result
+        return result, None
     # フォールバック: テンプレート生成
     return _generate_proposal_reasoning_template(
         axis_horses=axis_horses,
@@ -1492,7 +1463,7 @@ def _generate_proposal_reasoning(
         ai_predictions=ai_predictions,
         runners_data=runners_data,
         speed_index_data=speed_index_data,
-    )
+    ), pending
 
 
 def _generate_analysis_comment(
@@ -1522,6 +1493,7 @@ def _generate_analysis_comment(
 
 
 @tool
+@log_tool_execution
 def generate_bet_proposal(
     race_id: str,
     budget: int = 0,
@@ -1557,62 +1529,64 @@ def generate_bet_proposal(
         - disclaimer: 免責事項
         (bankrollモード時は追加: race_budget, bankroll_usage_pct)
     """
-    global _last_proposal_result
-    _last_proposal_result = None  # 呼び出し単位でキャッシュをリセット
+    global _last_proposal_result, _pending_narration
+    _last_proposal_result = _pending_narration = None  # 呼び出し単位でキャッシュをリセット
     try:
         # データ収集
-        from .race_data import _fetch_race_detail, _extract_race_conditions
-        from .ai_prediction import get_ai_prediction
         from .pace_analysis import _get_running_styles
-
-        # レースデータ取得
-        race_detail = _fetch_race_detail(race_id)
-        race = race_detail.get("race", {})
-        runners_data = race_detail.get("runners", [])
-        race_conditions = _extract_race_conditions(race)
-        venue = race.get("venue", "")
-        total_runners = race.get("horse_count", len(runners_data))
-        race_name = race.get("race_name", "")
-
-        # AI予想取得
-        ai_result = get_ai_prediction(race_id)
-        ai_predictions = []
-        unified_probs = {}
-        if isinstance(ai_result, dict):
-            sources = ai_result.get("sources", [])
-            if sources:
-                ai_predictions = sources[0].get("predictions", [])
-                unified_probs = _compute_unified_win_probabilities(ai_result)
-            elif ai_result.get("predictions"):
-                ai_predictions = ai_result["predictions"]
-
-        # 脚質データ取得
-        running_styles = _get_running_styles(race_id)
-
-        # スピード指数データ取得
-        from .speed_index import get_speed_index
-        speed_index_data = None
-        si_result = get_speed_index(race_id)
-        if isinstance(si_result, dict) and "error" not in si_result:
-            speed_index_data = si_result
-
-        result = _generate_bet_proposal_impl(
-            race_id=race_id,
-            budget=budget,
-            runners_data=runners_data,
-            ai_predictions=ai_predictions,
-            race_name=race_name,
-            race_conditions=race_conditions,
-            venue=venue,
-            total_runners=total_runners,
-            running_styles=running_styles,
-            preferred_bet_types=preferred_bet_types,
-            axis_horses=axis_horses,
-            max_bets=max_bets,
-            speed_index_data=speed_index_data,
-            unified_probs=unified_probs or None,
-            bankroll=bankroll,
-        )
+        from .race_data import _extract_race_conditions, _fetch_race_detail
+        from .race_signals import AI_PREDICTION, SPEED_INDEX, load_race_signals
+
+        with phase("fetch"):
+            # レースデータ取得
+            race_detail = _fetch_race_detail(race_id)
+            race = race_detail.get("race", {})
+            runners_data = race_detail.get("runners", [])
+            race_conditions = _extract_race_conditions(race)
+            venue = race.get("venue", "")
+            total_runners = race.get("horse_count", len(runners_data))
+            race_name = race.get("race_name", "")
+
+            # AI予想・スピード指数を両テーブル並列の1回の読み込みで取得
+            signals = load_race_signals([race_id])[race_id]
+
+            ai_result = signals[AI_PREDICTION]
+            ai_predictions = []
+            unified_probs = {}
+            if isinstance(ai_result, dict):
+                sources = ai_result.get("sources", [])
+                if sources:
+                    ai_predictions = sources[0].get("predictions", [])
+                    unified_probs = _compute_unified_win_probabilities(ai_result)
+                elif ai_result.get("predictions"):
+                    ai_predictions = ai_result["predictions"]
+
+            # 脚質データ取得
+            running_styles = _get_running_styles(race_id)
+
+            speed_index_data = None
+            si_result = signals[SPEED_INDEX]
+            if isinstance(si_result, dict) and "error" not in si_result:
+                speed_index_data = si_result
+
+        with phase("compute"):
+            result = _generate_bet_proposal_impl(
+                race_id=race_id,
+                budget=budget,
+                runners_data=runners_data,
+                ai_predictions=ai_predictions,
+                race_name=race_name,
+                race_conditions=race_conditions,
+                venue=venue,
+                total_runners=total_runners,
+                running_styles=running_styles,
+                preferred_bet_types=preferred_bet_types,
+                axis_horses=axis_horses,
+                max_bets=max_bets,
+                speed_index_data=speed_index_data,
+                unified_probs=unified_probs or None,
+                bankroll=bankroll,
+            )
         if "error" not in result:
             _last_proposal_result = result
         return result
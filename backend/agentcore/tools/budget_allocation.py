@@ -0,0 +1,137 @@
+"""100円単位の予算配分エンジン.
+
+予算を購入単位（100円）の個数として扱い、丸めた結果を直接求める。
+比例配分は最大剰余法（各買い目に取り分の整数部を配り、余った単位を
+小数部の大きい順に1つずつ配る）で、合計は常に予算内の最大の単位数になる。
+いずれもソート1回の O(n log n)。
+
+- EV比例・ケリー比例: allocate_proportional に重みを渡す
+- ダッチング: allocate_dutching にオッズを渡す
+"""
+
+import math
+
+# 馬券の購入単位（円）
+BET_UNIT = 100
+
+
+def _largest_remainder(weights: list[float], units: int) -> list[int]:
+    """units 個の単位を重みに比例して配る（最大剰余法）.
+
+    重みの合計が 0 の場合は均等に配る。
+    """
+    total_weight = sum(weights)
+    if total_weight <= 0:
+        weights = [1.0] * len(weights)
+        total_weight = float(len(weights))
+    quotas = [units * w / total_weight for w in weights]
+    counts = [math.floor(q) for q in quotas]
+    leftover = units - sum(counts)
+    if leftover > 0:
+        # 小数部の大きい順（同値は重みの大きい順、先頭優先）
+        order = sorted(
+            range(len(weights)),
+            key=lambda i: (quotas[i] - counts[i], weights[i], -i),
+            reverse=True,
+        )
+        for i in order[:leftover]:
+            counts[i] += 1
+    return counts
+
+
+def allocate_proportional(
+    weights: list[float],
+    budget: int,
+    *,
+    unit: int = BET_UNIT,
+    min_units: int = 1,
+) -> list[int]:
+    """予算を重みに比例して unit 単位で配分する.
+
+    各買い目に最低 min_units 単位を保証し、合計は budget // unit 単位ちょうどになる。
+    全員に最低単位を配れない場合は、重みの大きい順に最低単位ずつ配る。
+
+    Args:
+        weights: 買い目ごとの重み（負の値は 0 扱い）
+        budget: 総予算（円）
+        unit: 購入単位（円）
+        min_units: 1買い目あたりの最低単位数
+
+    Returns:
+        買い目ごとの金額（円）。weights と同じ順序。
+    """
+    n = len(weights)
+    total_units = budget // unit if budget > 0 else 0
+    if n == 0 or total_units <= 0:
+        return [0] * n
+    weights = [max(0.0, float(w)) for w in weights]
+    counts = [0] * n
+
+    if total_units < n * min_units:
+        by_weight = sorted(range(n), key=lambda i: (-weights[i], i))
+        for i in by_weight[: total_units // min_units]:
+            counts[i] = min_units
+        return [c * unit for c in counts]
+
+    # 取り分が最低単位に満たない買い目を重みの小さい順に最低単位で固定する。
+    # 固定すると残りの取り分は減るため、昇順に1回走査すれば足りる。
+    # 最後の1つは固定せず、残りの単位をすべて受け取る。
+    remaining_units = total_units
+    remaining_weight = sum(weights)
+    by_weight = sorted(range(n), key=lambda i: (weights[i], -i))
+    pos = 0
+    while pos < n - 1:
+        i = by_weight[pos]
+        if remaining_weight <= 0 or remaining_units * weights[i] / remaining_weight >= min_units:
+            # 残りは全員最低単位以上（または全員重み0で均等配分）
+            break
+        counts[i] = min_units
+        remaining_units -= min_units
+        remaining_weight -= weights[i]
+        pos += 1
+
+    free = sorted(by_weight[pos:])
+    for i, c in zip(free, _largest_remainder([weights[i] for i in free], remaining_units), strict=True):
+        counts[i] = c
+    return [c * unit for c in counts]
+
+
+def allocate_dutching(
+    odds: list[float],
+    budget: int,
+    *,
+    unit: int = BET_UNIT,
+) -> list[int]:
+    """どの買い目が的中しても払い戻しがほぼ同額になるよう配分する.
+
+    金額はオッズの逆数に比例させる。取り分が1単位に満たない
+    高オッズの買い目は 0 円（対象外）とし、残りで予算 budget // unit 単位を使い切る。
+
+    Args:
+        odds: 買い目ごとのオッズ（0 以下は対象外）
+        budget: 総予算（円）
+        unit: 購入単位（円）
+
+    Returns:
+        買い目ごとの金額（円）。odds と同じ順序。
+    """
+    n = len(odds)
+    total_units = budget // unit if budget > 0 else 0
+    amounts = [0] * n
+    by_odds = sorted((i for i in range(n) if odds[i] > 0), key=lambda i: (odds[i], i))
+    if total_units <= 0 or not by_odds:
+        return amounts
+
+    # オッズの低い順に k 本を採用したとき、最も高オッズの買い目の取り分
+    # total_units / (odds_k × Σ 1/odds) が1単位以上となる最大の k
+    inv_sum = 0.0
+    selected = 0
+    for k, i in enumerate(by_odds, start=1):
+        inv_sum += 1.0 / odds[i]
+        if total_units / (odds[i] * inv_sum) < 1:
+            break
+        selected = k
+    chosen = sorted(by_odds[:selected])
+    for i, c in zip(chosen, _largest_remainder([1.0 / odds[i] for i in chosen], total_units), strict=True):
+        amounts[i] = c * unit
+    return amounts
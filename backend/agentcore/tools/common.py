@@ -1,68 +1,24 @@
 """AgentCoreツール共通モジュール.
 
-エラーハンドリング、構造化ロギング、実行時間計測、CloudWatchメトリクス送信のデコレータを提供する。
+エラーハンドリング、構造化ロギング、実行時間・フェーズ計測とメトリクス記録のデコレータと、
+独立したデータ取得を並列に実行するファンアウトを提供する。
 """
 
+import contextvars
 import logging
-import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from dataclasses import dataclass, field
 from functools import wraps
 from typing import Callable, ParamSpec, TypeVar
 
-import boto3
+from .metrics import record_tool_metrics, tool_scope
+from .tracing import span
 
 P = ParamSpec("P")
 R = TypeVar("R")
 
-METRICS_ENABLED = os.environ.get("EMIT_CLOUDWATCH_METRICS", "false").lower() == "true"
-METRICS_NAMESPACE = "BakenKaigi/AgentTools"
-
-# CloudWatchクライアント（遅延初期化）
-_cloudwatch_client = None
-
-
-def _get_cloudwatch_client():
-    global _cloudwatch_client
-    if _cloudwatch_client is None:
-        _cloudwatch_client = boto3.client(
-            "cloudwatch",
-            region_name=os.environ.get("AWS_REGION", "ap-northeast-1"),
-        )
-    return _cloudwatch_client
-
-
-def _emit_metrics(tool_name: str, duration_ms: float, success: bool) -> None:
-    """CloudWatchにメトリクスを送信する（ベストエフォート）."""
-    if not METRICS_ENABLED:
-        return
-    try:
-        client = _get_cloudwatch_client()
-        client.put_metric_data(
-            Namespace=METRICS_NAMESPACE,
-            MetricData=[
-                {
-                    "MetricName": "ExecutionTime",
-                    "Dimensions": [{"Name": "ToolName", "Value": tool_name}],
-                    "Value": duration_ms,
-                    "Unit": "Milliseconds",
-                },
-                {
-                    "MetricName": "Invocations",
-                    "Dimensions": [{"Name": "ToolName", "Value": tool_name}],
-                    "Value": 1,
-                    "Unit": "Count",
-                },
-                {
-                    "MetricName": "Errors",
-                    "Dimensions": [{"Name": "ToolName", "Value": tool_name}],
-                    "Value": 0 if success else 1,
-                    "Unit": "Count",
-                },
-            ],
-        )
-    except Exception:
-        pass  # メトリクス送信失敗はツール実行に影響させない
-
 
 def get_tool_logger(name: str) -> logging.Logger:
     """構造化ロガーを取得する.
@@ -84,18 +40,99 @@ def get_tool_logger(name: str) -> logging.Logger:
 def log_tool_execution(func: Callable[P, R]) -> Callable[P, R]:
     """ツール実行時間の計測・ログデコレータ.
 
-    ツールの呼び出しと完了をログに記録し、実行時間を計測する。
-    完了時にCloudWatchメトリクスを送信する。
+    ツールの呼び出しと完了をログに記録し、実行時間とフェーズ（metrics.phase）の内訳を計測する。
+    メトリクスはバッファに溜め、呼び出しの終わりに metrics.flush_metrics でまとめて書き出す。
     """
     @wraps(func)
     def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
         logger = get_tool_logger(func.__module__.split(".")[-1])
         logger.info(f"Tool invoked: {func.__name__}")
         start = time.perf_counter()
-        result = func(*args, **kwargs)
+        with span(func.__name__, "tool"), tool_scope() as phases_ms:
+            result = func(*args, **kwargs)
         duration_ms = (time.perf_counter() - start) * 1000
-        logger.info(f"Tool completed: {func.__name__} ({duration_ms:.0f}ms)")
+        breakdown = " ".join(f"{name}={ms:.0f}ms" for name, ms in phases_ms.items())
+        logger.info(f"Tool completed: {func.__name__} ({duration_ms:.0f}ms{'; ' + breakdown if breakdown else ''})")
         success = not (isinstance(result, dict) and "error" in result)
-        _emit_metrics(func.__name__, duration_ms, success=success)
+        record_tool_metrics(func.__name__, duration_ms, success=success, phases_ms=phases_ms)
         return result
     return wrapper
+
+
+# ファンアウト用の共有スレッドプール。
+# タイムアウトしたタスクはスレッドを止められないため、with で都度作ると
+# 終了待ちで呼び出し元がブロックされる。プロセス内で1つを使い回す。
+_FAN_OUT_MAX_WORKERS = 8
+_fan_out_executor = ThreadPoolExecutor(max_workers=_FAN_OUT_MAX_WORKERS, thread_name_prefix="tool-fan-out")
+
+
+@dataclass
+class FanOutResult:
+    """ファンアウトの結果.
+
+    Attributes:
+        results: 成功したタスクの戻り値（タスク名 → 値）
+        errors: 失敗・タイムアウトしたタスクのエラー内容（タスク名 → メッセージ）
+        timings_ms: タスクごとの所要時間（タイムアウトは打ち切りまでの時間）
+        total_ms: ファンアウト全体の所要時間
+    """
+
+    results: dict[str, object] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+    timings_ms: dict[str, float] = field(default_factory=dict)
+    total_ms: float = 0.0
+
+
+def _run_timed(func: Callable[[], object]) -> tuple[object, Exception | None, float]:
+    """(戻り値, 例外, 所要ミリ秒) を返す."""
+    start = time.perf_counter()
+    try:
+        value, error = func(), None
+    except Exception as e:
+        value, error = None, e
+    return value, error, (time.perf_counter() - start) * 1000
+
+
+def fan_out(
+    tasks: dict[str, Callable[[], object]],
+    *,
+    deadline: float,
+    timeouts: dict[str, float] | None = None,
+) -> FanOutResult:
+    """互いに依存しないタスクを並列に実行する.
+
+    全体の所要時間は最も遅いタスク（または deadline）で決まる。
+    例外やタイムアウトは FanOutResult.errors に記録し、他のタスクの結果は返す。
+
+    Args:
+        tasks: タスク名 → 引数なしの呼び出し
+        deadline: 全体の打ち切り秒数
+        timeouts: タスクごとの打ち切り秒数（deadline を超える値は deadline に丸める）
+
+    Returns:
+        FanOutResult
+    """
+    timeouts = timeouts or {}
+    start = time.perf_counter()
+    futures = {
+        name: _fan_out_executor.submit(contextvars.copy_context().run, _run_timed, func)
+        for name, func in tasks.items()
+    }
+
+    outcome = FanOutResult()
+    for name, future in futures.items():
+        limit = start + min(timeouts.get(name, deadline), deadline)
+        try:
+            value, error, elapsed_ms = future.result(timeout=max(0.0, limit - time.perf_counter()))
+        except FuturesTimeoutError:
+            future.cancel()
+            outcome.errors[name] = "timeout"
+            outcome.timings_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+            continue
+        outcome.timings_ms[name] = round(elapsed_ms, 1)
+        if error is not None:
+            outcome.errors[name] = str(error) or type(error).__name__
+        else:
+            outcome.results[name] = value
+    outcome.total_ms = round((time.perf_counter() - start) * 1000, 1)
+    return outcome
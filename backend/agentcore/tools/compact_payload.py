@@ -0,0 +1,158 @@
+"""ツール結果の LLM 向けコンパクト表現.
+
+analyze_race_for_betting / propose_bets の結果はそのまま LLM の入力になるため、
+入力トークン数が LLM ターンの待ち時間とコストを決める。
+馬・買い目を列指向の表（columns / rows）にし、ソース名を短い別名に、
+数値を丸め、既定値の列・空の項目を省いた表現に変換する。
+
+フロントエンドに返す買い目 JSON はツール結果キャッシュ（全項目）から差し込むため、
+ここでの変換は LLM が読む内容だけに影響する。
+"""
+
+import os
+
+# LLM に返すツール結果をコンパクト表現にするか（false で従来の入れ子の辞書）
+COMPACT_TOOL_RESULTS = os.environ.get("AGENT_COMPACT_TOOL_RESULTS", "true").lower() == "true"
+
+# 買い目の列と、全行がこの値なら列ごと省く既定値
+_BET_COLUMNS = (
+    ("bet_type", None),
+    ("horse_numbers", None),
+    ("amount", 0),
+    ("bet_count", 1),
+    ("expected_value", None),
+    ("composite_odds", None),
+    ("combination_probability", None),
+)
+
+# 買い目の丸め桁数（combination_probability は 0.01% 単位）
+_BET_DIGITS = {"expected_value": 2, "composite_odds": 1, "combination_probability": 4}
+
+
+def _round(value, digits: int = 1):
+    """数値を丸める. 整数で表せる値は int にして小数点を省く."""
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return value
+    rounded = round(float(value), digits)
+    return int(rounded) if rounded.is_integer() else rounded
+
+
+def _drop_empty(d: dict) -> dict:
+    """None・空文字・空のコレクションの項目を省く."""
+    return {k: v for k, v in d.items() if v is not None and v != "" and v != [] and v != {}}
+
+
+def _table(rows: list[list], columns: list[str], defaults: dict[str, object]) -> dict:
+    """列指向の表を作る. 全行が既定値の列は省く."""
+    keep = [
+        i for i, column in enumerate(columns)
+        if column not in defaults or any(row[i] != defaults[column] for row in rows)
+    ]
+    return {
+        "columns": [columns[i] for i in keep],
+        "rows": [[row[i] for i in keep] for row in rows],
+    }
+
+
+def _source_aliases(horses: list[dict]) -> tuple[dict[str, str], dict[str, str]]:
+    """AI予想・スピード指数のソース名 → 別名（AI-A → A、スピード指数は S1, S2...）."""
+    ai_names: list[str] = []
+    si_names: list[str] = []
+    for horse in horses:
+        for name in horse.get("ai_predictions") or {}:
+            if name not in ai_names:
+                ai_names.append(name)
+        for name in horse.get("speed_index") or {}:
+            if name not in si_names:
+                si_names.append(name)
+    ai_aliases = {name: name.removeprefix("AI-") for name in sorted(ai_names)}
+    si_aliases = {name: f"S{i + 1}" for i, name in enumerate(sorted(si_names))}
+    return ai_aliases, si_aliases
+
+
+def compact_race_analysis(analysis: dict) -> dict:
+    """analyze_race_for_betting の結果をコンパクト表現にする.
+
+    horses は columns / rows の表にする。AI予想の列は [順位, スコア]、
+    スピード指数の列は指数値で、データのない馬は null。
+    LLM が勝率の判断に使う race_info / horses と、欠けたソースを知らせる
+    fetch_diagnostics だけを残し、それ以外の項目（事前計算のメタデータ等）は渡さない。
+
+    Args:
+        analysis: analyze_race_for_betting の結果（コンパクト化前）
+
+    Returns:
+        dict: race_info / sources（別名 → ソース名）/ horses（表）/ fetch_diagnostics
+    """
+    if "error" in analysis:
+        return analysis
+
+    horses = analysis.get("horses", [])
+    ai_aliases, si_aliases = _source_aliases(horses)
+
+    race_info = _drop_empty(dict(analysis.get("race_info", {})))
+    consensus = race_info.get("consensus")
+    if consensus:
+        race_info["consensus"] = _drop_empty({
+            **consensus,
+            "divergence_horses": [
+                {**h, "ranks": {ai_aliases.get(k, k): v for k, v in h.get("ranks", {}).items()}}
+                for h in consensus.get("divergence_horses", [])
+            ],
+        })
+
+    columns = ["number", "name", "odds", "running_style", *ai_aliases.values(), *si_aliases.values()]
+    rows = []
+    for horse in horses:
+        ai = horse.get("ai_predictions") or {}
+        si = horse.get("speed_index") or {}
+        rows.append([
+            horse.get("number"),
+            horse.get("name"),
+            _round(horse.get("odds")),
+            horse.get("running_style"),
+            *(
+                [ai[name]["rank"], _round(ai[name]["score"])] if name in ai else None
+                for name in ai_aliases
+            ),
+            *(_round(si[name]) if name in si else None for name in si_aliases),
+        ])
+
+    compact = {
+        "race_info": race_info,
+        "sources": {
+            **{alias: f"{name}（AI予想 [順位, スコア]）" for name, alias in ai_aliases.items()},
+            **{alias: f"{name}（スピード指数）" for name, alias in si_aliases.items()},
+        },
+        "horses": _table(rows, columns, {"running_style": None}),
+    }
+    if "fetch_diagnostics" in analysis:
+        compact["fetch_diagnostics"] = _drop_empty(analysis["fetch_diagnostics"])
+    return _drop_empty(compact)
+
+
+def compact_bet_proposal(proposal: dict) -> dict:
+    """propose_bets の結果をコンパクト表現にする.
+
+    proposed_bets を columns / rows の表にし、表示用の bet_display・reasoning
+    （券種・馬番・EV から導ける）と定型の disclaimer を省く。
+
+    Args:
+        proposal: _propose_bets_impl の戻り値
+
+    Returns:
+        dict: proposed_bets を表にした買い目提案
+    """
+    if "error" in proposal:
+        return proposal
+
+    columns = [name for name, _ in _BET_COLUMNS]
+    defaults = {name: default for name, default in _BET_COLUMNS if default is not None}
+    rows = [
+        [_round(bet.get(name), _BET_DIGITS[name]) if name in _BET_DIGITS else bet.get(name) for name in columns]
+        for bet in proposal.get("proposed_bets", [])
+    ]
+    compact = {k: v for k, v in proposal.items() if k not in ("proposed_bets", "disclaimer")}
+    compact["race_summary"] = _drop_empty(dict(proposal.get("race_summary", {})))
+    compact["proposed_bets"] = _table(rows, columns, defaults)
+    return _drop_empty(compact)
@@ -4,25 +4,32 @@ LLMが調整した勝率と実オッズから期待値を計算し、
 期待値が正の買い目を選定・予算配分する。
 """
 
+import heapq
 import logging
-from itertools import combinations, permutations
+import os
+from concurrent.futures import Future
+from itertools import combinations
 
 from strands import tool
 
-from .bet_analysis import (
-    BET_TYPE_NAMES,
-    _harville_exacta,
-    _harville_trifecta,
-)
+from . import compact_payload
+from .bet_analysis import BET_TYPE_NAMES
 from .bet_proposal import (
-    MIN_BET_AMOUNT,
-    MAX_RACE_BUDGET_RATIO,
     DEFAULT_BASE_RATE,
+    MAX_RACE_BUDGET_RATIO,
+    MIN_BET_AMOUNT,
     _allocate_budget,
     _allocate_budget_dutching,
     _invoke_haiku_narrator,
 )
-from .jravan_client import cached_get, get_api_url
+from .common import log_tool_execution
+from .harville import get_harville_tables
+from .jravan_client import cached_get_json, get_api_url
+from .metrics import phase
+from .narration import get_narrator, with_late_narration
+from .plackett_luce import DEFAULT_SAMPLES, get_plackett_luce_simulator
+from .tool_memo import memoize_tool
+from .tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -73,14 +80,21 @@ def _resolve_ev_filter(
 # ツール結果キャッシュ（セパレータ復元用）
 # =============================================================================
 _last_ev_proposal_result: dict | None = None
+# 期限を過ぎて実行中の analysis_comment のナレーション
+_pending_ev_narration: Future | None = None
 
 
 def get_last_ev_proposal_result() -> dict | None:
-    """キャッシュされた最新のEV提案結果を取得し、キャッシュをクリアする."""
-    global _last_ev_proposal_result
-    result = _last_ev_proposal_result
-    _last_ev_proposal_result = None
-    return result
+    """キャッシュされた最新のEV提案結果を取得し、キャッシュをクリアする.
+
+    期限後に完了したナレーションがあれば analysis_comment に反映した新しい dict を返す。
+    """
+    global _last_ev_proposal_result, _pending_ev_narration
+    result, pending = _last_ev_proposal_result, _pending_ev_narration
+    _last_ev_proposal_result = _pending_ev_narration = None
+    if result is None:
+        return None
+    return with_late_narration(result, pending, "analysis_comment")
 
 
 # EV閾値: これ以上の期待値がある組合せのみ提案
@@ -89,14 +103,18 @@ EV_THRESHOLD = 1.0
 # デフォルト券種リスト（preferred_bet_types未指定時）
 DEFAULT_BET_TYPES = ["quinella", "exacta", "quinella_place", "trio"]
 
+# 組合せ確率のモデル: "harville"（閉形式）/ "plackett_luce"（モンテカルロ）
+PROBABILITY_MODEL = os.environ.get("EV_PROBABILITY_MODEL", "harville")
+# plackett_luce のサンプル数（多いほど高精度・低速）
+SIMULATION_SAMPLES = int(os.environ.get("EV_SIMULATION_SAMPLES", DEFAULT_SAMPLES))
+
+# セッション内で買い目提案を使い回す秒数（実オッズを含むため、オッズのキャッシュと揃える）
+PROPOSAL_MEMO_TTL_SECONDS = 300
+
 
 def _fetch_all_odds(race_id: str) -> dict:
     """JRA-VAN APIから全券種オッズを取得."""
-    response = cached_get(f"{get_api_url()}/races/{race_id}/odds")
-    if response.status_code == 404:
-        return {}
-    response.raise_for_status()
-    return response.json()
+    return cached_get_json(f"{get_api_url()}/races/{race_id}/odds") or {}
 
 
 # 昇順ソートする券種（着順を問わない）
@@ -151,54 +169,18 @@ def _calculate_combination_probability(
     win_probs: dict[int, float],
     total_runners: int,
 ) -> float:
-    """Harvilleモデルで組合せ確率を算出する."""
-    if bet_type == "win":
-        return win_probs.get(horse_numbers[0], 0.0)
-
-    elif bet_type == "place":
-        return min(1.0, win_probs.get(horse_numbers[0], 0.0) * 3)
-
-    elif bet_type == "quinella":
-        p_a = win_probs.get(horse_numbers[0], 0.0)
-        p_b = win_probs.get(horse_numbers[1], 0.0)
-        return _harville_exacta(p_a, p_b) + _harville_exacta(p_b, p_a)
-
-    elif bet_type == "exacta":
-        p_a = win_probs.get(horse_numbers[0], 0.0)
-        p_b = win_probs.get(horse_numbers[1], 0.0)
-        return _harville_exacta(p_a, p_b)
-
-    elif bet_type == "quinella_place":
-        p_a = win_probs.get(horse_numbers[0], 0.0)
-        p_b = win_probs.get(horse_numbers[1], 0.0)
-        prob = 0.0
-        for hn_c, p_c in win_probs.items():
-            if hn_c in set(horse_numbers):
-                continue
-            prob += _harville_trifecta(p_a, p_b, p_c)
-            prob += _harville_trifecta(p_a, p_c, p_b)
-            prob += _harville_trifecta(p_b, p_a, p_c)
-            prob += _harville_trifecta(p_b, p_c, p_a)
-            prob += _harville_trifecta(p_c, p_a, p_b)
-            prob += _harville_trifecta(p_c, p_b, p_a)
-        return prob
-
-    elif bet_type == "trio":
-        p_a = win_probs.get(horse_numbers[0], 0.0)
-        p_b = win_probs.get(horse_numbers[1], 0.0)
-        p_c = win_probs.get(horse_numbers[2], 0.0)
-        return sum(
-            _harville_trifecta(pa, pb, pc)
-            for pa, pb, pc in permutations([p_a, p_b, p_c])
-        )
-
-    elif bet_type == "trifecta":
-        p_a = win_probs.get(horse_numbers[0], 0.0)
-        p_b = win_probs.get(horse_numbers[1], 0.0)
-        p_c = win_probs.get(horse_numbers[2], 0.0)
-        return _harville_trifecta(p_a, p_b, p_c)
-
-    return 0.0
+    """組合せ確率を算出する（既定は Harville モデル）."""
+    return _get_probability_engine(win_probs).probability(horse_numbers, bet_type)
+
+
+def _get_probability_engine(win_probs: dict[int, float]):
+    """PROBABILITY_MODEL に応じたレース単位の確率エンジンを返す.
+
+    どちらも probability(horse_numbers, bet_type) で組合せ確率を引ける。
+    """
+    if PROBABILITY_MODEL == "plackett_luce":
+        return get_plackett_luce_simulator(win_probs, n_samples=SIMULATION_SAMPLES)
+    return get_harville_tables(win_probs)
 
 
 def _build_candidate(
@@ -240,8 +222,15 @@ def _generate_ev_candidates(
     total_runners: int,
     all_odds: dict,
     ev_filter: tuple[float, float, float | None, float | None] | None = None,
+    top_k: int | None = None,
 ) -> list[dict]:
-    """全組合せのEVを計算し、フィルター条件を満たすものを返す."""
+    """全組合せのEVを計算し、フィルター条件を満たすものを返す.
+
+    top_k を指定した場合は EV 上位 top_k 件のみを返す（_top_k_ev_candidates）。
+    """
+    if top_k is not None:
+        return _top_k_ev_candidates(win_probs, runners_map, bet_types, all_odds, ev_filter, top_k)
+
     min_prob_filter, min_ev_filter, max_prob_filter, max_ev_filter = ev_filter or (0.0, 0.0, None, None)
 
     eligible = sorted(
@@ -259,15 +248,15 @@ def _generate_ev_candidates(
             return False
         return True
 
+    # 組合せ確率はレース単位のエンジンから引く
+    tables = _get_probability_engine(win_probs)
     candidates = []
 
     for bet_type in bet_types:
         if bet_type in ("win", "place"):
             for hn in eligible:
                 horse_numbers = [hn]
-                prob = _calculate_combination_probability(
-                    horse_numbers, bet_type, win_probs, total_runners,
-                )
+                prob = tables.probability(horse_numbers, bet_type)
                 real_odds = _lookup_real_odds(horse_numbers, bet_type, all_odds)
                 ev = prob * real_odds if real_odds > 0 else 0.0
                 if _passes_filter(prob, ev):
@@ -280,9 +269,7 @@ def _generate_ev_candidates(
                 horse_numbers = list(combo)
                 if bet_type == "exacta":
                     horse_numbers.sort(key=lambda h: win_probs.get(h, 0), reverse=True)
-                prob = _calculate_combination_probability(
-                    horse_numbers, bet_type, win_probs, total_runners,
-                )
+                prob = tables.probability(horse_numbers, bet_type)
                 real_odds = _lookup_real_odds(horse_numbers, bet_type, all_odds)
                 ev = prob * real_odds if real_odds > 0 else 0.0
                 if _passes_filter(prob, ev):
@@ -295,9 +282,7 @@ def _generate_ev_candidates(
                 horse_numbers = list(combo)
                 if bet_type == "trifecta":
                     horse_numbers.sort(key=lambda h: win_probs.get(h, 0), reverse=True)
-                prob = _calculate_combination_probability(
-                    horse_numbers, bet_type, win_probs, total_runners,
-                )
+                prob = tables.probability(horse_numbers, bet_type)
                 real_odds = _lookup_real_odds(horse_numbers, bet_type, all_odds)
                 ev = prob * real_odds if real_odds > 0 else 0.0
                 if _passes_filter(prob, ev):
@@ -309,6 +294,124 @@ def _generate_ev_candidates(
     return candidates
 
 
+def _max_real_odds(bet_type: str, all_odds: dict) -> float:
+    """券種の実オッズの最大値（EV上界の算出用）."""
+    odds_dict = all_odds.get(_BET_TYPE_TO_ODDS_KEY.get(bet_type, ""), {})
+    if bet_type == "place":
+        return max((float(e.get("min", 0)) for e in odds_dict.values() if e), default=0.0)
+    return max((float(v) for v in odds_dict.values()), default=0.0)
+
+
+def _top_k_ev_candidates(
+    win_probs: dict[int, float],
+    runners_map: dict[int, dict],
+    bet_types: list[str],
+    all_odds: dict,
+    ev_filter: tuple[float, float, float | None, float | None] | None,
+    top_k: int,
+) -> list[dict]:
+    """EV上位 top_k 件の買い目候補を返す.
+
+    _generate_ev_candidates の結果（EV降順）の先頭 top_k 件と同じものを返す。
+    確率×券種の最大オッズで EV の上界を求め、上界が「EV下限」と
+    「ヒープ内の K 位の EV」を下回る組合せはオッズ参照ごと省く。
+    三連単は3着馬、馬単は2着馬の勝率に比例するため、勝率降順の走査で
+    上界を下回った時点で残りを打ち切る。表示用フィールドは残った候補だけ生成する。
+    """
+    if top_k <= 0:
+        return []
+    min_prob_filter, min_ev_filter, max_prob_filter, max_ev_filter = ev_filter or (0.0, 0.0, None, None)
+
+    eligible = sorted(
+        [hn for hn, p in win_probs.items() if p >= min_prob_filter],
+        key=lambda hn: win_probs[hn],
+        reverse=True,
+    )
+    tables = _get_probability_engine(win_probs)
+    # 推定値のエンジンでは単調性による打ち切りを使わない
+    monotone = getattr(tables, "closed_form", False)
+
+    # (round(EV), -生成順, bet_type, horse_numbers, 確率, オッズ, EV) の最小ヒープ
+    # 丸めEV降順・同値は生成順という全件ソートと同じ順位で上位を保持する
+    # （生成順は単調増加であればよく、省いた組合せでは進めない）
+    heap: list[tuple] = []
+    seq = 0
+
+    def _threshold() -> float:
+        if len(heap) < top_k:
+            return min_ev_filter
+        return max(min_ev_filter, heap[0][0])
+
+    def _offer(horse_numbers: list[int], bet_type: str, prob: float) -> None:
+        nonlocal seq
+        seq += 1
+        if prob < min_prob_filter or (max_prob_filter is not None and prob > max_prob_filter):
+            return
+        real_odds = _lookup_real_odds(horse_numbers, bet_type, all_odds)
+        ev = prob * real_odds if real_odds > 0 else 0.0
+        if ev < min_ev_filter or (max_ev_filter is not None and ev > max_ev_filter):
+            return
+        entry = (round(ev, 2), -seq, bet_type, horse_numbers, prob, real_odds, ev)
+        if len(heap) < top_k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+
+    for bet_type in bet_types:
+        max_odds = _max_real_odds(bet_type, all_odds)
+        if max_odds < _threshold():
+            # 確率1でも届かない
+            continue
+
+        if bet_type in ("win", "place"):
+            for hn in eligible:
+                prob = tables.probability([hn], bet_type)
+                if prob * max_odds < _threshold():
+                    continue
+                _offer([hn], bet_type, prob)
+
+        elif bet_type in ("quinella", "exacta", "quinella_place"):
+            for i, a in enumerate(eligible):
+                for b in eligible[i + 1:]:
+                    prob = tables.probability([a, b], bet_type)
+                    if prob * max_odds < _threshold():
+                        if bet_type == "exacta" and monotone:
+                            # 馬単確率は2着馬の勝率に比例する
+                            break
+                        continue
+                    _offer([a, b], bet_type, prob)
+
+        elif bet_type in ("trio", "trifecta"):
+            n = len(eligible)
+            for i in range(n):
+                for j in range(i + 1, n):
+                    a, b = eligible[i], eligible[j]
+                    # 三連複(a,b,c) <= ワイド(a,b)、三連単(a,b,c) <= 三連単(a,b,最有力のc)
+                    # （推定値のエンジンでは 三連単(a,b,c) <= 馬単(a,b)）
+                    if bet_type == "trio":
+                        pair_bound = tables.probability([a, b], "quinella_place") * (1 + 1e-9)
+                    elif not monotone:
+                        pair_bound = tables.probability([a, b], "exacta")
+                    else:
+                        pair_bound = tables.probability([a, b, eligible[j + 1]], bet_type) if j + 1 < n else 0.0
+                    if pair_bound * max_odds < _threshold():
+                        continue
+                    for k in range(j + 1, n):
+                        horse_numbers = [a, b, eligible[k]]
+                        prob = tables.probability(horse_numbers, bet_type)
+                        if prob * max_odds < _threshold():
+                            if bet_type == "trifecta" and monotone:
+                                break
+                            continue
+                        _offer(horse_numbers, bet_type, prob)
+
+    ranked = sorted(heap, reverse=True)
+    return [
+        _build_candidate(horse_numbers, bet_type, prob, real_odds, ev, runners_map)
+        for _, _, bet_type, horse_numbers, prob, real_odds, ev in ranked
+    ]
+
+
 def _propose_bets_impl(
     race_id: str,
     win_probabilities: dict[int, float],
@@ -322,8 +425,14 @@ def _propose_bets_impl(
     venue: str = "",
     ai_consensus: str = "",
     all_odds: dict | None = None,
+    ev_candidates: list[dict] | None = None,
 ) -> dict:
-    """EVベース買い目提案の統合実装（テスト用に公開）."""
+    """EVベース買い目提案の統合実装（テスト用に公開）.
+
+    ev_candidates を渡すと候補生成を省き、その先頭（EV降順）を使う。
+    事前計算した、フィルタ条件を満たす全候補を渡すこと。
+    """
+    global _pending_ev_narration
     race_conditions = race_conditions or []
     runners_map = {int(r.get("horse_number", 0)): r for r in runners_data}
     bet_types = preferred_bet_types or DEFAULT_BET_TYPES
@@ -336,16 +445,10 @@ def _propose_bets_impl(
 
     # 0. 実オッズ取得
     if all_odds is None:
-        all_odds = _fetch_all_odds(race_id)
-
-    # 1. EV計算+買い目候補生成（フィルタ条件を満たす全候補）
-    ev_filter = _resolve_ev_filter(_current_betting_preference)
-    bets = _generate_ev_candidates(
-        win_probabilities, runners_map, bet_types, total_runners, all_odds,
-        ev_filter=ev_filter,
-    )
+        with phase("fetch"):
+            all_odds = _fetch_all_odds(race_id)
 
-    # 2. 予算計算
+    # 1. 予算計算
     if use_bankroll:
         base_rate = DEFAULT_BASE_RATE
         race_budget = int(bankroll * base_rate)
@@ -355,24 +458,43 @@ def _propose_bets_impl(
         effective_budget = budget
         race_budget = 0
 
+    # 2. EV計算+買い目候補生成（フィルタ条件を満たす全候補）
+    # EV比例配分は予算で買える点数（最低100円/点）までEV上位に絞るため、
+    # その点数だけを探索する。ダッチングと予算なしは全候補を使う。
+    top_k = None
+    if not use_bankroll and effective_budget >= MIN_BET_AMOUNT:
+        top_k = effective_budget // MIN_BET_AMOUNT
+    ev_filter = _resolve_ev_filter(_current_betting_preference)
+    with span("ev_candidates", top_k=top_k, precomputed=ev_candidates is not None):
+        if ev_candidates is not None:
+            bets = [dict(c) for c in ev_candidates[:top_k]]
+        else:
+            bets = _generate_ev_candidates(
+                win_probabilities, runners_map, bet_types, total_runners, all_odds,
+                ev_filter=ev_filter, top_k=top_k,
+            )
+
     # 3. 予算配分
     if bets and effective_budget > 0:
-        if use_bankroll:
-            bets = _allocate_budget_dutching(bets, effective_budget)
-        else:
-            bets = _allocate_budget(bets, effective_budget)
+        with span("allocate_budget"):
+            if use_bankroll:
+                bets = _allocate_budget_dutching(bets, effective_budget)
+            else:
+                bets = _allocate_budget(bets, effective_budget)
 
     total_amount = sum(b.get("amount", 0) for b in bets)
     budget_remaining = effective_budget - total_amount
 
     # 4. ナレーション（コスト抑制のため上位10件のみ渡す）
+    # 期限内に返らなければ定型文で返し、届いたら結果に反映する
     narration_context = {
         "race_name": race_name,
         "ai_consensus": ai_consensus,
         "bets": bets[:10],
         "runners_data": runners_data,
     }
-    analysis_comment = _invoke_haiku_narrator(narration_context)
+    with phase("narrate"):
+        analysis_comment, pending_narration = get_narrator().narrate(narration_context, _invoke_haiku_narrator)
     if not analysis_comment:
         analysis_comment = f"EV分析に基づく提案。{len(bets)}点。"
 
@@ -394,10 +516,14 @@ def _propose_bets_impl(
         result["race_budget"] = race_budget
         result["bankroll_usage_pct"] = round(total_amount / bankroll * 100, 2) if bankroll > 0 else 0
 
+    # 期限後に届いたナレーションはツール結果キャッシュの取り出し時に反映する
+    _pending_ev_narration = pending_narration
+
     return result
 
 
 @tool
+@log_tool_execution
 def propose_bets(
     race_id: str,
     win_probabilities: dict[str, float],
@@ -434,9 +560,47 @@ def propose_bets(
     Returns:
         dict: 買い目提案（race_summary, proposed_bets, total_amount等）
     """
-    global _last_ev_proposal_result
-    _last_ev_proposal_result = None
+    global _last_ev_proposal_result, _pending_ev_narration
+    _last_ev_proposal_result = _pending_ev_narration = None
+
+    result = _propose_bets_memoized(
+        race_id=race_id,
+        win_probabilities=win_probabilities,
+        budget=budget,
+        bankroll=bankroll,
+        preferred_bet_types=preferred_bet_types,
+        race_name=race_name,
+        race_conditions=race_conditions,
+        venue=venue,
+        ai_consensus=ai_consensus,
+        runners_data=runners_data,
+        total_runners=total_runners,
+    )
+    if "error" in result:
+        return result
+
+    # フロントエンドへの買い目 JSON はこの全項目のキャッシュから差し込む
+    _last_ev_proposal_result = result
+    if compact_payload.COMPACT_TOOL_RESULTS:
+        return compact_payload.compact_bet_proposal(result)
+    return result
 
+
+@memoize_tool(PROPOSAL_MEMO_TTL_SECONDS, name="propose_bets", context=lambda: _current_betting_preference)
+def _propose_bets_memoized(
+    race_id: str,
+    win_probabilities: dict[str, float],
+    budget: int,
+    bankroll: int,
+    preferred_bet_types: list[str] | None,
+    race_name: str,
+    race_conditions: list[str] | None,
+    venue: str,
+    ai_consensus: str,
+    runners_data: list[dict] | None,
+    total_runners: int,
+) -> dict:
+    """propose_bets の本体. 結果（全項目）は好み設定ごとにセッション内でメモ化する."""
     try:
         # win_probabilities のキーを int に変換（LLMが文字列で渡す場合の対応）
         int_probs = {int(k): float(v) for k, v in win_probabilities.items()}
@@ -445,10 +609,27 @@ def propose_bets(
         if preferred_bet_types is None:
             preferred_bet_types = _resolve_bet_types(_current_betting_preference)
 
+        # 事前計算があっても保存時のオッズは使わず、現在のオッズと照合する（保存結果は最長
+        # PRECOMPUTE_TTL_SECONDS 前のもの）。単勝オッズが大きく動いていなければ出走馬を
+        # 再取得せず、勝率・オッズが作成時と同じならEV候補表も使う
+        from .precompute import get_precomputed, is_current, precomputed_candidates
+        all_odds = None
+        ev_candidates = None
+        precomputed = get_precomputed(race_id)
+        if precomputed is not None:
+            with phase("fetch"):
+                all_odds = _fetch_all_odds(race_id)
+            if is_current(precomputed, all_odds):
+                runners_data = runners_data or precomputed["runners_data"]
+                ev_candidates = precomputed_candidates(
+                    precomputed, int_probs, preferred_bet_types, _current_betting_preference, all_odds,
+                )
+
         # runners_data が渡されない場合はレースデータから取得
         if not runners_data:
             from .race_data import _fetch_race_detail
-            race_detail = _fetch_race_detail(race_id)
+            with phase("fetch"):
+                race_detail = _fetch_race_detail(race_id)
             runners_data = race_detail.get("runners", [])
             if total_runners == 0:
                 total_runners = race_detail.get("race", {}).get(
@@ -458,21 +639,24 @@ def propose_bets(
         if total_runners == 0:
             total_runners = len(runners_data)
 
-        result = _propose_bets_impl(
-            race_id=race_id,
-            win_probabilities=int_probs,
-            runners_data=runners_data,
-            total_runners=total_runners,
-            budget=budget,
-            bankroll=bankroll,
-            preferred_bet_types=preferred_bet_types,
-            race_name=race_name,
-            race_conditions=race_conditions,
-            venue=venue,
-            ai_consensus=ai_consensus,
-        )
-
-        _last_ev_proposal_result = result
+        # 取得・ナレーションは内側のフェーズとして差し引かれる
+        with phase("compute"):
+            result = _propose_bets_impl(
+                race_id=race_id,
+                win_probabilities=int_probs,
+                runners_data=runners_data,
+                total_runners=total_runners,
+                budget=budget,
+                bankroll=bankroll,
+                preferred_bet_types=preferred_bet_types,
+                race_name=race_name,
+                race_conditions=race_conditions,
+                venue=venue,
+                ai_consensus=ai_consensus,
+                all_odds=all_odds,
+                ev_candidates=ev_candidates,
+            )
+
         return result
     except Exception as e:
         logger.exception("propose_bets failed")
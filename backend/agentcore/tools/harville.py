@@ -0,0 +1,120 @@
+"""Harvilleモデルの組合せ確率エンジン.
+
+Harvilleモデルの三連単確率は
+    P(a, b, c) = p_a · p_b · p_c / ((1 - p_a)(1 - p_a - p_b))
+と分母が2つの係数に分解できる。出走馬全体について
+    inv1[a] = 1 / (1 - p_a),  inv2[a][b] = 1 / (1 - p_a - p_b)
+を1回だけ計算しておけば、馬単・三連単・三連複は O(1)、
+ワイドは馬ごとの部分和を使って全ペア O(n²) で求まる。
+
+組合せごとに _harville_trifecta を呼ぶ方式ではワイド1点に (n-2)×6 回の
+計算が必要だった。エンジンは勝率ベクトルごとにキャッシュする。
+"""
+
+from functools import cached_property, lru_cache
+from itertools import combinations
+
+
+class HarvilleTables:
+    """1レース分の Harville 確率エンジン.
+
+    _harville_exacta / _harville_trifecta と同じく、1着馬の勝率が 0 以下か 1 以上、
+    または1・2着馬の勝率の和が 1 以上の並びの確率は 0 とする。
+    勝率に含まれない馬番を含む組合せの確率は 0.0。
+    """
+
+    # 確率は勝率の閉形式（馬単は2着馬、三連単は3着馬の勝率に対して単調）
+    closed_form = True
+
+    def __init__(self, win_probs: dict[int, float]):
+        self._probs = dict(win_probs)
+        horses = list(self._probs)
+        self._inv1 = {
+            a: 1 / (1 - p) if 0.0 < p < 1.0 else 0.0
+            for a, p in self._probs.items()
+        }
+        self._inv2: dict[int, dict[int, float]] = {}
+        for a in horses:
+            p_a = self._probs[a]
+            row = {}
+            for b in horses:
+                remaining = 1 - p_a - self._probs[b]
+                row[b] = 1 / remaining if remaining > 0.0 else 0.0
+            self._inv2[a] = row
+
+    def exacta(self, a: int, b: int) -> float:
+        """馬単確率 P(a=1着, b=2着)."""
+        return self._probs[a] * self._probs[b] * self._inv1[a]
+
+    def trifecta(self, a: int, b: int, c: int) -> float:
+        """三連単確率 P(a=1着, b=2着, c=3着)."""
+        return self._probs[a] * self._probs[b] * self._probs[c] * self._inv1[a] * self._inv2[a][b]
+
+    def trio(self, a: int, b: int, c: int) -> float:
+        """三連複確率（6通りの着順の和）."""
+        i1, i2 = self._inv1, self._inv2
+        ab, ac, bc = i2[a][b], i2[a][c], i2[b][c]
+        return self._probs[a] * self._probs[b] * self._probs[c] * (
+            i1[a] * (ab + ac) + i1[b] * (ab + bc) + i1[c] * (ac + bc)
+        )
+
+    @cached_property
+    def wide_table(self) -> dict[tuple[int, int], float]:
+        """ワイド確率 = 2頭がともに3着以内（キーは昇順の馬番）.
+
+        wide(a, b) = Σ_c trio(a, b, c) を、馬ごとの部分和
+        R[a] = Σ_c p_c·inv2[a][c]、T[a] = Σ_c p_c·inv1[c]·inv2[a][c]
+        から c を除く形で展開して求める。
+        """
+        p, i1, i2 = self._probs, self._inv1, self._inv2
+        total = sum(p.values())
+        r = {a: sum(p[c] * i2[a][c] for c in p if c != a) for a in p}
+        t = {a: sum(p[c] * i1[c] * i2[a][c] for c in p if c != a) for a in p}
+        table = {}
+        for a, b in combinations(sorted(p), 2):
+            ab = i2[a][b]
+            table[(a, b)] = p[a] * p[b] * (
+                ab * (i1[a] + i1[b]) * (total - p[a] - p[b])
+                + i1[a] * (r[a] - p[b] * ab)
+                + i1[b] * (r[b] - p[a] * ab)
+                + t[a] - p[b] * i1[b] * ab
+                + t[b] - p[a] * i1[a] * ab
+            )
+        return table
+
+    def probability(self, horse_numbers: list[int], bet_type: str) -> float:
+        """券種・馬番の組合せ確率を返す.
+
+        馬単/三連単は着順どおり、その他は順不同で参照する。
+        """
+        try:
+            if bet_type == "win":
+                return self._probs.get(horse_numbers[0], 0.0)
+            if bet_type == "place":
+                return min(1.0, self._probs.get(horse_numbers[0], 0.0) * 3)
+            if bet_type == "exacta":
+                return self.exacta(horse_numbers[0], horse_numbers[1])
+            if bet_type == "quinella":
+                a, b = horse_numbers[0], horse_numbers[1]
+                return self.exacta(a, b) + self.exacta(b, a)
+            if bet_type == "quinella_place":
+                a, b = horse_numbers[0], horse_numbers[1]
+                return self.wide_table[(a, b) if a < b else (b, a)]
+            if bet_type == "trifecta":
+                return self.trifecta(horse_numbers[0], horse_numbers[1], horse_numbers[2])
+            if bet_type == "trio":
+                return self.trio(horse_numbers[0], horse_numbers[1], horse_numbers[2])
+        except KeyError:
+            # 勝率に含まれない馬番
+            return 0.0
+        return 0.0
+
+
+@lru_cache(maxsize=16)
+def _cached_tables(probs_key: tuple[tuple[int, float], ...]) -> HarvilleTables:
+    return HarvilleTables(dict(probs_key))
+
+
+def get_harville_tables(win_probs: dict[int, float]) -> HarvilleTables:
+    """勝率ベクトルに対応するエンジンを取得（同じ勝率なら使い回す）."""
+    return _cached_tables(tuple(sorted(win_probs.items())))
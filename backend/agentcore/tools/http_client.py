@@ -0,0 +1,184 @@
+"""JRA-VAN API 向けの共有HTTPクライアント.
+
+プロセス内で1つの requests.Session を使い回し、API Gateway への
+TCP/TLS 接続をキープアライブで再利用する。冪等な GET のみ、
+429/5xx と接続エラーをジッター付き指数バックオフで再試行する。
+
+AgentCore（backend/agentcore）は backend/src と別にデプロイされ、互いを
+import できないため、このファイルは agentcore/tools/http_client.py と
+src/infrastructure/http_client.py に同じ内容で置く（一致はテストで確認する）。
+トレーシングは agentcore 側にだけあり、ない側ではスパンを記録しない。
+"""
+
+import logging
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from .tracing import span
+except ImportError:
+
+    @contextmanager
+    def span(name: str, kind: str = "compute", **attributes) -> Iterator[dict]:
+        """トレーシングのない側の代替（何も記録しない）."""
+        yield attributes
+
+
+logger = logging.getLogger(__name__)
+
+# 再試行回数（初回を含まない）
+MAX_RETRIES = 2
+# バックオフ: backoff_factor * 2^(n-1) 秒 + [0, BACKOFF_JITTER) 秒
+BACKOFF_FACTOR = 0.2
+BACKOFF_JITTER = 0.2
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# ホストごとの同時リクエスト数（= 保持する接続数）
+MAX_CONNECTIONS_PER_HOST = 8
+
+
+class _Counters:
+    """リクエスト統計（スレッドセーフ）."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+
+    def add(self, name: str) -> None:
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+class _CountingRetry(Retry):
+    """再試行のたびにカウンタを増やす Retry."""
+
+    counters: _Counters | None = None
+
+    def new(self, **kw) -> "_CountingRetry":
+        retry = super().new(**kw)
+        retry.counters = self.counters
+        return retry
+
+    def increment(self, *args, **kwargs) -> "_CountingRetry":
+        retry = super().increment(*args, **kwargs)
+        if self.counters is not None:
+            self.counters.add("retries")
+        return retry
+
+
+class PooledHttpClient:
+    """接続プール・再試行・ホスト別同時実行数制限つきのHTTPクライアント."""
+
+    def __init__(
+        self,
+        *,
+        max_retries: int = MAX_RETRIES,
+        max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST,
+    ):
+        self._counters = _Counters()
+        retry = _CountingRetry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=BACKOFF_FACTOR,
+            backoff_jitter=BACKOFF_JITTER,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        retry.counters = self._counters
+        self._adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=max_connections_per_host,
+            max_retries=retry,
+        )
+        self._session = requests.Session()
+        self._session.mount("https://", self._adapter)
+        self._session.mount("http://", self._adapter)
+        self._max_per_host = max_connections_per_host
+        self._host_slots: dict[str, threading.BoundedSemaphore] = {}
+        self._slots_lock = threading.Lock()
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self._max_per_host)
+                self._host_slots[host] = slot
+            return slot
+
+    def get(
+        self,
+        url: str,
+        *,
+        params: dict | None = None,
+        headers: dict | None = None,
+        timeout: float = 10,
+    ) -> requests.Response:
+        """GETリクエストを送る（再試行あり）.
+
+        Raises:
+            requests.RequestException: 再試行しても接続できない場合
+        """
+        self._counters.add("requests")
+        parts = urlsplit(url)
+        with span(f"GET {parts.netloc}{parts.path}", "http") as attributes, self._slot(url):
+            response = self._session.get(url, params=params, headers=headers, timeout=timeout)
+            attributes["status_code"] = response.status_code
+            return response
+
+    @property
+    def stats(self) -> dict:
+        """接続再利用・再試行の統計を返す."""
+        new_connections = 0
+        pool_requests = 0
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                new_connections += pool.num_connections
+                pool_requests += pool.num_requests
+        return {
+            "requests": self._counters.requests,
+            "retries": self._counters.retries,
+            "new_connections": new_connections,
+            "reused_connections": max(0, pool_requests - new_connections),
+        }
+
+    def close(self) -> None:
+        """保持している接続を閉じる."""
+        self._session.close()
+
+
+_client: PooledHttpClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> PooledHttpClient:
+    """プロセス共有のクライアントを取得."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = PooledHttpClient()
+    return _client
+
+
+def http_get(
+    url: str,
+    *,
+    params: dict | None = None,
+    headers: dict | None = None,
+    timeout: float = 10,
+) -> requests.Response:
+    """共有クライアントでGETする（requests.get の置き換え）."""
+    return get_http_client().get(url, params=params, headers=headers, timeout=timeout)
@@ -1,9 +1,11 @@
 """JRA-VAN API クライアント共通モジュール.
 
 API Key取得とヘッダー生成のロジックを共通化。
-セッション内キャッシュにより同一リクエストの重複呼び出しを排除。
+セッション内キャッシュ → セッション間の共有キャッシュ → API の順に参照し、
+同一リクエストの重複呼び出しを排除。
 """
 
+import json
 import logging
 import os
 
@@ -12,6 +14,8 @@ import requests
 from botocore.exceptions import ClientError
 
 from .api_cache import get_session_cache
+from .http_client import http_get
+from .shared_cache import get_shared_cache
 
 logger = logging.getLogger(__name__)
 
@@ -82,26 +86,31 @@ def get_api_url() -> str:
     return JRAVAN_API_URL
 
 
-def cached_get(url: str, *, params: dict | None = None, timeout: int = 10) -> requests.Response:
-    """キャッシュ付きGETリクエスト.
-
-    キャッシュヒット時はAPI呼び出しをスキップしてキャッシュ済みレスポンスを返す。
-    GETリクエストのみキャッシュ対象。エラーレスポンスはキャッシュしない。
-
-    Args:
-        url: リクエストURL
-        params: クエリパラメータ
-        timeout: タイムアウト秒数
-
-    Returns:
-        requests.Response
-    """
+def _lookup(url: str, params: dict | None) -> object | None:
+    """セッション内キャッシュ → 共有キャッシュの順に参照する."""
     cache = get_session_cache()
     cached = cache.get(url, params)
     if cached is not None:
         return cached
 
-    response = requests.get(
+    shared = get_shared_cache()
+    if shared is None:
+        return None
+    found = shared.get(url, params)
+    if found is None:
+        return None
+    data, remaining_ttl = found
+    cache.set(url, data, params, ttl=remaining_ttl)
+    return data
+
+
+def _fetch(url: str, params: dict | None, timeout: int) -> tuple[requests.Response, object | None]:
+    """APIへGETし、成功レスポンスはデコード済みJSONとしてキャッシュする.
+
+    Returns:
+        (レスポンス, デコード済みJSON)。キャッシュしなかった場合JSONはNone。
+    """
+    response = http_get(
         url,
         params=params,
         headers=get_headers(),
@@ -109,14 +118,100 @@ def cached_get(url: str, *, params: dict | None = None, timeout: int = 10) -> re
     )
 
     if response.ok:
-        cache.set(url, response, params)
+        cache = get_session_cache()
+        try:
+            data = response.json()
+        except ValueError:
+            return response, None
+        cache.set(url, data, params, size=len(response.content))
+        shared = get_shared_cache()
+        if shared is not None:
+            shared.put_async(url, data, params)
         stats = cache.stats
         logger.debug(
-            "Cache stats: hits=%d misses=%d hit_rate=%.1f%% size=%d",
+            "Cache stats: hits=%d misses=%d hit_rate=%.1f%% size=%d bytes=%d",
             stats["hits"],
             stats["misses"],
             stats["hit_rate"] * 100,
             stats["cache_size"],
+            stats["cache_bytes"],
         )
+        return response, data
+
+    return response, None
+
+
+def cached_get_json(url: str, *, params: dict | None = None, timeout: int = 10) -> dict | list | None:
+    """キャッシュ付きGETリクエスト（デコード済みJSONを返す）.
 
+    キャッシュヒット時はAPI呼び出しもJSONデコードもスキップする。
+    返り値はキャッシュと共有されるため、呼び出し側で変更しないこと。
+
+    Args:
+        url: リクエストURL
+        params: クエリパラメータ
+        timeout: タイムアウト秒数
+
+    Returns:
+        レスポンスJSON。404の場合はNone。
+
+    Raises:
+        requests.HTTPError: 404以外のエラーレスポンスの場合
+    """
+    cached = _lookup(url, params)
+    if cached is not None:
+        return cached
+
+    response, data = _fetch(url, params, timeout)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return data if data is not None else response.json()
+
+
+def cached_get(url: str, *, params: dict | None = None, timeout: int = 10) -> requests.Response:
+    """キャッシュ付きGETリクエスト.
+
+    キャッシュヒット時はAPI呼び出しをスキップし、キャッシュ済みJSONを持つ
+    レスポンスを返す（json() は再エンコード・デコードせずキャッシュを返す）。
+    GETリクエストのみキャッシュ対象。エラーレスポンスはキャッシュしない。
+    JSONだけが必要なら cached_get_json を使う。
+
+    Args:
+        url: リクエストURL
+        params: クエリパラメータ
+        timeout: タイムアウト秒数
+
+    Returns:
+        requests.Response
+    """
+    cached = _lookup(url, params)
+    if cached is not None:
+        return _CachedResponse(url, cached)
+
+    response, _ = _fetch(url, params, timeout)
     return response
+
+
+class _CachedResponse(requests.Response):
+    """キャッシュ済みJSONを持つレスポンス.
+
+    json() はキャッシュ済みJSONをそのまま返し（呼び出し側で変更しないこと）、
+    本文のバイト列は content / text が参照されたときに初めて作る。
+    """
+
+    def __init__(self, url: str, data: object):
+        super().__init__()
+        self.status_code = 200
+        self.url = url
+        self.encoding = "utf-8"
+        self._data = data
+
+    def json(self, **kwargs) -> object:
+        return self._data
+
+    @property
+    def content(self) -> bytes:
+        if self._content is False:
+            self._content = json.dumps(self._data, ensure_ascii=False).encode()
+        return self._content
@@ -0,0 +1,320 @@
+"""ツールメトリクスのバッファリング送信.
+
+ツール実行ごとに CloudWatch へ同期送信するとツールのレイテンシにネットワーク往復が
+乗るため、データポイントはメモリに溜めておき、呼び出しの終わりにまとめて書き出す。
+
+書き出し方式（METRICS_MODE）:
+    emf: Embedded Metric Format のログ行として標準出力に書く（API 呼び出しなし）
+    api: PutMetricData をバックグラウンドスレッドでバッチ送信する
+
+ツール内のフェーズ（fetch / compute / narrate 等）の所要時間は phase() で計測し、
+ツール完了時に PhaseTime メトリクスとして記録する。
+"""
+
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import boto3
+
+from .tracing import span
+
+logger = logging.getLogger("agentcore.tools.metrics")
+
+METRICS_ENABLED = os.environ.get("EMIT_CLOUDWATCH_METRICS", "false").lower() == "true"
+METRICS_NAMESPACE = "BakenKaigi/AgentTools"
+# "emf"（既定）/ "api"
+METRICS_MODE = os.environ.get("METRICS_MODE", "emf").lower()
+
+# これを超えて溜まったら呼び出しの途中でも書き出す
+MAX_BUFFERED_DATAPOINTS = 500
+# PutMetricData 1リクエストあたりの MetricData 上限
+API_BATCH_SIZE = 1000
+# MetricDatum.Values に入れられる異なる値の上限
+API_MAX_VALUES = 150
+# EMF の1メトリクスあたりの値の上限
+EMF_MAX_VALUES = 100
+
+
+@dataclass(frozen=True)
+class Datapoint:
+    """1件のメトリクス値."""
+
+    name: str
+    value: float
+    unit: str
+    dimensions: tuple[tuple[str, str], ...]
+
+
+class MetricsBuffer:
+    """メトリクスをメモリに溜め、flush でまとめて書き出す."""
+
+    def __init__(
+        self,
+        *,
+        namespace: str = METRICS_NAMESPACE,
+        mode: str = METRICS_MODE,
+        writer: Callable[[str], None] | None = None,
+        client=None,
+        max_buffered: int = MAX_BUFFERED_DATAPOINTS,
+    ):
+        if mode not in ("emf", "api"):
+            raise ValueError(f"Unknown metrics mode: {mode}")
+        self._namespace = namespace
+        self._mode = mode
+        self._writer = writer or _write_stdout
+        self._client = client
+        self._max_buffered = max_buffered
+        self._buffer: list[Datapoint] = []
+        self._lock = threading.Lock()
+        self._sender: ThreadPoolExecutor | None = None
+
+    def put(self, name: str, value: float, unit: str, dimensions: dict[str, str]) -> None:
+        """データポイントを溜める."""
+        point = Datapoint(name, value, unit, tuple(sorted(dimensions.items())))
+        with self._lock:
+            self._buffer.append(point)
+            full = len(self._buffer) >= self._max_buffered
+        if full:
+            self.flush()
+
+    def flush(self) -> Future | None:
+        """溜めたデータポイントを書き出す（ベストエフォート）.
+
+        Returns:
+            api モードで送信を開始した場合はその Future。それ以外は None。
+        """
+        with self._lock:
+            points, self._buffer = self._buffer, []
+        if not points:
+            return None
+        if self._mode == "emf":
+            try:
+                for line in _emf_lines(self._namespace, points):
+                    self._writer(line)
+            except Exception:
+                logger.warning("Failed to write EMF metrics", exc_info=True)
+            return None
+        return self._get_sender().submit(self._put_metric_data, points)
+
+    def _get_sender(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._sender is None:
+                self._sender = ThreadPoolExecutor(max_workers=1, thread_name_prefix="metrics-sender")
+            return self._sender
+
+    def _put_metric_data(self, points: list[Datapoint]) -> None:
+        try:
+            client = self._client or _get_cloudwatch_client()
+            data = _metric_data(points)
+            for i in range(0, len(data), API_BATCH_SIZE):
+                client.put_metric_data(Namespace=self._namespace, MetricData=data[i:i + API_BATCH_SIZE])
+        except Exception:
+            logger.warning("Failed to put metric data", exc_info=True)
+
+    @property
+    def pending(self) -> int:
+        """未書き出しのデータポイント数."""
+        with self._lock:
+            return len(self._buffer)
+
+
+def _write_stdout(line: str) -> None:
+    # ロギングのフォーマットが付くと EMF として解釈されないため標準出力に直接書く
+    sys.stdout.write(line + "\n")
+    sys.stdout.flush()
+
+
+def _emf_lines(namespace: str, points: list[Datapoint]) -> Iterator[str]:
+    """ディメンションの組ごとに EMF のログ行を作る."""
+    groups: dict[tuple[tuple[str, str], ...], dict[str, tuple[str, list[float]]]] = {}
+    for p in points:
+        metrics = groups.setdefault(p.dimensions, {})
+        metrics.setdefault(p.name, (p.unit, []))[1].append(p.value)
+
+    timestamp = int(time.time() * 1000)
+    for dimensions, metrics in groups.items():
+        # 1メトリクスあたりの値の数の上限ごとに行を分ける
+        offset = 0
+        while True:
+            chunk = {name: (unit, values[offset:offset + EMF_MAX_VALUES]) for name, (unit, values) in metrics.items()}
+            chunk = {name: v for name, v in chunk.items() if v[1]}
+            if not chunk:
+                break
+            doc: dict = {
+                "_aws": {
+                    "Timestamp": timestamp,
+                    "CloudWatchMetrics": [{
+                        "Namespace": namespace,
+                        "Dimensions": [[k for k, _ in dimensions]],
+                        "Metrics": [{"Name": name, "Unit": unit} for name, (unit, _) in chunk.items()],
+                    }],
+                },
+            }
+            doc.update(dict(dimensions))
+            for name, (_, values) in chunk.items():
+                doc[name] = values[0] if len(values) == 1 else values
+            yield json.dumps(doc, ensure_ascii=False)
+            offset += EMF_MAX_VALUES
+
+
+def _metric_data(points: list[Datapoint]) -> list[dict]:
+    """同じメトリクス・ディメンションの値を Values/Counts にまとめた MetricData を作る."""
+    grouped: dict[tuple, Counter] = {}
+    for p in points:
+        grouped.setdefault((p.name, p.unit, p.dimensions), Counter())[p.value] += 1
+
+    data = []
+    for (name, unit, dimensions), counts in grouped.items():
+        items = list(counts.items())
+        for i in range(0, len(items), API_MAX_VALUES):
+            chunk = items[i:i + API_MAX_VALUES]
+            data.append({
+                "MetricName": name,
+                "Dimensions": [{"Name": k, "Value": v} for k, v in dimensions],
+                "Values": [v for v, _ in chunk],
+                "Counts": [float(c) for _, c in chunk],
+                "Unit": unit,
+            })
+    return data
+
+
+_cloudwatch_client = None
+
+
+def _get_cloudwatch_client():
+    global _cloudwatch_client
+    if _cloudwatch_client is None:
+        _cloudwatch_client = boto3.client(
+            "cloudwatch",
+            region_name=os.environ.get("AWS_REGION", "ap-northeast-1"),
+        )
+    return _cloudwatch_client
+
+
+_metrics_buffer: MetricsBuffer | None = None
+_metrics_buffer_lock = threading.Lock()
+
+
+def get_metrics_buffer() -> MetricsBuffer:
+    """プロセス共有のバッファを取得."""
+    global _metrics_buffer
+    if _metrics_buffer is None:
+        with _metrics_buffer_lock:
+            if _metrics_buffer is None:
+                _metrics_buffer = MetricsBuffer()
+    return _metrics_buffer
+
+
+def flush_metrics() -> None:
+    """呼び出しの終わりに溜めたメトリクスを書き出す（api モードでも待たない）."""
+    if METRICS_ENABLED:
+        get_metrics_buffer().flush()
+
+
+# =============================================================================
+# フェーズ計測
+# =============================================================================
+
+
+@dataclass
+class _ToolScope:
+    """実行中ツールのフェーズ計測状態."""
+
+    phases_ms: dict[str, float] = field(default_factory=dict)
+    # 入れ子のフェーズの所要時間（親フェーズから差し引く）
+    child_ms: list[float] = field(default_factory=list)
+
+
+_current_scope: contextvars.ContextVar[_ToolScope | None] = contextvars.ContextVar(
+    "tool_metrics_scope", default=None,
+)
+
+
+@contextmanager
+def tool_scope() -> Iterator[dict[str, float]]:
+    """ツール実行中のフェーズ計測を開始する.
+
+    Yields:
+        フェーズ名 → 所要ミリ秒（ブロックを抜けた時点で確定）
+    """
+    scope = _ToolScope()
+    token = _current_scope.set(scope)
+    try:
+        yield scope.phases_ms
+    finally:
+        _current_scope.reset(token)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """ツール内のフェーズの所要時間を計測する.
+
+    入れ子のフェーズの時間は外側から差し引くため、フェーズの合計はツール全体の時間を超えない。
+    同じ名前のフェーズは合算する。ツール実行外では計測しない。
+    トレース中ならフェーズをスパンとしても記録する。
+    """
+    scope = _current_scope.get()
+    if scope is None:
+        with span(name, "phase"):
+            yield
+        return
+    scope.child_ms.append(0.0)
+    start = time.perf_counter()
+    try:
+        with span(name, "phase"):
+            yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        own = elapsed - scope.child_ms.pop()
+        scope.phases_ms[name] = scope.phases_ms.get(name, 0.0) + own
+        if scope.child_ms:
+            scope.child_ms[-1] += elapsed
+
+
+def record_tool_metrics(
+    tool_name: str,
+    duration_ms: float,
+    success: bool,
+    phases_ms: dict[str, float] | None = None,
+) -> None:
+    """ツール1回分のメトリクスをバッファに溜める."""
+    if not METRICS_ENABLED:
+        return
+    buffer = get_metrics_buffer()
+    dimensions = {"ToolName": tool_name}
+    buffer.put("ExecutionTime", duration_ms, "Milliseconds", dimensions)
+    buffer.put("Invocations", 1, "Count", dimensions)
+    buffer.put("Errors", 0 if success else 1, "Count", dimensions)
+    for name, ms in (phases_ms or {}).items():
+        buffer.put("PhaseTime", round(ms, 1), "Milliseconds", {"ToolName": tool_name, "Phase": name})
+
+
+def record_fetch_metrics(tool_name: str, timings_ms: dict[str, float], failed: dict[str, str]) -> None:
+    """ツールのデータ取得（ソース別の所要時間と失敗）をバッファに溜める."""
+    if not METRICS_ENABLED:
+        return
+    buffer = get_metrics_buffer()
+    for source, ms in timings_ms.items():
+        dimensions = {"ToolName": tool_name, "Source": source}
+        buffer.put("FetchTime", round(ms, 1), "Milliseconds", dimensions)
+        buffer.put("FetchErrors", 1 if source in failed else 0, "Count", dimensions)
+
+
+def record_memo_hit(tool_name: str, saved_ms: float) -> None:
+    """ツール結果メモ化のヒット1回分（省いた実行時間）をバッファに溜める."""
+    if not METRICS_ENABLED:
+        return
+    buffer = get_metrics_buffer()
+    dimensions = {"ToolName": tool_name}
+    buffer.put("MemoHits", 1, "Count", dimensions)
+    buffer.put("MemoSavedTime", round(saved_ms, 1), "Milliseconds", dimensions)
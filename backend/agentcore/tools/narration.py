@@ -0,0 +1,189 @@
+"""買い目提案のLLMナレーション実行（期限付き・キャッシュ付き）.
+
+買い目は決定的に計算済みのため、ナレーションの Bedrock 往復で
+ツール結果を待たせない。ナレーションはワーカースレッドで実行し、
+NARRATION_DEADLINE_SECONDS 以内に返らなければ呼び出し元はテンプレート文で即座に返す。
+期限を過ぎたナレーションも実行は続け、完了したらキャッシュに入れる。
+返した結果の dict は変更せず、セパレータ復元用のツール結果キャッシュを
+取り出すときに with_late_narration で完了済みのテキストを反映した新しい dict を作る。
+
+ナレーションはコンテキストの JSON のハッシュでキャッシュし、
+同じ買い目リストを再度ナレーションしない。実行中の同一コンテキストには相乗りする。
+"""
+
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+logger = logging.getLogger("agentcore.tools.narration")
+
+# ナレーションを待つ上限（秒）
+NARRATION_DEADLINE_SECONDS = float(os.environ.get("NARRATOR_DEADLINE_SECONDS", "3.0"))
+# キャッシュするナレーション数
+MAX_CACHE_ENTRIES = 256
+# "bedrock"（既定）/ "stub"（ローカル開発用の固定応答）
+NARRATOR_BACKEND = os.environ.get("NARRATOR_BACKEND", "bedrock").lower()
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="narrator")
+
+
+def narration_cache_key(context: dict) -> str:
+    """ナレーションコンテキストのキャッシュキー（キー順に依存しないハッシュ）."""
+    payload = json.dumps(context, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Narrator:
+    """期限付き・キャッシュ付きでナレーションを実行する."""
+
+    def __init__(
+        self,
+        *,
+        deadline: float = NARRATION_DEADLINE_SECONDS,
+        max_entries: int = MAX_CACHE_ENTRIES,
+    ):
+        self._deadline = deadline
+        self._max_entries = max_entries
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._timeouts = 0
+
+    def narrate(
+        self,
+        context: dict,
+        model: Callable[[dict], str | None],
+    ) -> tuple[str | None, Future | None]:
+        """ナレーションを取得する.
+
+        Args:
+            context: ナレーションコンテキスト
+            model: コンテキストからテキストを生成する関数（失敗時は None）
+
+        Returns:
+            (期限内に得られたテキスト, 期限を過ぎて実行中の Future)。
+            テキストが得られなかった場合は None。Future は完了時にテキスト（または None）を返す。
+        """
+        key = narration_cache_key(context)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return cached, None
+            future = self._inflight.get(key)
+            if future is None:
+                self._misses += 1
+                # トレース（tools.tracing）に Bedrock 呼び出しを残すためコンテキストを引き継ぐ
+                future = _executor.submit(contextvars.copy_context().run, self._run, key, context, model)
+                self._inflight[key] = future
+
+        try:
+            return future.result(timeout=self._deadline), None
+        except FutureTimeoutError:
+            with self._lock:
+                self._timeouts += 1
+            logger.info("Narration exceeded %.1fs deadline; returning template", self._deadline)
+            return None, future
+
+    def _run(self, key: str, context: dict, model: Callable[[dict], str | None]) -> str | None:
+        try:
+            text = model(context)
+        except Exception:
+            logger.warning("Narration model failed", exc_info=True)
+            text = None
+        with self._lock:
+            self._inflight.pop(key, None)
+            if text:
+                self._cache[key] = text
+                self._cache.move_to_end(key)
+                while len(self._cache) > self._max_entries:
+                    self._cache.popitem(last=False)
+        return text
+
+    def clear(self) -> None:
+        """キャッシュと統計をリセットする（実行中のナレーションは続行）."""
+        with self._lock:
+            self._cache.clear()
+            self._hits = self._misses = self._timeouts = 0
+
+    @property
+    def stats(self) -> dict:
+        """キャッシュ・期限超過の統計を返す."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "timeouts": self._timeouts,
+                "cache_size": len(self._cache),
+                "inflight": len(self._inflight),
+            }
+
+
+def with_late_narration(result: dict, future: Future | None, key: str) -> dict:
+    """期限を過ぎたナレーションが完了していれば result[key] を差し替えた新しい dict を返す.
+
+    待たない。未完了・失敗なら result をそのまま返す（result 自体は変更しない）。
+    """
+    if future is None or not future.done():
+        return result
+    text = future.result()
+    if not text:
+        return result
+    return {**result, key: text}
+
+
+class StubNarrationModel:
+    """Bedrock を呼ばない固定応答のナレーションモデル（テスト・ローカル開発用）.
+
+    _call_bedrock_haiku と同じ (system_prompt, user_message) で呼び出せる。
+    """
+
+    def __init__(self, text: str | None = None, *, delay: float = 0.0):
+        self._text = text
+        self._delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._released = threading.Event()
+
+    def __call__(self, system_prompt: str, user_message: str) -> str:
+        with self._lock:
+            self.calls += 1
+        if self._delay:
+            self._released.wait(self._delay)
+        if self._text is not None:
+            return self._text
+        bets = json.loads(user_message).get("bets", []) if user_message else []
+        return (
+            "【軸馬選定】スタブ応答です。\n\n"
+            f"【券種】買い目{len(bets)}点。\n\n"
+            "【組み合わせ】スタブ応答です。\n\n"
+            "【リスク】スタブ応答です。"
+        )
+
+    def release(self) -> None:
+        """delay による待機を打ち切る."""
+        self._released.set()
+
+
+_narrator: Narrator | None = None
+_narrator_lock = threading.Lock()
+
+
+def get_narrator() -> Narrator:
+    """プロセス共有の Narrator を取得."""
+    global _narrator
+    if _narrator is None:
+        with _narrator_lock:
+            if _narrator is None:
+                _narrator = Narrator()
+    return _narrator
@@ -0,0 +1,214 @@
+"""LLMナレーション用の Bedrock Runtime クライアント層.
+
+プロセス内で1つの bedrock-runtime クライアント（キープアライブ・接続プール付き）を
+使い回し、ConverseStream で最初のトークンから順に受け取る。
+出力トークン数（maxTokens）と呼び出し全体の時間予算を強制し、
+呼び出しごとに最初のトークンまでの時間（TTFT）と総時間を記録する。
+
+BEDROCK_NARRATOR_ENDPOINT_URL でエンドポイントをローカルのスタンドインに
+差し替えられる。NARRATOR_BACKEND=stub ならネットワークを使わない固定応答を返す。
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+
+import boto3
+from botocore.config import Config
+
+from .narration import NARRATOR_BACKEND, StubNarrationModel
+from .tracing import span
+
+logger = logging.getLogger("agentcore.tools.narrator_client")
+
+# モデルID・リージョン（環境変数で上書き可能）
+NARRATOR_MODEL_ID = os.environ.get(
+    "BEDROCK_NARRATOR_MODEL_ID",
+    "jp.anthropic.claude-haiku-4-5-20251001-v1:0",
+)
+NARRATOR_REGION = os.environ.get("AWS_REGION", "ap-northeast-1")
+# ローカルのスタンドイン（例: http://localhost:8081）。未設定なら Bedrock
+NARRATOR_ENDPOINT_URL = os.environ.get("BEDROCK_NARRATOR_ENDPOINT_URL") or None
+
+# 出力トークン上限と、呼び出し全体（接続〜最後のトークン）の時間予算（秒）
+NARRATOR_MAX_TOKENS = int(os.environ.get("NARRATOR_MAX_TOKENS", "1024"))
+NARRATOR_TIME_BUDGET_SECONDS = float(os.environ.get("NARRATOR_TIME_BUDGET_SECONDS", "15"))
+NARRATOR_TEMPERATURE = 0.7
+
+# 記録しておく直近の呼び出し数
+RECENT_CALLS = 50
+
+_CLIENT_CONFIG = Config(
+    connect_timeout=2,
+    read_timeout=10,
+    retries={"max_attempts": 2, "mode": "standard"},
+    max_pool_connections=4,
+    tcp_keepalive=True,
+)
+
+
+class NarrationBudgetExceededError(Exception):
+    """ストリーミング中に時間予算を超えた."""
+
+
+@dataclass
+class NarrationCall:
+    """1回のナレーション呼び出しの計測値."""
+
+    ttft_ms: float | None
+    total_ms: float
+    output_tokens: int | None
+    stop_reason: str | None
+    budget_exceeded: bool = False
+
+
+class NarratorClient:
+    """ストリーミング・時間予算・計測つきのナレーション用クライアント."""
+
+    def __init__(
+        self,
+        *,
+        model_id: str = NARRATOR_MODEL_ID,
+        region: str = NARRATOR_REGION,
+        endpoint_url: str | None = NARRATOR_ENDPOINT_URL,
+        max_tokens: int = NARRATOR_MAX_TOKENS,
+        time_budget: float = NARRATOR_TIME_BUDGET_SECONDS,
+        client=None,
+    ):
+        self._model_id = model_id
+        self._max_tokens = max_tokens
+        self._time_budget = time_budget
+        self._client = client or boto3.client(
+            "bedrock-runtime",
+            region_name=region,
+            endpoint_url=endpoint_url,
+            config=_CLIENT_CONFIG,
+        )
+        self._calls: deque[NarrationCall] = deque(maxlen=RECENT_CALLS)
+        self._lock = threading.Lock()
+
+    def complete(self, system_prompt: str, user_message: str) -> str:
+        """ストリーミングでテキストを生成し、全文を返す.
+
+        Raises:
+            NarrationBudgetExceededError: 時間予算内に生成が終わらなかった場合
+            botocore.exceptions.BotoCoreError / ClientError: API 呼び出しの失敗
+        """
+        with span("bedrock.converse_stream", "bedrock") as attributes:
+            start = time.perf_counter()
+            response = self._client.converse_stream(
+                modelId=self._model_id,
+                system=[{"text": system_prompt}],
+                messages=[{"role": "user", "content": [{"text": user_message}]}],
+                inferenceConfig={"maxTokens": self._max_tokens, "temperature": NARRATOR_TEMPERATURE},
+            )
+            stream = response["stream"]
+            chunks: list[str] = []
+            ttft_ms = None
+            stop_reason = None
+            output_tokens = None
+            exceeded = False
+            try:
+                for event in stream:
+                    delta = event.get("contentBlockDelta")
+                    if delta is not None:
+                        text = delta.get("delta", {}).get("text", "")
+                        if text:
+                            if ttft_ms is None:
+                                ttft_ms = (time.perf_counter() - start) * 1000
+                            chunks.append(text)
+                    elif "messageStop" in event:
+                        stop_reason = event["messageStop"].get("stopReason")
+                    elif "metadata" in event:
+                        output_tokens = event["metadata"].get("usage", {}).get("outputTokens")
+                    if time.perf_counter() - start > self._time_budget:
+                        exceeded = True
+                        break
+            finally:
+                if exceeded and hasattr(stream, "close"):
+                    stream.close()
+                call = NarrationCall(
+                    ttft_ms=round(ttft_ms, 1) if ttft_ms is not None else None,
+                    total_ms=round((time.perf_counter() - start) * 1000, 1),
+                    output_tokens=output_tokens,
+                    stop_reason=stop_reason,
+                    budget_exceeded=exceeded,
+                )
+                self._record(call)
+                attributes.update(ttft_ms=call.ttft_ms, output_tokens=call.output_tokens, stop_reason=call.stop_reason)
+
+            if exceeded:
+                raise NarrationBudgetExceededError(f"narration exceeded {self._time_budget:.1f}s budget")
+            return "".join(chunks)
+
+    def _record(self, call: NarrationCall) -> None:
+        with self._lock:
+            self._calls.append(call)
+        logger.info(
+            "Narration call: ttft_ms=%s total_ms=%.1f output_tokens=%s stop_reason=%s budget_exceeded=%s",
+            call.ttft_ms, call.total_ms, call.output_tokens, call.stop_reason, call.budget_exceeded,
+        )
+
+    @property
+    def recent_calls(self) -> list[dict]:
+        """直近の呼び出しの計測値（古い順）."""
+        with self._lock:
+            return [asdict(c) for c in self._calls]
+
+
+class StubBedrockRuntime:
+    """converse_stream を固定応答のイベント列で返す bedrock-runtime のスタンドイン."""
+
+    def __init__(
+        self,
+        model: StubNarrationModel | None = None,
+        *,
+        chunk_size: int = 16,
+        chunk_delay: float = 0.0,
+    ):
+        self._model = model or StubNarrationModel()
+        self._chunk_size = chunk_size
+        self._chunk_delay = chunk_delay
+
+    def converse_stream(self, *, system: list[dict], messages: list[dict], **kwargs) -> dict:
+        text = self._model(system[0]["text"], messages[0]["content"][0]["text"])
+        return {"stream": self._events(text, kwargs["inferenceConfig"].get("maxTokens"))}
+
+    def _events(self, text: str, max_tokens: int | None):
+        yield {"messageStart": {"role": "assistant"}}
+        chunks = [text[i:i + self._chunk_size] for i in range(0, len(text), self._chunk_size)]
+        stop_reason = "end_turn"
+        if max_tokens is not None and len(chunks) > max_tokens:
+            # 1チャンク = 1トークンとみなす
+            chunks, stop_reason = chunks[:max_tokens], "max_tokens"
+        for chunk in chunks:
+            if self._chunk_delay:
+                time.sleep(self._chunk_delay)
+            yield {"contentBlockDelta": {"delta": {"text": chunk}, "contentBlockIndex": 0}}
+        yield {"messageStop": {"stopReason": stop_reason}}
+        yield {"metadata": {"usage": {"outputTokens": len(chunks)}}}
+
+
+_narrator_client: NarratorClient | None = None
+_narrator_client_lock = threading.Lock()
+
+
+def get_narrator_client() -> NarratorClient:
+    """プロセス共有のクライアントを取得."""
+    global _narrator_client
+    if _narrator_client is None:
+        with _narrator_client_lock:
+            if _narrator_client is None:
+                if NARRATOR_BACKEND == "stub":
+                    _narrator_client = NarratorClient(client=StubBedrockRuntime())
+                else:
+                    _narrator_client = NarratorClient()
+    return _narrator_client
+
+
+def prewarm_narrator_client() -> None:
+    """バックグラウンドでクライアントを生成しておく（初回ナレーションの生成コストを隠す）."""
+    threading.Thread(target=get_narrator_client, name="narrator-prewarm", daemon=True).start()
@@ -22,7 +22,8 @@ from .constants import (
     WIN_PLACE_RATIO_HIGH,
     WIN_PLACE_RATIO_LOW,
 )
-from .jravan_client import cached_get, get_api_url
+from .jravan_client import cached_get_json, get_api_url
+from .odds_series import FINAL_WINDOW_MINUTES, OddsSeries
 
 logger = get_tool_logger("odds_analysis")
 
@@ -57,19 +58,17 @@ def analyze_odds_movement(
     """
     try:
         # 単勝オッズ履歴を取得
-        win_response = cached_get(
+        win_odds_data = cached_get_json(
             f"{get_api_url()}/races/{race_id}/odds-history",
             timeout=API_TIMEOUT_SECONDS,
         )
 
-        if win_response.status_code == 404:
+        if win_odds_data is None:
             return {
                 "warning": "オッズデータが見つかりませんでした",
                 "race_id": race_id,
             }
 
-        win_response.raise_for_status()
-        win_odds_data = win_response.json()
         odds_history = win_odds_data.get("odds_history", [])
 
         if not odds_history:
@@ -84,13 +83,14 @@ def analyze_odds_movement(
         # 市場概要
         market_overview = _analyze_market_overview(odds_history)
 
+        # 履歴は馬×時刻の行列に一度だけ変換し、変動分析はこれを使う
+        series = OddsSeries.from_history(odds_history)
+
         # 馬ごとの変動分析
-        movements = _analyze_movements(odds_history, horse_numbers)
+        movements = _analyze_movements(series, horse_numbers)
 
         # 時間帯別変動分析
-        time_based_analysis = _analyze_time_based_movements(
-            odds_history, horse_numbers
-        )
+        time_based_analysis = _analyze_time_based_movements(series, horse_numbers)
 
         # AI指数ベースの妙味分析
         value_analysis = _analyze_value_with_ai(
@@ -141,17 +141,12 @@ def _fetch_place_odds(race_id: str) -> list[dict]:
         複勝オッズリスト
     """
     try:
-        response = cached_get(
+        data = cached_get_json(
             f"{get_api_url()}/races/{race_id}/odds",
             params={"bet_type": "place"},
             timeout=API_TIMEOUT_SECONDS,
         )
-
-        if response.status_code != 200:
-            return []
-
-        data = response.json()
-        return data.get("odds", [])
+        return (data or {}).get("odds", [])
     except Exception as e:
         logger.warning(f"Failed to fetch place odds: {e}")
         return []
@@ -205,31 +200,19 @@ def _analyze_market_overview(
 
 
 def _analyze_movements(
-    odds_history: list[dict],
+    series: OddsSeries,
     horse_numbers: list[int] | None,
 ) -> list[dict[str, str | int | float]]:
-    """馬ごとのオッズ変動を分析する."""
-    if len(odds_history) < 2:
+    """馬ごとのオッズ変動（発売開始から最新まで）を分析する."""
+    if len(series) < 2:
         return []
 
-    initial = odds_history[0]
-    latest = odds_history[-1]
-
-    initial_odds = {o.get("horse_number"): o for o in initial.get("odds", [])}
-    latest_odds = {o.get("horse_number"): o for o in latest.get("odds", [])}
+    window = series.since_open()
+    endpoints = series.endpoints(window, horse_numbers)
+    volatility = series.volatility(window, horse_numbers)
 
     movements = []
-    for horse_num, latest_data in latest_odds.items():
-        if horse_numbers and horse_num not in horse_numbers:
-            continue
-
-        initial_data = initial_odds.get(horse_num, {})
-        init_odds = initial_data.get("odds", 0)
-        curr_odds = latest_data.get("odds", 0)
-
-        if init_odds <= 0 or curr_odds <= 0:
-            continue
-
+    for horse_num, (init_odds, curr_odds) in endpoints.items():
         change_rate = ((curr_odds - init_odds) / init_odds) * 100
 
         # トレンド判定
@@ -256,10 +239,11 @@ def _analyze_movements(
 
         movements.append({
             "horse_number": horse_num,
-            "horse_name": latest_data.get("horse_name", ""),
+            "horse_name": series.horse_names.get(horse_num, ""),
             "initial_odds": init_odds,
             "current_odds": curr_odds,
             "change_rate": round(change_rate, 1),
+            "volatility": round(volatility[horse_num], 3),
             "trend": trend,
             "movement_type": movement_type,
             "alert_level": alert_level,
@@ -271,102 +255,59 @@ def _analyze_movements(
 
 
 def _analyze_time_based_movements(
-    odds_history: list[dict],
+    series: OddsSeries,
     horse_numbers: list[int] | None,
 ) -> dict:
     """時間帯別のオッズ変動を分析する.
 
-    締切前1時間の変動を特に重視する。
+    締切前1時間（最新のスナップショットから FINAL_WINDOW_MINUTES 分）の変動を特に重視する。
+    タイムスタンプが読めない履歴では後ろから1/3を締切前とみなす。
 
     Args:
-        odds_history: オッズ履歴データ
+        series: オッズ履歴の行列
         horse_numbers: 分析対象馬番リスト
 
     Returns:
         時間帯別変動分析結果
     """
-    if len(odds_history) < 3:
+    if len(series) < 3:
         return {
             "final_hour_movements": [],
             "early_movements": [],
             "warning": "時間帯別分析には3つ以上のオッズデータが必要",
         }
 
-    # 履歴を時刻でソート（タイムスタンプがあれば使用）
-    # タイムスタンプがない場合は配列の後半を「締切前」とみなす
-    total_entries = len(odds_history)
-    final_hour_start_idx = max(0, total_entries - max(3, total_entries // 3))
-
-    # 締切前1時間（概算）のデータ
-    final_hour_data = odds_history[final_hour_start_idx:]
-    early_data = odds_history[:final_hour_start_idx] if final_hour_start_idx > 0 else []
+    # 締切前の窓の開始列（窓の開始時点の値を持つ列）までが序盤
+    final_window = series.last_minutes(FINAL_WINDOW_MINUTES)
+    early_window = series.since_open(until=final_window[0])
 
     final_hour_movements = []
-    early_movements = []
-
-    # 締切前の変動を分析
-    if len(final_hour_data) >= 2:
-        start = final_hour_data[0]
-        end = final_hour_data[-1]
-
-        start_odds = {o.get("horse_number"): o for o in start.get("odds", [])}
-        end_odds = {o.get("horse_number"): o for o in end.get("odds", [])}
-
-        for horse_num, end_data in end_odds.items():
-            if horse_numbers and horse_num not in horse_numbers:
-                continue
-
-            start_data = start_odds.get(horse_num, {})
-            s_odds = start_data.get("odds", 0)
-            e_odds = end_data.get("odds", 0)
-
-            if s_odds <= 0 or e_odds <= 0:
-                continue
-
-            change_rate = ((e_odds - s_odds) / s_odds) * 100
-
-            if abs(change_rate) >= 10:  # 10%以上の変動のみ記録
-                final_hour_movements.append({
-                    "horse_number": horse_num,
-                    "horse_name": end_data.get("horse_name", ""),
-                    "change_rate": round(change_rate, 1),
-                    "is_significant": abs(change_rate) >= 20,
-                    "direction": "下落" if change_rate < 0 else "上昇",
-                })
-
-    # 序盤の変動を分析
-    if len(early_data) >= 2:
-        start = early_data[0]
-        end = early_data[-1]
-
-        start_odds = {o.get("horse_number"): o for o in start.get("odds", [])}
-        end_odds = {o.get("horse_number"): o for o in end.get("odds", [])}
-
-        for horse_num, end_data in end_odds.items():
-            if horse_numbers and horse_num not in horse_numbers:
-                continue
-
-            start_data = start_odds.get(horse_num, {})
-            s_odds = start_data.get("odds", 0)
-            e_odds = end_data.get("odds", 0)
-
-            if s_odds <= 0 or e_odds <= 0:
-                continue
-
-            change_rate = ((e_odds - s_odds) / s_odds) * 100
+    for horse_num, change_rate in series.change_rates(final_window, horse_numbers).items():
+        if abs(change_rate) >= 10:  # 10%以上の変動のみ記録
+            final_hour_movements.append({
+                "horse_number": horse_num,
+                "horse_name": series.horse_names.get(horse_num, ""),
+                "change_rate": round(change_rate, 1),
+                "is_significant": abs(change_rate) >= 20,
+                "direction": "下落" if change_rate < 0 else "上昇",
+            })
 
+    early_movements = []
+    if early_window[1] >= 2:
+        for horse_num, change_rate in series.change_rates(early_window, horse_numbers).items():
             if abs(change_rate) >= 15:  # 序盤は15%以上のみ
                 early_movements.append({
                     "horse_number": horse_num,
-                    "horse_name": end_data.get("horse_name", ""),
+                    "horse_name": series.horse_names.get(horse_num, ""),
                     "change_rate": round(change_rate, 1),
                     "direction": "下落" if change_rate < 0 else "上昇",
                 })
 
     # 締切前に急変した馬を特定（インサイダー疑惑）
+    late_money = series.late_money(FINAL_WINDOW_MINUTES, horse_numbers)
     late_surge_horses = [
-        m for m in final_hour_movements
-        if m.get("is_significant") and m.get("direction") == "下落"
+        m | {"horse_name": series.horse_names.get(m["horse_number"], ""), "is_significant": True, "direction": "下落"}
+        for m in late_money
     ]
 
     return {
@@ -381,6 +322,7 @@ def _analyze_time_based_movements(
             reverse=True,
         )[:5],
         "late_surge_horses": late_surge_horses,
+        "window_basis": series.window_basis,
         "analysis_note": "締切前の急変は関係者情報の可能性あり" if late_surge_horses else None,
     }
 
@@ -0,0 +1,216 @@
+"""単勝オッズ履歴の時系列エンジン.
+
+オッズ履歴（apd_sokuho の速報スナップショット）を一度だけ
+馬 × 時刻の数値行列（欠損は NaN）に変換し、以後の集計はこの行列で行う。
+時刻は各スナップショットのタイムスタンプを使い、時間窓（締切前N分・発売開始から）は
+二分探索で列の範囲に変換する。変動率・ボラティリティ・締切前の資金流入は
+列の範囲に対して全馬分をまとめて計算する。
+
+タイムスタンプが読めない履歴では時刻の代わりに並び順を使い、
+時間窓は「後ろから1/3（最低3件）」で近似する（window_basis = "position"）。
+"""
+
+import math
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import pairwise
+
+# 締切前の窓（分）
+FINAL_WINDOW_MINUTES = 60
+
+# 締切前の資金流入とみなす単勝オッズの下落率（%）
+LATE_MONEY_DROP_RATE = -20.0
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _parse_timestamp(value: object) -> float | None:
+    """タイムスタンプを秒に変換する（ISO8601 / "HH:MM" / 数値）. 読めなければNone."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            t = datetime.strptime(value, "%H:%M")
+        except ValueError:
+            return None
+        return float(t.hour * 3600 + t.minute * 60)
+    if dt.tzinfo is not None:
+        return dt.timestamp()
+    return (dt - _EPOCH).total_seconds()
+
+
+def _first_valid(row: list[float], start: int, end: int) -> float:
+    """row[start:end] の最初の有効値（なければ NaN）."""
+    for i in range(start, end):
+        if row[i] == row[i]:
+            return row[i]
+    return math.nan
+
+
+@dataclass
+class OddsSeries:
+    """馬 × 時刻の単勝オッズ行列.
+
+    Attributes:
+        horse_numbers: 行の馬番（昇順）
+        times: 列の時刻（秒、昇順）。window_basis が "position" なら列番号
+        odds: 馬ごとのオッズ列（odds[i][j] は horse_numbers[i] の times[j] 時点。欠損は NaN）
+        horse_names: 馬番 → 馬名（最新のスナップショット）
+        window_basis: "timestamp"（時刻で窓を切る）/ "position"（並び順で近似）
+    """
+
+    horse_numbers: list[int]
+    times: list[float]
+    odds: list[list[float]]
+    horse_names: dict[int, str] = field(default_factory=dict)
+    window_basis: str = "timestamp"
+
+    @classmethod
+    def from_history(cls, odds_history: list[dict]) -> "OddsSeries":
+        """オッズ履歴（[{"timestamp": ..., "odds": [{"horse_number", "odds", ...}]}]）から作る."""
+        parsed = [_parse_timestamp(snapshot.get("timestamp")) for snapshot in odds_history]
+        if all(t is not None for t in parsed):
+            # 同時刻のスナップショットは元の並びを保つ
+            order = sorted(range(len(odds_history)), key=lambda j: parsed[j])
+            times = [parsed[j] for j in order]
+            basis = "timestamp"
+        else:
+            order = list(range(len(odds_history)))
+            times = [float(j) for j in order]
+            basis = "position"
+
+        horse_index: dict[int, int] = {}
+        columns: list[dict[int, float]] = []
+        names: dict[int, str] = {}
+        for j in order:
+            column = {}
+            for entry in odds_history[j].get("odds", []):
+                hn = entry.get("horse_number")
+                if hn is None:
+                    continue
+                hn = int(hn)
+                horse_index.setdefault(hn, len(horse_index))
+                value = entry.get("odds") or 0
+                column[hn] = float(value) if value > 0 else math.nan
+                if entry.get("horse_name"):
+                    names[hn] = entry["horse_name"]
+            columns.append(column)
+
+        horse_numbers = sorted(horse_index)
+        odds = [[column.get(hn, math.nan) for column in columns] for hn in horse_numbers]
+        return cls(horse_numbers, times, odds, names, basis)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    # ------------------------------------------------------------------
+    # 時間窓 → 列の範囲
+    # ------------------------------------------------------------------
+
+    def index_at(self, t: float) -> int:
+        """時刻 t 時点で最新の列番号（t より前に列がなければ0）."""
+        return max(0, bisect_right(self.times, t) - 1)
+
+    def last_minutes(self, minutes: float) -> tuple[int, int]:
+        """最後の列から minutes 分前の時点〜最後の列の範囲 [start, end).
+
+        start は窓の開始時点の値を持つ列（開始時刻以前で最新の列）。
+        position 基準では後ろから1/3（最低3件）で近似する。
+        """
+        n = len(self.times)
+        if n == 0:
+            return 0, 0
+        if self.window_basis == "position":
+            return max(0, n - max(3, n // 3)), n
+        return self.index_at(self.times[-1] - minutes * 60), n
+
+    def since_open(self, until: int | None = None) -> tuple[int, int]:
+        """発売開始〜列 until（含む）の範囲 [0, until + 1)."""
+        end = len(self.times) if until is None else until + 1
+        return 0, end
+
+    # ------------------------------------------------------------------
+    # 全馬分の集計
+    # ------------------------------------------------------------------
+
+    def _rows(self, horse_numbers: list[int] | None) -> list[int]:
+        if not horse_numbers:
+            return list(range(len(self.horse_numbers)))
+        wanted = set(horse_numbers)
+        return [i for i, hn in enumerate(self.horse_numbers) if hn in wanted]
+
+    def endpoints(
+        self, window: tuple[int, int], horse_numbers: list[int] | None = None,
+    ) -> dict[int, tuple[float, float]]:
+        """範囲内の最初の有効オッズと、範囲の最後の列のオッズ.
+
+        最後の列にいない馬（取消・除外）は含めない。
+        """
+        start, end = window
+        if end <= start:
+            return {}
+        result = {}
+        for i in self._rows(horse_numbers):
+            row = self.odds[i]
+            first, last = _first_valid(row, start, end), row[end - 1]
+            if first == first and last == last:
+                result[self.horse_numbers[i]] = (first, last)
+        return result
+
+    def change_rates(
+        self, window: tuple[int, int], horse_numbers: list[int] | None = None,
+    ) -> dict[int, float]:
+        """範囲内の単勝オッズの変動率（%）."""
+        return {
+            hn: (last - first) / first * 100
+            for hn, (first, last) in self.endpoints(window, horse_numbers).items()
+        }
+
+    def volatility(
+        self, window: tuple[int, int], horse_numbers: list[int] | None = None,
+    ) -> dict[int, float]:
+        """範囲内の対数変化（有効値の連続する2点間）の標準偏差. 2点未満の馬は 0."""
+        start, end = window
+        result = {}
+        for i in self._rows(horse_numbers):
+            values = [v for v in self.odds[i][start:end] if v == v]
+            returns = [math.log(b / a) for a, b in pairwise(values)]
+            if len(returns) < 2:
+                result[self.horse_numbers[i]] = 0.0
+                continue
+            mean = sum(returns) / len(returns)
+            result[self.horse_numbers[i]] = math.sqrt(sum((r - mean) ** 2 for r in returns) / (len(returns) - 1))
+        return result
+
+    def late_money(
+        self,
+        minutes: float = FINAL_WINDOW_MINUTES,
+        horse_numbers: list[int] | None = None,
+        drop_rate: float = LATE_MONEY_DROP_RATE,
+    ) -> list[dict]:
+        """締切前 minutes 分に単勝オッズが drop_rate 以上下がった馬（下落の大きい順）.
+
+        implied_share_change は単勝の支持率（1/オッズ を全馬で正規化）の増分。
+        """
+        window = self.last_minutes(minutes)
+        all_endpoints = self.endpoints(window)
+        first_total = sum(1 / first for first, _ in all_endpoints.values())
+        last_total = sum(1 / last for _, last in all_endpoints.values())
+        wanted = set(horse_numbers or self.horse_numbers)
+        signals = []
+        for hn, (first, last) in all_endpoints.items():
+            rate = (last - first) / first * 100
+            if hn not in wanted or rate > drop_rate:
+                continue
+            signals.append({
+                "horse_number": hn,
+                "change_rate": round(rate, 1),
+                "implied_share_change": round(1 / last / last_total - 1 / first / first_total, 4),
+            })
+        signals.sort(key=lambda s: s["change_rate"])
+        return signals
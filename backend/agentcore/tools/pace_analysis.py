@@ -8,6 +8,7 @@ import logging
 import requests
 from strands import tool
 
+from .http_client import http_get
 from .jravan_client import get_api_url, get_headers
 
 logger = logging.getLogger(__name__)
@@ -27,7 +28,7 @@ def _get_running_styles(race_id: str) -> list[dict]:
     """APIから脚質データを取得する."""
     url = f"{get_api_url()}/races/{race_id}/running-styles"
     try:
-        response = requests.get(
+        response = http_get(
             url,
             headers=get_headers(),
             timeout=10,
@@ -0,0 +1,160 @@
+"""Plackett–Luce モデルのモンテカルロ組合せ確率エンジン.
+
+勝率を強さとして着順（1〜3着）をサンプリングし、1回のシミュレーションから
+全券種の組合せ確率を推定する。HarvilleTables と同じ probability() で参照できる。
+
+サンプリングは1頭ずつではなくバッチ単位で行う。1着をバッチ分まとめて
+random.choices で引き、同じ1着馬のサンプルをまとめて2着を、
+同じ1・2着のサンプルをまとめて3着を引く。乱数生成は C 実装の
+random.choices に任せ、Python のループは最大 n + n(n-1) 回で済む。
+
+推定誤差は標本数 N に対して sqrt(p(1-p)/N)。既定の 100,000 サンプルで
+p=1% の組合せの標準誤差は約 0.03% ポイント。
+"""
+
+import math
+import random
+from collections import Counter
+from functools import lru_cache
+
+# 既定のサンプル数と1バッチのサンプル数
+DEFAULT_SAMPLES = 100_000
+DEFAULT_BATCH_SIZE = 50_000
+# 既定の乱数シード（同じ勝率なら同じ推定値を返す）
+DEFAULT_SEED = 0
+
+
+class PlackettLuceSimulator:
+    """1レース分の Plackett–Luce モンテカルロ確率エンジン.
+
+    勝率は強さとして扱う（合計が1でなくても比率で正規化される）。
+    残りの馬の強さがすべて 0 で着順が決まらないサンプルは、
+    その先の着順を含む組合せの的中に数えない。
+    """
+
+    # 確率は推定値のため、勝率に対する単調性を枝刈りに使えない
+    closed_form = False
+
+    def __init__(
+        self,
+        win_probs: dict[int, float],
+        *,
+        n_samples: int = DEFAULT_SAMPLES,
+        seed: int | None = DEFAULT_SEED,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        if n_samples <= 0:
+            raise ValueError("n_samples must be positive")
+        self._probs = dict(win_probs)
+        self.n_samples = n_samples
+        self._top3: Counter = Counter()
+        rng = random.Random(seed)
+        remaining = n_samples
+        while remaining > 0:
+            size = min(batch_size, remaining)
+            self._simulate_batch(rng, size)
+            remaining -= size
+        self._aggregate()
+
+    def _simulate_batch(self, rng: random.Random, size: int) -> None:
+        """size 件の着順をサンプリングし、上位3頭の並びを数える."""
+        horses = sorted(h for h, p in self._probs.items() if p > 0)
+        if not horses:
+            return
+        weights = [self._probs[h] for h in horses]
+
+        firsts = Counter(rng.choices(horses, weights, k=size))
+        for a, count_a in firsts.items():
+            others = [h for h in horses if h != a]
+            if not others:
+                self._top3[(a,)] += count_a
+                continue
+            seconds = Counter(rng.choices(others, [self._probs[h] for h in others], k=count_a))
+            for b, count_ab in seconds.items():
+                rest = [h for h in others if h != b]
+                if not rest:
+                    self._top3[(a, b)] += count_ab
+                    continue
+                thirds = Counter(rng.choices(rest, [self._probs[h] for h in rest], k=count_ab))
+                for c, count_abc in thirds.items():
+                    self._top3[(a, b, c)] += count_abc
+
+    def _aggregate(self) -> None:
+        """上位3頭の並びの度数から券種ごとの的中数を集計する."""
+        self._win: Counter = Counter()
+        self._place: Counter = Counter()
+        self._exacta: Counter = Counter()
+        self._wide: Counter = Counter()
+        self._trio: Counter = Counter()
+        self._trifecta: Counter = Counter()
+        for order, count in self._top3.items():
+            self._win[order[0]] += count
+            for h in order:
+                self._place[h] += count
+            if len(order) >= 2:
+                self._exacta[order[:2]] += count
+            if len(order) == 3:
+                self._trifecta[order] += count
+                self._trio[tuple(sorted(order))] += count
+            for a, b in _pairs(order):
+                self._wide[(a, b) if a < b else (b, a)] += count
+
+    def _hits(self, horse_numbers: list[int], bet_type: str) -> int:
+        """組合せの的中サンプル数."""
+        if bet_type == "win":
+            return self._win[horse_numbers[0]]
+        if bet_type == "place":
+            return self._place[horse_numbers[0]]
+        if bet_type == "exacta":
+            return self._exacta[(horse_numbers[0], horse_numbers[1])]
+        if bet_type == "quinella":
+            a, b = horse_numbers[0], horse_numbers[1]
+            return self._exacta[(a, b)] + self._exacta[(b, a)]
+        if bet_type == "quinella_place":
+            a, b = horse_numbers[0], horse_numbers[1]
+            return self._wide[(a, b) if a < b else (b, a)]
+        if bet_type == "trifecta":
+            return self._trifecta[(horse_numbers[0], horse_numbers[1], horse_numbers[2])]
+        if bet_type == "trio":
+            return self._trio[tuple(sorted(horse_numbers[:3]))]
+        return 0
+
+    def probability(self, horse_numbers: list[int], bet_type: str) -> float:
+        """券種・馬番の組合せ確率の推定値を返す.
+
+        馬単/三連単は着順どおり、その他は順不同で参照する。
+        複勝は3着以内に入ったサンプルの割合。
+        """
+        return self._hits(horse_numbers, bet_type) / self.n_samples
+
+    def standard_error(self, horse_numbers: list[int], bet_type: str) -> float:
+        """推定確率の標準誤差 sqrt(p(1-p)/N)."""
+        p = self.probability(horse_numbers, bet_type)
+        return math.sqrt(p * (1 - p) / self.n_samples)
+
+
+def _pairs(order: tuple[int, ...]) -> list[tuple[int, int]]:
+    """並びに含まれる2頭の組（順不同）."""
+    return [(order[i], order[j]) for i in range(len(order)) for j in range(i + 1, len(order))]
+
+
+@lru_cache(maxsize=16)
+def _cached_simulator(
+    probs_key: tuple[tuple[int, float], ...], n_samples: int, seed: int | None,
+) -> PlackettLuceSimulator:
+    return PlackettLuceSimulator(dict(probs_key), n_samples=n_samples, seed=seed)
+
+
+def get_plackett_luce_simulator(
+    win_probs: dict[int, float],
+    *,
+    n_samples: int = DEFAULT_SAMPLES,
+    seed: int | None = DEFAULT_SEED,
+) -> PlackettLuceSimulator:
+    """勝率ベクトルに対応するエンジンを取得（同じ勝率・設定なら使い回す）.
+
+    seed=None の場合は毎回シミュレーションし直す。
+    """
+    if seed is None:
+        return PlackettLuceSimulator(win_probs, n_samples=n_samples, seed=None)
+    return _cached_simulator(tuple(sorted(win_probs.items())), n_samples, seed)
@@ -0,0 +1,305 @@
+"""レース単位の買い目提案の事前計算.
+
+ゲストや好み設定が既定のユーザーでは、ツールのうちユーザーに依存しない部分
+（レース分析・統合勝率・既定条件のEV候補表）はレースごとに同じになる。
+事前計算ジョブでこれらを作って共有層に保存し、ツールは先に保存結果を読む。
+
+保存結果はレースIDごとに1件で、作成時の単勝オッズ（odds_version）を持つ。
+ジョブは再実行のたびにオッズを取り直し、単勝オッズが大きく動いていれば作り直す。
+動いていなければ分析・統合勝率は使い回し、オッズとEV候補表だけを最新にする。
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+import zlib
+
+from boto3.dynamodb.conditions import Key
+
+from .shared_cache import MAX_PAYLOAD_BYTES, CacheBackend, _create_backend
+
+logger = logging.getLogger(__name__)
+
+# 保存結果の有効期限（秒）。ジョブが止まっても古いオッズで提案し続けない
+PRECOMPUTE_TTL_SECONDS = 900
+
+# 単勝オッズがこの比率以上動いた馬がいれば作り直す
+ODDS_CHANGE_RATIO = 0.2
+
+# 1番人気の入れ替わりは、新しい1番人気が元の1番人気よりこの比率以上低いオッズのときだけ数える
+# （人気が拮抗した馬どうしの小さな上下で作り直しを繰り返さない）
+FAVORITE_SWAP_MARGIN = 0.1
+
+_DATA_TYPE = "precompute"
+
+
+def win_odds_snapshot(all_odds: dict) -> dict[str, float]:
+    """全券種オッズから単勝オッズ（馬番 → オッズ）を取り出す."""
+    return {str(hn): float(odds) for hn, odds in (all_odds.get("win") or {}).items() if odds}
+
+
+def odds_version(win_odds: dict[str, float]) -> str:
+    """単勝オッズの版（内容のハッシュ）."""
+    canonical = json.dumps(sorted(win_odds.items()), separators=(",", ":"))
+    return hashlib.md5(canonical.encode()).hexdigest()[:12]
+
+
+def odds_changed_materially(old: dict[str, float], new: dict[str, float]) -> bool:
+    """単勝オッズが作り直しが必要なほど動いたか.
+
+    出走馬が変わった（取消・除外）、1番人気が FAVORITE_SWAP_MARGIN 以上の差で入れ替わった、
+    いずれかの馬のオッズが ODDS_CHANGE_RATIO 以上動いた場合に True。
+    """
+    if set(old) != set(new):
+        return True
+    if not new:
+        return False
+    old_favorite = min(old, key=old.get)
+    new_favorite = min(new, key=new.get)
+    if new_favorite != old_favorite and new[new_favorite] * (1 + FAVORITE_SWAP_MARGIN) <= new[old_favorite]:
+        return True
+    return any(abs(new[hn] - old[hn]) / old[hn] >= ODDS_CHANGE_RATIO for hn in new if old[hn] > 0)
+
+
+class PrecomputeStore:
+    """事前計算結果の保存先. バックエンドの障害は未計算として扱う."""
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: int = PRECOMPUTE_TTL_SECONDS):
+        self._backend = backend
+        self._ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _key(race_id: str) -> str:
+        return f"precompute:{race_id}"
+
+    def get(self, race_id: str) -> dict | None:
+        """有効期限内の保存結果を返す. なければNone."""
+        try:
+            found = self._backend.get(self._key(race_id))
+        except Exception as e:
+            logger.warning("Precompute store get failed for %s: %s", race_id, e)
+            return None
+        if not found or found[1] <= time.time():
+            return None
+        try:
+            return json.loads(zlib.decompress(found[0]))
+        except (zlib.error, ValueError) as e:
+            logger.warning("Broken precompute entry for %s: %s", race_id, e)
+            return None
+
+    def put(self, race_id: str, entry: dict) -> bool:
+        """保存結果を書き込み、有効期限を延ばす. 書き込めたら True."""
+        payload = zlib.compress(json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode())
+        if len(payload) > MAX_PAYLOAD_BYTES:
+            logger.warning("Skip precompute write for %s: %d bytes exceeds limit", race_id, len(payload))
+            return False
+        try:
+            self._backend.put(self._key(race_id), payload, int(time.time()) + self._ttl_seconds, _DATA_TYPE)
+        except Exception as e:
+            logger.warning("Precompute store put failed for %s: %s", race_id, e)
+            return False
+        return True
+
+
+_store: PrecomputeStore | None = None
+_store_initialized = False
+_store_lock = threading.Lock()
+
+
+def get_precompute_store() -> PrecomputeStore | None:
+    """事前計算の保存先を取得（共有キャッシュが無効ならNone）."""
+    global _store, _store_initialized
+    with _store_lock:
+        if not _store_initialized:
+            _store_initialized = True
+            try:
+                backend = _create_backend()
+            except Exception as e:
+                logger.warning("Failed to initialize precompute store: %s", e)
+                backend = None
+            _store = PrecomputeStore(backend) if backend is not None else None
+    return _store
+
+
+def get_precomputed(race_id: str) -> dict | None:
+    """レースの事前計算結果を取得する. なければNone."""
+    store = get_precompute_store()
+    if store is None:
+        return None
+    return store.get(race_id)
+
+
+def is_current(entry: dict, all_odds: dict) -> bool:
+    """保存結果の作成時から、現在の単勝オッズが作り直しが必要なほど動いていないか."""
+    win_odds = win_odds_snapshot(all_odds)
+    return bool(win_odds) and not odds_changed_materially(entry["win_odds"], win_odds)
+
+
+def precomputed_candidates(
+    entry: dict,
+    win_probabilities: dict[int, float],
+    bet_types: list[str],
+    betting_preference: dict | None,
+    all_odds: dict,
+) -> list[dict] | None:
+    """保存したEV候補表がこの提案にそのまま使えれば返す.
+
+    候補表の確率・EVは既定の好み設定・既定の券種・統合勝率・保存時のオッズで計算している。
+    候補の値をそのまま使うため、LLM の勝率が統合勝率と完全に一致し、
+    現在のオッズ（all_odds）が保存時と同じ場合に限る。
+    """
+    from .ev_proposer import DEFAULT_BET_TYPES
+
+    if betting_preference or list(bet_types) != DEFAULT_BET_TYPES:
+        return None
+    unified = {int(hn): p for hn, p in entry.get("unified_probs", {}).items()}
+    if not unified or unified != win_probabilities:
+        return None
+    if entry.get("all_odds") != all_odds:
+        return None
+    return entry["ev_candidates"]
+
+
+def _default_ev_candidates(unified: dict[int, float], runners_data: list[dict], all_odds: dict) -> list[dict]:
+    """既定の好み設定・既定の券種・統合勝率のEV候補表."""
+    from .ev_proposer import DEFAULT_BET_TYPES, _generate_ev_candidates, _resolve_ev_filter
+
+    return _generate_ev_candidates(
+        unified,
+        {r["horse_number"]: r for r in runners_data},
+        DEFAULT_BET_TYPES,
+        len(runners_data),
+        all_odds,
+        ev_filter=_resolve_ev_filter(None),
+    )
+
+
+def _refresh_odds(stored: dict, all_odds: dict, win_odds: dict[str, float]) -> dict:
+    """保存結果の分析・統合勝率を使い回し、オッズとEV候補表だけを最新にする.
+
+    win_odds / odds_version は作り直しの判定の基準のため、作成時のままにする。
+    """
+    analysis = stored["analysis"] | {
+        "horses": [
+            h | {"odds": win_odds.get(str(h["number"]), h["odds"])} for h in stored["analysis"]["horses"]
+        ],
+    }
+    runners_data = [
+        r | {"odds": win_odds.get(str(r["horse_number"]), r["odds"])} for r in stored["runners_data"]
+    ]
+    unified = {int(hn): p for hn, p in stored["unified_probs"].items()}
+    return stored | {
+        "analysis": analysis,
+        "runners_data": runners_data,
+        "ev_candidates": _default_ev_candidates(unified, runners_data, all_odds),
+        "all_odds": all_odds,
+    }
+
+
+def precompute_race(race_id: str, store: PrecomputeStore) -> str:
+    """1レース分を事前計算して保存する.
+
+    Args:
+        race_id: レースID
+        store: 保存先
+
+    Returns:
+        "computed"（作り直した）/ "unchanged"（単勝オッズが大きく動いておらず、
+        分析を使い回してオッズとEV候補表だけ更新した）/
+        "skipped"（オッズ・分析・AI予想が取れない）/ "failed"（保存できない）
+    """
+    from .bet_proposal import _compute_unified_win_probabilities
+    from .ev_proposer import _fetch_all_odds
+    from .race_analyzer import _collect_race_analysis
+    from .race_signals import AI_PREDICTION, load_race_signals
+
+    all_odds = _fetch_all_odds(race_id)
+    win_odds = win_odds_snapshot(all_odds)
+    if not win_odds:
+        return "skipped"
+
+    stored = store.get(race_id)
+    if stored is not None and not odds_changed_materially(stored["win_odds"], win_odds):
+        refreshed = _refresh_odds(stored, all_odds, win_odds)
+        return "unchanged" if store.put(race_id, refreshed) else "failed"
+
+    analysis = _collect_race_analysis(race_id)
+    if "error" in analysis:
+        logger.info("Skip precompute for %s: %s", race_id, analysis["error"])
+        return "skipped"
+    # 分析で取得済みのため、ここはレース単位のキャッシュから返る
+    ai_result = load_race_signals([race_id], kinds=(AI_PREDICTION,))[race_id][AI_PREDICTION]
+    unified = _compute_unified_win_probabilities(ai_result) if "error" not in ai_result else {}
+    if not unified:
+        return "skipped"
+
+    runners_data = [
+        {"horse_number": h["number"], "horse_name": h["name"], "odds": h["odds"]}
+        for h in analysis["horses"]
+    ]
+    entry = {
+        "race_id": race_id,
+        "odds_version": odds_version(win_odds),
+        "win_odds": win_odds,
+        "computed_at": int(time.time()),
+        # 取得時間は計算時点のものなので、保存結果には残さない
+        "analysis": {k: v for k, v in analysis.items() if k != "fetch_diagnostics"},
+        "runners_data": runners_data,
+        "unified_probs": {str(hn): p for hn, p in unified.items()},
+        "ev_candidates": _default_ev_candidates(unified, runners_data, all_odds),
+        "all_odds": all_odds,
+    }
+    return "computed" if store.put(race_id, entry) else "failed"
+
+
+def _race_ids_for_date(date: str) -> list[str]:
+    """開催日のレースIDをAI予想テーブルの日付GSIから集める."""
+    from .ai_prediction import DATE_INDEX_NAME, get_dynamodb_table
+
+    table = get_dynamodb_table()
+    race_ids: set[str] = set()
+    query_kwargs = {
+        "IndexName": DATE_INDEX_NAME,
+        "KeyConditionExpression": Key("race_date").eq(date),
+    }
+    while True:
+        response = table.query(**query_kwargs)
+        race_ids.update(item["race_id"] for item in response.get("Items", []) if item.get("race_id"))
+        if "LastEvaluatedKey" not in response:
+            break
+        query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    return sorted(race_ids)
+
+
+def run_precompute(race_ids: list[str] | None = None, date: str | None = None) -> dict:
+    """事前計算ジョブ. 指定したレース（または開催日の全レース）を事前計算する.
+
+    発走前のレースを対象に定期実行する想定。
+    オッズはセッションキャッシュ（5分）を通すため、実行間隔はそれ以上にする。
+
+    Args:
+        race_ids: 対象レースID
+        date: 開催日 (例: "20260201")。race_ids がなければこの日の全レース
+
+    Returns:
+        dict: results（レースID → 状態）、または error
+    """
+    store = get_precompute_store()
+    if store is None:
+        return {"error": "事前計算の保存先が無効です"}
+    if not race_ids:
+        if not date:
+            return {"error": "race_ids か date が必要です"}
+        race_ids = _race_ids_for_date(date)
+
+    results = {}
+    for race_id in race_ids:
+        try:
+            results[race_id] = precompute_race(race_id, store)
+        except Exception:
+            logger.exception("Precompute failed for %s", race_id)
+            results[race_id] = "failed"
+    logger.info("Precompute finished: %s", results)
+    return {"results": results}
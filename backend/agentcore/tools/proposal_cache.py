@@ -0,0 +1,241 @@
+"""買い目提案の応答を呼び出しをまたいで共有するキャッシュ.
+
+ゲスト・好み設定が既定のユーザーの応答は、レース・単勝オッズ・既定の券種だけで決まる。
+エージェントの応答全体（ナレーション・買い目JSONを含む）を
+(レースID, オッズの版, 好み設定のハッシュ) をキーに共有層へ短いTTLで保存し、
+同じオッズの間は2人目以降の呼び出しでエージェント実行を省く。
+好み設定のあるユーザーの応答は共有しない（agent.py が呼び分ける）。
+
+オッズの版は呼び出しのたびに現在のオッズ（/races/{race_id}/odds）から決める。
+このレスポンスはセッション内キャッシュに入り、エージェント実行時の propose_bets が使い回す。
+事前計算結果の作成時から単勝オッズが大きく動いていなければその odds_version
+（事前計算と同じ版の間は応答を共有する）、動いていれば現在の単勝オッズのハッシュを使う。
+
+同じキーの作成は1回にする（single-flight）。同一プロセスでは実行中の作成に相乗りし、
+プロセス間（microVM 間）では共有層のリース（put_if_absent）を取った1つだけが作成して、
+他は保存されるのを待つ。待つのは POPULATE_WAIT_SECONDS までで、過ぎれば自分で作成する。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections.abc import Callable
+from concurrent.futures import Future
+
+from .precompute import get_precomputed, is_current, odds_version, win_odds_snapshot
+from .shared_cache import MAX_PAYLOAD_BYTES, CacheBackend, _create_backend
+
+logger = logging.getLogger(__name__)
+
+# 応答の共有を有効にするか
+PROPOSAL_CACHE_ENABLED = os.environ.get("AGENT_PROPOSAL_CACHE", "true").lower() == "true"
+
+# 応答を共有する秒数（オッズの版が変わればキーも変わる）
+PROPOSAL_CACHE_TTL_SECONDS = 180
+
+# 作成中のリースの有効期限（秒）。作成者が落ちても、この後は別の呼び出しが作成する
+POPULATE_LEASE_SECONDS = 90
+
+# 他のプロセスの作成を待つ上限（秒）と確認間隔（秒）。
+# 待ちきれずに自分で作成しても応答時間の予算に収まるよう、エージェント実行よりずっと短くする
+POPULATE_WAIT_SECONDS = 10
+POLL_INTERVAL_SECONDS = 0.5
+
+_DATA_TYPE = "proposal"
+
+
+def preference_hash(betting_preference: dict | None) -> str:
+    """好み設定のハッシュ（キー順に依存しない）. 設定なしは "default"."""
+    if not betting_preference:
+        return "default"
+    canonical = json.dumps(betting_preference, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.md5(canonical.encode()).hexdigest()[:12]
+
+
+def current_odds_version(race_id: str) -> str | None:
+    """レースの現在のオッズの版. 単勝オッズが取れなければNone.
+
+    事前計算結果の作成時から単勝オッズが大きく動いていなければその odds_version、
+    動いていれば（または事前計算結果がなければ）現在の単勝オッズのハッシュ。
+    """
+    from .ev_proposer import _fetch_all_odds
+
+    try:
+        all_odds = _fetch_all_odds(race_id)
+        entry = get_precomputed(race_id)
+    except Exception as e:
+        logger.warning("Failed to resolve odds version for %s: %s", race_id, e)
+        return None
+    win_odds = win_odds_snapshot(all_odds)
+    if not win_odds:
+        return None
+    if entry is not None and is_current(entry, all_odds):
+        return entry["odds_version"]
+    return odds_version(win_odds)
+
+
+class ProposalCache:
+    """買い目提案の応答の共有キャッシュ. バックエンドの障害はキャッシュミスとして扱う."""
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        *,
+        ttl_seconds: int = PROPOSAL_CACHE_TTL_SECONDS,
+        lease_seconds: int = POPULATE_LEASE_SECONDS,
+        wait_seconds: float = POPULATE_WAIT_SECONDS,
+        poll_interval: float = POLL_INTERVAL_SECONDS,
+    ):
+        self._backend = backend
+        self._ttl_seconds = ttl_seconds
+        self._lease_seconds = lease_seconds
+        self._wait_seconds = wait_seconds
+        self._poll_interval = poll_interval
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._shared = 0
+
+    @staticmethod
+    def make_key(race_id: str, version: str, betting_preference: dict | None) -> str:
+        """(レースID, オッズの版, 好み設定のハッシュ) のキー."""
+        return f"proposal:{race_id}:{version}:{preference_hash(betting_preference)}"
+
+    def get(self, key: str) -> dict | None:
+        """有効期限内の応答を返す. なければNone."""
+        try:
+            found = self._backend.get(key)
+        except Exception as e:
+            logger.warning("Proposal cache get failed for %s: %s", key, e)
+            return None
+        if not found or found[1] <= time.time():
+            return None
+        try:
+            return json.loads(zlib.decompress(found[0]))
+        except (zlib.error, ValueError) as e:
+            logger.warning("Broken proposal cache entry for %s: %s", key, e)
+            return None
+
+    def put(self, key: str, response: dict) -> bool:
+        """応答を保存する. 書き込めたら True."""
+        payload = zlib.compress(json.dumps(response, ensure_ascii=False, separators=(",", ":")).encode())
+        if len(payload) > MAX_PAYLOAD_BYTES:
+            logger.warning("Skip proposal cache write for %s: %d bytes exceeds limit", key, len(payload))
+            return False
+        try:
+            self._backend.put(key, payload, int(time.time()) + self._ttl_seconds, _DATA_TYPE)
+        except Exception as e:
+            logger.warning("Proposal cache put failed for %s: %s", key, e)
+            return False
+        return True
+
+    def _acquire_lease(self, key: str) -> bool:
+        """作成のリースを取る. 共有層の障害時は取れたものとして自分で作成する."""
+        try:
+            return self._backend.put_if_absent(
+                f"{key}:lease", b"", int(time.time()) + self._lease_seconds, f"{_DATA_TYPE}_lease",
+            )
+        except Exception as e:
+            logger.warning("Proposal cache lease failed for %s: %s", key, e)
+            return True
+
+    def _wait_for(self, key: str) -> dict | None:
+        """他のプロセスが応答を保存するのを待つ. 期限までに保存されなければNone."""
+        deadline = time.monotonic() + self._wait_seconds
+        while time.monotonic() < deadline:
+            time.sleep(self._poll_interval)
+            response = self.get(key)
+            if response is not None:
+                return response
+        return None
+
+    def get_or_compute(
+        self, key: str, compute: Callable[[], dict], cacheable: Callable[[dict], bool],
+    ) -> dict:
+        """共有された応答を返す. なければ1回だけ compute で作成して保存する.
+
+        Args:
+            key: make_key で作ったキー
+            compute: 応答を作成する関数（エージェント実行）
+            cacheable: 作成した応答を共有してよいか（失敗した応答は保存しない）
+
+        Returns:
+            応答の dict（呼び出し元ごとの浅いコピー）
+        """
+        response = self.get(key)
+        if response is not None:
+            with self._lock:
+                self._hits += 1
+            logger.info("Proposal cache hit: %s", key)
+            return response
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+        if not owner:
+            with self._lock:
+                self._shared += 1
+            return dict(future.result())
+
+        try:
+            response = self._populate(key, compute, cacheable)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(response)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return dict(response)
+
+    def _populate(
+        self, key: str, compute: Callable[[], dict], cacheable: Callable[[dict], bool],
+    ) -> dict:
+        if not self._acquire_lease(key):
+            response = self._wait_for(key)
+            if response is not None:
+                with self._lock:
+                    self._shared += 1
+                return response
+            logger.info("Timed out waiting for proposal %s; computing locally", key)
+        with self._lock:
+            self._misses += 1
+        response = compute()
+        if cacheable(response):
+            self.put(key, response)
+        return response
+
+    @property
+    def stats(self) -> dict:
+        """ヒット・作成・相乗りの回数を返す."""
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "shared": self._shared}
+
+
+_proposal_cache: ProposalCache | None = None
+_proposal_cache_initialized = False
+_proposal_cache_lock = threading.Lock()
+
+
+def get_proposal_cache() -> ProposalCache | None:
+    """買い目提案の共有キャッシュを取得（無効化されていればNone）."""
+    global _proposal_cache, _proposal_cache_initialized
+    with _proposal_cache_lock:
+        if not _proposal_cache_initialized:
+            _proposal_cache_initialized = True
+            try:
+                backend = _create_backend() if PROPOSAL_CACHE_ENABLED else None
+            except Exception as e:
+                logger.warning("Failed to initialize proposal cache: %s", e)
+                backend = None
+            _proposal_cache = ProposalCache(backend) if backend is not None else None
+    return _proposal_cache
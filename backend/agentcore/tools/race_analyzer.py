@@ -8,10 +8,30 @@ import logging
 
 from strands import tool
 
+from . import compact_payload
+from .common import fan_out, log_tool_execution
+from .metrics import record_fetch_metrics
+from .tool_memo import memoize_tool
+from .tracing import span
+
 logger = logging.getLogger(__name__)
 
+# データ取得の打ち切り秒数（全体 / ソース別）
+FETCH_DEADLINE_SECONDS = 12.0
+FETCH_TIMEOUT_SECONDS = {
+    "race_detail": 11.0,
+    "ai_prediction": 5.0,
+    "running_styles": 11.0,
+    "speed_index": 5.0,
+}
+
+# セッション内で分析結果を使い回す秒数（単勝オッズを含むため、オッズのキャッシュと揃える）
+ANALYSIS_MEMO_TTL_SECONDS = 300
+
 
 @tool
+@log_tool_execution
+@memoize_tool(ANALYSIS_MEMO_TTL_SECONDS)
 def analyze_race_for_betting(race_id: str) -> dict:
     """レースを分析し、各馬のAI予想生データと分析情報を返す。
 
@@ -25,34 +45,88 @@ def analyze_race_for_betting(race_id: str) -> dict:
         dict: レース分析結果
             - race_info: レース基本情報（脚質構成、コンセンサス等）
             - horses: 各馬の情報（AI予想、脚質、スピード指数）
+            - fetch_diagnostics: ソース別の取得時間（ms）と失敗したソース（事前計算を使った場合はなし）
     """
     try:
-        from .ai_prediction import get_ai_prediction
-        from .pace_analysis import _get_running_styles
-        from .race_data import _extract_race_conditions, _fetch_race_detail
-        from .speed_index import get_speed_index
-
-        # レースデータ取得
-        race_detail = _fetch_race_detail(race_id)
-        race = race_detail.get("race", {})
-        runners_data = race_detail.get("runners", [])
-        race_conditions = _extract_race_conditions(race)
-
-        # AI予想取得
-        ai_result = get_ai_prediction(race_id)
-        if not isinstance(ai_result, dict) or "error" in ai_result:
-            return {"error": f"AI予想の取得に失敗: {ai_result}"}
-
-        # 脚質データ取得
-        running_styles = _get_running_styles(race_id)
-
-        # スピード指数取得
-        speed_index_data = None
-        si_result = get_speed_index(race_id)
-        if isinstance(si_result, dict) and "error" not in si_result:
-            speed_index_data = si_result
-
-        return _analyze_race_impl(
+        from .precompute import get_precomputed
+
+        # 事前計算があればデータ取得・分析を省く
+        precomputed = get_precomputed(race_id)
+        if precomputed is not None:
+            analysis = precomputed["analysis"] | {
+                "precomputed": {
+                    "odds_version": precomputed["odds_version"],
+                    "computed_at": precomputed["computed_at"],
+                },
+            }
+        else:
+            analysis = _collect_race_analysis(race_id)
+        if "error" in analysis:
+            return analysis
+        if compact_payload.COMPACT_TOOL_RESULTS:
+            return compact_payload.compact_race_analysis(analysis)
+        return analysis
+    except Exception as e:
+        logger.exception("analyze_race_for_betting failed")
+        return {"error": f"レース分析に失敗しました: {e}"}
+
+
+def _collect_race_analysis(race_id: str) -> dict:
+    """レースデータを並列に取得して分析する（ツールと事前計算ジョブで共用）.
+
+    Args:
+        race_id: レースID
+
+    Returns:
+        _analyze_race_impl の結果に fetch_diagnostics（ソース別の取得時間と失敗したソース名）を加えたもの。
+        失敗の詳細はログとメトリクスに残す。
+        必須データ（レースデータ・AI予想）が取れなければ error のみの辞書。
+    """
+    from .ai_prediction import get_ai_prediction
+    from .pace_analysis import _get_running_styles
+    from .race_data import _extract_race_conditions, _fetch_race_detail
+    from .speed_index import get_speed_index
+
+    # 4ソースは互いに依存しないため並列に取得する
+    fetched = fan_out(
+        {
+            "race_detail": lambda: _fetch_race_detail(race_id),
+            "ai_prediction": lambda: get_ai_prediction(race_id),
+            "running_styles": lambda: _get_running_styles(race_id),
+            "speed_index": lambda: get_speed_index(race_id),
+        },
+        deadline=FETCH_DEADLINE_SECONDS,
+        timeouts=FETCH_TIMEOUT_SECONDS,
+    )
+    for name, error in fetched.errors.items():
+        logger.warning("analyze_race_for_betting: %s fetch failed: %s", name, error)
+    logger.info(
+        "analyze_race_for_betting: fetched %s in %.1fms %s",
+        race_id, fetched.total_ms, fetched.timings_ms,
+    )
+    record_fetch_metrics("analyze_race_for_betting", fetched.timings_ms, fetched.errors)
+
+    # レースデータとAI予想は必須。脚質・スピード指数は欠けても分析を続ける
+    if "race_detail" in fetched.errors:
+        return {"error": f"レース分析に失敗しました: {fetched.errors['race_detail']}"}
+    race_detail = fetched.results["race_detail"]
+    race = race_detail.get("race", {})
+    runners_data = race_detail.get("runners", [])
+    race_conditions = _extract_race_conditions(race)
+
+    ai_result = fetched.results.get("ai_prediction", fetched.errors.get("ai_prediction"))
+    if not isinstance(ai_result, dict) or "error" in ai_result:
+        return {"error": f"AI予想の取得に失敗: {ai_result}"}
+
+    running_styles = fetched.results.get("running_styles") or []
+
+    speed_index_data = None
+    si_result = fetched.results.get("speed_index")
+    if isinstance(si_result, dict) and "error" not in si_result:
+        speed_index_data = si_result
+
+    with span("analyze_race"):
+        analysis = _analyze_race_impl(
             race_id=race_id,
             race_name=race.get("race_name", ""),
             venue=race.get("venue", ""),
@@ -65,9 +139,12 @@ def analyze_race_for_betting(race_id: str) -> dict:
             running_styles=running_styles,
             speed_index_data=speed_index_data,
         )
-    except Exception as e:
-        logger.exception("analyze_race_for_betting failed")
-        return {"error": f"レース分析に失敗しました: {e}"}
+    return analysis | {
+        "fetch_diagnostics": {
+            "timings_ms": {name: round(ms) for name, ms in fetched.timings_ms.items()},
+            "failed": sorted(fetched.errors),
+        },
+    }
 
 
 def _analyze_race_impl(
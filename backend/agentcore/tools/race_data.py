@@ -6,7 +6,7 @@ JRA-VAN API を呼び出してレース・馬データを取得する。
 import requests
 from strands import tool
 
-from .jravan_client import cached_get, get_api_url
+from .jravan_client import cached_get_json, get_api_url
 
 VENUE_CODE_TO_NAME: dict[str, str] = {
     "01": "札幌",
@@ -29,14 +29,13 @@ def venue_code_to_name(code: str) -> str:
 
 def _fetch_race_detail(race_id: str) -> dict:
     """JRA-VAN APIからレース詳細を取得する共通関数."""
-    response = cached_get(
-        f"{get_api_url()}/races/{race_id}",
-    )
-    response.raise_for_status()
-    data = response.json()
+    data = cached_get_json(f"{get_api_url()}/races/{race_id}")
+    if data is None:
+        raise requests.HTTPError(f"404 Not Found: {race_id}")
     race = data.get("race")
     if race and "venue" in race:
-        race["venue"] = venue_code_to_name(race["venue"])
+        # キャッシュと共有しているため書き換えずにコピーする
+        data = {**data, "race": {**race, "venue": venue_code_to_name(race["venue"])}}
     return data
 
 
@@ -0,0 +1,190 @@
+"""レースシグナル（AI予想・スピード指数）の一括ローダー.
+
+AI予想とスピード指数は別テーブルにあり、ツールごとに同じレースを直列にクエリしていた。
+このローダーは複数レース × 両テーブルのクエリを並列に発行し、整形・コンセンサス分析・
+匿名化を1回だけ適用した結果をセッション内でキャッシュする。
+同じレース・種別の取得が実行中なら、クエリを重ねずにその結果を待つ。
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from . import ai_prediction, speed_index
+from .tracing import span
+
+logger = logging.getLogger("agentcore.tools.race_signals")
+
+AI_PREDICTION = "ai_prediction"
+SPEED_INDEX = "speed_index"
+SIGNAL_KINDS = (AI_PREDICTION, SPEED_INDEX)
+
+# 種別ごとのテーブル取得・整形を持つモジュール（テストでの差し替えが効くよう呼び出し時に参照する）
+_SIGNAL_MODULES = {
+    AI_PREDICTION: ai_prediction,
+    SPEED_INDEX: speed_index,
+}
+
+# キャッシュの有効秒数とエントリ上限（エントリはレース × 種別）
+CACHE_TTL_SECONDS = 1800
+MAX_CACHED_ENTRIES = 256
+
+# クエリ用のスレッドプール。fan_out のタスク内から呼ばれるため、共有プールとは分ける
+_QUERY_MAX_WORKERS = 8
+
+Signals = dict[str, dict[str, dict]]
+
+
+def _query_items(table, race_id: str) -> list[dict]:
+    """race_id の全ソースのアイテムを取得する."""
+    kwargs = {"KeyConditionExpression": Key("race_id").eq(race_id)}
+    items = []
+    while True:
+        response = table.query(**kwargs)
+        items.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def _load_one(race_id: str, kind: str) -> dict:
+    """1レース・1種別を取得して整形する. 失敗時はエラーを含む辞書を返す."""
+    module = _SIGNAL_MODULES[kind]
+    try:
+        items = _query_items(module.get_dynamodb_table(), race_id)
+        return module._build_all_sources(race_id, items)
+    except ClientError as e:
+        error_code = e.response.get("Error", {}).get("Code", "Unknown")
+        return {"race_id": race_id, "error": f"DynamoDBエラー: {error_code}", "sources": []}
+    except Exception as e:
+        logger.warning("race signal load failed: race_id=%s kind=%s: %s", race_id, kind, e)
+        return {"race_id": race_id, "error": f"予期しないエラー: {str(e)}", "sources": []}
+
+
+class RaceSignalLoader:
+    """レースシグナルのセッション内キャッシュつきローダー.
+
+    取り出した値はキャッシュと共有されるため、呼び出し側で変更しないこと。
+    エラーを含む結果（データ未取得を含む）はキャッシュしない。
+    """
+
+    def __init__(self, *, ttl: float = CACHE_TTL_SECONDS, max_entries: int = MAX_CACHED_ENTRIES):
+        self._ttl = ttl
+        self._max_entries = max_entries
+        # (race_id, 種別) -> (有効期限, 結果)
+        self._cache: OrderedDict[tuple[str, str], tuple[float, dict]] = OrderedDict()
+        self._inflight: dict[tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=_QUERY_MAX_WORKERS, thread_name_prefix="race-signals")
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+
+    def load(self, race_ids: list[str], kinds: tuple[str, ...] = SIGNAL_KINDS) -> Signals:
+        """複数レースのシグナルをまとめて取得する.
+
+        Args:
+            race_ids: レースIDのリスト（重複は1回だけ取得する）
+            kinds: 取得する種別（AI_PREDICTION / SPEED_INDEX）
+
+        Returns:
+            {race_id: {種別: get_ai_prediction / get_speed_index の全ソース取得と同じ形式の辞書}}
+        """
+        race_ids = list(dict.fromkeys(race_ids))
+        results: dict[tuple[str, str], dict] = {}
+        waiting: dict[tuple[str, str], Future] = {}
+        owned: dict[tuple[str, str], Future] = {}
+        now = time.time()
+        with self._lock:
+            for key in ((race_id, kind) for race_id in race_ids for kind in kinds):
+                entry = self._cache.get(key)
+                if entry is not None and entry[0] > now:
+                    self._cache.move_to_end(key)
+                    self._hits += 1
+                    results[key] = entry[1]
+                elif key in self._inflight:
+                    self._coalesced += 1
+                    waiting[key] = self._inflight[key]
+                else:
+                    self._misses += 1
+                    owned[key] = self._inflight[key] = Future()
+
+        if owned:
+            try:
+                with span("race_signals", races=len({race_id for race_id, _ in owned}), queries=len(owned)):
+                    queries = {
+                        key: self._executor.submit(contextvars.copy_context().run, _load_one, *key)
+                        for key in owned
+                    }
+                    for key, query in queries.items():
+                        results[key] = query.result()
+            finally:
+                self._complete(owned, results)
+
+        for key, future in waiting.items():
+            results[key] = future.result()
+
+        signals: Signals = {race_id: {} for race_id in race_ids}
+        for (race_id, kind), result in results.items():
+            signals[race_id][kind] = result
+        return signals
+
+    def _complete(self, owned: dict[tuple[str, str], Future], results: dict[tuple[str, str], dict]) -> None:
+        """取得した結果をキャッシュし、待っている呼び出しに渡す."""
+        expiry = time.time() + self._ttl
+        with self._lock:
+            for key, future in owned.items():
+                self._inflight.pop(key, None)
+                result = results.get(key)
+                if result is None:
+                    result = {"race_id": key[0], "error": "予期しないエラー: 取得が中断されました", "sources": []}
+                elif "error" not in result:
+                    self._cache[key] = (expiry, result)
+                    self._cache.move_to_end(key)
+                future.set_result(result)
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        """キャッシュと統計をリセットする."""
+        with self._lock:
+            self._cache.clear()
+            self._hits = 0
+            self._misses = 0
+            self._coalesced = 0
+
+    @property
+    def stats(self) -> dict:
+        """キャッシュ統計を返す."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+                "cache_size": len(self._cache),
+            }
+
+
+_loader: RaceSignalLoader | None = None
+_loader_lock = threading.Lock()
+
+
+def get_race_signal_loader() -> RaceSignalLoader:
+    """プロセス内で共有するローダーを取得する."""
+    global _loader
+    if _loader is None:
+        with _loader_lock:
+            if _loader is None:
+                _loader = RaceSignalLoader()
+    return _loader
+
+
+def load_race_signals(race_ids: list[str], kinds: tuple[str, ...] = SIGNAL_KINDS) -> Signals:
+    """共有ローダーで複数レースのシグナルをまとめて取得する（RaceSignalLoader.load を参照）."""
+    return get_race_signal_loader().load(race_ids, kinds)
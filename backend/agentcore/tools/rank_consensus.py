@@ -0,0 +1,185 @@
+"""複数ソースの順位のコンセンサス分析.
+
+AI予想・スピード指数の各ソースの順位を、レースごとに1回だけ
+ソース × 馬の順位行列（欠損は None）に変換し、合意・乖離の指標はこの行列から計算する。
+
+- top-N 合意数: 馬ごとに、何ソースの上位N頭に入っているか（複数の N をまとめて数える）
+- 上位3頭の合意: 全ソースの上位3頭に共通する馬と、並びの一致
+- 乖離馬: 全ソースに登場し、ソース間の順位差が DIVERGENCE_GAP 以上の馬
+- 順位相関: 全ソースに登場する馬についての、ソース間の Spearman 順位相関
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from itertools import combinations
+
+# 乖離馬とみなすソース間の順位差
+DIVERGENCE_GAP = 3
+
+# 順位相関を計算する最少頭数
+MIN_CORRELATION_HORSES = 3
+
+
+@dataclass
+class RankMatrix:
+    """ソース × 馬の順位行列.
+
+    Attributes:
+        sources: 行のソース名
+        horse_numbers: 列の馬番（いずれかのソースに登場した馬、昇順）
+        ranks: ソースごとの順位の行（ranks[i][j] は sources[i] での horse_numbers[j] の順位。欠損は None）
+        orders: ソースごとの馬番（上位から）
+    """
+
+    sources: list[str]
+    horse_numbers: list[int]
+    ranks: list[list[int | None]]
+    orders: list[list[int]]
+
+    @classmethod
+    def from_entries(cls, sources: list[dict], entries_key: str) -> "RankMatrix":
+        """[{"source": ..., entries_key: [{"horse_number", "rank", ...}]}] から作る.
+
+        上位はリストの並び順。rank がない項目は並び順を順位にする。
+        """
+        names = [s.get("source") for s in sources]
+        orders = []
+        rank_maps = []
+        for s in sources:
+            entries = s.get(entries_key, [])
+            orders.append([e["horse_number"] for e in entries])
+            rank_maps.append({e["horse_number"]: e.get("rank", i + 1) for i, e in enumerate(entries)})
+        return cls._from_rank_maps(names, orders, rank_maps)
+
+    @classmethod
+    def from_scores(cls, scores: list[dict[int, float]], sources: list[str] | None = None) -> "RankMatrix":
+        """ソースごとの 馬番 → スコア（大きいほど上位）から作る. 同スコアは元の並び順."""
+        orders = [sorted(s, key=lambda hn, s=s: s[hn], reverse=True) for s in scores]
+        rank_maps = [{hn: i + 1 for i, hn in enumerate(order)} for order in orders]
+        names = sources or [f"source-{i + 1}" for i in range(len(scores))]
+        return cls._from_rank_maps(names, orders, rank_maps)
+
+    @classmethod
+    def _from_rank_maps(
+        cls, names: list[str], orders: list[list[int]], rank_maps: list[dict[int, int]],
+    ) -> "RankMatrix":
+        horse_numbers = sorted({hn for rank_map in rank_maps for hn in rank_map})
+        ranks = [[rank_map.get(hn) for hn in horse_numbers] for rank_map in rank_maps]
+        return cls(names, horse_numbers, ranks, orders)
+
+    # ------------------------------------------------------------------
+    # 上位N頭の合意
+    # ------------------------------------------------------------------
+
+    def agree_counts(self, top_ns: Iterable[int]) -> dict[int, dict[int, int]]:
+        """N ごとに、馬番 → その馬を上位N頭に入れたソース数."""
+        result: dict[int, dict[int, int]] = {n: {} for n in top_ns}
+        for order in self.orders:
+            for n, counts in result.items():
+                for hn in dict.fromkeys(order[:n]):
+                    counts[hn] = counts.get(hn, 0) + 1
+        return result
+
+    def agreed_top(self, n: int = 3) -> list[int]:
+        """全ソースの上位N頭に共通する馬番（先頭ソースの順位順）."""
+        counts = self.agree_counts([n])[n]
+        agreed = [hn for hn, count in counts.items() if count == len(self.orders)]
+        first = dict(zip(self.horse_numbers, self.ranks[0], strict=True)) if self.ranks else {}
+        return sorted(agreed, key=lambda hn: (first.get(hn) or float("inf"), hn))
+
+    def top_order_matches(self, n: int = 3) -> bool:
+        """全ソースの上位N頭の並びが一致するか."""
+        return all(order[:n] == self.orders[0][:n] for order in self.orders[1:])
+
+    # ------------------------------------------------------------------
+    # 乖離と相関
+    # ------------------------------------------------------------------
+
+    def common_columns(self) -> list[int]:
+        """全ソースに登場する馬の列番号."""
+        return [
+            j for j in range(len(self.horse_numbers))
+            if all(row[j] is not None for row in self.ranks)
+        ]
+
+    def divergence(self, min_gap: int = DIVERGENCE_GAP) -> list[dict]:
+        """全ソースに登場し、順位差が min_gap 以上の馬（順位差の大きい順）."""
+        horses = []
+        for j in self.common_columns():
+            column = [row[j] for row in self.ranks]
+            gap = max(column) - min(column)
+            if gap >= min_gap:
+                horses.append({
+                    "horse_number": self.horse_numbers[j],
+                    "ranks": dict(zip(self.sources, column, strict=True)),
+                    "gap": gap,
+                })
+        horses.sort(key=lambda h: h["gap"], reverse=True)
+        return horses
+
+    def rank_correlations(self) -> dict[tuple[str, str], float]:
+        """ソースの組ごとの Spearman 順位相関（全ソースに登場する馬で計算）.
+
+        共通の馬が MIN_CORRELATION_HORSES 頭未満なら空。
+        """
+        columns = self.common_columns()
+        n = len(columns)
+        if n < MIN_CORRELATION_HORSES:
+            return {}
+        # 共通の馬の中で順位を付け直す（同順位は馬番順）
+        positions = []
+        for row in self.ranks:
+            ordered = sorted(columns, key=lambda j, row=row: (row[j], self.horse_numbers[j]))
+            positions.append({j: i for i, j in enumerate(ordered)})
+        result = {}
+        for a, b in combinations(range(len(self.sources)), 2):
+            d2 = sum((positions[a][j] - positions[b][j]) ** 2 for j in columns)
+            result[(self.sources[a], self.sources[b])] = 1 - 6 * d2 / (n * (n * n - 1))
+        return result
+
+    def mean_rank_correlation(self) -> float | None:
+        """ソースの組の順位相関の平均. 計算できなければ None."""
+        correlations = self.rank_correlations()
+        if not correlations:
+            return None
+        return sum(correlations.values()) / len(correlations)
+
+
+def analyze_consensus(sources: list[dict], entries_key: str) -> dict:
+    """複数ソースのコンセンサスを分析する.
+
+    Args:
+        sources: [{"source": "ai-shisu", entries_key: [{"horse_number", "rank", ...}]}, ...]
+        entries_key: 順位の項目のキー（"predictions" / "indices"）
+
+    Returns:
+        dict: {
+            "agreed_top3": [8, 3],  # 全ソースのtop3に含まれる馬番
+            "consensus_level": "部分合意",
+            "divergence_horses": [
+                {"horse_number": 5, "ranks": {"ai-shisu": 2, "muryou-keiba-ai": 8}, "gap": 6}
+            ],
+            "rank_correlation": 0.62,  # ソース間の順位相関の平均（計算できなければ含めない）
+        }
+    """
+    matrix = RankMatrix.from_entries(sources, entries_key)
+
+    agreed_top3 = matrix.agreed_top(3)
+    common_count = len(agreed_top3)
+    if common_count == 3:
+        # top3の顔ぶれが一致 → 各ソースのtop3順位（並び）が完全一致か確認
+        consensus_level = "完全合意" if matrix.top_order_matches(3) else "概ね合意"
+    elif common_count == 2:
+        consensus_level = "部分合意"
+    else:
+        consensus_level = "大きな乖離"
+
+    result = {
+        "agreed_top3": agreed_top3,
+        "consensus_level": consensus_level,
+        "divergence_horses": matrix.divergence(),
+    }
+    correlation = matrix.mean_rank_correlation()
+    if correlation is not None:
+        result["rank_correlation"] = round(correlation, 2)
+    return result
@@ -0,0 +1,295 @@
+"""セッションをまたいで共有するJRA-VAN APIレスポンスキャッシュ.
+
+SessionCache（microVM内メモリ）の下に置く第2層。
+本番は DynamoDB、ローカル開発・テストでは SQLite をバックエンドにする。
+参照順は メモリ → 共有層 → API。書き込みはバックグラウンドスレッドで行い、
+ツールのレイテンシに載せない。
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+import boto3
+from botocore.config import Config
+
+from .api_cache import _infer_data_type, make_cache_key
+from .tracing import trace_aws_client
+
+logger = logging.getLogger("agentcore.tools.shared_cache")
+
+AWS_REGION = os.environ.get("AWS_REGION", "ap-northeast-1")
+
+# 共有層に載せるデータ種別とTTL（秒）。odds など短命なデータは共有しない。
+# race_info は出走馬のオッズを含むため、セッション内より短くする。
+SHARED_TTL = {
+    "race_info": 600,
+    "horse_info": 86400,
+    "jockey_info": 86400,
+    "trainer_info": 86400,
+    "results": 86400,
+}
+
+# DynamoDB のアイテム上限（400KB）に収まる圧縮後サイズ
+MAX_PAYLOAD_BYTES = 350 * 1024
+
+# バックエンド障害時に共有層を迂回する秒数
+FAILURE_COOLDOWN_SECONDS = 300
+
+
+class CacheBackend(ABC):
+    """共有キャッシュのストレージインターフェース."""
+
+    @abstractmethod
+    def get(self, key: str) -> tuple[bytes, int] | None:
+        """(圧縮済みペイロード, 有効期限のUNIX秒) を返す. なければNone."""
+        pass
+
+    @abstractmethod
+    def put(self, key: str, payload: bytes, expires_at: int, data_type: str) -> None:
+        """ペイロードを保存する."""
+        pass
+
+    @abstractmethod
+    def put_if_absent(self, key: str, payload: bytes, expires_at: int, data_type: str) -> bool:
+        """有効期限内のアイテムがなければ保存する. 保存できたら True."""
+        pass
+
+
+class DynamoDBCacheBackend(CacheBackend):
+    """DynamoDB をバックエンドにした共有キャッシュ.
+
+    パーティションキーは cache_key。期限切れアイテムは DynamoDB TTL（ttl 属性）で
+    削除されるが、削除は遅延するため読み出し時にも期限を確認する。
+    """
+
+    def __init__(self, table_name: str, region_name: str = AWS_REGION):
+        # 共有層が遅いとキャッシュの意味がないため、短いタイムアウトで諦める
+        config = Config(connect_timeout=1, read_timeout=1, retries={"max_attempts": 1})
+        dynamodb = boto3.resource("dynamodb", region_name=region_name, config=config)
+        trace_aws_client(dynamodb.meta.client)
+        self._table = dynamodb.Table(table_name)
+
+    def get(self, key: str) -> tuple[bytes, int] | None:
+        item = self._table.get_item(Key={"cache_key": key}).get("Item")
+        if not item:
+            return None
+        return bytes(item["payload"]), int(item["ttl"])
+
+    def put(self, key: str, payload: bytes, expires_at: int, data_type: str) -> None:
+        self._table.put_item(
+            Item={
+                "cache_key": key,
+                "payload": payload,
+                "data_type": data_type,
+                "ttl": expires_at,
+            }
+        )
+
+    def put_if_absent(self, key: str, payload: bytes, expires_at: int, data_type: str) -> bool:
+        try:
+            self._table.put_item(
+                Item={
+                    "cache_key": key,
+                    "payload": payload,
+                    "data_type": data_type,
+                    "ttl": expires_at,
+                },
+                ConditionExpression="attribute_not_exists(cache_key) OR #ttl <= :now",
+                ExpressionAttributeNames={"#ttl": "ttl"},
+                ExpressionAttributeValues={":now": int(time.time())},
+            )
+        except self._table.meta.client.exceptions.ConditionalCheckFailedException:
+            return False
+        return True
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """SQLite をバックエンドにした共有キャッシュ（ローカル開発・テスト用）."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "cache_key TEXT PRIMARY KEY, payload BLOB NOT NULL, "
+            "data_type TEXT NOT NULL, expires_at INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> tuple[bytes, int] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at FROM cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return bytes(row[0]), int(row[1])
+
+    def put(self, key: str, payload: bytes, expires_at: int, data_type: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (cache_key, payload, data_type, expires_at) VALUES (?, ?, ?, ?)",
+                (key, payload, data_type, expires_at),
+            )
+            self._conn.commit()
+
+    def put_if_absent(self, key: str, payload: bytes, expires_at: int, data_type: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at FROM cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[0] > time.time():
+                return False
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (cache_key, payload, data_type, expires_at) VALUES (?, ?, ?, ?)",
+                (key, payload, data_type, expires_at),
+            )
+            self._conn.commit()
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SharedCache:
+    """共有キャッシュ層. バックエンドの障害はキャッシュミスとして扱う."""
+
+    def __init__(self, backend: CacheBackend, max_workers: int = 2):
+        self._backend = backend
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shared-cache")
+        self._pending: set[Future] = set()
+        self._pending_lock = threading.Lock()
+        self._disabled_until = 0.0
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+        self._writes = 0
+
+    @staticmethod
+    def is_shareable(url: str) -> bool:
+        """共有層の対象となるURLか."""
+        return _infer_data_type(url) in SHARED_TTL
+
+    def _available(self) -> bool:
+        return time.time() >= self._disabled_until
+
+    def _on_error(self, action: str, error: Exception) -> None:
+        self._errors += 1
+        self._disabled_until = time.time() + FAILURE_COOLDOWN_SECONDS
+        logger.warning("Shared cache %s failed, bypassing for %ds: %s", action, FAILURE_COOLDOWN_SECONDS, error)
+
+    def get(self, url: str, params: dict | None = None) -> tuple[object, float] | None:
+        """共有層から取得する.
+
+        Returns:
+            (デコード済みJSON, 残りTTL秒)。ミス・対象外・障害時はNone。
+        """
+        if not self.is_shareable(url) or not self._available():
+            return None
+        try:
+            found = self._backend.get(make_cache_key(url, params))
+        except Exception as e:
+            self._on_error("get", e)
+            return None
+        remaining = found[1] - time.time() if found else 0
+        if remaining <= 0:
+            self._misses += 1
+            return None
+        try:
+            data = json.loads(zlib.decompress(found[0]))
+        except (zlib.error, ValueError) as e:
+            logger.warning("Broken shared cache entry for %s: %s", url, e)
+            self._misses += 1
+            return None
+        self._hits += 1
+        logger.debug("Shared cache hit: %s", url)
+        return data, remaining
+
+    def put_async(self, url: str, data: object, params: dict | None = None) -> None:
+        """共有層への書き込みをバックグラウンドで行う."""
+        data_type = _infer_data_type(url)
+        ttl = SHARED_TTL.get(data_type)
+        if ttl is None or not self._available():
+            return
+        key = make_cache_key(url, params)
+        expires_at = int(time.time()) + ttl
+        future = self._executor.submit(self._put, key, data, expires_at, data_type)
+        with self._pending_lock:
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+
+    def _discard(self, future: Future) -> None:
+        with self._pending_lock:
+            self._pending.discard(future)
+
+    def _put(self, key: str, data: object, expires_at: int, data_type: str) -> None:
+        payload = zlib.compress(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode())
+        if len(payload) > MAX_PAYLOAD_BYTES:
+            logger.debug("Skip shared cache write: %d bytes exceeds limit", len(payload))
+            return
+        try:
+            self._backend.put(key, payload, expires_at, data_type)
+            self._writes += 1
+        except Exception as e:
+            self._on_error("put", e)
+
+    def flush(self, timeout: float | None = None) -> None:
+        """保留中の書き込みが終わるまで待つ."""
+        with self._pending_lock:
+            pending = list(self._pending)
+        wait(pending, timeout=timeout)
+
+    @property
+    def stats(self) -> dict:
+        """共有層の統計を返す."""
+        total = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / total if total > 0 else 0,
+            "errors": self._errors,
+            "writes": self._writes,
+        }
+
+
+_shared_cache: SharedCache | None = None
+_shared_cache_initialized = False
+_shared_cache_lock = threading.Lock()
+
+
+def _create_backend() -> CacheBackend | None:
+    """環境変数 AGENT_TOOL_CACHE_BACKEND（dynamodb / sqlite / none）からバックエンドを作る."""
+    kind = os.environ.get("AGENT_TOOL_CACHE_BACKEND", "dynamodb").lower()
+    if kind == "dynamodb":
+        return DynamoDBCacheBackend(
+            os.environ.get("AGENT_TOOL_CACHE_TABLE_NAME", "baken-kaigi-agent-tool-cache")
+        )
+    if kind == "sqlite":
+        return SQLiteCacheBackend(os.environ.get("AGENT_TOOL_CACHE_PATH", "/tmp/agent_tool_cache.sqlite3"))
+    return None
+
+
+def get_shared_cache() -> SharedCache | None:
+    """共有キャッシュを取得（無効化されていればNone）."""
+    global _shared_cache, _shared_cache_initialized
+    if _shared_cache_initialized:
+        return _shared_cache
+    with _shared_cache_lock:
+        if not _shared_cache_initialized:
+            try:
+                backend = _create_backend()
+            except Exception as e:
+                logger.warning("Failed to initialize shared cache: %s", e)
+                backend = None
+            _shared_cache = SharedCache(backend) if backend is not None else None
+            # 作り終えてから初期化済みにする（途中の None を他スレッドに見せない）
+            _shared_cache_initialized = True
+    return _shared_cache
@@ -6,22 +6,38 @@
 import os
 
 import boto3
+from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 from strands import tool
 
+from .rank_consensus import analyze_consensus
+from .tracing import trace_aws_client
+
 # AWSリージョン（AgentCore環境ではAWS_REGION未設定の場合があるため明示指定）
 AWS_REGION = os.environ.get("AWS_REGION", "ap-northeast-1")
 
+# 日付別一覧用の GSI（パーティションキー race_date、ソートキー source）
+DATE_INDEX_NAME = "race_date-source-index"
+
+
+_dynamodb_resource = None
+
 
 def get_dynamodb_table():
-    """DynamoDB テーブルを取得."""
+    """DynamoDB テーブルを取得.
+
+    リソース（サービス定義の読み込みを含む）はプロセス内で使い回す。
+    """
+    global _dynamodb_resource
+    if _dynamodb_resource is None:
+        _dynamodb_resource = boto3.resource("dynamodb", region_name=AWS_REGION)
+        trace_aws_client(_dynamodb_resource.meta.client)
     table_name = os.environ.get("SPEED_INDICES_TABLE_NAME", "baken-kaigi-speed-indices")
-    dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
-    return dynamodb.Table(table_name)
+    return _dynamodb_resource.Table(table_name)
 
 
 def _analyze_consensus(sources: list[dict]) -> dict:
-    """複数ソースのコンセンサスを分析する.
+    """複数ソースのコンセンサスを分析する（rank_consensus の順位行列で計算）.
 
     Args:
         sources: [{"source": "jiro8-speed", "indices": [...]}, ...]
@@ -32,75 +48,11 @@ def _analyze_consensus(sources: list[dict]) -> dict:
             "consensus_level": "部分合意",
             "divergence_horses": [
                 {"horse_number": 5, "ranks": {"jiro8-speed": 2, "kichiuma-speed": 8}, "gap": 6}
-            ]
+            ],
+            "rank_correlation": 0.62,  # ソース間の順位相関の平均
         }
     """
-    # 各ソースのtop3馬番セットを取得
-    top3_sets = []
-    for s in sources:
-        indices = s.get("indices", [])
-        top3 = {i["horse_number"] for i in indices[:3]}
-        top3_sets.append(top3)
-
-    # 全ソースのtop3に共通する馬番（先頭ソースの順位でソートして順序安定化）
-    first_source_ranks = {
-        i["horse_number"]: i["rank"] for i in sources[0].get("indices", [])
-    }
-    agreed_set = top3_sets[0].intersection(*top3_sets[1:])
-    agreed_top3 = sorted(
-        agreed_set,
-        key=lambda hn: (first_source_ranks.get(hn, float("inf")), hn),
-    )
-
-    # コンセンサスレベル判定
-    common_count = len(agreed_top3)
-    if common_count == 3:
-        # top3の顔ぶれが一致 → 各ソースのtop3順位（並び）が完全一致か確認
-        base_top3 = [i["horse_number"] for i in sources[0].get("indices", [])[:3]]
-        top3_order_all_match = all(
-            [i["horse_number"] for i in s.get("indices", [])[:3]] == base_top3
-            for s in sources[1:]
-        )
-        consensus_level = "完全合意" if top3_order_all_match else "概ね合意"
-    elif common_count == 2:
-        consensus_level = "部分合意"
-    else:
-        consensus_level = "大きな乖離"
-
-    # 乖離馬の検出: 全ソースに登場する馬で順位差が3以上
-    # 各ソースの馬番→順位マップを作成
-    rank_maps = {}
-    for s in sources:
-        source_name = s["source"]
-        rank_maps[source_name] = {}
-        for i in s.get("indices", []):
-            rank_maps[source_name][i["horse_number"]] = i["rank"]
-
-    # 全ソースに登場する馬番を取得
-    all_source_names = list(rank_maps.keys())
-    all_horses = set(rank_maps[all_source_names[0]].keys())
-    for sn in all_source_names[1:]:
-        all_horses &= set(rank_maps[sn].keys())
-
-    divergence_horses = []
-    for horse_num in all_horses:
-        ranks_dict = {sn: rank_maps[sn][horse_num] for sn in all_source_names}
-        rank_values = list(ranks_dict.values())
-        gap = max(rank_values) - min(rank_values)
-        if gap >= 3:
-            divergence_horses.append({
-                "horse_number": horse_num,
-                "ranks": ranks_dict,
-                "gap": gap,
-            })
-
-    divergence_horses.sort(key=lambda h: h["gap"], reverse=True)
-
-    return {
-        "agreed_top3": agreed_top3,
-        "consensus_level": consensus_level,
-        "divergence_horses": divergence_horses,
-    }
+    return analyze_consensus(sources, "indices")
 
 
 def _get_single_source(table, race_id: str, source: str) -> dict:
@@ -134,15 +86,18 @@ def _get_single_source(table, race_id: str, source: str) -> dict:
     }
 
 
-def _get_all_sources(table, race_id: str) -> dict:
-    """全ソースのスピード指数データを取得しコンセンサス分析を付加する."""
-    from boto3.dynamodb.conditions import Key
+def _build_all_sources(race_id: str, items: list[dict]) -> dict:
+    """1レース分の全ソースのスピード指数データを整形しコンセンサス分析を付加する.
 
-    response = table.query(
-        KeyConditionExpression=Key("race_id").eq(race_id),
-    )
+    テーブルの読み込みは race_signals が両テーブル分をまとめて行う。
+
+    Args:
+        race_id: レースID
+        items: race_id で引いたテーブルのアイテム
 
-    items = response.get("Items", [])
+    Returns:
+        dict: get_speed_index(race_id) の全ソース取得時の戻り値
+    """
     if not items:
         return {
             "race_id": race_id,
@@ -152,7 +107,6 @@ def _get_all_sources(table, race_id: str) -> dict:
 
     sources = []
     for item in items:
-        item.pop("ttl", None)
         sources.append({
             "source": item.get("source"),
             "venue": item.get("venue"),
@@ -201,12 +155,12 @@ def get_speed_index(race_id: str, source: str | None = None) -> dict:
                 - consensus: コンセンサス分析（2ソース以上の場合のみ）
     """
     try:
-        table = get_dynamodb_table()
-
         if source is not None:
-            return _get_single_source(table, race_id, source)
+            return _get_single_source(get_dynamodb_table(), race_id, source)
         else:
-            return _get_all_sources(table, race_id)
+            from .race_signals import SPEED_INDEX, load_race_signals
+
+            return load_race_signals([race_id], kinds=(SPEED_INDEX,))[race_id][SPEED_INDEX]
 
     except ClientError as e:
         error_code = e.response.get("Error", {}).get("Code", "Unknown")
@@ -261,26 +215,20 @@ def list_speed_indices_for_date(date: str, source: str = "jiro8-speed") -> dict:
     try:
         table = get_dynamodb_table()
 
-        # 日付プレフィックスでスキャン（race_idは日付で始まる）
+        # 開催日・ソースのGSIをクエリ（読み込むのはその日のアイテムだけ）
         # LastEvaluatedKeyでページネーションし全件取得
         items = []
-        scan_kwargs = {
-            "FilterExpression": "begins_with(race_id, :date) AND #src = :source",
-            "ExpressionAttributeNames": {
-                "#src": "source",
-            },
-            "ExpressionAttributeValues": {
-                ":date": date,
-                ":source": source,
-            },
+        query_kwargs = {
+            "IndexName": DATE_INDEX_NAME,
+            "KeyConditionExpression": Key("race_date").eq(date) & Key("source").eq(source),
         }
 
         while True:
-            response = table.scan(**scan_kwargs)
+            response = table.query(**query_kwargs)
             items.extend(response.get("Items", []))
             if "LastEvaluatedKey" not in response:
                 break
-            scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+            query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
 
         races = []
         for item in items:
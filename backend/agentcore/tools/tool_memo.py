@@ -0,0 +1,231 @@
+"""エージェントセッション内のツール結果メモ化.
+
+1回のエージェント実行の中で、LLM は同じ race_id で analyze_race_for_betting や
+propose_bets を何度か呼ぶことがある。正規化した引数をキーに結果を覚えておき、
+2回目以降はデータ取得・計算を省いて同じ結果を返す。
+
+メモはセッション単位。agent.py が呼び出しのたびに begin_session で
+セッションIDを渡し、セッションが変わると中身を捨てる。
+セッションの外（ツールを直接呼ぶテストや事前計算ジョブ）ではメモ化しない。
+"""
+
+import copy
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import wraps
+from typing import ParamSpec, TypeVar
+
+from .metrics import record_memo_hit
+
+logger = logging.getLogger(__name__)
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+# ツール結果のメモ化を有効にするか
+TOOL_MEMO_ENABLED = os.environ.get("AGENT_TOOL_MEMO", "true").lower() == "true"
+
+# メモに保持する結果の上限
+MAX_MEMO_ENTRIES = 64
+
+# 引数の浮動小数点を丸める桁数（LLM が同じ値を別の表記で渡しても同じキーにする）
+_FLOAT_DIGITS = 6
+
+
+def _normalize(value: object) -> object:
+    """引数をキー用に正規化する（辞書のキーは文字列、タプルはリスト、小数は丸め）."""
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, float):
+        return round(value, _FLOAT_DIGITS)
+    return value
+
+
+def make_memo_key(func: Callable, args: tuple, kwargs: dict, context: object = None) -> str:
+    """ツール名と正規化した引数からメモのキーを作る. 省略した引数は既定値で埋める."""
+    bound = inspect.signature(func).bind(*args, **kwargs)
+    bound.apply_defaults()
+    normalized = {"args": _normalize(dict(bound.arguments)), "context": _normalize(context)}
+    return f"{func.__name__}:{json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)}"
+
+
+@dataclass
+class _MemoEntry:
+    tool_name: str
+    race_id: str | None
+    value: object
+    expires_at: float
+    compute_ms: float
+
+
+class ToolMemo:
+    """セッション単位のツール結果メモ.
+
+    結果は保存時・返却時に deepcopy し、呼び出し側が変更してもメモに影響しない。
+    エラー（"error" を含む辞書）は覚えない。
+    """
+
+    def __init__(self, max_entries: int = MAX_MEMO_ENTRIES):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, _MemoEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._session_id: str | None = None
+        self._active = False
+        self._hits = 0
+        self._misses = 0
+        self._saved_ms = 0.0
+
+    @property
+    def active(self) -> bool:
+        """セッション中か（セッションの外ではメモ化しない）."""
+        return self._active
+
+    def begin_session(self, session_id: str | None) -> None:
+        """エージェント呼び出しの開始. セッションが変われば中身と統計を捨てる.
+
+        session_id が None の呼び出しは毎回別のセッションとして扱う。
+        """
+        with self._lock:
+            if session_id is None or session_id != self._session_id:
+                self._entries.clear()
+                self._hits = 0
+                self._misses = 0
+                self._saved_ms = 0.0
+            self._session_id = session_id
+            self._active = True
+
+    def end_session(self) -> None:
+        """エージェント呼び出しの終了. セッションの統計をログに出す."""
+        self._active = False
+        stats = self.stats
+        if stats["hits"] or stats["misses"]:
+            logger.info(
+                "Tool memo: hits=%d misses=%d saved=%.0fms (session=%s)",
+                stats["hits"], stats["misses"], stats["saved_ms"], self._session_id,
+            )
+
+    def get(self, key: str) -> _MemoEntry | None:
+        """有効期限内の結果を返す. ヒットしたら省いた時間を数える."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                self._entries.pop(key, None)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            self._saved_ms += entry.compute_ms
+            return entry
+
+    def put(self, key: str, entry: _MemoEntry) -> None:
+        """結果を覚える. 上限を超えたら古いものから捨てる."""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tool_name: str | None = None, race_id: str | None = None) -> int:
+        """結果を捨てる. 条件を省くと全件.
+
+        Args:
+            tool_name: このツールの結果だけ捨てる
+            race_id: このレースの結果だけ捨てる
+
+        Returns:
+            捨てた件数
+        """
+        with self._lock:
+            keys = [
+                key for key, entry in self._entries.items()
+                if (tool_name is None or entry.tool_name == tool_name)
+                and (race_id is None or entry.race_id == race_id)
+            ]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    @property
+    def stats(self) -> dict:
+        """セッション内の統計（ヒット数・ミス数・省いた実行時間）."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "saved_ms": round(self._saved_ms, 1),
+                "size": len(self._entries),
+            }
+
+
+_tool_memo: ToolMemo | None = None
+_tool_memo_lock = threading.Lock()
+
+
+def get_tool_memo() -> ToolMemo:
+    """プロセス共通のツール結果メモを取得."""
+    global _tool_memo
+    with _tool_memo_lock:
+        if _tool_memo is None:
+            _tool_memo = ToolMemo()
+    return _tool_memo
+
+
+def memoize_tool(
+    ttl_seconds: float,
+    *,
+    name: str | None = None,
+    context: Callable[[], object] | None = None,
+) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """ツール結果をセッション内でメモ化するデコレータ.
+
+    @tool / @log_tool_execution の内側に付ける（ログ・メトリクスにはヒットも1回として残る）。
+
+    Args:
+        ttl_seconds: 結果を使い回す秒数
+        name: 統計・無効化に使うツール名（既定は関数名）
+        context: 引数以外に結果を左右する状態を返す関数（例: 好み設定）。キーに含める
+    """
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        tool_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            memo = get_tool_memo()
+            if not TOOL_MEMO_ENABLED or not memo.active:
+                return func(*args, **kwargs)
+            try:
+                key = make_memo_key(func, args, kwargs, context() if context else None)
+            except (TypeError, ValueError) as e:
+                logger.debug("Tool memo skipped for %s: %s", tool_name, e)
+                return func(*args, **kwargs)
+
+            entry = memo.get(key)
+            if entry is not None:
+                logger.info("Tool memo hit: %s (saved %.0fms)", tool_name, entry.compute_ms)
+                record_memo_hit(tool_name, entry.compute_ms)
+                return copy.deepcopy(entry.value)
+
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            compute_ms = (time.perf_counter() - start) * 1000
+            if not (isinstance(result, dict) and "error" in result):
+                bound = inspect.signature(func).bind(*args, **kwargs)
+                memo.put(key, _MemoEntry(
+                    tool_name=tool_name,
+                    race_id=bound.arguments.get("race_id"),
+                    value=copy.deepcopy(result),
+                    expires_at=time.monotonic() + ttl_seconds,
+                    compute_ms=compute_ms,
+                ))
+            return result
+        return wrapper
+    return decorator
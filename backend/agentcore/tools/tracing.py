@@ -0,0 +1,297 @@
+"""エージェント呼び出しの軽量レイテンシトレース.
+
+エントリポイントで start_trace を開き、その中の処理をスパンとして記録する。
+どこで時間を使ったか（Bedrock のターン、DynamoDB 読み出し、JRA-VAN への HTTP、
+Python の計算）を1回の呼び出し単位で切り分けるためのもの。
+
+スパンの記録元:
+    invocation: start_trace（agent.invoke）
+    tool: log_tool_execution
+    phase: metrics.phase（fetch / compute / narrate）
+    compute: span() で囲んだ純粋な計算
+    http: PooledHttpClient.get
+    aws: trace_aws_client を登録した boto3 クライアント（DynamoDB 等）
+    bedrock: ナレーションの ConverseStream と、TracingHooks によるエージェントのモデル呼び出し
+
+トレースは現在のコンテキスト（contextvars）に紐づくため、ファンアウトのワーカーや
+strands のイベントループに引き継がれる。トレースがなければ span() は何もしない。
+TRACE_EXPORT=true で完了したトレースを構造化ログ（1トレース1行の JSON）に書き出す。
+"""
+
+import contextvars
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+from strands.hooks import AfterModelCallEvent, BeforeModelCallEvent, HookProvider, HookRegistry
+
+logger = logging.getLogger("agentcore.tools.tracing")
+
+TRACE_EXPORT = os.environ.get("TRACE_EXPORT", "false").lower() == "true"
+# 1トレースに記録するスパンの上限（超えた分は数だけ数える）
+MAX_SPANS = 500
+# 応答に含める遅いスパンの数
+SUMMARY_SPANS = 10
+
+
+@dataclass
+class Span:
+    """1区間の計測値.
+
+    Attributes:
+        span_id: トレース内の連番
+        parent_id: 親スパン（ルートは None）
+        name: 区間名
+        kind: invocation / tool / phase / compute / http / aws / bedrock
+        start_ms: トレース開始からの経過ミリ秒
+        duration_ms: 所要ミリ秒
+        attributes: 付加情報（ステータスコード等）
+        error: 例外が発生した場合の型名
+    """
+
+    span_id: int
+    parent_id: int | None
+    name: str
+    kind: str
+    start_ms: float
+    duration_ms: float
+    attributes: dict = field(default_factory=dict)
+    error: str | None = None
+
+
+class Trace:
+    """1回のエージェント呼び出しのスパン集合（スレッドセーフ）."""
+
+    def __init__(self, name: str, *, max_spans: int | None = None):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.started = time.perf_counter()
+        self.root_id = 0
+        self._ids = itertools.count(1)
+        self._max_spans = MAX_SPANS if max_spans is None else max_spans
+        self._spans: list[Span] = []
+        self._dropped = 0
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def add(
+        self,
+        name: str,
+        kind: str,
+        start: float,
+        end: float,
+        *,
+        span_id: int | None = None,
+        parent_id: int | None = None,
+        attributes: dict | None = None,
+        error: str | None = None,
+    ) -> None:
+        """perf_counter の開始・終了時刻からスパンを記録する."""
+        span = Span(
+            span_id=span_id if span_id is not None else self.next_id(),
+            parent_id=parent_id,
+            name=name,
+            kind=kind,
+            start_ms=round((start - self.started) * 1000, 1),
+            duration_ms=round((end - start) * 1000, 1),
+            attributes=attributes or {},
+            error=error,
+        )
+        with self._lock:
+            # ルートは上限に関わらず残す
+            if len(self._spans) < self._max_spans or parent_id is None:
+                self._spans.append(span)
+            else:
+                self._dropped += 1
+
+    @property
+    def spans(self) -> list[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def slowest(self, n: int = SUMMARY_SPANS) -> list[dict]:
+        """所要時間の長いスパン（ルートを除く）."""
+        spans = sorted((s for s in self.spans if s.parent_id is not None), key=lambda s: -s.duration_ms)
+        return [
+            {"name": s.name, "kind": s.kind, "duration_ms": s.duration_ms, "start_ms": s.start_ms}
+            | ({"error": s.error} if s.error else {})
+            for s in spans[:n]
+        ]
+
+    def summary(self, n: int = SUMMARY_SPANS) -> dict:
+        """呼び出し応答に含めるデバッグ用の要約."""
+        totals: dict[str, float] = {}
+        for s in self.spans:
+            if s.parent_id is not None:
+                totals[s.kind] = round(totals.get(s.kind, 0.0) + s.duration_ms, 1)
+        root = next((s for s in self.spans if s.parent_id is None), None)
+        return {
+            "trace_id": self.trace_id,
+            "total_ms": root.duration_ms if root else None,
+            "kind_totals_ms": totals,
+            "slowest": self.slowest(n),
+        }
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans, dropped = list(self._spans), self._dropped
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "spans": [asdict(s) for s in sorted(spans, key=lambda s: (s.start_ms, s.span_id))],
+            "dropped_spans": dropped,
+        }
+
+
+_current_trace: contextvars.ContextVar[Trace | None] = contextvars.ContextVar("trace", default=None)
+_current_span_id: contextvars.ContextVar[int | None] = contextvars.ContextVar("trace_span_id", default=None)
+
+
+def current_trace() -> Trace | None:
+    """現在のコンテキストのトレース."""
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(name: str, **attributes) -> Iterator[Trace]:
+    """トレースを開始し、ブロック全体をルートスパンとして記録する."""
+    trace = Trace(name)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span_id.set(trace.root_id)
+    error = None
+    try:
+        yield trace
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _current_span_id.reset(span_token)
+        _current_trace.reset(trace_token)
+        trace.add(name, "invocation", trace.started, time.perf_counter(),
+                  span_id=trace.root_id, attributes=attributes, error=error)
+        if TRACE_EXPORT:
+            export_trace(trace)
+
+
+@contextmanager
+def span(name: str, kind: str = "compute", **attributes) -> Iterator[dict]:
+    """区間をスパンとして記録する（トレースがなければ何もしない）.
+
+    Yields:
+        スパンの付加情報（ブロック内で書き足せる）
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield attributes
+        return
+    span_id = trace.next_id()
+    parent_id = _current_span_id.get()
+    token = _current_span_id.set(span_id)
+    error = None
+    start = time.perf_counter()
+    try:
+        yield attributes
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        end = time.perf_counter()
+        _current_span_id.reset(token)
+        trace.add(name, kind, start, end, span_id=span_id, parent_id=parent_id,
+                  attributes=attributes, error=error)
+
+
+def export_trace(trace: Trace) -> None:
+    """トレースを構造化ログとして書き出す."""
+    logger.info(json.dumps({"trace": trace.to_dict()}, ensure_ascii=False, default=str))
+
+
+# =============================================================================
+# boto3 クライアントの計測
+# =============================================================================
+
+
+def _before_aws_call(model, context, **kwargs) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        name = f"{model.service_model.service_name}.{model.name}"
+        context["trace_call"] = (trace, _current_span_id.get(), time.perf_counter(), name)
+
+
+def _after_aws_call(context, http_response=None, parsed=None, exception=None, **kwargs) -> None:
+    # after-call-error には model が渡されないため、名前は before-call で決めておく
+    call = context.pop("trace_call", None)
+    if call is None:
+        return
+    trace, parent_id, start, name = call
+    attributes = {}
+    if http_response is not None:
+        attributes["status_code"] = http_response.status_code
+    error = type(exception).__name__ if exception is not None else None
+    if error is None and parsed:
+        error = parsed.get("Error", {}).get("Code")
+    trace.add(name, "aws", start, time.perf_counter(), parent_id=parent_id, attributes=attributes, error=error)
+
+
+def trace_aws_client(client):
+    """boto3 クライアントの API 呼び出しを aws スパンとして記録するようにする.
+
+    Args:
+        client: boto3 クライアント（リソースの場合は resource.meta.client）
+
+    Returns:
+        同じクライアント
+    """
+    events = client.meta.events
+    events.register("before-call.*.*", _before_aws_call, unique_id="tracing-before-call")
+    events.register("after-call.*.*", _after_aws_call, unique_id="tracing-after-call")
+    events.register("after-call-error.*.*", _after_aws_call, unique_id="tracing-after-call-error")
+    return client
+
+
+# =============================================================================
+# strands エージェントのモデル呼び出し
+# =============================================================================
+
+
+class TracingHooks(HookProvider):
+    """エージェントのモデル呼び出し（Bedrock のターン）を bedrock スパンとして記録する."""
+
+    _STATE_KEY = "_trace_model_call"
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(BeforeModelCallEvent, self._before_model_call)
+        registry.add_callback(AfterModelCallEvent, self._after_model_call)
+
+    def _before_model_call(self, event: BeforeModelCallEvent) -> None:
+        trace = _current_trace.get()
+        if trace is not None:
+            event.invocation_state[self._STATE_KEY] = (trace, _current_span_id.get(), time.perf_counter())
+
+    def _after_model_call(self, event: AfterModelCallEvent) -> None:
+        call = event.invocation_state.pop(self._STATE_KEY, None)
+        if call is None:
+            return
+        trace, parent_id, start = call
+        attributes = {}
+        if event.stop_response is not None:
+            attributes["stop_reason"] = str(event.stop_response.stop_reason)
+        trace.add(
+            "agent.model_call",
+            "bedrock",
+            start,
+            time.perf_counter(),
+            parent_id=parent_id,
+            attributes=attributes,
+            error=type(event.exception).__name__ if event.exception is not None else None,
+        )
@@ -0,0 +1,85 @@
+"""コールドスタートのウォームアップ.
+
+エージェント・ツールモジュール・AWS クライアントの初期化は初回の invoke で行われるため、
+そのままでは最初のリクエストが import と生成のコストをすべて負担する。
+ヘルスチェック（/ping）を契機にバックグラウンドで初期化を済ませておき、
+最初のリクエストが届く前にコストを払っておく。
+
+AGENT_WARMUP_ON_PING=true で有効（AgentCore Runtime では agent.py が既定で有効にする）。
+"""
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ON_PING = os.environ.get("AGENT_WARMUP_ON_PING", "false").lower() == "true"
+
+
+class WarmUp:
+    """初期化ステップをバックグラウンドで1回だけ実行する.
+
+    ステップの失敗は記録するだけで、残りのステップは続行する
+    （初回の invoke が改めて初期化を試みる）。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._done = threading.Event()
+        self.timings_ms: dict[str, float] = {}
+        self.errors: dict[str, str] = {}
+
+    def start(self, steps: dict[str, Callable[[], object]]) -> bool:
+        """ウォームアップを開始する.
+
+        Args:
+            steps: ステップ名 → 引数なしの初期化処理（この順に実行）
+
+        Returns:
+            今回の呼び出しで開始した場合 True（開始済みなら False）
+        """
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self._thread = threading.Thread(target=self._run, args=(steps,), name="agent-warmup", daemon=True)
+            self._thread.start()
+            return True
+
+    def _run(self, steps: dict[str, Callable[[], object]]) -> None:
+        start = time.perf_counter()
+        for name, step in steps.items():
+            step_start = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                self.errors[name] = str(e) or type(e).__name__
+                logger.warning("Warm-up step %s failed", name, exc_info=True)
+            self.timings_ms[name] = round((time.perf_counter() - step_start) * 1000, 1)
+        total_ms = (time.perf_counter() - start) * 1000
+        logger.info("Warm-up completed in %.0fms: %s", total_ms, self.timings_ms)
+        self._done.set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """ウォームアップの完了を待つ. 完了していれば True."""
+        return self._done.wait(timeout)
+
+    @property
+    def started(self) -> bool:
+        with self._lock:
+            return self._thread is not None
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+
+_warmup = WarmUp()
+
+
+def get_warmup() -> WarmUp:
+    """プロセス共有の WarmUp を取得."""
+    return _warmup
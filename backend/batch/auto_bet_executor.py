@@ -5,9 +5,9 @@ IPAT投票を実行する。
 """
 import logging
 import os
+import time
 
 import boto3
-import requests
 
 from src.domain.identifiers import CartId, UserId
 from src.domain.entities import PurchaseOrder
@@ -17,7 +17,7 @@ from src.domain.services.betting_pipeline import (
     PLACE_WEIGHTS,
     SOURCES,
     WIN_WEIGHTS,
-    compute_agree_counts,
+    compute_agree_counts_by_top_n,
     log_opinion_pool,
     market_implied_probs,
     source_to_probs,
@@ -31,6 +31,7 @@ from src.domain.services.bet_generator import (
     generate_win_bets,
 )
 from src.domain.services.bet_to_ipat_converter import BetToIpatConverter
+from src.infrastructure.http_client import http_get
 from src.infrastructure.providers.gamble_os_ipat_gateway import GambleOsIpatGateway
 from src.infrastructure.providers.secrets_manager_credentials_provider import (
     SecretsManagerCredentialsProvider,
@@ -47,6 +48,9 @@ GAMBLE_OS_SECRET_NAME = os.environ["GAMBLE_OS_SECRET_NAME"]
 AI_PREDICTIONS_TABLE = os.environ.get(
     "AI_PREDICTIONS_TABLE_NAME", "baken-kaigi-ai-predictions"
 )
+# UnprocessedKeys（スロットリング時）を再要求する上限回数と初回の待ち秒数
+BATCH_GET_MAX_ATTEMPTS = 3
+BATCH_GET_BACKOFF_SECONDS = 0.1
 
 
 def handler(event, context):
@@ -60,9 +64,8 @@ def handler(event, context):
 
     try:
         dynamodb = boto3.resource("dynamodb", region_name="ap-northeast-1")
-        table = dynamodb.Table(AI_PREDICTIONS_TABLE)
 
-        predictions = _fetch_predictions(table, race_id)
+        predictions = _fetch_predictions(dynamodb, race_id)
         _log_predictions(predictions)
         if len(predictions) < 2:
             logger.warning("予想ソース不足: %d ソース", len(predictions))
@@ -114,14 +117,24 @@ def _log_bets(bets: list[BetProposal]) -> None:
     logger.info("合計投票額: %d円", total)
 
 
-def _fetch_predictions(table, race_id: str) -> dict:
-    """DynamoDB から4ソースのAI予想を取得."""
+def _fetch_predictions(dynamodb, race_id: str) -> dict:
+    """DynamoDB から4ソースのAI予想を1回の BatchGetItem で取得."""
+    request = {AI_PREDICTIONS_TABLE: {"Keys": [{"race_id": race_id, "source": s} for s in SOURCES]}}
+    items = []
+    for attempt in range(BATCH_GET_MAX_ATTEMPTS):
+        if attempt:
+            time.sleep(BATCH_GET_BACKOFF_SECONDS * 2 ** (attempt - 1))
+        resp = dynamodb.batch_get_item(RequestItems=request)
+        items.extend(resp.get("Responses", {}).get(AI_PREDICTIONS_TABLE, []))
+        request = resp.get("UnprocessedKeys") or {}
+        if not request:
+            break
+    else:
+        logger.warning("未処理キーが残りました: %s", request)
+
     predictions = {}
-    for source in SOURCES:
-        resp = table.get_item(Key={"race_id": race_id, "source": source})
-        item = resp.get("Item")
-        if not item:
-            continue
+    for item in sorted(items, key=lambda i: SOURCES.index(i["source"])):
+        source = item["source"]
         preds = [
             {
                 "horse_number": int(p["horse_number"]),
@@ -137,7 +150,7 @@ def _fetch_predictions(table, race_id: str) -> dict:
 
 def _fetch_odds(race_id: str) -> dict:
     """JRA-VAN API から最新オッズを取得."""
-    resp = requests.get(f"{JRAVAN_API_URL}/races/{race_id}/odds", timeout=30)
+    resp = http_get(f"{JRAVAN_API_URL}/races/{race_id}/odds", timeout=30)
     resp.raise_for_status()
     return resp.json()
 
@@ -177,8 +190,8 @@ def _run_pipeline(predictions: dict, odds: dict) -> list:
             return all_bets
 
         ranked = sorted(place_combined.items(), key=lambda x: x[1], reverse=True)
-        agree_src3 = compute_agree_counts(source_probs_list, top_n=3)
-        agree_src4 = compute_agree_counts(source_probs_list, top_n=4)
+        agree_counts = compute_agree_counts_by_top_n(source_probs_list, [3, 4])
+        agree_src3, agree_src4 = agree_counts[3], agree_counts[4]
 
         if "place" in odds:
             all_bets.extend(generate_place_bets(ranked, odds["place"], agree_src3))
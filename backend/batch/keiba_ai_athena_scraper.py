@@ -258,6 +258,8 @@ def save_predictions(
     item = {
         "race_id": race_id,
         "source": SOURCE_NAME,
+        # 日付別一覧のGSIキー（race_id の先頭8桁が開催日）
+        "race_date": race_id[:8],
         "venue": venue,
         "race_number": race_number,
         "predictions": predictions,
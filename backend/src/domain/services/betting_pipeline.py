@@ -67,13 +67,21 @@ def market_implied_probs(odds_win: dict) -> dict[int, float]:
     return {h: p / total for h, p in raw.items()} if total > 0 else {}
 
 
+def compute_agree_counts_by_top_n(
+    source_probs: list[dict[int, float]], top_ns: list[int]
+) -> dict[int, dict[int, int]]:
+    """各ソースを1回だけ順位付けし、TopNごとに各馬番が何ソースのTopN以内かを計算."""
+    result: dict[int, dict[int, int]] = {n: {} for n in top_ns}
+    for probs in source_probs:
+        ranked = sorted(probs.keys(), key=lambda h: probs[h], reverse=True)
+        for n, counts in result.items():
+            for h in ranked[:n]:
+                counts[h] = counts.get(h, 0) + 1
+    return result
+
+
 def compute_agree_counts(
     source_probs: list[dict[int, float]], top_n: int
 ) -> dict[int, int]:
     """各馬番が何ソースのTopN以内にランクされるかを計算."""
-    counts: dict[int, int] = {}
-    for probs in source_probs:
-        ranked = sorted(probs.keys(), key=lambda h: probs[h], reverse=True)[:top_n]
-        for h in ranked:
-            counts[h] = counts.get(h, 0) + 1
-    return counts
+    return compute_agree_counts_by_top_n(source_probs, [top_n])[top_n]
@@ -12,6 +12,7 @@ from boto3.dynamodb.conditions import Attr, Key
 
 from src.domain.identifiers import RaceId
 from src.domain.ports import AllOddsData, RaceData, RaceDataProvider, RunnerData
+from src.infrastructure.http_client import http_get
 
 logger = logging.getLogger(__name__)
 
@@ -291,7 +292,7 @@ class DynamoDbRaceDataProvider(RaceDataProvider):
         if self._jravan_api_url is None:
             return None
         try:
-            response = requests.get(
+            response = http_get(
                 f"{self._jravan_api_url}/races/{race_id}/odds",
                 timeout=10,
             )
@@ -33,6 +33,17 @@ class TestBetProposalPrompt:
 
         assert isinstance(BET_PROPOSAL_SYSTEM_PROMPT, str)
 
+    def test_コンパクト表現のときだけ表の読み方を含める(self):
+        from agentcore.prompts.bet_proposal import BET_PROPOSAL_SYSTEM_PROMPT, build_bet_proposal_prompt
+
+        compact = build_bet_proposal_prompt(compact_tool_results=True)
+        nested = build_bet_proposal_prompt(compact_tool_results=False)
+
+        assert "`columns` と `rows` の表" in compact
+        assert compact.index("`columns` と `rows` の表") < compact.index("**判断の指針:**")
+        assert "`columns`" not in nested
+        assert nested == BET_PROPOSAL_SYSTEM_PROMPT
+
 
 # _extract_suggested_questions 関数のロジックを直接テスト
 # Note: agentcore.agent をインポートするには strands/bedrock_agentcore が必要なため、
@@ -16,15 +16,18 @@ from tools.ai_prediction import (
     _anonymize_sources,
     _build_source_label_map,
 )
+from tools.race_signals import get_race_signal_loader
 
 
 @pytest.fixture
 def mock_dynamodb_table():
     """DynamoDBテーブルのモック."""
+    get_race_signal_loader().clear()
     with patch("tools.ai_prediction.get_dynamodb_table") as mock:
         table = MagicMock()
         mock.return_value = table
         yield table
+    get_race_signal_loader().clear()
 
 
 class TestGetAiPrediction:
@@ -111,7 +114,7 @@ class TestListAiPredictionsForDate:
 
     def test_日付でデータ一覧取得(self, mock_dynamodb_table):
         """正常系: 指定日のデータ一覧を取得できる."""
-        mock_dynamodb_table.scan.return_value = {
+        mock_dynamodb_table.query.return_value = {
             "Items": [
                 {
                     "race_id": "202601310511",
@@ -141,6 +144,10 @@ class TestListAiPredictionsForDate:
 
         result = list_ai_predictions_for_date(date="20260131")
 
+        # 日付GSIのクエリ1回で取得し、テーブル全体はスキャンしない
+        mock_dynamodb_table.query.assert_called_once()
+        assert mock_dynamodb_table.query.call_args.kwargs["IndexName"] == "race_date-source-index"
+        mock_dynamodb_table.scan.assert_not_called()
         assert result["date"] == "20260131"
         assert result["source"] == "AI-A"  # 匿名化される
         assert result["total_count"] == 2
@@ -155,7 +162,7 @@ class TestListAiPredictionsForDate:
 
     def test_データがない場合(self, mock_dynamodb_table):
         """正常系: 指定日のデータがない場合."""
-        mock_dynamodb_table.scan.return_value = {"Items": []}
+        mock_dynamodb_table.query.return_value = {"Items": []}
 
         result = list_ai_predictions_for_date(date="20260201")
 
@@ -166,7 +173,7 @@ class TestListAiPredictionsForDate:
 
     def test_レースがソートされる(self, mock_dynamodb_table):
         """正常系: レースが競馬場名・レース番号でソートされる."""
-        mock_dynamodb_table.scan.return_value = {
+        mock_dynamodb_table.query.return_value = {
             "Items": [
                 {"race_id": "202601310512", "source": "ai-shisu", "venue": "東京", "race_number": 12, "predictions": []},
                 {"race_id": "202601310811", "source": "ai-shisu", "venue": "京都", "race_number": 11, "predictions": []},
@@ -1,6 +1,7 @@
 """JRA-VAN APIセッション内キャッシュのテスト."""
 
 import sys
+import threading
 import time
 from pathlib import Path
 from unittest.mock import patch
@@ -90,6 +91,115 @@ class TestSessionCacheStats:
         assert cache.stats["cache_size"] == 2
 
 
+    def test_データ種別ごとのヒット率(self):
+        cache = SessionCache()
+        cache.set("https://api.example.com/races/1/odds", {"win": {}})
+        cache.get("https://api.example.com/races/1/odds")  # hit
+        cache.get("https://api.example.com/races/2/odds")  # miss
+        cache.get("https://api.example.com/jockey/1")  # miss
+        by_type = cache.stats["by_type"]
+        assert by_type["odds"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+        assert by_type["jockey_info"] == {"hits": 0, "misses": 1, "hit_rate": 0}
+
+    def test_概算バイト数を集計する(self):
+        cache = SessionCache()
+        cache.set("https://api.example.com/a", {"data": 1})
+        cache.set("https://api.example.com/b", {"data": 2}, size=100)
+        assert cache.stats["cache_bytes"] == len('{"data":1}') + 100
+
+    def test_上書き時はバイト数を差し替える(self):
+        cache = SessionCache()
+        cache.set("https://api.example.com/a", {"data": 1}, size=100)
+        cache.set("https://api.example.com/a", {"data": 2}, size=30)
+        assert cache.stats["cache_bytes"] == 30
+        assert cache.stats["cache_size"] == 1
+
+
+class TestSessionCacheEviction:
+    """LRU追い出しのテスト."""
+
+    def test_エントリ数上限で最も古く使われたものを追い出す(self):
+        cache = SessionCache()
+        with patch.object(SessionCache, "MAX_ENTRIES", 2):
+            cache.set("https://api.example.com/a", {"v": "a"})
+            cache.set("https://api.example.com/b", {"v": "b"})
+            cache.get("https://api.example.com/a")  # a を最近使用にする
+            cache.set("https://api.example.com/c", {"v": "c"})
+        assert cache.get("https://api.example.com/a") == {"v": "a"}
+        assert cache.get("https://api.example.com/b") is None
+        assert cache.get("https://api.example.com/c") == {"v": "c"}
+        assert cache.stats["evictions"] == 1
+
+    def test_バイト数上限で追い出す(self):
+        cache = SessionCache()
+        with patch.object(SessionCache, "MAX_BYTES", 250):
+            cache.set("https://api.example.com/a", {"v": "a"}, size=100)
+            cache.set("https://api.example.com/b", {"v": "b"}, size=100)
+            cache.set("https://api.example.com/c", {"v": "c"}, size=100)
+        assert cache.get("https://api.example.com/a") is None
+        assert cache.stats["cache_size"] == 2
+        assert cache.stats["cache_bytes"] == 200
+
+    def test_期限切れを優先して追い出す(self):
+        cache = SessionCache()
+        with patch.object(SessionCache, "MAX_ENTRIES", 2), \
+                patch.object(SessionCache, "DEFAULT_TTL", {"expired": 0, "default": 1800}):
+            cache.set("https://api.example.com/a", {"v": "a"})
+            cache.set("https://api.example.com/b", {"v": "b"}, data_type="expired")
+            time.sleep(0.01)
+            cache.set("https://api.example.com/c", {"v": "c"})
+        assert cache.get("https://api.example.com/a") == {"v": "a"}
+        assert cache.stats["evictions"] == 0
+
+    def test_clearで全エントリと統計をリセットする(self):
+        cache = SessionCache()
+        cache.set("https://api.example.com/a", {"v": "a"})
+        cache.get("https://api.example.com/a")
+        cache.clear()
+        stats = cache.stats
+        assert stats["cache_size"] == 0
+        assert stats["cache_bytes"] == 0
+        assert stats["hits"] == 0
+        assert stats["by_type"] == {}
+
+
+class TestSessionCacheConcurrency:
+    """並列取得（fan_out）のワーカーから同時に使うときのテスト."""
+
+    def test_同時の読み書きと追い出しで壊れない(self):
+        cache = SessionCache()
+        errors = []
+
+        def worker(n: int) -> None:
+            try:
+                for i in range(500):
+                    url = f"https://api.example.com/{(n * 7 + i) % 40}"
+                    data_type = "expired" if i % 3 == 0 else None
+                    cache.set(url, {"v": i}, data_type=data_type, size=10)
+                    cache.get(url)
+            except Exception as e:
+                errors.append(e)
+
+        # スレッド切り替えを細かくして競合が表に出やすくする
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with patch.object(SessionCache, "MAX_ENTRIES", 16), \
+                    patch.object(SessionCache, "DEFAULT_TTL", {"expired": 0, "default": 1800}):
+                threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+        finally:
+            sys.setswitchinterval(interval)
+
+        assert errors == []
+        stats = cache.stats
+        assert stats["cache_size"] <= 16
+        assert stats["cache_bytes"] == stats["cache_size"] * 10
+
+
 class TestInferDataType:
     """_infer_data_type のテスト."""
 
@@ -5,6 +5,8 @@ from decimal import Decimal
 from pathlib import Path
 from unittest.mock import patch
 
+import pytest
+
 # agentcoreモジュールをインポートできるようにパスを追加
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
 
@@ -28,6 +30,15 @@ from tools.bet_proposal import (
     MAX_PARTNERS,
     TORIGAMI_COMPOSITE_ODDS_THRESHOLD,
 )
+from tools.narration import StubNarrationModel, get_narrator
+
+
+@pytest.fixture(autouse=True)
+def clear_narration_cache():
+    """テスト間でナレーションキャッシュを共有しない."""
+    get_narrator().clear()
+    yield
+    get_narrator().clear()
 
 
 # =============================================================================
@@ -2075,3 +2086,35 @@ class TestLlmNarrationIntegration:
         result = _generate_proposal_reasoning(**self._make_reasoning_args())
         assert "【軸馬選定】" in result
         assert "【リスク】" in result
+
+    def test_同じコンテキストのナレーションはキャッシュから返す(self):
+        stub = StubNarrationModel()
+        with patch("tools.bet_proposal._call_bedrock_haiku", stub):
+            first = _generate_proposal_reasoning(**self._make_reasoning_args())
+            second = _generate_proposal_reasoning(**self._make_reasoning_args())
+        assert first == second
+        assert "スタブ応答" in first
+        assert stub.calls == 1
+
+    def test_期限を過ぎたらテンプレートで返し完了後にキャッシュの取り出しで反映する(self):
+        from tools import bet_proposal
+
+        stub = StubNarrationModel(delay=5.0)
+        runners = _make_runners(8)
+        with patch("tools.bet_proposal._call_bedrock_haiku", stub), \
+                patch.object(get_narrator(), "_deadline", 0.05):
+            result = _generate_bet_proposal_impl(
+                race_id="test", budget=3000, runners_data=runners,
+                ai_predictions=_make_ai_predictions(8), race_name="テスト",
+                race_conditions=[], venue="東京", total_runners=8,
+            )
+            template = result["proposal_reasoning"]
+            assert "スタブ応答" not in template
+            stub.release()
+            bet_proposal._pending_narration.result(timeout=1.0)
+
+        bet_proposal._last_proposal_result = result
+        cached = bet_proposal.get_last_proposal_result()
+        assert "スタブ応答" in cached["proposal_reasoning"]
+        # 返した結果は変更しない
+        assert result["proposal_reasoning"] == template
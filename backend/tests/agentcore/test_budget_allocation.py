@@ -0,0 +1,95 @@
+"""100円単位の予算配分エンジンのテスト."""
+
+import random
+import sys
+from itertools import pairwise
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from tools.budget_allocation import allocate_dutching, allocate_proportional
+
+
+def _random_cases(seed: int, count: int = 300):
+    """(重みまたはオッズのリスト, 予算) をランダムに生成する."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        n = rng.randint(1, 40)
+        values = [rng.choice([0.0, rng.uniform(0, 3), rng.uniform(1, 200)]) for _ in range(n)]
+        budget = rng.choice([rng.randint(0, 500), rng.randint(100, 50000)])
+        yield values, budget
+
+
+class TestAllocateProportional:
+    """allocate_proportional のテスト."""
+
+    def test_予算を100円単位で使い切る(self):
+        for weights, budget in _random_cases(seed=1):
+            amounts = allocate_proportional(weights, budget)
+            assert len(amounts) == len(weights)
+            assert all(a % 100 == 0 and a >= 0 for a in amounts)
+            assert sum(amounts) == budget // 100 * 100
+
+    def test_予算が足りれば全買い目に最低100円(self):
+        for weights, budget in _random_cases(seed=2):
+            if budget // 100 >= len(weights):
+                assert all(a >= 100 for a in allocate_proportional(weights, budget))
+
+    def test_重みが大きいほど金額が少なくない(self):
+        for weights, budget in _random_cases(seed=3):
+            amounts = allocate_proportional(weights, budget)
+            for (w1, a1), (w2, a2) in pairwise(zip(weights, amounts, strict=True)):
+                if w1 > w2:
+                    assert a1 >= a2
+                elif w2 > w1:
+                    assert a2 >= a1
+
+    def test_最低保証を除けば取り分との差は1単位未満(self):
+        weights = [5.0, 3.0, 2.0]
+        amounts = allocate_proportional(weights, 1050)
+        assert amounts == [500, 300, 200]
+        for w, a in zip([7.0, 2.0, 1.0], allocate_proportional([7.0, 2.0, 1.0], 2000), strict=True):
+            assert abs(a - 2000 * w / 10) < 100
+
+    def test_取り分が最低額未満なら最低額に固定して残りを比例配分(self):
+        assert allocate_proportional([100.0, 1.0, 1.0], 1000) == [800, 100, 100]
+
+    def test_重みがすべて0なら均等(self):
+        assert allocate_proportional([0, 0, 0], 900) == [300, 300, 300]
+
+    def test_全員に最低額を配れない場合は重みの大きい順(self):
+        assert allocate_proportional([1.0, 3.0, 2.0], 200) == [0, 100, 100]
+
+    def test_予算0や空リスト(self):
+        assert allocate_proportional([1.0, 2.0], 0) == [0, 0]
+        assert allocate_proportional([], 1000) == []
+
+
+class TestAllocateDutching:
+    """allocate_dutching のテスト."""
+
+    def test_予算を100円単位で使い切る(self):
+        for odds, budget in _random_cases(seed=4):
+            amounts = allocate_dutching(odds, budget)
+            assert all(a % 100 == 0 and a >= 0 for a in amounts)
+            if any(o > 0 for o in odds):
+                assert sum(amounts) == budget // 100 * 100
+            else:
+                assert sum(amounts) == 0
+
+    def test_払い戻しの差はオッズ1単位分以内(self):
+        for odds, budget in _random_cases(seed=5):
+            amounts = allocate_dutching(odds, budget)
+            funded = [(o, a) for o, a in zip(odds, amounts, strict=True) if a > 0]
+            if len(funded) < 2:
+                continue
+            payouts = [o * a for o, a in funded]
+            assert max(payouts) - min(payouts) <= max(o for o, _ in funded) * 100 * 2
+
+    def test_高オッズから除外される(self):
+        amounts = allocate_dutching([2.0, 50.0, 4.0], 500)
+        assert amounts[1] == 0
+        assert amounts[0] > amounts[2] > 0
+
+    def test_オッズ0以下は対象外(self):
+        assert allocate_dutching([0.0, 5.0, -1.0], 1000) == [0, 1000, 0]
@@ -0,0 +1,146 @@
+"""ツール結果のコンパクト表現のテスト."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from tools.compact_payload import compact_bet_proposal, compact_race_analysis
+
+
+def _analysis() -> dict:
+    return {
+        "race_info": {
+            "race_id": "202602010511",
+            "race_name": "テスト",
+            "venue": "東京",
+            "distance": "1600m",
+            "surface": "芝",
+            "total_runners": 2,
+            "running_style_summary": {"逃げ": 1},
+            "ai_consensus": "概ね合意",
+            "consensus": {
+                "agreed_top3": [1],
+                "consensus_level": "部分合意",
+                "divergence_horses": [{"horse_number": 2, "ranks": {"AI-A": 2, "AI-B": 6}, "gap": 4}],
+            },
+        },
+        "horses": [
+            {
+                "number": 1,
+                "name": "馬A",
+                "odds": 3.456,
+                "ai_predictions": {"AI-A": {"score": 81.25, "rank": 1}, "AI-B": {"score": 70.0, "rank": 2}},
+                "running_style": "逃げ",
+                "speed_index": {"jiro8-speed": 95.04},
+            },
+            {
+                "number": 2,
+                "name": "馬B",
+                "odds": 12.0,
+                "ai_predictions": {"AI-A": {"score": 60.0, "rank": 2}},
+                "running_style": None,
+                "speed_index": None,
+            },
+        ],
+        "precomputed": {"odds_version": "abc", "computed_at": 1700000000},
+    }
+
+
+class TestCompactRaceAnalysis:
+    """compact_race_analysis のテスト."""
+
+    def test_馬を列指向の表にする(self):
+        result = compact_race_analysis(_analysis())
+
+        assert result["horses"]["columns"] == ["number", "name", "odds", "running_style", "A", "B", "S1"]
+        assert result["horses"]["rows"] == [
+            [1, "馬A", 3.5, "逃げ", [1, 81.2], [2, 70], 95],
+            [2, "馬B", 12, None, [2, 60], None, None],
+        ]
+
+    def test_ソースの別名と意味を返す(self):
+        result = compact_race_analysis(_analysis())
+
+        assert set(result["sources"]) == {"A", "B", "S1"}
+        assert result["sources"]["S1"].startswith("jiro8-speed")
+        assert result["race_info"]["consensus"]["divergence_horses"][0]["ranks"] == {"A": 2, "B": 6}
+
+    def test_既定値の列と空の項目を省く(self):
+        analysis = _analysis()
+        for horse in analysis["horses"]:
+            horse["running_style"] = None
+        analysis["race_info"]["running_style_summary"] = {}
+        analysis["race_info"]["consensus"] = None
+
+        result = compact_race_analysis(analysis)
+
+        assert "running_style" not in result["horses"]["columns"]
+        assert "running_style_summary" not in result["race_info"]
+        assert "consensus" not in result["race_info"]
+
+    def test_LLMが使う項目だけを渡す(self):
+        analysis = _analysis() | {
+            "fetch_diagnostics": {"timings_ms": {"race_detail": 121}, "failed": []},
+            "precomputed": {"odds_version": "v1", "computed_at": 0},
+        }
+
+        result = compact_race_analysis(analysis)
+
+        assert set(result) == {"race_info", "sources", "horses", "fetch_diagnostics"}
+        assert result["fetch_diagnostics"] == {"timings_ms": {"race_detail": 121}}
+
+    def test_エラーはそのまま返す(self):
+        assert compact_race_analysis({"error": "x"}) == {"error": "x"}
+
+    def test_元の結果を変更しない(self):
+        analysis = _analysis()
+        compact_race_analysis(analysis)
+
+        assert analysis == _analysis()
+
+
+class TestCompactBetProposal:
+    """compact_bet_proposal のテスト."""
+
+    def _proposal(self) -> dict:
+        bet = {
+            "bet_type": "quinella",
+            "horse_numbers": [1, 2],
+            "amount": 300,
+            "bet_count": 1,
+            "bet_display": "馬連 1-2",
+            "expected_value": 1.34,
+            "composite_odds": 12.3,
+            "combination_probability": 0.109123,
+            "reasoning": "EV=1.34 (確率10.9%×オッズ12.3倍)",
+        }
+        return {
+            "race_id": "202602010511",
+            "race_summary": {"race_name": "", "ai_consensus_level": "不明"},
+            "proposed_bets": [bet, {**bet, "horse_numbers": [1, 3], "amount": 200}],
+            "total_amount": 500,
+            "budget_remaining": 0,
+            "analysis_comment": "コメント",
+            "proposal_reasoning": "確率0%以上・期待値1.0以上で2点選定",
+            "disclaimer": "この提案はデータ分析に基づくものであり、的中を保証するものではありません。",
+        }
+
+    def test_買い目を表にして表示用の項目を省く(self):
+        result = compact_bet_proposal(self._proposal())
+
+        assert result["proposed_bets"]["columns"] == [
+            "bet_type", "horse_numbers", "amount", "expected_value", "composite_odds", "combination_probability",
+        ]
+        assert result["proposed_bets"]["rows"][0] == ["quinella", [1, 2], 300, 1.34, 12.3, 0.1091]
+        assert "disclaimer" not in result
+        assert result["race_summary"] == {"ai_consensus_level": "不明"}
+        assert result["budget_remaining"] == 0
+
+    def test_買い目なしでも表を返す(self):
+        proposal = self._proposal() | {"proposed_bets": [], "total_amount": 0}
+
+        result = compact_bet_proposal(proposal)
+
+        assert result["proposed_bets"]["rows"] == []
+        assert result["total_amount"] == 0
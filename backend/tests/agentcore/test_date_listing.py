@@ -0,0 +1,116 @@
+"""日付別一覧（race_date-source-index）のテスト.
+
+GSI を再現するインメモリのテーブルで、読み込むアイテム数がテーブルの大きさに
+依存しないことを確かめる。
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from tools.ai_prediction import DATE_INDEX_NAME, list_ai_predictions_for_date
+from tools.speed_index import list_speed_indices_for_date
+
+VENUE_CODES = {"05": "東京", "08": "京都"}
+
+
+class FakeTable:
+    """DynamoDB テーブルのインメモリ代替.
+
+    条件式は And / 等価のみ対応する。キャパシティの代わりに、
+    クエリ・スキャンで読み込んだアイテム数を items_read に数える。
+    """
+
+    def __init__(self, indexes: dict[str, tuple[str, str]]):
+        self.items: list[dict] = []
+        self.indexes = indexes
+        self.items_read = 0
+
+    def put_item(self, **kwargs) -> None:
+        self.items.append(kwargs["Item"])
+
+    @staticmethod
+    def _equalities(condition) -> dict:
+        expression = condition.get_expression()
+        if expression["operator"] == "AND":
+            left, right = expression["values"]
+            return FakeTable._equalities(left) | FakeTable._equalities(right)
+        assert expression["operator"] == "="
+        key, value = expression["values"]
+        return {key.name: value}
+
+    def query(self, **kwargs) -> dict:
+        conditions = self._equalities(kwargs["KeyConditionExpression"])
+        index_name = kwargs.get("IndexName")
+        partition_key, _ = self.indexes[index_name] if index_name else ("race_id", "source")
+        # パーティション内のアイテムだけを読む（GSI にはキー属性を持つアイテムだけが載る）
+        partition = [i for i in self.items if i.get(partition_key) == conditions[partition_key]]
+        self.items_read += len(partition)
+        return {"Items": [i for i in partition if all(i.get(k) == v for k, v in conditions.items())]}
+
+    def scan(self, **kwargs) -> dict:
+        self.items_read += len(self.items)
+        return {"Items": list(self.items)}
+
+
+def _fill(table: FakeTable, days: int, source: str, field: str) -> None:
+    """days 日分（1日 2場 × 12R）のアイテムを入れる."""
+    for day in range(1, days + 1):
+        date = f"202601{day:02d}"
+        for venue_code, venue in VENUE_CODES.items():
+            for race_number in range(1, 13):
+                race_id = f"{date}{venue_code}{race_number:02d}"
+                for src in (source, "other-source"):
+                    table.put_item(Item={
+                        "race_id": race_id,
+                        "source": src,
+                        "race_date": date,
+                        "venue": venue,
+                        "race_number": race_number,
+                        field: [{"rank": 1, "horse_number": 1}],
+                    })
+
+
+@pytest.fixture
+def make_table():
+    def make(days: int, source: str, field: str) -> FakeTable:
+        table = FakeTable({DATE_INDEX_NAME: ("race_date", "source")})
+        _fill(table, days, source, field)
+        return table
+    return make
+
+
+class TestDateListing:
+    """list_*_for_date の日付GSIクエリのテスト."""
+
+    def test_AI予想の一覧はその日のアイテムだけを読む(self, make_table):
+        table = make_table(3, "ai-shisu", "predictions")
+        with patch("tools.ai_prediction.get_dynamodb_table", return_value=table):
+            result = list_ai_predictions_for_date(date="20260102")
+
+        assert result["total_count"] == 24
+        assert {r["race_id"][:8] for r in result["races"]} == {"20260102"}
+        # その日の全ソース分（2場 × 12R × 2ソース）だけ
+        assert table.items_read == 48
+
+    def test_スピード指数の一覧はその日のアイテムだけを読む(self, make_table):
+        table = make_table(3, "jiro8-speed", "indices")
+        with patch("tools.speed_index.get_dynamodb_table", return_value=table):
+            result = list_speed_indices_for_date(date="20260103", source="jiro8-speed")
+
+        assert result["total_count"] == 24
+        assert result["races"][0]["venue"] == "京都"
+        assert table.items_read == 48
+
+    @pytest.mark.parametrize("days", [1, 10, 30])
+    def test_読み込み量はテーブルの大きさに依存しない(self, make_table, days):
+        table = make_table(days, "jiro8-speed", "indices")
+        with patch("tools.speed_index.get_dynamodb_table", return_value=table):
+            list_speed_indices_for_date(date="20260101", source="jiro8-speed")
+
+        assert len(table.items) == days * 48
+        assert table.items_read == 48
@@ -1,12 +1,17 @@
 """EVベース買い目提案ツールのテスト."""
 
+import random
 import sys
+import time
 from pathlib import Path
 from unittest.mock import patch
 
+import pytest
+
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
 
 from tools.ev_proposer import (
+    _generate_ev_candidates,
     _propose_bets_impl,
     _make_odds_key,
     _lookup_real_odds,
@@ -16,6 +21,15 @@ from tools.ev_proposer import (
     DEFAULT_BET_TYPES,
     EV_THRESHOLD,
 )
+from tools.narration import StubNarrationModel, get_narrator
+
+
+@pytest.fixture(autouse=True)
+def clear_narration_cache():
+    """テスト間でナレーションキャッシュを共有しない."""
+    get_narrator().clear()
+    yield
+    get_narrator().clear()
 
 
 def _make_runners(count: int) -> list[dict]:
@@ -250,6 +264,127 @@ class TestProposeBetsImpl:
             assert "bet_display" in bet
 
 
+class TestTopKEvCandidates:
+    """top_k 指定時の EV 上位探索のテスト."""
+
+    ALL_BET_TYPES = ["win", "place", "quinella", "exacta", "quinella_place", "trio", "trifecta"]
+
+    def _race(self, n: int, seed: int) -> tuple[dict, dict, dict]:
+        rng = random.Random(seed)
+        weights = [rng.random() ** 2 + 0.01 for _ in range(n)]
+        total = sum(weights)
+        win_probs = {i + 1: w / total for i, w in enumerate(weights)}
+        runners = _make_runners(n)
+        for r in runners:
+            # 確率とずれたオッズにして EV をばらつかせる
+            r["odds"] = round(0.8 / win_probs[r["horse_number"]] * rng.uniform(0.6, 1.6), 1)
+        all_odds = _make_all_odds(runners)
+        all_odds["place"] = {
+            str(h): {"min": round(max(1.1, o / 3), 1), "max": round(o / 2, 1)}
+            for h, o in all_odds["win"].items()
+        }
+        runners_map = {r["horse_number"]: r for r in runners}
+        return win_probs, runners_map, all_odds
+
+    def test_全件探索の上位K件と一致する(self):
+        for seed in range(5):
+            win_probs, runners_map, all_odds = self._race(14, seed)
+            for ev_filter in [None, (0.0, EV_THRESHOLD, None, None), (0.01, 0.8, 0.5, 3.0)]:
+                full = _generate_ev_candidates(
+                    win_probs, runners_map, self.ALL_BET_TYPES, 14, all_odds, ev_filter,
+                )
+                for k in (1, 5, 30, len(full) + 10):
+                    top = _generate_ev_candidates(
+                        win_probs, runners_map, self.ALL_BET_TYPES, 14, all_odds, ev_filter, top_k=k,
+                    )
+                    assert top == full[:k]
+
+    def test_EVが同値なら生成順を保つ(self):
+        win_probs = {1: 0.25, 2: 0.25, 3: 0.25, 4: 0.25}
+        runners_map = {h: {"horse_name": f"馬{h}"} for h in win_probs}
+        all_odds = {"win": {str(h): 4.0 for h in win_probs}}
+
+        full = _generate_ev_candidates(win_probs, runners_map, ["win"], 4, all_odds)
+        top = _generate_ev_candidates(win_probs, runners_map, ["win"], 4, all_odds, top_k=2)
+
+        assert top == full[:2]
+
+    def test_上界で枝刈りしてオッズ参照を減らす(self):
+        win_probs, runners_map, all_odds = self._race(18, 1)
+        with patch("tools.ev_proposer._lookup_real_odds", wraps=_lookup_real_odds) as lookup:
+            _generate_ev_candidates(
+                win_probs, runners_map, ["trifecta"], 18, all_odds, (0.0, EV_THRESHOLD, None, None), top_k=5,
+            )
+        assert lookup.call_count < 816 // 2
+
+    def test_モンテカルロエンジンでも全件探索の上位K件と一致する(self):
+        win_probs, runners_map, all_odds = self._race(10, 2)
+        with patch("tools.ev_proposer.PROBABILITY_MODEL", "plackett_luce"), \
+                patch("tools.ev_proposer.SIMULATION_SAMPLES", 20_000):
+            full = _generate_ev_candidates(win_probs, runners_map, self.ALL_BET_TYPES, 10, all_odds)
+            top = _generate_ev_candidates(win_probs, runners_map, self.ALL_BET_TYPES, 10, all_odds, top_k=20)
+
+        assert top == full[:20]
+
+    @patch("tools.ev_proposer._invoke_haiku_narrator", return_value=None)
+    def test_予算配分では買える点数だけ探索する(self, mock_narrator):
+        runners = _make_runners(8)
+        win_probs = {1: 0.30, 2: 0.20, 3: 0.15, 4: 0.12, 5: 0.08, 6: 0.06, 7: 0.05, 8: 0.04}
+
+        with patch("tools.ev_proposer._generate_ev_candidates", wraps=_generate_ev_candidates) as gen:
+            result = _propose_bets_impl(
+                race_id="test",
+                win_probabilities=win_probs,
+                runners_data=runners,
+                total_runners=8,
+                budget=500,
+                all_odds=_make_all_odds(runners),
+            )
+
+        assert gen.call_args.kwargs["top_k"] == 5
+        assert len(result["proposed_bets"]) <= 5
+
+
+class TestNarration:
+    """ナレーションの期限・反映のテスト."""
+
+    def _propose(self):
+        runners = _make_runners(6)
+        return _propose_bets_impl(
+            race_id="test",
+            win_probabilities={1: 0.35, 2: 0.25, 3: 0.15, 4: 0.1, 5: 0.1, 6: 0.05},
+            runners_data=runners,
+            total_runners=6,
+            budget=3000,
+            all_odds=_make_all_odds(runners),
+        )
+
+    def test_期限内のナレーションが分析コメントになる(self):
+        with patch("tools.bet_proposal._call_bedrock_haiku", StubNarrationModel()):
+            result = self._propose()
+        assert "スタブ応答" in result["analysis_comment"]
+
+    def test_期限を過ぎたら定型文で即座に返し完了後にキャッシュの取り出しで反映する(self):
+        from tools import ev_proposer
+
+        stub = StubNarrationModel(delay=5.0)
+        with patch("tools.bet_proposal._call_bedrock_haiku", stub), \
+                patch.object(get_narrator(), "_deadline", 0.05):
+            start = time.perf_counter()
+            result = self._propose()
+            elapsed = time.perf_counter() - start
+            assert result["analysis_comment"].startswith("EV分析に基づく提案。")
+            assert elapsed < 1.0
+            stub.release()
+            ev_proposer._pending_ev_narration.result(timeout=1.0)
+
+        ev_proposer._last_ev_proposal_result = result
+        cached = ev_proposer.get_last_ev_proposal_result()
+        assert "スタブ応答" in cached["analysis_comment"]
+        # 返した結果は変更しない
+        assert result["analysis_comment"].startswith("EV分析に基づく提案。")
+
+
 class TestMakeOddsKey:
     """_make_odds_key のテスト."""
 
@@ -577,3 +712,40 @@ class TestRaceBudgetFallback:
         )
 
         assert result["total_amount"] == 0
+
+
+class TestProposeBetsTool:
+    """propose_bets ツールの戻り値のテスト."""
+
+    @pytest.fixture(autouse=True)
+    def no_precompute(self):
+        with patch("tools.precompute.get_precompute_store", return_value=None):
+            yield
+
+    def _proposal(self) -> dict:
+        return {
+            "race_id": "202602010511",
+            "race_summary": {"race_name": "テスト", "ai_consensus_level": "概ね合意"},
+            "proposed_bets": [{
+                "bet_type": "win", "horse_numbers": [1], "amount": 100, "bet_count": 1,
+                "bet_display": "単勝 1番 馬1", "expected_value": 1.2, "composite_odds": 4.0,
+                "combination_probability": 0.3, "reasoning": "EV=1.20",
+            }],
+            "total_amount": 100,
+            "budget_remaining": 0,
+            "analysis_comment": "コメント",
+            "proposal_reasoning": "1点選定",
+            "disclaimer": "免責",
+        }
+
+    def test_LLMにはコンパクト表現を返し全項目をキャッシュする(self):
+        from tools.ev_proposer import get_last_ev_proposal_result, propose_bets
+
+        proposal = self._proposal()
+        with patch("tools.ev_proposer._propose_bets_impl", return_value=proposal):
+            result = propose_bets(
+                race_id="202602010511", win_probabilities={"1": 1.0}, runners_data=[{"horse_number": 1}],
+            )
+
+        assert result["proposed_bets"]["rows"] == [["win", [1], 100, 1.2, 4, 0.3]]
+        assert get_last_ev_proposal_result() is proposal
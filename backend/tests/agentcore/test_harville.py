@@ -0,0 +1,116 @@
+"""Harville確率テーブルのテスト."""
+
+import random
+import sys
+from itertools import permutations
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from tools.bet_analysis import _harville_exacta, _harville_trifecta
+from tools.harville import HarvilleTables, get_harville_tables
+
+
+def _random_probs(n: int, seed: int = 1) -> dict[int, float]:
+    rng = random.Random(seed)
+    weights = [rng.random() ** 2 for _ in range(n)]
+    total = sum(weights)
+    return {i + 1: w / total for i, w in enumerate(weights)}
+
+
+def _reference(horse_numbers: list[int], bet_type: str, probs: dict[int, float]) -> float:
+    """組合せごとに計算する従来の実装."""
+    p = [probs.get(h, 0.0) for h in horse_numbers]
+    if bet_type == "exacta":
+        return _harville_exacta(p[0], p[1])
+    if bet_type == "quinella":
+        return _harville_exacta(p[0], p[1]) + _harville_exacta(p[1], p[0])
+    if bet_type == "trifecta":
+        return _harville_trifecta(p[0], p[1], p[2])
+    if bet_type == "trio":
+        return sum(_harville_trifecta(*perm) for perm in permutations(p))
+    if bet_type == "quinella_place":
+        return sum(
+            _harville_trifecta(*perm)
+            for c, p_c in probs.items() if c not in horse_numbers
+            for perm in permutations([p[0], p[1], p_c])
+        )
+    raise ValueError(bet_type)
+
+
+class TestHarvilleTables:
+    """HarvilleTables のテスト."""
+
+    @pytest.mark.parametrize("bet_type", ["exacta", "quinella", "quinella_place"])
+    def test_2頭券種が従来の計算と一致する(self, bet_type):
+        probs = _random_probs(10)
+        tables = HarvilleTables(probs)
+        for combo in permutations(probs, 2):
+            assert tables.probability(list(combo), bet_type) == pytest.approx(
+                _reference(list(combo), bet_type, probs), rel=1e-12, abs=1e-15,
+            )
+
+    @pytest.mark.parametrize("bet_type,size", [
+        ("exacta", 2), ("quinella_place", 2), ("trifecta", 3), ("trio", 3),
+    ])
+    def test_勝率0や合計1以上の組を含んでも従来の計算と一致する(self, bet_type, size):
+        probs = {1: 0.55, 2: 0.5, 3: 0.0, 4: 0.2, 5: 1.0}
+        tables = HarvilleTables(probs)
+        for combo in permutations(probs, size):
+            assert tables.probability(list(combo), bet_type) == pytest.approx(
+                _reference(list(combo), bet_type, probs), rel=1e-12, abs=1e-15,
+            )
+
+    @pytest.mark.parametrize("bet_type", ["trifecta", "trio"])
+    def test_3頭券種が従来の計算と一致する(self, bet_type):
+        probs = _random_probs(9)
+        tables = HarvilleTables(probs)
+        for combo in permutations(probs, 3):
+            assert tables.probability(list(combo), bet_type) == pytest.approx(
+                _reference(list(combo), bet_type, probs), rel=1e-12, abs=1e-15,
+            )
+
+    def test_単勝と複勝(self):
+        tables = HarvilleTables({1: 0.5, 2: 0.3, 3: 0.2})
+        assert tables.probability([1], "win") == 0.5
+        assert tables.probability([1], "place") == 1.0
+        assert tables.probability([3], "place") == pytest.approx(0.6)
+
+    def test_三連単の総和は1(self):
+        probs = _random_probs(18)
+        tables = HarvilleTables(probs)
+        assert sum(tables.trifecta(*combo) for combo in permutations(probs, 3)) == pytest.approx(1.0)
+
+    def test_ワイドの総和は3(self):
+        # 3着以内の2頭の組は3通り
+        tables = HarvilleTables(_random_probs(18))
+        assert sum(tables.wide_table.values()) == pytest.approx(3.0)
+
+    def test_勝率にない馬番は0(self):
+        tables = HarvilleTables({1: 0.6, 2: 0.4})
+        assert tables.probability([1, 9], "quinella") == 0.0
+        assert tables.probability([1, 2, 9], "trio") == 0.0
+
+    def test_勝率1や0の馬を含んでも計算できる(self):
+        tables = HarvilleTables({1: 1.0, 2: 0.0, 3: 0.0})
+        assert tables.probability([1, 2], "exacta") == 0.0
+        assert tables.probability([2, 3, 1], "trifecta") == 0.0
+
+    def test_ワイド以外ではワイド表を作らない(self):
+        tables = HarvilleTables(_random_probs(5))
+        tables.probability([1, 2], "quinella")
+        tables.probability([1, 2, 3], "trio")
+        assert "wide_table" not in tables.__dict__
+
+
+class TestGetHarvilleTables:
+    """get_harville_tables のテスト."""
+
+    def test_同じ勝率ならテーブルを使い回す(self):
+        probs = _random_probs(8, seed=7)
+        assert get_harville_tables(probs) is get_harville_tables(dict(reversed(list(probs.items()))))
+
+    def test_勝率が違えば別のテーブル(self):
+        assert get_harville_tables(_random_probs(8, seed=1)) is not get_harville_tables(_random_probs(8, seed=2))
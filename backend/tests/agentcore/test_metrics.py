@@ -0,0 +1,187 @@
+"""ツールメトリクスのバッファリング送信のテスト."""
+
+import json
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from tools.metrics import (
+    EMF_MAX_VALUES,
+    MetricsBuffer,
+    flush_metrics,
+    phase,
+    record_fetch_metrics,
+    record_tool_metrics,
+    tool_scope,
+)
+
+
+class TestEmfMode:
+    """EMF モードのテスト."""
+
+    def test_flushまで書き出さない(self):
+        lines = []
+        buffer = MetricsBuffer(mode="emf", writer=lines.append)
+
+        buffer.put("ExecutionTime", 12.5, "Milliseconds", {"ToolName": "a"})
+
+        assert lines == []
+        assert buffer.pending == 1
+        buffer.flush()
+        assert len(lines) == 1
+        assert buffer.pending == 0
+
+    def test_ディメンションの組ごとに1行(self):
+        lines = []
+        buffer = MetricsBuffer(namespace="Test/NS", mode="emf", writer=lines.append)
+        for tool in ["a", "a", "b"]:
+            buffer.put("ExecutionTime", 10.0, "Milliseconds", {"ToolName": tool})
+            buffer.put("Invocations", 1, "Count", {"ToolName": tool})
+        buffer.flush()
+
+        docs = {doc["ToolName"]: doc for doc in map(json.loads, lines)}
+        assert set(docs) == {"a", "b"}
+        assert docs["a"]["ExecutionTime"] == [10.0, 10.0]
+        assert docs["b"]["Invocations"] == 1
+        directive = docs["a"]["_aws"]["CloudWatchMetrics"][0]
+        assert directive["Namespace"] == "Test/NS"
+        assert directive["Dimensions"] == [["ToolName"]]
+        assert {"Name": "ExecutionTime", "Unit": "Milliseconds"} in directive["Metrics"]
+
+    def test_値の数の上限で行を分ける(self):
+        lines = []
+        buffer = MetricsBuffer(mode="emf", writer=lines.append, max_buffered=10_000)
+        for i in range(EMF_MAX_VALUES * 2 + 1):
+            buffer.put("ExecutionTime", float(i), "Milliseconds", {"ToolName": "a"})
+        buffer.flush()
+
+        docs = [json.loads(line) for line in lines]
+        assert len(docs) == 3
+        assert sum(len(d["ExecutionTime"]) if isinstance(d["ExecutionTime"], list) else 1 for d in docs) == 201
+
+    def test_上限まで溜まったら途中でも書き出す(self):
+        lines = []
+        buffer = MetricsBuffer(mode="emf", writer=lines.append, max_buffered=3)
+        for _ in range(3):
+            buffer.put("Invocations", 1, "Count", {"ToolName": "a"})
+
+        assert len(lines) == 1
+        assert buffer.pending == 0
+
+    def test_未知のモードはエラー(self):
+        with pytest.raises(ValueError):
+            MetricsBuffer(mode="xray")
+
+
+class TestApiMode:
+    """PutMetricData モードのテスト."""
+
+    def test_同じ値をValuesとCountsにまとめてバックグラウンドで送る(self):
+        client = MagicMock()
+        buffer = MetricsBuffer(mode="api", client=client)
+        for value in [10.0, 10.0, 20.0]:
+            buffer.put("ExecutionTime", value, "Milliseconds", {"ToolName": "a"})
+
+        buffer.flush().result(timeout=1.0)
+
+        client.put_metric_data.assert_called_once()
+        [datum] = client.put_metric_data.call_args.kwargs["MetricData"]
+        assert datum["Dimensions"] == [{"Name": "ToolName", "Value": "a"}]
+        assert dict(zip(datum["Values"], datum["Counts"], strict=True)) == {10.0: 2.0, 20.0: 1.0}
+
+    def test_1000件ごとにリクエストを分ける(self):
+        client = MagicMock()
+        buffer = MetricsBuffer(mode="api", client=client, max_buffered=10_000)
+        for i in range(1500):
+            buffer.put("Invocations", 1, "Count", {"ToolName": f"tool{i}"})
+
+        buffer.flush().result(timeout=1.0)
+
+        sizes = [len(c.kwargs["MetricData"]) for c in client.put_metric_data.call_args_list]
+        assert sizes == [1000, 500]
+
+    def test_flushは送信を待たない(self):
+        client = MagicMock()
+        client.put_metric_data.side_effect = lambda **kwargs: time.sleep(0.2)
+        buffer = MetricsBuffer(mode="api", client=client)
+        buffer.put("Invocations", 1, "Count", {"ToolName": "a"})
+
+        start = time.perf_counter()
+        future = buffer.flush()
+        assert time.perf_counter() - start < 0.1
+        future.result(timeout=1.0)
+
+    def test_送信失敗は例外にしない(self):
+        client = MagicMock()
+        client.put_metric_data.side_effect = Exception("CloudWatch error")
+        buffer = MetricsBuffer(mode="api", client=client)
+        buffer.put("Invocations", 1, "Count", {"ToolName": "a"})
+
+        assert buffer.flush().result(timeout=1.0) is None
+
+    def test_空ならなにもしない(self):
+        client = MagicMock()
+        assert MetricsBuffer(mode="api", client=client).flush() is None
+        client.put_metric_data.assert_not_called()
+
+
+class TestPhase:
+    """phase / tool_scope のテスト."""
+
+    def test_ツール実行外では計測しない(self):
+        with phase("fetch"):
+            pass
+
+    def test_同じ名前のフェーズは合算する(self):
+        with tool_scope() as phases_ms:
+            for _ in range(2):
+                with phase("fetch"):
+                    time.sleep(0.01)
+
+        assert phases_ms["fetch"] >= 20
+
+
+class TestRecordToolMetrics:
+    """record_tool_metrics / flush_metrics のテスト."""
+
+    def test_実行時間とフェーズを記録する(self):
+        lines = []
+        buffer = MetricsBuffer(mode="emf", writer=lines.append)
+        with patch("tools.metrics.METRICS_ENABLED", True), \
+                patch("tools.metrics.get_metrics_buffer", return_value=buffer):
+            record_tool_metrics("tool", 30.0, success=True, phases_ms={"fetch": 20.0, "compute": 10.0})
+            flush_metrics()
+
+        docs = [json.loads(line) for line in lines]
+        phases = {d["Phase"]: d["PhaseTime"] for d in docs if "Phase" in d}
+        assert phases == {"fetch": 20.0, "compute": 10.0}
+        phase_directive = next(d for d in docs if "Phase" in d)["_aws"]["CloudWatchMetrics"][0]
+        assert phase_directive["Dimensions"] == [["Phase", "ToolName"]]
+
+    def test_ソース別の取得時間と失敗を記録する(self):
+        lines = []
+        buffer = MetricsBuffer(mode="emf", writer=lines.append)
+        with patch("tools.metrics.METRICS_ENABLED", True), \
+                patch("tools.metrics.get_metrics_buffer", return_value=buffer):
+            record_fetch_metrics("tool", {"race_detail": 120.0, "speed_index": 800.0}, {"speed_index": "timeout"})
+            flush_metrics()
+
+        docs = {d["Source"]: d for d in (json.loads(line) for line in lines)}
+        assert docs["race_detail"]["FetchTime"] == 120.0
+        assert docs["race_detail"]["FetchErrors"] == 0
+        assert docs["speed_index"]["FetchErrors"] == 1
+
+    def test_無効ならなにもしない(self):
+        buffer = MagicMock()
+        with patch("tools.metrics.METRICS_ENABLED", False), \
+                patch("tools.metrics.get_metrics_buffer", return_value=buffer):
+            record_tool_metrics("tool", 30.0, success=True)
+            flush_metrics()
+
+        buffer.put.assert_not_called()
+        buffer.flush.assert_not_called()
@@ -0,0 +1,147 @@
+"""ナレーション実行（期限付き・キャッシュ付き）のテスト."""
+
+import json
+import sys
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from tools.narration import (
+    Narrator,
+    StubNarrationModel,
+    narration_cache_key,
+    with_late_narration,
+)
+
+CONTEXT = {"race_name": "テストレース", "bets": [{"horse_numbers": [1, 2], "expected_value": 1.5}]}
+
+
+def _model(stub: StubNarrationModel):
+    """StubNarrationModel をコンテキストを受け取るモデル関数にする."""
+    return lambda context: stub("system", json.dumps(context, ensure_ascii=False))
+
+
+class TestNarrator:
+    """Narrator のテスト."""
+
+    def test_同じコンテキストはキャッシュから返す(self):
+        narrator = Narrator(deadline=1.0)
+        stub = StubNarrationModel("ナレーション")
+
+        assert narrator.narrate(CONTEXT, _model(stub)) == ("ナレーション", None)
+        assert narrator.narrate(dict(reversed(list(CONTEXT.items()))), _model(stub)) == ("ナレーション", None)
+
+        assert stub.calls == 1
+        assert narrator.stats["hits"] == 1
+
+    def test_期限を過ぎたらNoneと実行中のFutureを返す(self):
+        narrator = Narrator(deadline=0.05)
+        stub = StubNarrationModel("遅いナレーション", delay=5.0)
+
+        start = time.perf_counter()
+        text, pending = narrator.narrate(CONTEXT, _model(stub))
+        elapsed = time.perf_counter() - start
+
+        assert text is None
+        assert elapsed < 1.0
+        assert narrator.stats["timeouts"] == 1
+
+        stub.release()
+        assert pending.result(timeout=1.0) == "遅いナレーション"
+        # 期限後に完了したナレーションもキャッシュされる
+        assert narrator.narrate(CONTEXT, _model(stub)) == ("遅いナレーション", None)
+        assert stub.calls == 1
+
+    def test_実行中の同一コンテキストには相乗りする(self):
+        narrator = Narrator(deadline=0.05)
+        stub = StubNarrationModel("ナレーション", delay=5.0)
+
+        _, first = narrator.narrate(CONTEXT, _model(stub))
+        _, second = narrator.narrate(CONTEXT, _model(stub))
+        stub.release()
+        first.result(timeout=1.0)
+
+        assert first is second
+        assert stub.calls == 1
+
+    def test_失敗はキャッシュせず次回再試行する(self):
+        narrator = Narrator(deadline=1.0)
+        calls = []
+
+        def failing(context):
+            calls.append(context)
+            raise RuntimeError("bedrock down")
+
+        assert narrator.narrate(CONTEXT, failing) == (None, None)
+        assert narrator.narrate(CONTEXT, lambda context: None) == (None, None)
+        assert narrator.stats["cache_size"] == 0
+        assert len(calls) == 1
+
+    def test_上限を超えたら古いものから捨てる(self):
+        narrator = Narrator(deadline=1.0, max_entries=2)
+        for i in range(3):
+            narrator.narrate({"i": i}, lambda context: f"text{context['i']}")
+
+        assert narrator.stats["cache_size"] == 2
+        assert narrator.stats["misses"] == 3
+        narrator.narrate({"i": 0}, lambda context: "再生成")
+        assert narrator.stats["misses"] == 4
+
+
+class TestWithLateNarration:
+    """with_late_narration のテスト."""
+
+    def test_完了したテキストで差し替えた新しいdictを返す(self):
+        narrator = Narrator(deadline=0.01)
+        stub = StubNarrationModel("届いたナレーション", delay=5.0)
+        result = {"analysis_comment": "テンプレート"}
+
+        _, pending = narrator.narrate(CONTEXT, _model(stub))
+        assert with_late_narration(result, pending, "analysis_comment") is result
+        stub.release()
+        pending.result(timeout=1.0)
+
+        updated = with_late_narration(result, pending, "analysis_comment")
+        assert updated == {"analysis_comment": "届いたナレーション"}
+        assert result == {"analysis_comment": "テンプレート"}
+
+    def test_失敗時は差し替えない(self):
+        narrator = Narrator(deadline=0.01)
+        release = threading.Event()
+
+        def slow_failure(context):
+            release.wait(5.0)
+            return None
+
+        result = {"analysis_comment": "テンプレート"}
+        _, pending = narrator.narrate(CONTEXT, slow_failure)
+        release.set()
+        pending.result(timeout=1.0)
+
+        assert with_late_narration(result, pending, "analysis_comment") is result
+
+    def test_Futureなしならそのまま返す(self):
+        result = {"analysis_comment": "テンプレート"}
+        assert with_late_narration(result, None, "analysis_comment") is result
+
+
+class TestNarrationCacheKey:
+    """narration_cache_key のテスト."""
+
+    def test_内容が違えば別のキー(self):
+        assert narration_cache_key({"a": 1}) != narration_cache_key({"a": 2})
+
+    def test_Decimalを含んでもキーを作れる(self):
+        assert narration_cache_key({"v": Decimal("1.5")}) == narration_cache_key({"v": Decimal("1.5")})
+
+
+class TestStubNarrationModel:
+    """StubNarrationModel のテスト."""
+
+    def test_4セクションの固定応答を返す(self):
+        text = StubNarrationModel()("system", json.dumps(CONTEXT))
+        for section in ["【軸馬選定】", "【券種】", "【組み合わせ】", "【リスク】"]:
+            assert section in text
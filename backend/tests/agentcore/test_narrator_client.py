@@ -0,0 +1,115 @@
+"""ナレーション用 Bedrock クライアント層のテスト."""
+
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from tools import narrator_client
+from tools.bet_proposal import _invoke_haiku_narrator
+from tools.narration import StubNarrationModel
+from tools.narrator_client import (
+    NarrationBudgetExceededError,
+    NarratorClient,
+    StubBedrockRuntime,
+    get_narrator_client,
+)
+
+FOUR_SECTIONS = "【軸馬選定】軸。\n\n【券種】馬連。\n\n【組み合わせ】相手。\n\n【リスク】混戦。"
+
+
+class TestNarratorClient:
+    """NarratorClient のテスト."""
+
+    def test_ストリームを連結して全文を返す(self):
+        client = NarratorClient(client=StubBedrockRuntime(StubNarrationModel(FOUR_SECTIONS), chunk_size=4))
+
+        assert client.complete("system", "{}") == FOUR_SECTIONS
+
+    def test_TTFTと総時間を記録する(self):
+        stub = StubBedrockRuntime(StubNarrationModel(FOUR_SECTIONS), chunk_size=8, chunk_delay=0.005)
+        client = NarratorClient(client=stub)
+
+        client.complete("system", "{}")
+
+        call = client.recent_calls[-1]
+        assert 0 < call["ttft_ms"] < call["total_ms"]
+        assert call["stop_reason"] == "end_turn"
+        assert call["output_tokens"] > 0
+        assert call["budget_exceeded"] is False
+
+    def test_出力トークン上限を渡す(self):
+        stub = StubBedrockRuntime(StubNarrationModel("x" * 100), chunk_size=1)
+        client = NarratorClient(client=stub, max_tokens=10)
+
+        assert client.complete("system", "{}") == "x" * 10
+        assert client.recent_calls[-1]["stop_reason"] == "max_tokens"
+
+    def test_時間予算を超えたら打ち切る(self):
+        stub = StubBedrockRuntime(StubNarrationModel("x" * 100), chunk_size=1, chunk_delay=0.01)
+        client = NarratorClient(client=stub, time_budget=0.05)
+
+        with pytest.raises(NarrationBudgetExceededError):
+            client.complete("system", "{}")
+
+        call = client.recent_calls[-1]
+        assert call["budget_exceeded"] is True
+        assert call["total_ms"] < 500
+
+    def test_ConverseStreamのパラメータ(self):
+        bedrock = MagicMock()
+        bedrock.converse_stream.return_value = {"stream": []}
+        client = NarratorClient(client=bedrock, model_id="test-model", max_tokens=256)
+
+        client.complete("system prompt", "user message")
+
+        bedrock.converse_stream.assert_called_once_with(
+            modelId="test-model",
+            system=[{"text": "system prompt"}],
+            messages=[{"role": "user", "content": [{"text": "user message"}]}],
+            inferenceConfig={"maxTokens": 256, "temperature": narrator_client.NARRATOR_TEMPERATURE},
+        )
+
+    @patch("tools.narrator_client.boto3.client")
+    def test_接続プールとキープアライブ付きでクライアントを作る(self, mock_client):
+        NarratorClient(region="ap-northeast-1", endpoint_url="http://localhost:8081")
+
+        kwargs = mock_client.call_args.kwargs
+        assert mock_client.call_args.args == ("bedrock-runtime",)
+        assert kwargs["endpoint_url"] == "http://localhost:8081"
+        assert kwargs["config"].tcp_keepalive is True
+        assert kwargs["config"].max_pool_connections >= 1
+
+
+class TestGetNarratorClient:
+    """get_narrator_client のテスト."""
+
+    @pytest.fixture(autouse=True)
+    def reset(self):
+        with patch.object(narrator_client, "_narrator_client", None):
+            yield
+
+    def test_stubならローカルのスタンドインを使う(self):
+        with patch.object(narrator_client, "NARRATOR_BACKEND", "stub"):
+            client = get_narrator_client()
+
+        assert "【リスク】" in client.complete("system", '{"bets": []}')
+        assert get_narrator_client() is client
+
+
+class TestInvokeHaikuNarratorWithClient:
+    """_invoke_haiku_narrator とクライアント層の結合テスト."""
+
+    def test_ストリーミング結果がナレーションになる(self):
+        client = NarratorClient(client=StubBedrockRuntime(StubNarrationModel(FOUR_SECTIONS)))
+        with patch("tools.bet_proposal.get_narrator_client", return_value=client):
+            assert _invoke_haiku_narrator({"bets": []}) == FOUR_SECTIONS
+
+    def test_時間予算超過はNoneを返す(self):
+        stub = StubBedrockRuntime(StubNarrationModel(FOUR_SECTIONS), chunk_size=1, chunk_delay=0.01)
+        client = NarratorClient(client=stub, time_budget=0.02)
+        with patch("tools.bet_proposal.get_narrator_client", return_value=client):
+            assert _invoke_haiku_narrator({"bets": []}) is None
@@ -2,14 +2,15 @@
 
 import sys
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
 import pytest
 import requests
 
 try:
     sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
-    from tools.odds_analysis import analyze_odds_movement, _estimate_fair_odds_from_ai
+    from tools.odds_analysis import analyze_odds_movement, _analyze_time_based_movements, _estimate_fair_odds_from_ai
+    from tools.odds_series import OddsSeries
     STRANDS_AVAILABLE = True
 except ImportError:
     STRANDS_AVAILABLE = False
@@ -27,12 +28,10 @@ def mock_jravan_client():
 class TestAnalyzeOddsMovement:
     """オッズ分析統合テスト."""
 
-    @patch("tools.odds_analysis.cached_get")
+    @patch("tools.odds_analysis.cached_get_json")
     def test_正常系_オッズを分析(self, mock_get):
         """正常系: オッズデータを正しく分析できる."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        mock_get.return_value = {
             "odds_history": [
                 {
                     "timestamp": "10:00",
@@ -50,7 +49,6 @@ class TestAnalyzeOddsMovement:
                 },
             ],
         }
-        mock_get.return_value = mock_response
 
         result = analyze_odds_movement(
             race_id="202601250611",
@@ -60,7 +58,7 @@ class TestAnalyzeOddsMovement:
         # 正常系では明示的にerrorがないことを確認
         assert "error" not in result, f"Unexpected error: {result.get('error')}"
 
-    @patch("tools.odds_analysis.cached_get")
+    @patch("tools.odds_analysis.cached_get_json")
     def test_RequestException時にエラーを返す(self, mock_get):
         """異常系: RequestException発生時はerrorを返す."""
         mock_get.side_effect = requests.RequestException("Connection failed")
@@ -73,6 +71,34 @@ class TestAnalyzeOddsMovement:
         assert "error" in result
 
 
+class TestAnalyzeTimeBasedMovements:
+    """時間帯別変動分析のテスト."""
+
+    def _history(self) -> list[dict]:
+        # 09:00〜15:00 の毎時。2番は 13:00〜14:00 に下落、3番は最後の1時間に下落
+        odds_2 = [10.0, 10.0, 10.0, 10.0, 10.0, 6.0, 6.0]
+        odds_3 = [20.0, 20.0, 20.0, 20.0, 20.0, 20.0, 12.0]
+        return [
+            {
+                "timestamp": f"2026-02-01T{9 + i:02d}:00:00",
+                "odds": [
+                    {"horse_number": 1, "horse_name": "馬1", "odds": 3.0},
+                    {"horse_number": 2, "horse_name": "馬2", "odds": odds_2[i]},
+                    {"horse_number": 3, "horse_name": "馬3", "odds": odds_3[i]},
+                ],
+            }
+            for i in range(7)
+        ]
+
+    def test_締切前1時間はタイムスタンプで切り出す(self):
+        result = _analyze_time_based_movements(OddsSeries.from_history(self._history()), None)
+
+        assert [m["horse_number"] for m in result["final_hour_movements"]] == [3]
+        assert [m["horse_number"] for m in result["late_surge_horses"]] == [3]
+        assert [m["horse_number"] for m in result["early_movements"]] == [2]
+        assert result["window_basis"] == "timestamp"
+
+
 class TestEstimateFairOddsFromAi:
     """AI指数からフェアオッズ推定のテスト（対数線形補間）."""
 
@@ -0,0 +1,119 @@
+"""単勝オッズ履歴の時系列エンジンのテスト."""
+
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from tools.odds_series import OddsSeries
+
+
+def _snapshot(timestamp, odds: dict[int, float]) -> dict:
+    return {
+        "timestamp": timestamp,
+        "odds": [{"horse_number": hn, "horse_name": f"馬{hn}", "odds": o} for hn, o in odds.items()],
+    }
+
+
+def _history() -> list[dict]:
+    """発売開始 13:00、締切 15:30。3番は締切前30分で急落."""
+    return [
+        _snapshot("2026-02-01T13:00:00", {1: 3.0, 2: 5.0, 3: 20.0}),
+        _snapshot("2026-02-01T14:00:00", {1: 2.8, 2: 5.5, 3: 19.0}),
+        _snapshot("2026-02-01T14:30:00", {1: 2.9, 2: 6.0, 3: 18.0}),
+        _snapshot("2026-02-01T15:00:00", {1: 3.0, 2: 6.2, 3: 12.0}),
+        _snapshot("2026-02-01T15:30:00", {1: 3.1, 2: 6.6, 3: 9.0}),
+    ]
+
+
+class TestFromHistory:
+    """OddsSeries.from_history のテスト."""
+
+    def test_馬と時刻の行列にする(self):
+        series = OddsSeries.from_history(_history())
+
+        assert series.horse_numbers == [1, 2, 3]
+        assert len(series) == 5
+        assert series.odds[2] == [20.0, 19.0, 18.0, 12.0, 9.0]
+        assert series.times[1] - series.times[0] == 3600
+        assert series.window_basis == "timestamp"
+
+    def test_時刻順に並べ直す(self):
+        history = _history()
+        series = OddsSeries.from_history([history[3], history[0], history[4], history[1], history[2]])
+
+        assert series.odds[2] == [20.0, 19.0, 18.0, 12.0, 9.0]
+
+    def test_欠けた馬とオッズなしはNaN(self):
+        series = OddsSeries.from_history([
+            _snapshot("10:00", {1: 3.0, 2: 0}),
+            _snapshot("10:05", {1: 2.5, 2: 4.0, 3: 8.0}),
+        ])
+
+        assert math.isnan(series.odds[1][0])
+        assert math.isnan(series.odds[2][0])
+        assert series.times == [36000.0, 36300.0]
+
+    def test_タイムスタンプが読めなければ並び順を使う(self):
+        series = OddsSeries.from_history([_snapshot("", {1: 3.0})] * 6)
+
+        assert series.window_basis == "position"
+        assert series.last_minutes(60) == (3, 6)
+
+
+class TestWindows:
+    """時間窓のテスト."""
+
+    def test_締切前N分は開始時点の値を持つ列から(self):
+        series = OddsSeries.from_history(_history())
+
+        assert series.last_minutes(60) == (2, 5)
+        assert series.last_minutes(45) == (2, 5)
+        assert series.last_minutes(30) == (3, 5)
+        assert series.last_minutes(600) == (0, 5)
+
+    def test_発売開始からの範囲(self):
+        series = OddsSeries.from_history(_history())
+
+        assert series.since_open() == (0, 5)
+        assert series.since_open(until=2) == (0, 3)
+
+
+class TestSignals:
+    """変動率・ボラティリティ・資金流入のテスト."""
+
+    def test_窓ごとの変動率(self):
+        series = OddsSeries.from_history(_history())
+
+        rates = series.change_rates(series.last_minutes(60))
+
+        assert rates[3] == pytest.approx(-50.0)
+        assert rates[1] == pytest.approx((3.1 - 2.9) / 2.9 * 100)
+        assert set(series.change_rates(series.since_open(), [2])) == {2}
+
+    def test_取消馬は変動率に含めない(self):
+        history = _history()
+        history[-1]["odds"] = [o for o in history[-1]["odds"] if o["horse_number"] != 2]
+        series = OddsSeries.from_history(history)
+
+        assert 2 not in series.change_rates(series.since_open())
+
+    def test_ボラティリティは値動きの大きい馬ほど大きい(self):
+        series = OddsSeries.from_history(_history())
+
+        volatility = series.volatility(series.since_open())
+
+        assert volatility[3] > volatility[1] > 0
+
+    def test_締切前の資金流入(self):
+        series = OddsSeries.from_history(_history())
+
+        late = series.late_money(60)
+
+        assert [s["horse_number"] for s in late] == [3]
+        assert late[0]["change_rate"] == -50.0
+        assert late[0]["implied_share_change"] > 0
+        assert series.late_money(60, horse_numbers=[1]) == []
@@ -0,0 +1,110 @@
+"""Plackett–Luce モンテカルロ確率エンジンのテスト."""
+
+import random
+import sys
+from itertools import combinations, permutations
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from tools.harville import HarvilleTables
+from tools.plackett_luce import PlackettLuceSimulator, get_plackett_luce_simulator
+
+
+def _random_probs(n: int, seed: int = 1) -> dict[int, float]:
+    rng = random.Random(seed)
+    weights = [rng.random() ** 2 + 0.02 for _ in range(n)]
+    total = sum(weights)
+    return {i + 1: w / total for i, w in enumerate(weights)}
+
+
+@pytest.fixture(scope="module")
+def probs():
+    return _random_probs(8)
+
+
+@pytest.fixture(scope="module")
+def simulator(probs):
+    return PlackettLuceSimulator(probs, n_samples=200_000, seed=3)
+
+
+class TestPlackettLuceSimulator:
+    """PlackettLuceSimulator のテスト."""
+
+    @pytest.mark.parametrize("bet_type,size", [
+        ("exacta", 2), ("quinella", 2), ("quinella_place", 2), ("trio", 3), ("trifecta", 3),
+    ])
+    def test_Harvilleの厳密値に標準誤差の範囲で収束する(self, probs, simulator, bet_type, size):
+        harville = HarvilleTables(probs)
+        for combo in permutations(probs, size):
+            expected = harville.probability(list(combo), bet_type)
+            error = max(simulator.standard_error(list(combo), bet_type), 1 / simulator.n_samples)
+            assert abs(simulator.probability(list(combo), bet_type) - expected) < 5 * error
+
+    def test_単勝は勝率に近い(self, probs, simulator):
+        for h, p in probs.items():
+            assert simulator.probability([h], "win") == pytest.approx(p, abs=0.005)
+
+    def test_全券種の確率の総和が整合する(self, probs, simulator):
+        horses = list(probs)
+        assert sum(simulator.probability([h], "place") for h in horses) == pytest.approx(3.0)
+        assert sum(simulator.probability(list(c), "trifecta") for c in permutations(horses, 3)) == pytest.approx(1.0)
+        assert sum(simulator.probability(list(c), "trio") for c in combinations(horses, 3)) == pytest.approx(1.0)
+        quinella_place = sum(simulator.probability(list(c), "quinella_place") for c in combinations(horses, 2))
+        assert quinella_place == pytest.approx(3.0)
+
+    def test_三連複と馬連は順不同で参照できる(self, simulator):
+        assert simulator.probability([3, 1, 2], "trio") == simulator.probability([1, 2, 3], "trio")
+        assert simulator.probability([2, 1], "quinella") == simulator.probability([1, 2], "quinella")
+
+    def test_同じシードなら同じ推定値(self, probs):
+        a = PlackettLuceSimulator(probs, n_samples=5_000, seed=11)
+        b = PlackettLuceSimulator(probs, n_samples=5_000, seed=11)
+        assert all(
+            a.probability(list(c), "trifecta") == b.probability(list(c), "trifecta")
+            for c in permutations(probs, 3)
+        )
+
+    def test_バッチに分けてもサンプル数は変わらない(self, probs):
+        simulator = PlackettLuceSimulator(probs, n_samples=10_001, seed=1, batch_size=1_000)
+        assert sum(simulator.probability([h], "win") for h in probs) == pytest.approx(1.0)
+
+    def test_勝率0の馬は3着以内に入らない(self):
+        simulator = PlackettLuceSimulator({1: 0.5, 2: 0.5, 3: 0.0, 4: 0.0}, n_samples=1_000)
+        assert simulator.probability([3], "place") == 0.0
+        assert simulator.probability([1, 2, 3], "trio") == 0.0
+        # 3着が決まらないサンプルでも馬連・ワイドは数える
+        assert simulator.probability([1, 2], "quinella") == 1.0
+        assert simulator.probability([1, 2], "quinella_place") == 1.0
+
+    def test_勝率にない馬番は0(self, simulator):
+        assert simulator.probability([1, 99], "exacta") == 0.0
+        assert simulator.probability([99], "win") == 0.0
+
+    def test_サンプル数は正でなければならない(self, probs):
+        with pytest.raises(ValueError):
+            PlackettLuceSimulator(probs, n_samples=0)
+
+
+class TestGetPlackettLuceSimulator:
+    """get_plackett_luce_simulator のテスト."""
+
+    def test_同じ勝率と設定ならエンジンを使い回す(self):
+        probs = _random_probs(6, seed=5)
+        assert get_plackett_luce_simulator(probs, n_samples=1_000) is get_plackett_luce_simulator(
+            dict(reversed(list(probs.items()))), n_samples=1_000,
+        )
+
+    def test_サンプル数が違えば別のエンジン(self):
+        probs = _random_probs(6, seed=5)
+        assert get_plackett_luce_simulator(probs, n_samples=1_000) is not get_plackett_luce_simulator(
+            probs, n_samples=2_000,
+        )
+
+    def test_シードなしなら毎回シミュレーションする(self):
+        probs = _random_probs(6, seed=5)
+        assert get_plackett_luce_simulator(probs, n_samples=1_000, seed=None) is not get_plackett_luce_simulator(
+            probs, n_samples=1_000, seed=None,
+        )
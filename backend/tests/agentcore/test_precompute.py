@@ -0,0 +1,323 @@
+"""買い目提案の事前計算のテスト."""
+
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from tools import precompute
+from tools.ev_proposer import DEFAULT_BET_TYPES
+from tools.precompute import (
+    PrecomputeStore,
+    odds_changed_materially,
+    odds_version,
+    precompute_race,
+    precomputed_candidates,
+    run_precompute,
+)
+from tools.shared_cache import SQLiteCacheBackend
+
+RACE_ID = "202602010511"
+
+
+@pytest.fixture
+def store(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"))
+    yield PrecomputeStore(backend)
+    backend.close()
+
+
+def _all_odds(win: dict[str, float]) -> dict:
+    numbers = sorted(int(hn) for hn in win)
+    pairs = {f"{a}-{b}": 8.0 for a in numbers for b in numbers if a < b}
+    return {
+        "win": win,
+        "place": {},
+        "quinella": pairs,
+        "quinella_place": dict.fromkeys(pairs, 3.0),
+        "exacta": {f"{a}-{b}": 15.0 for a in numbers for b in numbers if a != b},
+        "trio": {},
+        "trifecta": {},
+    }
+
+
+def _analysis() -> dict:
+    return {
+        "race_info": {"race_id": RACE_ID, "race_name": "テスト"},
+        "horses": [
+            {"number": hn, "name": f"馬{hn}", "odds": 4.0, "ai_predictions": {}, "running_style": None,
+             "speed_index": None}
+            for hn in (1, 2, 3, 4)
+        ],
+    }
+
+
+def _ai_result() -> dict:
+    return {"sources": [{"source": "AI-A", "predictions": [
+        {"horse_number": 1, "score": 40, "rank": 1},
+        {"horse_number": 2, "score": 30, "rank": 2},
+        {"horse_number": 3, "score": 20, "rank": 3},
+        {"horse_number": 4, "score": 10, "rank": 4},
+    ]}]}
+
+
+def _patch_sources(win: dict[str, float], analysis: MagicMock | None = None):
+    return (
+        patch("tools.ev_proposer._fetch_all_odds", return_value=_all_odds(win)),
+        patch("tools.race_analyzer._collect_race_analysis", analysis or MagicMock(return_value=_analysis())),
+        patch("tools.race_signals.load_race_signals", return_value={RACE_ID: {"ai_prediction": _ai_result()}}),
+    )
+
+
+WIN_ODDS = {"1": 2.5, "2": 4.0, "3": 6.0, "4": 12.0}
+
+
+class TestOddsChange:
+    """単勝オッズの変化判定のテスト."""
+
+    def test_小さな変動は作り直さない(self):
+        assert not odds_changed_materially(WIN_ODDS, WIN_ODDS | {"4": 13.0})
+
+    def test_比率以上の変動で作り直す(self):
+        assert odds_changed_materially(WIN_ODDS, WIN_ODDS | {"4": 20.0})
+
+    def test_取消で作り直す(self):
+        assert odds_changed_materially(WIN_ODDS, {k: v for k, v in WIN_ODDS.items() if k != "3"})
+
+    def test_1番人気の入れ替わりで作り直す(self):
+        assert odds_changed_materially({"1": 3.0, "2": 3.3}, {"1": 3.4, "2": 3.0})
+
+    def test_拮抗した1番人気の小さな入れ替わりでは作り直さない(self):
+        assert not odds_changed_materially({"1": 3.0, "2": 3.1}, {"1": 3.1, "2": 3.0})
+
+    def test_版は内容だけで決まる(self):
+        assert odds_version(WIN_ODDS) == odds_version(dict(reversed(list(WIN_ODDS.items()))))
+        assert odds_version(WIN_ODDS) != odds_version(WIN_ODDS | {"4": 13.0})
+
+
+class TestPrecomputeStore:
+    """PrecomputeStore のテスト."""
+
+    def test_書き込んだ結果を読める(self, store):
+        assert store.put(RACE_ID, {"race_id": RACE_ID})
+
+        assert store.get(RACE_ID) == {"race_id": RACE_ID}
+        assert store.get("202602010512") is None
+
+    def test_期限切れは返さない(self, tmp_path):
+        backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"))
+        expired = PrecomputeStore(backend, ttl_seconds=-1)
+        expired.put(RACE_ID, {"race_id": RACE_ID})
+
+        assert expired.get(RACE_ID) is None
+        backend.close()
+
+    def test_バックエンドの障害は未計算として扱う(self):
+        backend = MagicMock()
+        backend.get.side_effect = RuntimeError("down")
+        backend.put.side_effect = RuntimeError("down")
+        broken = PrecomputeStore(backend)
+
+        assert broken.get(RACE_ID) is None
+        assert not broken.put(RACE_ID, {})
+
+
+class TestPrecomputeRace:
+    """precompute_race のテスト."""
+
+    def test_分析と統合勝率とEV候補表を保存する(self, store):
+        # 取得時間は計算時点のものなので保存しない
+        diagnostics = {"fetch_diagnostics": {"timings_ms": {"race_detail": 120}, "failed": []}}
+        analysis = MagicMock(return_value=_analysis() | diagnostics)
+        p1, p2, p3 = _patch_sources(WIN_ODDS, analysis)
+        with p1, p2, p3:
+            assert precompute_race(RACE_ID, store) == "computed"
+
+        entry = store.get(RACE_ID)
+        assert entry["odds_version"] == odds_version(WIN_ODDS)
+        assert entry["analysis"] == _analysis()
+        assert entry["unified_probs"] == pytest.approx({"1": 0.4, "2": 0.3, "3": 0.2, "4": 0.1})
+        assert entry["ev_candidates"]
+        evs = [c["expected_value"] for c in entry["ev_candidates"]]
+        assert evs == sorted(evs, reverse=True)
+        assert {c["bet_type"] for c in entry["ev_candidates"]} <= set(DEFAULT_BET_TYPES)
+
+    def test_オッズが動いていなければ分析をやり直さない(self, store):
+        analysis = MagicMock(return_value=_analysis())
+        p1, p2, p3 = _patch_sources(WIN_ODDS, analysis)
+        with p1, p2, p3:
+            precompute_race(RACE_ID, store)
+        p1, p2, p3 = _patch_sources(WIN_ODDS | {"4": 13.0}, analysis)
+        with p1, p2, p3:
+            assert precompute_race(RACE_ID, store) == "unchanged"
+
+        assert analysis.call_count == 1
+        assert store.get(RACE_ID)["odds_version"] == odds_version(WIN_ODDS)
+
+    def test_オッズが動いていなくてもオッズとEV候補表は最新にする(self, store):
+        analysis = MagicMock(return_value=_analysis())
+        p1, p2, p3 = _patch_sources(WIN_ODDS, analysis)
+        with p1, p2, p3:
+            precompute_race(RACE_ID, store)
+        before = store.get(RACE_ID)
+        drifted = _all_odds(WIN_ODDS | {"4": 13.0})
+        drifted["quinella"] = dict.fromkeys(drifted["quinella"], 30.0)
+        with patch("tools.ev_proposer._fetch_all_odds", return_value=drifted):
+            assert precompute_race(RACE_ID, store) == "unchanged"
+
+        entry = store.get(RACE_ID)
+        assert entry["all_odds"] == drifted
+        assert entry["ev_candidates"] != before["ev_candidates"]
+        assert {r["horse_number"]: r["odds"] for r in entry["runners_data"]}[4] == 13.0
+        assert {h["number"]: h["odds"] for h in entry["analysis"]["horses"]}[4] == 13.0
+        # 作り直しの判定の基準は作成時のまま
+        assert entry["win_odds"] == WIN_ODDS
+        assert entry["unified_probs"] == before["unified_probs"]
+
+    def test_オッズが大きく動けば作り直す(self, store):
+        analysis = MagicMock(return_value=_analysis())
+        p1, p2, p3 = _patch_sources(WIN_ODDS, analysis)
+        with p1, p2, p3:
+            precompute_race(RACE_ID, store)
+        moved = WIN_ODDS | {"1": 5.0}
+        p1, p2, p3 = _patch_sources(moved, analysis)
+        with p1, p2, p3:
+            assert precompute_race(RACE_ID, store) == "computed"
+
+        assert analysis.call_count == 2
+        assert store.get(RACE_ID)["odds_version"] == odds_version(moved)
+
+    def test_分析できなければ保存しない(self, store):
+        p1, p2, p3 = _patch_sources(WIN_ODDS, MagicMock(return_value={"error": "AI予想の取得に失敗"}))
+        with p1, p2, p3:
+            assert precompute_race(RACE_ID, store) == "skipped"
+
+        assert store.get(RACE_ID) is None
+
+
+class TestRunPrecompute:
+    """run_precompute のテスト."""
+
+    def test_開催日の全レースを対象にする(self, store):
+        table = MagicMock()
+        table.query.return_value = {"Items": [
+            {"race_id": "202602010511", "source": "ai-shisu"},
+            {"race_id": "202602010511", "source": "muryou-keiba-ai"},
+            {"race_id": "202602010512", "source": "ai-shisu"},
+        ]}
+        with patch.object(precompute, "get_precompute_store", return_value=store), \
+                patch("tools.ai_prediction.get_dynamodb_table", return_value=table), \
+                patch.object(precompute, "precompute_race", return_value="computed") as run:
+            result = run_precompute(date="20260201")
+
+        assert result == {"results": {"202602010511": "computed", "202602010512": "computed"}}
+        assert run.call_count == 2
+
+    def test_1レースの失敗で止まらない(self, store):
+        with patch.object(precompute, "get_precompute_store", return_value=store), \
+                patch.object(precompute, "precompute_race", side_effect=[RuntimeError("x"), "computed"]):
+            result = run_precompute(race_ids=["202602010511", "202602010512"])
+
+        assert result["results"] == {"202602010511": "failed", "202602010512": "computed"}
+
+    def test_保存先が無効ならエラー(self):
+        with patch.object(precompute, "get_precompute_store", return_value=None):
+            assert "error" in run_precompute(race_ids=[RACE_ID])
+
+
+class TestToolsReadPrecomputed:
+    """ツールが事前計算結果を先に読むことのテスト."""
+
+    @pytest.fixture
+    def entry(self, store):
+        p1, p2, p3 = _patch_sources(WIN_ODDS)
+        with p1, p2, p3:
+            precompute_race(RACE_ID, store)
+        with patch.object(precompute, "get_precompute_store", return_value=store):
+            yield store.get(RACE_ID)
+
+    def test_分析はデータを取得せずに返す(self, entry):
+        from tools.race_analyzer import analyze_race_for_betting
+
+        with patch("tools.race_analyzer._collect_race_analysis", side_effect=AssertionError("fetched")):
+            result = analyze_race_for_betting(race_id=RACE_ID)
+
+        assert len(result["horses"]["rows"]) == 4
+        # 事前計算のメタデータは LLM に渡さない
+        assert "precomputed" not in result
+
+    def test_統合勝率どおりならEV候補表を使う(self, entry):
+        from tools.ev_proposer import get_last_ev_proposal_result, propose_bets, set_betting_preference
+
+        set_betting_preference(None)
+        with patch("tools.ev_proposer._generate_ev_candidates", side_effect=AssertionError("generated")), \
+                patch("tools.ev_proposer._fetch_all_odds", return_value=entry["all_odds"]), \
+                patch("tools.ev_proposer._invoke_haiku_narrator", return_value=None):
+            propose_bets(race_id=RACE_ID, win_probabilities=entry["unified_probs"], budget=1000)
+
+        result = get_last_ev_proposal_result()
+        assert result["proposed_bets"]
+        assert result["total_amount"] <= 1000
+
+    def test_LLMが勝率を変えれば候補を作り直す(self, entry):
+        from tools.ev_proposer import get_last_ev_proposal_result, propose_bets, set_betting_preference
+
+        set_betting_preference(None)
+        probs = {"1": 0.25, "2": 0.25, "3": 0.25, "4": 0.25}
+        with patch("tools.ev_proposer._fetch_all_odds", return_value=entry["all_odds"]), \
+                patch("tools.ev_proposer._invoke_haiku_narrator", return_value=None):
+            propose_bets(race_id=RACE_ID, win_probabilities=probs, budget=1000)
+
+        assert get_last_ev_proposal_result() is not None
+        assert precomputed_candidates(
+            entry, {int(k): v for k, v in probs.items()}, DEFAULT_BET_TYPES, None, entry["all_odds"],
+        ) is None
+
+    def test_勝率がわずかでも違えば候補表を使わない(self, entry):
+        probs = {int(hn): p for hn, p in entry["unified_probs"].items()}
+        probs[4] += 0.001
+
+        assert precomputed_candidates(entry, probs, DEFAULT_BET_TYPES, None, entry["all_odds"]) is None
+
+    def test_オッズが保存時と違えば候補表を使わない(self, entry):
+        probs = {int(hn): p for hn, p in entry["unified_probs"].items()}
+        moved = entry["all_odds"] | {"quinella": dict.fromkeys(entry["all_odds"]["quinella"], 30.0)}
+
+        assert precomputed_candidates(entry, probs, DEFAULT_BET_TYPES, None, moved) is None
+
+    def test_単勝オッズが大きく動いていれば事前計算を使わず現在のオッズで作る(self, entry):
+        from tools.ev_proposer import get_last_ev_proposal_result, propose_bets, set_betting_preference
+
+        set_betting_preference(None)
+        moved = _all_odds(WIN_ODDS | {"1": 5.0})
+        race_detail = {"race": {"horse_count": 4}, "runners": entry["runners_data"]}
+        with patch("tools.ev_proposer._fetch_all_odds", return_value=moved), \
+                patch("tools.race_data._fetch_race_detail", return_value=race_detail) as fetch_detail, \
+                patch("tools.ev_proposer._invoke_haiku_narrator", return_value=None), \
+                patch("tools.precompute.precomputed_candidates", side_effect=AssertionError("used")):
+            propose_bets(race_id=RACE_ID, win_probabilities=entry["unified_probs"], budget=1000)
+
+        assert get_last_ev_proposal_result()["proposed_bets"]
+        # 事前計算の出走馬も使わず取り直す
+        fetch_detail.assert_called_once_with(RACE_ID)
+
+    def test_好み設定があれば候補表を使わない(self, entry):
+        probs = {int(hn): p for hn, p in entry["unified_probs"].items()}
+
+        odds = entry["all_odds"]
+        assert precomputed_candidates(entry, probs, DEFAULT_BET_TYPES, None, odds) == entry["ev_candidates"]
+        assert precomputed_candidates(entry, probs, DEFAULT_BET_TYPES, {"min_ev": 1.5}, odds) is None
+        assert precomputed_candidates(entry, probs, ["trio"], None, odds) is None
+
+
+def test_時刻は保存時点(store):
+    p1, p2, p3 = _patch_sources(WIN_ODDS)
+    before = int(time.time())
+    with p1, p2, p3:
+        precompute_race(RACE_ID, store)
+
+    assert store.get(RACE_ID)["computed_at"] >= before
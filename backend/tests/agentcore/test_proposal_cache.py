@@ -0,0 +1,196 @@
+"""買い目提案の応答共有キャッシュのテスト."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from tools.precompute import odds_version
+from tools.proposal_cache import ProposalCache, current_odds_version, preference_hash
+from tools.shared_cache import SQLiteCacheBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    b = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"))
+    yield b
+    b.close()
+
+
+@pytest.fixture
+def cache(backend):
+    return ProposalCache(backend, wait_seconds=1, poll_interval=0.01)
+
+
+def _counting_compute(delay: float = 0):
+    calls = []
+
+    def compute() -> dict:
+        calls.append(1)
+        time.sleep(delay)
+        return {"message": f"提案{len(calls)}", "bet_actions": []}
+
+    return compute, calls
+
+
+def _always(response: dict) -> bool:
+    return True
+
+
+class TestPreferenceHash:
+    """preference_hash のテスト."""
+
+    def test_設定なしは既定(self):
+        assert preference_hash(None) == preference_hash({}) == "default"
+
+    def test_キー順に依存しない(self):
+        assert preference_hash({"a": 1, "b": [2]}) == preference_hash({"b": [2], "a": 1})
+        assert preference_hash({"a": 1}) != preference_hash({"a": 2})
+
+
+class TestGetOrCompute:
+    """ProposalCache.get_or_compute のテスト."""
+
+    def test_2回目は保存した応答を返す(self, cache):
+        compute, calls = _counting_compute()
+        key = cache.make_key("R1", "v1", None)
+
+        first = cache.get_or_compute(key, compute, _always)
+        second = cache.get_or_compute(key, compute, _always)
+
+        assert len(calls) == 1
+        assert second == first
+        assert cache.stats == {"hits": 1, "misses": 1, "shared": 0}
+
+    def test_オッズの版や好み設定が違えば作り直す(self, cache):
+        compute, calls = _counting_compute()
+
+        cache.get_or_compute(cache.make_key("R1", "v1", None), compute, _always)
+        cache.get_or_compute(cache.make_key("R1", "v2", None), compute, _always)
+        cache.get_or_compute(cache.make_key("R1", "v2", {"selected_bet_types": ["trio"]}), compute, _always)
+
+        assert len(calls) == 3
+
+    def test_共有できない応答は保存しない(self, cache):
+        compute, calls = _counting_compute()
+        key = cache.make_key("R1", "v1", None)
+
+        cache.get_or_compute(key, compute, lambda r: False)
+        cache.get_or_compute(key, compute, lambda r: False)
+
+        assert len(calls) == 2
+
+    def test_同時の呼び出しは作成中の応答に相乗りする(self, cache):
+        compute, calls = _counting_compute(delay=0.1)
+        key = cache.make_key("R1", "v1", None)
+        results = []
+
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute(key, compute, _always)))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert [r["message"] for r in results] == ["提案1"] * 5
+
+    def test_返した応答を変更しても他の呼び出しに影響しない(self, cache):
+        compute, _ = _counting_compute()
+        key = cache.make_key("R1", "v1", None)
+
+        cache.get_or_compute(key, compute, _always)["session_id"] = "s1"
+
+        assert "session_id" not in cache.get_or_compute(key, compute, _always)
+
+
+class TestLease:
+    """プロセス間の作成リースのテスト."""
+
+    def test_他のプロセスが作成中なら保存を待つ(self, cache, backend):
+        compute, calls = _counting_compute()
+        key = cache.make_key("R1", "v1", None)
+        assert backend.put_if_absent(f"{key}:lease", b"", int(time.time()) + 60, "proposal_lease")
+
+        other = ProposalCache(backend)
+        timer = threading.Timer(0.1, lambda: other.put(key, {"message": "他のプロセス"}))
+        timer.start()
+        result = cache.get_or_compute(key, compute, _always)
+        timer.join()
+
+        assert calls == []
+        assert result == {"message": "他のプロセス"}
+        assert cache.stats["shared"] == 1
+
+    def test_待ちきれなければ自分で作成する(self, backend):
+        cache = ProposalCache(backend, wait_seconds=0.05, poll_interval=0.01)
+        compute, calls = _counting_compute()
+        key = cache.make_key("R1", "v1", None)
+        backend.put_if_absent(f"{key}:lease", b"", int(time.time()) + 60, "proposal_lease")
+
+        result = cache.get_or_compute(key, compute, _always)
+
+        assert len(calls) == 1
+        assert result["message"] == "提案1"
+
+    def test_共有層の障害時はそのまま作成する(self):
+        broken = MagicMock()
+        broken.get.side_effect = RuntimeError("down")
+        broken.put_if_absent.side_effect = RuntimeError("down")
+        cache = ProposalCache(broken)
+        compute, calls = _counting_compute()
+
+        result = cache.get_or_compute(cache.make_key("R1", "v1", None), compute, _always)
+
+        assert len(calls) == 1
+        assert result["message"] == "提案1"
+
+
+class TestCurrentOddsVersion:
+    """current_odds_version のテスト."""
+
+    WIN_ODDS = {"1": 2.5, "2": 4.0}
+
+    def _version(self, win_odds: dict, precomputed: dict | None) -> str | None:
+        with patch("tools.ev_proposer._fetch_all_odds", return_value={"win": win_odds} if win_odds else {}), \
+                patch("tools.proposal_cache.get_precomputed", return_value=precomputed):
+            return current_odds_version("R1")
+
+    def test_事前計算から大きく動いていなければその版を使う(self):
+        precomputed = {"odds_version": "abc", "win_odds": self.WIN_ODDS}
+
+        assert self._version(self.WIN_ODDS | {"2": 4.2}, precomputed) == "abc"
+
+    def test_事前計算から大きく動いていれば現在の単勝オッズから作る(self):
+        precomputed = {"odds_version": "abc", "win_odds": self.WIN_ODDS}
+
+        assert self._version(self.WIN_ODDS | {"2": 8.0}, precomputed) == odds_version(self.WIN_ODDS | {"2": 8.0})
+
+    def test_事前計算結果がなければ単勝オッズから作る(self):
+        first = self._version(self.WIN_ODDS, None)
+        second = self._version(self.WIN_ODDS | {"1": 2.4}, None)
+
+        assert first and second and first != second
+
+    def test_オッズが取れなければNone(self):
+        assert self._version({}, {"odds_version": "abc", "win_odds": self.WIN_ODDS}) is None
+
+    def test_取得に失敗したらNone(self):
+        with patch("tools.ev_proposer._fetch_all_odds", side_effect=RuntimeError("down")):
+            assert current_odds_version("R1") is None
+
+    def test_デプロイ済みの全券種オッズのルートを呼ぶ(self):
+        # API Gateway のルートは cdk/tests/test_api_stack.py で確認している
+        with patch("tools.ev_proposer.cached_get_json", return_value={"win": self.WIN_ODDS}) as get, \
+                patch("tools.ev_proposer.get_api_url", return_value="https://api.example.com"), \
+                patch("tools.proposal_cache.get_precomputed", return_value=None):
+            assert current_odds_version("R1") == odds_version(self.WIN_ODDS)
+
+        get.assert_called_once_with("https://api.example.com/races/R1/odds")
@@ -1,12 +1,16 @@
 """レース分析ツールのテスト."""
 
 import sys
+import time
 from pathlib import Path
+from unittest.mock import patch
 
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+import pytest
 
-from tools.race_analyzer import _analyze_race_impl
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
 
+from tools import compact_payload, race_analyzer
+from tools.race_analyzer import _analyze_race_impl, analyze_race_for_betting
 
 # =============================================================================
 # テスト用データ
@@ -312,3 +316,110 @@ class TestAnalyzeRaceImpl:
         )
 
         assert result["race_info"]["running_style_summary"] == {}
+
+
+# =============================================================================
+# analyze_race_for_betting テスト
+# =============================================================================
+
+
+def _slow(value, seconds: float = 0.2):
+    """指定秒数待ってから value を返す関数を作る."""
+    def fetch(race_id, *args, **kwargs):
+        time.sleep(seconds)
+        return value
+    return fetch
+
+
+def _race_detail() -> dict:
+    return {
+        "race": {"race_name": "テスト", "venue": "東京", "distance": 1600, "track_type": "芝", "horse_count": 3},
+        "runners": _make_runners(3),
+    }
+
+
+class TestAnalyzeRaceForBetting:
+    """analyze_race_for_betting のデータ取得のテスト."""
+
+    @pytest.fixture(autouse=True)
+    def no_precompute(self):
+        with patch("tools.precompute.get_precompute_store", return_value=None):
+            yield
+
+    def _patch_sources(self, *, race_detail=None, ai=None, styles=None, speed=None):
+        ai_result = {"sources": [{"source": "jiro8", "predictions": _make_ai_predictions(3)}]}
+        return (
+            patch("tools.race_data._fetch_race_detail", race_detail or _slow(_race_detail())),
+            patch("tools.ai_prediction.get_ai_prediction", ai or _slow(ai_result)),
+            patch("tools.pace_analysis._get_running_styles", styles or _slow(_make_running_styles(3))),
+            patch("tools.speed_index.get_speed_index", speed or _slow({"error": "no data"})),
+        )
+
+    def test_4ソースを並列に取得する(self):
+        p1, p2, p3, p4 = self._patch_sources()
+        start = time.perf_counter()
+        with p1, p2, p3, p4:
+            result = analyze_race_for_betting("202602010511")
+        elapsed = time.perf_counter() - start
+
+        assert "error" not in result
+        # 直列なら 0.8 秒かかる
+        assert elapsed < 0.6
+        assert len(result["horses"]["rows"]) == 3
+
+    def test_ソース別の取得時間を結果に含めメトリクスにも送る(self):
+        p1, p2, p3, p4 = self._patch_sources()
+        with p1, p2, p3, p4, patch.object(race_analyzer, "record_fetch_metrics") as record:
+            result = analyze_race_for_betting("202602010511")
+
+        diagnostics = result["fetch_diagnostics"]
+        assert set(diagnostics["timings_ms"]) == {"race_detail", "ai_prediction", "running_styles", "speed_index"}
+        assert all(isinstance(ms, int) for ms in diagnostics["timings_ms"].values())
+        assert "failed" not in diagnostics
+        tool_name, timings_ms, failed = record.call_args.args
+        assert tool_name == "analyze_race_for_betting"
+        assert set(timings_ms) == {"race_detail", "ai_prediction", "running_styles", "speed_index"}
+        assert all(ms >= 150 for ms in timings_ms.values())
+        assert failed == {}
+
+    def test_任意ソースのタイムアウトは部分結果で続行する(self):
+        p1, p2, p3, p4 = self._patch_sources(styles=_slow([], seconds=1.0))
+        timeouts = {**race_analyzer.FETCH_TIMEOUT_SECONDS, "running_styles": 0.3}
+        with p1, p2, p3, p4, patch.object(race_analyzer, "FETCH_TIMEOUT_SECONDS", timeouts), \
+                patch.object(race_analyzer, "record_fetch_metrics") as record:
+            start = time.perf_counter()
+            result = analyze_race_for_betting("202602010511")
+            elapsed = time.perf_counter() - start
+
+        assert "error" not in result
+        assert elapsed < 0.8
+        # 脚質が取れなければ脚質構成・脚質列は省かれる
+        assert "running_style_summary" not in result["race_info"]
+        assert "running_style" not in result["horses"]["columns"]
+        assert record.call_args.args[2] == {"running_styles": "timeout"}
+        assert result["fetch_diagnostics"]["failed"] == ["running_styles"]
+
+    def test_レースデータ取得失敗はエラーを返す(self):
+        def fail(race_id):
+            raise RuntimeError("API down")
+
+        p1, p2, p3, p4 = self._patch_sources(race_detail=fail)
+        with p1, p2, p3, p4:
+            result = analyze_race_for_betting("202602010511")
+
+        assert result == {"error": "レース分析に失敗しました: API down"}
+
+    def test_AI予想のエラーはエラーを返す(self):
+        p1, p2, p3, p4 = self._patch_sources(ai=_slow({"error": "not found"}, seconds=0))
+        with p1, p2, p3, p4:
+            result = analyze_race_for_betting("202602010511")
+
+        assert "AI予想の取得に失敗" in result["error"]
+
+    def test_コンパクト表現を無効にすると従来の形式で返す(self):
+        p1, p2, p3, p4 = self._patch_sources()
+        with p1, p2, p3, p4, patch.object(compact_payload, "COMPACT_TOOL_RESULTS", False):
+            result = analyze_race_for_betting("202602010511")
+
+        assert len(result["horses"]) == 3
+        assert result["horses"][0]["ai_predictions"] == {"jiro8": {"score": 400.0, "rank": 1}}
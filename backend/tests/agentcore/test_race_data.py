@@ -2,7 +2,7 @@
 
 import sys
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
 import pytest
 import requests
@@ -104,13 +104,10 @@ class TestExtractRaceConditions:
 class TestGetRaceRunners:
     """get_race_runners のテスト."""
 
-    @patch("tools.race_data.cached_get")
+    @patch("tools.race_data.cached_get_json")
     def test_正常なAPI応答で分析用データを返す(self, mock_get):
         """正常系: runners_data, race_conditions, venue, surface等を返す."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = _make_api_response()
-        mock_get.return_value = mock_response
+        mock_get.return_value = _make_api_response()
 
         result = get_race_runners("202601250611")
 
@@ -123,13 +120,10 @@ class TestGetRaceRunners:
         assert "race_name" in result
         assert "error" not in result
 
-    @patch("tools.race_data.cached_get")
+    @patch("tools.race_data.cached_get_json")
     def test_runners_dataに出走馬情報を含む(self, mock_get):
         """runners_dataにhorse_number, horse_name, odds, popularityが含まれる."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = _make_api_response()
-        mock_get.return_value = mock_response
+        mock_get.return_value = _make_api_response()
 
         result = get_race_runners("202601250611")
 
@@ -140,13 +134,10 @@ class TestGetRaceRunners:
         assert runner["odds"] == 2.5
         assert runner["popularity"] == 1
 
-    @patch("tools.race_data.cached_get")
+    @patch("tools.race_data.cached_get_json")
     def test_レース情報を正しく返す(self, mock_get):
         """venue, surface, distance, total_runnersを正しく返す."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = _make_api_response()
-        mock_get.return_value = mock_response
+        mock_get.return_value = _make_api_response()
 
         result = get_race_runners("202601250611")
 
@@ -156,45 +147,36 @@ class TestGetRaceRunners:
         assert result["total_runners"] == 16
         assert result["race_name"] == "テストレース"
 
-    @patch("tools.race_data.cached_get")
+    @patch("tools.race_data.cached_get_json")
     def test_G1レースのrace_conditionsを抽出する(self, mock_get):
         """G1レースの場合、race_conditionsに'g1'が含まれる."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = _make_api_response(
+        mock_get.return_value = _make_api_response(
             race_overrides={"grade_class": "G1"}
         )
-        mock_get.return_value = mock_response
 
         result = get_race_runners("202601250611")
 
         assert "g1" in result["race_conditions"]
 
-    @patch("tools.race_data.cached_get")
+    @patch("tools.race_data.cached_get_json")
     def test_ハンデ新馬戦のrace_conditionsを抽出する(self, mock_get):
         """ハンデ新馬戦の場合、handicapとmaiden_newが含まれる."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = _make_api_response(
+        mock_get.return_value = _make_api_response(
             race_overrides={
                 "race_name": "テストハンデ",
                 "age_condition": "新馬",
             }
         )
-        mock_get.return_value = mock_response
 
         result = get_race_runners("202601250611")
 
         assert "handicap" in result["race_conditions"]
         assert "maiden_new" in result["race_conditions"]
 
-    @patch("tools.race_data.cached_get")
+    @patch("tools.race_data.cached_get_json")
     def test_空のデータでもエラーなく返す(self, mock_get):
         """空のAPIレスポンスでもクラッシュしない."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {}
-        mock_get.return_value = mock_response
+        mock_get.return_value = {}
 
         result = get_race_runners("202601250611")
 
@@ -204,7 +186,7 @@ class TestGetRaceRunners:
         assert result["surface"] == ""
         assert result["total_runners"] == 0
 
-    @patch("tools.race_data.cached_get")
+    @patch("tools.race_data.cached_get_json")
     def test_RequestException時にエラーを返す(self, mock_get):
         """異常系: RequestException発生時はerrorを含む辞書を返す."""
         mock_get.side_effect = requests.RequestException("Connection failed")
@@ -214,56 +196,54 @@ class TestGetRaceRunners:
         assert "error" in result
         assert "API呼び出しに失敗しました" in result["error"]
 
-    @patch("tools.race_data.cached_get")
+    @patch("tools.race_data.cached_get_json")
     def test_HTTPエラー時にエラーを返す(self, mock_get):
         """異常系: HTTPステータスエラー時はerrorを含む辞書を返す."""
-        mock_response = MagicMock()
-        mock_response.status_code = 404
-        mock_response.raise_for_status.side_effect = requests.HTTPError("404 Not Found")
-        mock_get.return_value = mock_response
+        mock_get.side_effect = requests.HTTPError("500 Server Error")
 
         result = get_race_runners("202601250611")
 
         assert "error" in result
         assert "API呼び出しに失敗しました" in result["error"]
 
-    @patch("tools.race_data.cached_get")
+    @patch("tools.race_data.cached_get_json")
     def test_horse_countがない場合runnersの長さをtotal_runnersにする(self, mock_get):
         """horse_countが未設定の場合、runnersリストの長さをtotal_runnersにする."""
         api_response = _make_api_response()
         del api_response["race"]["horse_count"]
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = api_response
-        mock_get.return_value = mock_response
+        mock_get.return_value = api_response
 
         result = get_race_runners("202601250611")
 
         assert result["total_runners"] == 3  # runnersが3頭
 
-    @patch("tools.race_data.cached_get")
+    @patch("tools.race_data.cached_get_json")
     def test_venue_codeが競馬場名に変換される(self, mock_get):
         """APIがvenue_code("05")を返す場合、venue名("東京")に変換される."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = _make_api_response(
+        mock_get.return_value = _make_api_response(
             race_overrides={"venue": "09"}
         )
-        mock_get.return_value = mock_response
 
         result = get_race_runners("202601250911")
 
         assert result["venue"] == "阪神"
 
-    @patch("tools.race_data.cached_get")
+    @patch("tools.race_data.cached_get_json")
+    def test_キャッシュ済みのレスポンスを書き換えない(self, mock_get):
+        """venue変換はキャッシュと共有するレスポンスをコピーして行う."""
+        api_response = _make_api_response(race_overrides={"venue": "09"})
+        mock_get.return_value = api_response
+
+        get_race_runners("202601250911")
+
+        assert api_response["race"]["venue"] == "09"
+
+    @patch("tools.race_data.cached_get_json")
     def test_不明なvenue_codeはそのまま返す(self, mock_get):
         """未知のvenue_codeはそのまま返される."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = _make_api_response(
+        mock_get.return_value = _make_api_response(
             race_overrides={"venue": "99"}
         )
-        mock_get.return_value = mock_response
 
         result = get_race_runners("202601259911")
 
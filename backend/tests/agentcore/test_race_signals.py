@@ -0,0 +1,180 @@
+"""レースシグナル一括ローダーのテスト."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from tools.race_signals import AI_PREDICTION, SPEED_INDEX, RaceSignalLoader
+
+
+def _ai_item(race_id: str, source: str, horse_numbers: list[int]) -> dict:
+    return {
+        "race_id": race_id,
+        "source": source,
+        "venue": "東京",
+        "race_number": 11,
+        "predictions": [
+            {"horse_number": hn, "rank": i + 1, "score": 100 - i} for i, hn in enumerate(horse_numbers)
+        ],
+        "scraped_at": "2026-01-31T06:00:00+09:00",
+        "ttl": 1769900000,
+    }
+
+
+def _speed_item(race_id: str, source: str, horse_numbers: list[int]) -> dict:
+    return {
+        "race_id": race_id,
+        "source": source,
+        "venue": "東京",
+        "race_number": 11,
+        "indices": [
+            {"horse_number": hn, "rank": i + 1, "speed_index": 90 - i} for i, hn in enumerate(horse_numbers)
+        ],
+        "scraped_at": "2026-01-31T06:00:00+09:00",
+    }
+
+
+def _table(items_by_race: dict[str, list[dict]], delay: float = 0.0) -> MagicMock:
+    """race_id ごとのアイテムを返すテーブルのモック."""
+    table = MagicMock()
+
+    def query(**kwargs):
+        time.sleep(delay)
+        race_id = kwargs["KeyConditionExpression"].get_expression()["values"][1]
+        return {"Items": [dict(item) for item in items_by_race.get(race_id, [])]}
+
+    table.query.side_effect = query
+    return table
+
+
+@pytest.fixture
+def tables():
+    ai_table = _table({
+        "R1": [_ai_item("R1", "umamax", [8, 3, 5, 1]), _ai_item("R1", "ai-shisu", [8, 3, 1, 5])],
+        "R2": [_ai_item("R2", "ai-shisu", [2, 4, 6])],
+    })
+    speed_table = _table({
+        "R1": [_speed_item("R1", "jiro8-speed", [3, 8, 5])],
+    })
+    with patch("tools.ai_prediction.get_dynamodb_table", return_value=ai_table), \
+            patch("tools.speed_index.get_dynamodb_table", return_value=speed_table):
+        yield ai_table, speed_table
+
+
+class TestRaceSignalLoader:
+    """RaceSignalLoader のテスト."""
+
+    def test_両テーブルを取得し匿名化とコンセンサスを適用する(self, tables):
+        signals = RaceSignalLoader().load(["R1"])
+
+        ai = signals["R1"][AI_PREDICTION]
+        assert [s["source"] for s in ai["sources"]] == ["AI-B", "AI-A"]
+        assert ai["consensus"]["agreed_top3"] == [8, 3]
+        assert "ttl" not in ai["sources"][0]
+        speed = signals["R1"][SPEED_INDEX]
+        assert speed["sources"][0]["source"] == "jiro8-speed"
+        assert "consensus" not in speed
+
+    def test_複数レースをまとめて取得する(self, tables):
+        ai_table, speed_table = tables
+
+        signals = RaceSignalLoader().load(["R1", "R2", "R1"])
+
+        assert list(signals) == ["R1", "R2"]
+        assert ai_table.query.call_count == 2
+        assert speed_table.query.call_count == 2
+        assert signals["R2"][AI_PREDICTION]["sources"][0]["source"] == "AI-A"
+        assert "error" in signals["R2"][SPEED_INDEX]
+
+    def test_クエリを並列に発行する(self):
+        ai_table = _table({"R1": [_ai_item("R1", "ai-shisu", [1, 2, 3])]}, delay=0.2)
+        speed_table = _table({"R1": [_speed_item("R1", "jiro8-speed", [1, 2, 3])]}, delay=0.2)
+        with patch("tools.ai_prediction.get_dynamodb_table", return_value=ai_table), \
+                patch("tools.speed_index.get_dynamodb_table", return_value=speed_table):
+            start = time.perf_counter()
+            RaceSignalLoader().load(["R1", "R2"])
+            elapsed = time.perf_counter() - start
+
+        # 直列なら 0.8 秒かかる
+        assert elapsed < 0.5
+
+    def test_取得結果をセッション内でキャッシュする(self, tables):
+        ai_table, speed_table = tables
+        loader = RaceSignalLoader()
+
+        first = loader.load(["R1"])
+        second = loader.load(["R1"], kinds=(AI_PREDICTION,))
+
+        assert second["R1"][AI_PREDICTION] is first["R1"][AI_PREDICTION]
+        assert ai_table.query.call_count == 1
+        assert loader.stats["hits"] == 1
+
+    def test_エラー結果はキャッシュしない(self, tables):
+        ai_table, speed_table = tables
+        loader = RaceSignalLoader()
+
+        loader.load(["R2"], kinds=(SPEED_INDEX,))
+        loader.load(["R2"], kinds=(SPEED_INDEX,))
+
+        assert speed_table.query.call_count == 2
+
+    def test_有効期限切れは再取得する(self, tables):
+        ai_table, _ = tables
+        loader = RaceSignalLoader(ttl=0)
+
+        loader.load(["R1"], kinds=(AI_PREDICTION,))
+        loader.load(["R1"], kinds=(AI_PREDICTION,))
+
+        assert ai_table.query.call_count == 2
+
+    def test_DynamoDBエラーは種別ごとのエラーになる(self, tables):
+        ai_table, _ = tables
+        ai_table.query.side_effect = ClientError(
+            {"Error": {"Code": "ProvisionedThroughputExceededException", "Message": ""}}, "Query",
+        )
+
+        signals = RaceSignalLoader().load(["R1"])
+
+        assert signals["R1"][AI_PREDICTION] == {
+            "race_id": "R1",
+            "error": "DynamoDBエラー: ProvisionedThroughputExceededException",
+            "sources": [],
+        }
+        assert "error" not in signals["R1"][SPEED_INDEX]
+
+    def test_実行中の取得には相乗りする(self):
+        ai_table = _table({"R1": [_ai_item("R1", "ai-shisu", [1, 2, 3])]}, delay=0.2)
+        loader = RaceSignalLoader()
+        results = []
+        with patch("tools.ai_prediction.get_dynamodb_table", return_value=ai_table):
+            threads = [
+                threading.Thread(target=lambda: results.append(loader.load(["R1"], kinds=(AI_PREDICTION,))))
+                for _ in range(3)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        assert ai_table.query.call_count == 1
+        assert len(results) == 3
+        assert loader.stats["coalesced"] == 2
+
+    def test_ページングして全件取得する(self):
+        table = MagicMock()
+        table.query.side_effect = [
+            {"Items": [_ai_item("R1", "ai-shisu", [1, 2, 3])], "LastEvaluatedKey": {"race_id": "R1"}},
+            {"Items": [_ai_item("R1", "umamax", [1, 2, 3])]},
+        ]
+        with patch("tools.ai_prediction.get_dynamodb_table", return_value=table):
+            signals = RaceSignalLoader().load(["R1"], kinds=(AI_PREDICTION,))
+
+        assert len(signals["R1"][AI_PREDICTION]["sources"]) == 2
+        assert table.query.call_args.kwargs["ExclusiveStartKey"] == {"race_id": "R1"}
@@ -0,0 +1,82 @@
+"""順位行列のコンセンサス分析のテスト."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from tools.rank_consensus import RankMatrix, analyze_consensus
+
+
+def _source(name: str, horse_numbers: list[int]) -> dict:
+    return {
+        "source": name,
+        "predictions": [{"horse_number": hn, "rank": i + 1} for i, hn in enumerate(horse_numbers)],
+    }
+
+
+class TestRankMatrix:
+    """RankMatrix のテスト."""
+
+    def test_ソースと馬の順位行列にする(self):
+        matrix = RankMatrix.from_entries(
+            [_source("a", [8, 3, 5]), _source("b", [3, 8, 1])], "predictions",
+        )
+
+        assert matrix.horse_numbers == [1, 3, 5, 8]
+        assert matrix.ranks == [[None, 2, 3, 1], [3, 1, None, 2]]
+        assert [matrix.horse_numbers[j] for j in matrix.common_columns()] == [3, 8]
+
+    def test_複数のTopNの合意数をまとめて数える(self):
+        matrix = RankMatrix.from_scores([
+            {1: 0.4, 2: 0.3, 3: 0.2, 4: 0.1},
+            {2: 0.4, 1: 0.3, 4: 0.2, 3: 0.1},
+        ])
+
+        counts = matrix.agree_counts([1, 2, 3])
+
+        assert counts[1] == {1: 1, 2: 1}
+        assert counts[2] == {1: 2, 2: 2}
+        assert counts[3] == {1: 2, 2: 2, 3: 1, 4: 1}
+
+    def test_上位の合意は先頭ソースの順位順(self):
+        matrix = RankMatrix.from_entries(
+            [_source("a", [5, 3, 8, 1]), _source("b", [8, 5, 3, 1])], "predictions",
+        )
+
+        assert matrix.agreed_top(3) == [5, 3, 8]
+        assert not matrix.top_order_matches(3)
+
+    def test_順位相関(self):
+        same = RankMatrix.from_entries([_source("a", [1, 2, 3, 4]), _source("b", [1, 2, 3, 4])], "predictions")
+        reversed_ = RankMatrix.from_entries([_source("a", [1, 2, 3, 4]), _source("b", [4, 3, 2, 1])], "predictions")
+
+        assert same.rank_correlations() == {("a", "b"): pytest.approx(1.0)}
+        assert reversed_.mean_rank_correlation() == pytest.approx(-1.0)
+
+    def test_共通の馬が少なければ順位相関なし(self):
+        matrix = RankMatrix.from_entries([_source("a", [1, 2]), _source("b", [2, 1])], "predictions")
+
+        assert matrix.rank_correlations() == {}
+        assert matrix.mean_rank_correlation() is None
+
+
+class TestAnalyzeConsensus:
+    """analyze_consensus のテスト."""
+
+    def test_3ソースの乖離馬と相関(self):
+        sources = [
+            _source("a", [1, 2, 3, 4, 5]),
+            _source("b", [1, 3, 2, 4, 5]),
+            _source("c", [5, 2, 3, 4, 1]),
+        ]
+
+        result = analyze_consensus(sources, "predictions")
+
+        assert result["agreed_top3"] == [2, 3]
+        assert result["consensus_level"] == "部分合意"
+        assert [h["horse_number"] for h in result["divergence_horses"]] == [1, 5]
+        assert result["divergence_horses"][0]["ranks"] == {"a": 1, "b": 1, "c": 5}
+        assert -1.0 <= result["rank_correlation"] <= 1.0
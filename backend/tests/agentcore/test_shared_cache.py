@@ -0,0 +1,199 @@
+"""セッション間共有キャッシュのテスト."""
+
+import json
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from tools import shared_cache
+from tools.api_cache import make_cache_key
+from tools.shared_cache import (
+    DynamoDBCacheBackend,
+    SharedCache,
+    SQLiteCacheBackend,
+)
+
+HORSE_URL = "https://api.example.com/horses/2020100001"
+ODDS_URL = "https://api.example.com/races/202605240511/odds"
+
+
+@pytest.fixture
+def backend(tmp_path):
+    b = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"))
+    yield b
+    b.close()
+
+
+@pytest.fixture
+def cache(backend):
+    return SharedCache(backend)
+
+
+class TestSharedCache:
+    """SharedCache のテスト."""
+
+    def test_書き込んだデータを取得できる(self, cache):
+        cache.put_async(HORSE_URL, {"horse": {"name": "テスト馬"}})
+        cache.flush()
+
+        data, remaining = cache.get(HORSE_URL)
+
+        assert data == {"horse": {"name": "テスト馬"}}
+        assert 0 < remaining <= shared_cache.SHARED_TTL["horse_info"]
+
+    def test_パラメータ違いは別エントリ(self, cache):
+        cache.put_async(HORSE_URL, {"v": 1}, params={"limit": 5})
+        cache.flush()
+
+        assert cache.get(HORSE_URL, params={"limit": 5})[0] == {"v": 1}
+        assert cache.get(HORSE_URL) is None
+
+    def test_共有対象外のデータ種別は読み書きしない(self, cache, backend):
+        cache.put_async(ODDS_URL, {"win": {"1": 2.5}})
+        cache.flush()
+
+        assert backend.get(make_cache_key(ODDS_URL)) is None
+        assert cache.get(ODDS_URL) is None
+        assert cache.stats["misses"] == 0
+
+    def test_期限切れはミスになる(self, cache, backend):
+        payload = zlib.compress(json.dumps({"v": 1}).encode())
+        backend.put(make_cache_key(HORSE_URL), payload, int(time.time()) - 1, "horse_info")
+
+        assert cache.get(HORSE_URL) is None
+        assert cache.stats["misses"] == 1
+
+    def test_上限を超えるペイロードは書き込まない(self, cache, backend):
+        with patch.object(shared_cache, "MAX_PAYLOAD_BYTES", 10):
+            cache.put_async(HORSE_URL, {"data": "x" * 1000})
+            cache.flush()
+
+        assert backend.get(make_cache_key(HORSE_URL)) is None
+
+    def test_バックエンド障害時はミス扱いで一定時間迂回する(self):
+        failing = MagicMock()
+        failing.get.side_effect = RuntimeError("unavailable")
+        cache = SharedCache(failing)
+
+        assert cache.get(HORSE_URL) is None
+        assert cache.get(HORSE_URL) is None
+
+        failing.get.assert_called_once()
+        assert cache.stats["errors"] == 1
+
+    def test_書き込みは呼び出し元をブロックしない(self):
+        slow = MagicMock()
+        slow.put.side_effect = lambda *args: time.sleep(0.2)
+        cache = SharedCache(slow)
+
+        start = time.perf_counter()
+        cache.put_async(HORSE_URL, {"v": 1})
+        elapsed = time.perf_counter() - start
+        cache.flush()
+
+        assert elapsed < 0.1
+        slow.put.assert_called_once()
+        assert cache.stats["writes"] == 1
+
+
+class TestDynamoDBCacheBackend:
+    """DynamoDBCacheBackend のテスト."""
+
+    @patch("tools.shared_cache.boto3.resource")
+    def test_TTL属性付きで保存する(self, mock_resource):
+        table = mock_resource.return_value.Table.return_value
+        backend = DynamoDBCacheBackend("test-table")
+
+        backend.put("key1", b"payload", 1700000000, "horse_info")
+
+        table.put_item.assert_called_once_with(
+            Item={"cache_key": "key1", "payload": b"payload", "data_type": "horse_info", "ttl": 1700000000}
+        )
+
+    @patch("tools.shared_cache.boto3.resource")
+    def test_アイテムがなければNone(self, mock_resource):
+        table = mock_resource.return_value.Table.return_value
+        table.get_item.return_value = {}
+
+        assert DynamoDBCacheBackend("test-table").get("key1") is None
+
+    @patch("tools.shared_cache.boto3.resource")
+    def test_条件付き書き込みが拒否されたらFalse(self, mock_resource):
+        table = mock_resource.return_value.Table.return_value
+        error = type("ConditionalCheckFailedException", (Exception,), {})
+        table.meta.client.exceptions.ConditionalCheckFailedException = error
+        table.put_item.side_effect = error()
+
+        assert DynamoDBCacheBackend("test-table").put_if_absent("key1", b"", 1700000000, "lease") is False
+        assert "ConditionExpression" in table.put_item.call_args.kwargs
+
+
+class TestSQLiteCacheBackend:
+    """SQLiteCacheBackend のテスト."""
+
+    def test_有効期限内のアイテムがあれば書き込まない(self, backend):
+        now = int(time.time())
+
+        assert backend.put_if_absent("lease", b"a", now + 60, "lease") is True
+        assert backend.put_if_absent("lease", b"b", now + 60, "lease") is False
+        assert backend.get("lease")[0] == b"a"
+
+    def test_期限切れのアイテムは上書きする(self, backend):
+        now = int(time.time())
+        backend.put("lease", b"a", now - 1, "lease")
+
+        assert backend.put_if_absent("lease", b"b", now + 60, "lease") is True
+        assert backend.get("lease")[0] == b"b"
+
+
+class TestGetSharedCache:
+    """get_shared_cache のテスト."""
+
+    @pytest.fixture(autouse=True)
+    def reset(self):
+        with patch.object(shared_cache, "_shared_cache", None), \
+                patch.object(shared_cache, "_shared_cache_initialized", False):
+            yield
+
+    def test_noneなら無効(self, monkeypatch):
+        monkeypatch.setenv("AGENT_TOOL_CACHE_BACKEND", "none")
+        assert shared_cache.get_shared_cache() is None
+
+    def test_sqliteを選べる(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("AGENT_TOOL_CACHE_BACKEND", "sqlite")
+        monkeypatch.setenv("AGENT_TOOL_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+
+        cache = shared_cache.get_shared_cache()
+
+        assert isinstance(cache, SharedCache)
+        assert shared_cache.get_shared_cache() is cache
+
+    def test_同時に呼んでも初期化は1回で同じインスタンスを返す(self, monkeypatch, backend):
+        created = []
+
+        def create_backend():
+            created.append(1)
+            time.sleep(0.05)
+            return backend
+
+        monkeypatch.setattr(shared_cache, "_create_backend", create_backend)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(shared_cache.get_shared_cache()))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(created) == 1
+        assert len(results) == 8
+        assert all(isinstance(r, SharedCache) and r is results[0] for r in results)
@@ -9,16 +9,19 @@ import pytest
 # agentcoreモジュールをインポートできるようにパスを追加
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
 
+from tools.race_signals import get_race_signal_loader
 from tools.speed_index import get_speed_index, list_speed_indices_for_date, _analyze_consensus
 
 
 @pytest.fixture
 def mock_dynamodb_table():
     """DynamoDBテーブルのモック."""
+    get_race_signal_loader().clear()
     with patch("tools.speed_index.get_dynamodb_table") as mock:
         table = MagicMock()
         mock.return_value = table
         yield table
+    get_race_signal_loader().clear()
 
 
 def _make_indices(horse_numbers_scores):
@@ -281,7 +284,7 @@ class TestListSpeedIndicesForDate:
 
     def test_日付でデータ一覧取得(self, mock_dynamodb_table):
         """正常系: 指定日のデータ一覧を取得できる."""
-        mock_dynamodb_table.scan.return_value = {
+        mock_dynamodb_table.query.return_value = {
             "Items": [
                 {
                     "race_id": "202602080511",
@@ -309,6 +312,10 @@ class TestListSpeedIndicesForDate:
 
         result = list_speed_indices_for_date(date="20260208")
 
+        # 日付GSIのクエリ1回で取得し、テーブル全体はスキャンしない
+        mock_dynamodb_table.query.assert_called_once()
+        assert mock_dynamodb_table.query.call_args.kwargs["IndexName"] == "race_date-source-index"
+        mock_dynamodb_table.scan.assert_not_called()
         assert result["date"] == "20260208"
         assert result["source"] == "jiro8-speed"
         assert result["total_count"] == 2
@@ -323,7 +330,7 @@ class TestListSpeedIndicesForDate:
 
     def test_データがない場合(self, mock_dynamodb_table):
         """正常系: 指定日のデータがない場合."""
-        mock_dynamodb_table.scan.return_value = {"Items": []}
+        mock_dynamodb_table.query.return_value = {"Items": []}
 
         result = list_speed_indices_for_date(date="20260201")
 
@@ -334,7 +341,7 @@ class TestListSpeedIndicesForDate:
 
     def test_レースがソートされる(self, mock_dynamodb_table):
         """正常系: レースが競馬場名・レース番号でソートされる."""
-        mock_dynamodb_table.scan.return_value = {
+        mock_dynamodb_table.query.return_value = {
             "Items": [
                 {"race_id": "202602080512", "source": "jiro8-speed", "venue": "東京", "race_number": 12, "indices": []},
                 {"race_id": "202602080811", "source": "jiro8-speed", "venue": "京都", "race_number": 11, "indices": []},
@@ -0,0 +1,105 @@
+"""コールドスタート対策（ウォームアップ・起動時間プロファイラ）のテスト."""
+
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from startup_profile import AGENTCORE_DIR, format_report, package_totals, parse_importtime
+from warmup import WarmUp
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:      2000 |       2500 |   botocore.client
+import time:       300 |       2800 | boto3
+import time:     15000 |      15000 | tools.ev_proposer
+something else
+"""
+
+
+class TestWarmUp:
+    """WarmUp のテスト."""
+
+    def test_ステップを順に1回だけ実行する(self):
+        calls = []
+        warmup = WarmUp()
+
+        assert warmup.start({"a": lambda: calls.append("a"), "b": lambda: calls.append("b")})
+        assert not warmup.start({"a": lambda: calls.append("again")})
+        assert warmup.wait(1.0)
+
+        assert calls == ["a", "b"]
+        assert set(warmup.timings_ms) == {"a", "b"}
+        assert warmup.started and warmup.done
+
+    def test_失敗したステップを記録して続行する(self):
+        calls = []
+        warmup = WarmUp()
+
+        def fail():
+            raise RuntimeError("no credentials")
+
+        warmup.start({"fail": fail, "next": lambda: calls.append("next")})
+        warmup.wait(1.0)
+
+        assert warmup.errors == {"fail": "no credentials"}
+        assert calls == ["next"]
+
+    def test_呼び出し元をブロックしない(self):
+        release = threading.Event()
+        warmup = WarmUp()
+
+        warmup.start({"slow": lambda: release.wait(5.0)})
+
+        assert not warmup.wait(0.01)
+        release.set()
+        assert warmup.wait(1.0)
+
+
+class TestStartupProfile:
+    """startup_profile のテスト."""
+
+    def test_importtimeの出力を解析する(self):
+        records = parse_importtime(IMPORTTIME_OUTPUT)
+
+        assert [r.module for r in records] == ["_io", "botocore.client", "boto3", "tools.ev_proposer"]
+        assert [r.depth for r in records] == [2, 1, 0, 0]
+        assert records[1].self_us == 2000
+        assert records[1].cumulative_us == 2500
+
+    def test_パッケージごとに自身の時間を合計する(self):
+        totals = package_totals(parse_importtime(IMPORTTIME_OUTPUT))
+
+        assert list(totals) == ["tools", "botocore", "boto3", "_io"]
+        assert totals["tools"] == 15.0
+
+    def test_レポート(self):
+        report = format_report(parse_importtime(IMPORTTIME_OUTPUT), top=2)
+
+        assert "total import time: 17.4ms (4 modules)" in report
+        assert "tools.ev_proposer" in report
+        assert "_io" not in report
+
+
+class TestLazyToolsPackage:
+    """tools パッケージの遅延 import のテスト."""
+
+    def test_サブモジュールのimportで他のツールを読み込まない(self):
+        code = (
+            "import sys; import tools.harville; "
+            "print('tools.odds_analysis' in sys.modules, 'tools.bet_analysis' in sys.modules)"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=AGENTCORE_DIR, capture_output=True, text=True, check=True,
+        ).stdout
+
+        assert out.strip() == "False False"
+
+    def test_エクスポートは参照時に読み込む(self):
+        import tools
+
+        assert tools.get_ai_prediction.__name__ == "get_ai_prediction"
+        assert "analyze_odds_movement" in tools.__all__
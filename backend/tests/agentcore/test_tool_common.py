@@ -1,17 +1,22 @@
 """共通ツールモジュールのテスト."""
 
+import json
 import logging
 import sys
+import time
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
+
+import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
 
 from tools.common import (
-    _emit_metrics,
+    fan_out,
     get_tool_logger,
     log_tool_execution,
 )
+from tools.metrics import MetricsBuffer, phase
 
 
 class TestGetToolLogger:
@@ -92,100 +97,121 @@ class TestLogToolExecution:
         assert "ms" in completed_msg[0], f"実行時間(ms)がログに含まれていない: {completed_msg[0]}"
 
 
-class TestEmitMetrics:
-    """_emit_metrics のテスト."""
-
-    @patch("tools.common.METRICS_ENABLED", False)
-    def test_METRICS_ENABLED_falseの場合はメトリクス送信しない(self):
-        with patch("tools.common._get_cloudwatch_client") as mock_get_client:
-            _emit_metrics("test_tool", 100.0, success=True)
-            mock_get_client.assert_not_called()
-
-    @patch("tools.common.METRICS_ENABLED", True)
-    def test_METRICS_ENABLED_trueの場合はCloudWatchクライアントが呼ばれる(self):
-        mock_client = MagicMock()
-        with patch("tools.common._get_cloudwatch_client", return_value=mock_client):
-            _emit_metrics("test_tool", 150.5, success=True)
-
-        mock_client.put_metric_data.assert_called_once()
-        call_kwargs = mock_client.put_metric_data.call_args[1]
-        assert call_kwargs["Namespace"] == "BakenKaigi/AgentTools"
-        metric_data = call_kwargs["MetricData"]
-        assert len(metric_data) == 3
-
-        # ExecutionTime
-        assert metric_data[0]["MetricName"] == "ExecutionTime"
-        assert metric_data[0]["Value"] == 150.5
-        assert metric_data[0]["Dimensions"] == [{"Name": "ToolName", "Value": "test_tool"}]
-
-        # Invocations
-        assert metric_data[1]["MetricName"] == "Invocations"
-        assert metric_data[1]["Value"] == 1
-
-        # Errors（成功時は0）
-        assert metric_data[2]["MetricName"] == "Errors"
-        assert metric_data[2]["Value"] == 0
-
-    @patch("tools.common.METRICS_ENABLED", True)
-    def test_エラー時はErrors_1が送信される(self):
-        mock_client = MagicMock()
-        with patch("tools.common._get_cloudwatch_client", return_value=mock_client):
-            _emit_metrics("test_tool", 50.0, success=False)
-
-        metric_data = mock_client.put_metric_data.call_args[1]["MetricData"]
-        errors_metric = metric_data[2]
-        assert errors_metric["MetricName"] == "Errors"
-        assert errors_metric["Value"] == 1
-
-    @patch("tools.common.METRICS_ENABLED", True)
-    def test_メトリクス送信失敗時も例外が発生しない(self):
-        mock_client = MagicMock()
-        mock_client.put_metric_data.side_effect = Exception("CloudWatch error")
-        with patch("tools.common._get_cloudwatch_client", return_value=mock_client):
-            # 例外が発生しないことを確認
-            _emit_metrics("test_tool", 100.0, success=True)
+class TestMetricsIntegration:
+    """デコレータとメトリクス記録の統合テスト."""
 
+    @pytest.fixture
+    def lines(self):
+        return []
 
-class TestMetricsIntegration:
-    """デコレータとメトリクス送信の統合テスト."""
+    @pytest.fixture
+    def buffer(self, lines):
+        buffer = MetricsBuffer(mode="emf", writer=lines.append)
+        with patch("tools.metrics.METRICS_ENABLED", True), \
+                patch("tools.metrics.get_metrics_buffer", return_value=buffer):
+            yield buffer
 
-    @patch("tools.common.METRICS_ENABLED", True)
-    def test_log_tool_execution成功時にメトリクスが送信される(self):
-        mock_client = MagicMock()
-        with patch("tools.common._get_cloudwatch_client", return_value=mock_client):
-            @log_tool_execution
-            def my_tool():
-                return {"result": "ok"}
+    def _flushed(self, buffer, lines) -> list[dict]:
+        buffer.flush()
+        return [json.loads(line) for line in lines]
 
-            result = my_tool()
+    def test_log_tool_execution成功時にメトリクスが溜まる(self, buffer, lines):
+        @log_tool_execution
+        def my_tool():
+            return {"result": "ok"}
 
-        assert result == {"result": "ok"}
-        mock_client.put_metric_data.assert_called_once()
-        metric_data = mock_client.put_metric_data.call_args[1]["MetricData"]
-        assert metric_data[2]["Value"] == 0  # Errors = 0
+        result = my_tool()
 
-    @patch("tools.common.METRICS_ENABLED", True)
-    def test_log_tool_executionでerror結果時にErrors_1が送信される(self):
-        mock_client = MagicMock()
-        with patch("tools.common._get_cloudwatch_client", return_value=mock_client):
-            @log_tool_execution
-            def my_tool():
-                return {"error": "something went wrong"}
+        assert result == {"result": "ok"}
+        # ツール実行中には書き出さない
+        assert lines == []
+        [doc] = self._flushed(buffer, lines)
+        assert doc["ToolName"] == "my_tool"
+        assert doc["Invocations"] == 1
+        assert doc["Errors"] == 0
+        assert doc["ExecutionTime"] >= 0
+        assert doc["_aws"]["CloudWatchMetrics"][0]["Namespace"] == "BakenKaigi/AgentTools"
+
+    def test_log_tool_executionでerror結果時にErrors_1が記録される(self, buffer, lines):
+        @log_tool_execution
+        def my_tool():
+            return {"error": "something went wrong"}
 
-            result = my_tool()
+        result = my_tool()
 
         assert result == {"error": "something went wrong"}
-        metric_data = mock_client.put_metric_data.call_args[1]["MetricData"]
-        assert metric_data[2]["Value"] == 1  # Errors = 1
+        [doc] = self._flushed(buffer, lines)
+        assert doc["Errors"] == 1
 
-    @patch("tools.common.METRICS_ENABLED", False)
-    def test_METRICS_ENABLED_falseではデコレータからメトリクス送信されない(self):
-        with patch("tools.common._get_cloudwatch_client") as mock_get_client:
-            @log_tool_execution
-            def my_tool():
-                return {"result": "ok"}
+    def test_フェーズごとの所要時間を記録する(self, buffer, lines, caplog):
+        @log_tool_execution
+        def my_tool():
+            with phase("fetch"):
+                time.sleep(0.02)
+            with phase("compute"), phase("narrate"):
+                time.sleep(0.02)
+            return {}
 
-            result = my_tool()
+        with caplog.at_level(logging.INFO):
+            my_tool()
 
-        assert result == {"result": "ok"}
-        mock_get_client.assert_not_called()
+        docs = {doc.get("Phase"): doc for doc in self._flushed(buffer, lines)}
+        assert docs["fetch"]["PhaseTime"] >= 20
+        assert docs["narrate"]["PhaseTime"] >= 20
+        # 入れ子のフェーズは外側から差し引く
+        assert docs["compute"]["PhaseTime"] < 20
+        assert any("fetch=" in r.message and "narrate=" in r.message for r in caplog.records)
+
+    def test_METRICS_ENABLED_falseでは記録しない(self, buffer):
+        @log_tool_execution
+        def my_tool():
+            return {"result": "ok"}
+
+        with patch("tools.metrics.METRICS_ENABLED", False):
+            my_tool()
+
+        assert buffer.pending == 0
+
+
+class TestFanOut:
+    """fan_out のテスト."""
+
+    def test_全タスクの結果を返す(self):
+        result = fan_out({"a": lambda: 1, "b": lambda: "two"}, deadline=1.0)
+
+        assert result.results == {"a": 1, "b": "two"}
+        assert result.errors == {}
+        assert set(result.timings_ms) == {"a", "b"}
+
+    def test_並列に実行する(self):
+        tasks = {name: (lambda: time.sleep(0.2)) for name in ("a", "b", "c")}
+
+        result = fan_out(tasks, deadline=2.0)
+
+        assert result.total_ms < 500
+
+    def test_例外は他のタスクに影響しない(self):
+        def fail():
+            raise ValueError("boom")
+
+        result = fan_out({"ok": lambda: 1, "ng": fail}, deadline=1.0)
+
+        assert result.results == {"ok": 1}
+        assert result.errors == {"ng": "boom"}
+
+    def test_タスク別タイムアウト(self):
+        result = fan_out(
+            {"fast": lambda: 1, "slow": lambda: time.sleep(1.0)},
+            deadline=2.0,
+            timeouts={"slow": 0.1},
+        )
+
+        assert result.results == {"fast": 1}
+        assert result.errors == {"slow": "timeout"}
+        assert result.total_ms < 500
+
+    def test_全体の締め切りでタスク別タイムアウトを丸める(self):
+        result = fan_out({"slow": lambda: time.sleep(1.0)}, deadline=0.1, timeouts={"slow": 5.0})
+
+        assert result.errors == {"slow": "timeout"}
+        assert result.total_ms < 500
@@ -0,0 +1,195 @@
+"""ツール結果メモ化のテスト."""
+
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from tools import tool_memo
+from tools.tool_memo import ToolMemo, make_memo_key, memoize_tool
+
+
+@pytest.fixture
+def memo():
+    m = ToolMemo()
+    with patch.object(tool_memo, "_tool_memo", m):
+        m.begin_session("session-1")
+        yield m
+
+
+def _counting_tool(ttl: float = 60, context=None):
+    calls = []
+
+    @memoize_tool(ttl, context=context)
+    def analyze(race_id: str, options: dict | None = None, top: int = 3) -> dict:
+        calls.append(race_id)
+        time.sleep(0.01)
+        return {"race_id": race_id, "horses": [{"number": 1}], "top": top}
+
+    return analyze, calls
+
+
+class TestMakeMemoKey:
+    """make_memo_key のテスト."""
+
+    def test_引数の表記の違いを吸収する(self):
+        def f(race_id: str, probs: dict, top: int = 3):
+            pass
+
+        keyword_key = make_memo_key(f, (), {"race_id": "R1", "probs": {1: 0.25}, "top": 3})
+        assert make_memo_key(f, ("R1", {"1": 0.25}), {}) == keyword_key
+        assert make_memo_key(f, ("R1", {"1": 0.1 + 0.2}), {}) == make_memo_key(f, ("R1", {"1": 0.3}), {})
+        assert make_memo_key(f, ("R1", {"1": 0.25}), {}) != make_memo_key(f, ("R1", {"1": 0.26}), {})
+
+    def test_状態をキーに含める(self):
+        def f(race_id: str):
+            pass
+
+        assert make_memo_key(f, ("R1",), {}, {"min_ev": 1.0}) != make_memo_key(f, ("R1",), {}, None)
+
+
+class TestMemoizeTool:
+    """memoize_tool のテスト."""
+
+    def test_同じ引数の2回目は実行しない(self, memo):
+        analyze, calls = _counting_tool()
+
+        first = analyze("R1")
+        second = analyze(race_id="R1", top=3)
+
+        assert calls == ["R1"]
+        assert second == first
+        assert memo.stats["hits"] == 1
+        assert memo.stats["saved_ms"] >= 10
+
+    def test_返した結果を変更してもメモに影響しない(self, memo):
+        analyze, _ = _counting_tool()
+
+        analyze("R1")["horses"].clear()
+        analyze("R1")["horses"].append({"number": 2})
+
+        assert analyze("R1")["horses"] == [{"number": 1}]
+
+    def test_期限切れは実行し直す(self, memo):
+        analyze, calls = _counting_tool(ttl=0)
+
+        analyze("R1")
+        analyze("R1")
+
+        assert calls == ["R1", "R1"]
+
+    def test_エラーは覚えない(self, memo):
+        calls = []
+
+        @memoize_tool(60)
+        def fail(race_id: str) -> dict:
+            calls.append(race_id)
+            return {"error": "timeout"}
+
+        fail("R1")
+        fail("R1")
+
+        assert len(calls) == 2
+
+    def test_状態が変われば実行し直す(self, memo):
+        state = {"preference": None}
+        analyze, calls = _counting_tool(context=lambda: state["preference"])
+
+        analyze("R1")
+        state["preference"] = {"min_ev": 1.5}
+        analyze("R1")
+
+        assert len(calls) == 2
+
+    def test_セッションの外ではメモ化しない(self):
+        with patch.object(tool_memo, "_tool_memo", ToolMemo()):
+            analyze, calls = _counting_tool()
+            analyze("R1")
+            analyze("R1")
+
+        assert len(calls) == 2
+
+    def test_無効化した結果は実行し直す(self, memo):
+        analyze, calls = _counting_tool()
+        analyze("R1")
+        analyze("R2")
+
+        assert memo.invalidate(race_id="R1") == 1
+        analyze("R1")
+        analyze("R2")
+
+        assert calls == ["R1", "R2", "R1"]
+        assert memo.invalidate(tool_name="analyze") == 2
+
+
+class TestSession:
+    """ToolMemo のセッションのテスト."""
+
+    def test_同じセッションでは呼び出しをまたいで使い回す(self, memo):
+        analyze, calls = _counting_tool()
+        analyze("R1")
+        memo.end_session()
+
+        memo.begin_session("session-1")
+        analyze("R1")
+
+        assert len(calls) == 1
+
+    def test_セッションが変われば捨てる(self, memo):
+        analyze, calls = _counting_tool()
+        analyze("R1")
+
+        memo.begin_session("session-2")
+        analyze("R1")
+
+        assert len(calls) == 2
+        assert memo.stats["hits"] == 0
+
+    def test_セッションIDがなければ呼び出しごとに捨てる(self, memo):
+        analyze, calls = _counting_tool()
+        memo.begin_session(None)
+        analyze("R1")
+
+        memo.begin_session(None)
+        analyze("R1")
+
+        assert len(calls) == 2
+
+
+class TestProposeBetsMemo:
+    """propose_bets のメモ化のテスト."""
+
+    @pytest.fixture(autouse=True)
+    def no_precompute(self):
+        with patch("tools.precompute.get_precompute_store", return_value=None):
+            yield
+
+    def test_ヒットしてもフロントエンド用の全項目をキャッシュする(self, memo):
+        from tools.ev_proposer import get_last_ev_proposal_result, propose_bets, set_betting_preference
+
+        proposal = {"race_id": "R1", "proposed_bets": [], "total_amount": 0}
+        set_betting_preference(None)
+        with patch("tools.ev_proposer._propose_bets_impl", return_value=proposal) as impl:
+            propose_bets(race_id="R1", win_probabilities={"1": 1.0}, runners_data=[{"horse_number": 1}])
+            get_last_ev_proposal_result()
+            propose_bets(race_id="R1", win_probabilities={1: 1.0}, runners_data=[{"horse_number": 1}])
+
+        assert impl.call_count == 1
+        assert get_last_ev_proposal_result() == proposal
+
+    def test_好み設定が変われば計算し直す(self, memo):
+        from tools.ev_proposer import propose_bets, set_betting_preference
+
+        proposal = {"race_id": "R1", "proposed_bets": [], "total_amount": 0}
+        with patch("tools.ev_proposer._propose_bets_impl", return_value=proposal) as impl:
+            set_betting_preference(None)
+            propose_bets(race_id="R1", win_probabilities={"1": 1.0}, runners_data=[{"horse_number": 1}])
+            set_betting_preference({"selected_bet_types": ["trio"]})
+            propose_bets(race_id="R1", win_probabilities={"1": 1.0}, runners_data=[{"horse_number": 1}])
+        set_betting_preference(None)
+
+        assert impl.call_count == 2
@@ -0,0 +1,199 @@
+"""エージェント呼び出しのレイテンシトレースのテスト."""
+
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from strands.hooks import AfterModelCallEvent, BeforeModelCallEvent
+from tools.common import fan_out, log_tool_execution
+from tools.http_client import PooledHttpClient
+from tools.metrics import phase
+from tools.narration import Narrator, StubNarrationModel
+from tools.narrator_client import NarratorClient, StubBedrockRuntime
+from tools.tracing import (
+    TracingHooks,
+    current_trace,
+    export_trace,
+    span,
+    start_trace,
+    trace_aws_client,
+)
+
+
+def _by_name(trace) -> dict:
+    return {s.name: s for s in trace.spans}
+
+
+class TestSpan:
+    """start_trace / span のテスト."""
+
+    def test_トレース外では何もしない(self):
+        with span("compute") as attributes:
+            attributes["n"] = 1
+        assert current_trace() is None
+
+    def test_入れ子のスパンは親を持つ(self):
+        with start_trace("invoke", race_id="r1") as trace, span("outer", "tool"), span("inner") as attributes:
+            attributes["rows"] = 3
+
+        spans = _by_name(trace)
+        assert spans["invoke"].parent_id is None
+        assert spans["invoke"].attributes == {"race_id": "r1"}
+        assert spans["outer"].parent_id == spans["invoke"].span_id
+        assert spans["inner"].parent_id == spans["outer"].span_id
+        assert spans["inner"].attributes == {"rows": 3}
+
+    def test_例外は型名を記録して再送出する(self):
+        with pytest.raises(ValueError), start_trace("invoke") as trace, span("compute"):
+            raise ValueError("boom")
+
+        spans = _by_name(trace)
+        assert spans["compute"].error == "ValueError"
+        assert spans["invoke"].error == "ValueError"
+
+    def test_ファンアウトのワーカーのスパンも親に紐づく(self):
+        def task():
+            with span("fetch", "http"):
+                return 1
+
+        with start_trace("invoke") as trace, span("tool", "tool"):
+            fan_out({"a": task, "b": task}, deadline=1.0)
+
+        spans = trace.spans
+        tool = next(s for s in spans if s.name == "tool")
+        fetches = [s for s in spans if s.name == "fetch"]
+        assert len(fetches) == 2
+        assert all(s.parent_id == tool.span_id for s in fetches)
+
+    def test_上限を超えたスパンは数だけ数える(self):
+        with patch("tools.tracing.MAX_SPANS", 3), start_trace("invoke") as trace:
+            for _ in range(5):
+                with span("compute"):
+                    pass
+
+        exported = trace.to_dict()
+        # ルートは上限に関わらず残す
+        assert [s["name"] for s in exported["spans"]] == ["invoke", "compute", "compute", "compute"]
+        assert exported["dropped_spans"] == 2
+
+
+class TestSummary:
+    """Trace.summary / export_trace のテスト."""
+
+    def test_遅い順と種類別の合計(self):
+        with start_trace("invoke") as trace:
+            with span("slow", "http"):
+                time.sleep(0.03)
+            with span("fast", "compute"):
+                pass
+
+        summary = trace.summary()
+        assert summary["slowest"][0]["name"] == "slow"
+        assert summary["total_ms"] >= 30
+        assert set(summary["kind_totals_ms"]) == {"http", "compute"}
+
+    def test_構造化ログに書き出す(self, caplog):
+        with start_trace("invoke") as trace, span("compute"):
+            pass
+
+        with caplog.at_level(logging.INFO, logger="agentcore.tools.tracing"):
+            export_trace(trace)
+
+        record = json.loads(caplog.records[-1].message)
+        assert record["trace"]["trace_id"] == trace.trace_id
+        assert [s["name"] for s in record["trace"]["spans"]] == ["invoke", "compute"]
+
+
+class TestInstrumentation:
+    """ツール・外部呼び出しの計測のテスト."""
+
+    def test_ツールとフェーズのスパン(self):
+        @log_tool_execution
+        def my_tool():
+            with phase("fetch"):
+                pass
+            return {}
+
+        with start_trace("invoke") as trace:
+            my_tool()
+
+        spans = _by_name(trace)
+        assert spans["my_tool"].kind == "tool"
+        assert spans["fetch"].kind == "phase"
+        assert spans["fetch"].parent_id == spans["my_tool"].span_id
+
+    def test_HTTPのスパン(self):
+        client = PooledHttpClient()
+        response = MagicMock(status_code=200)
+        with patch.object(client._session, "get", return_value=response), start_trace("invoke") as trace:
+            client.get("https://api.example.com/races/123", params={"a": 1})
+
+        http = next(s for s in trace.spans if s.kind == "http")
+        assert http.name == "GET api.example.com/races/123"
+        assert http.attributes == {"status_code": 200}
+
+    def test_boto3クライアントのスパン(self):
+        client = trace_aws_client(boto3.client(
+            "dynamodb", region_name="ap-northeast-1",
+            aws_access_key_id="test", aws_secret_access_key="test",
+        ))
+        params = {"TableName": "t", "Key": {"k": {"S": "a"}}}
+        with Stubber(client) as stubber, start_trace("invoke") as trace:
+            stubber.add_response("get_item", {"Item": {}}, params)
+            stubber.add_client_error("get_item", "ResourceNotFoundException", expected_params=params)
+            client.get_item(**params)
+            with pytest.raises(client.exceptions.ResourceNotFoundException):
+                client.get_item(**params)
+
+        calls = [s for s in trace.spans if s.kind == "aws"]
+        assert [s.name for s in calls] == ["dynamodb.GetItem", "dynamodb.GetItem"]
+        assert calls[0].error is None
+        assert calls[1].error == "ResourceNotFoundException"
+
+    def test_トレース外のboto3呼び出しは記録しない(self):
+        client = trace_aws_client(boto3.client(
+            "dynamodb", region_name="ap-northeast-1",
+            aws_access_key_id="test", aws_secret_access_key="test",
+        ))
+        with Stubber(client) as stubber:
+            stubber.add_response("get_item", {"Item": {}})
+            # フックはトレースがなくても例外を出さない
+            assert client.get_item(TableName="t", Key={"k": {"S": "a"}}) == {"Item": {}}
+
+    def test_ナレーションのBedrock呼び出しはワーカーでも記録される(self):
+        narrator_client = NarratorClient(client=StubBedrockRuntime(StubNarrationModel("ナレーション")))
+        narrator = Narrator(deadline=1.0)
+
+        with start_trace("invoke") as trace, phase("narrate"):
+            narrator.narrate({"bets": []}, lambda context: narrator_client.complete("system", "{}"))
+
+        spans = _by_name(trace)
+        bedrock = spans["bedrock.converse_stream"]
+        assert bedrock.kind == "bedrock"
+        assert bedrock.parent_id == spans["narrate"].span_id
+        assert bedrock.attributes["stop_reason"] == "end_turn"
+
+    def test_エージェントのモデル呼び出し(self):
+        hooks = TracingHooks()
+        state: dict = {}
+        with start_trace("invoke") as trace:
+            hooks._before_model_call(BeforeModelCallEvent(agent=MagicMock(), invocation_state=state))
+            hooks._after_model_call(AfterModelCallEvent(
+                agent=MagicMock(),
+                invocation_state=state,
+                stop_response=AfterModelCallEvent.ModelStopResponse(message={}, stop_reason="tool_use"),
+            ))
+
+        model_call = _by_name(trace)["agent.model_call"]
+        assert model_call.kind == "bedrock"
+        assert model_call.attributes == {"stop_reason": "tool_use"}
+        assert state == {}
@@ -254,6 +254,7 @@ class TestSavePredictions:
 
         assert item["race_id"] == "202601310511"
         assert item["source"] == "ai-shisu"
+        assert item["race_date"] == "20260131"
         assert item["venue"] == "東京"
         assert item["race_number"] == 11
         assert item["predictions"] == predictions
@@ -5,27 +5,64 @@ from unittest.mock import MagicMock, patch
 os.environ.setdefault("TARGET_USER_ID", "test-user")
 os.environ.setdefault("GAMBLE_OS_SECRET_NAME", "test-secret")
 
-from batch.auto_bet_executor import handler, _run_pipeline, _fetch_predictions
+from batch.auto_bet_executor import AI_PREDICTIONS_TABLE, SOURCES, handler, _run_pipeline, _fetch_predictions
 
 
 class TestFetchPredictions:
     def test_DynamoDBからAI予想を取得(self):
-        mock_table = MagicMock()
-        mock_table.get_item.return_value = {
-            "Item": {
-                "race_id": "202602210501",
-                "source": "keiba-ai-navi",
-                "predictions": [
-                    {"horse_number": "1", "score": "80", "rank": "1"},
-                    {"horse_number": "2", "score": "70", "rank": "2"},
-                ],
-            }
+        mock_dynamodb = MagicMock()
+        mock_dynamodb.batch_get_item.return_value = {
+            "Responses": {
+                AI_PREDICTIONS_TABLE: [
+                    {
+                        "race_id": "202602210501",
+                        "source": "keiba-ai-navi",
+                        "predictions": [
+                            {"horse_number": "1", "score": "80", "rank": "1"},
+                            {"horse_number": "2", "score": "70", "rank": "2"},
+                        ],
+                    }
+                ]
+            },
+            "UnprocessedKeys": {},
         }
-        result = _fetch_predictions(mock_table, "202602210501")
+        result = _fetch_predictions(mock_dynamodb, "202602210501")
         assert "keiba-ai-navi" in result
         assert result["keiba-ai-navi"][0]["horse_number"] == 1
         assert result["keiba-ai-navi"][0]["score"] == 80.0
 
+    def test_全ソースを1回のBatchGetItemで取得(self):
+        mock_dynamodb = MagicMock()
+        mock_dynamodb.batch_get_item.return_value = {"Responses": {AI_PREDICTIONS_TABLE: []}}
+        _fetch_predictions(mock_dynamodb, "202602210501")
+
+        mock_dynamodb.batch_get_item.assert_called_once()
+        keys = mock_dynamodb.batch_get_item.call_args.kwargs["RequestItems"][AI_PREDICTIONS_TABLE]["Keys"]
+        assert [k["source"] for k in keys] == SOURCES
+        assert {k["race_id"] for k in keys} == {"202602210501"}
+
+    @patch("batch.auto_bet_executor.time.sleep")
+    def test_未処理キーを再要求する(self, mock_sleep):
+        def item(source):
+            return {
+                "race_id": "202602210501",
+                "source": source,
+                "predictions": [{"horse_number": "1", "score": "80", "rank": "1"}],
+            }
+
+        unprocessed = {AI_PREDICTIONS_TABLE: {"Keys": [{"race_id": "202602210501", "source": "umamax"}]}}
+        mock_dynamodb = MagicMock()
+        mock_dynamodb.batch_get_item.side_effect = [
+            {"Responses": {AI_PREDICTIONS_TABLE: [item("muryou-keiba-ai")]}, "UnprocessedKeys": unprocessed},
+            {"Responses": {AI_PREDICTIONS_TABLE: [item("umamax")]}, "UnprocessedKeys": {}},
+        ]
+        result = _fetch_predictions(mock_dynamodb, "202602210501")
+
+        assert mock_dynamodb.batch_get_item.call_count == 2
+        assert mock_dynamodb.batch_get_item.call_args.kwargs["RequestItems"] == unprocessed
+        # SOURCES の順に並ぶ
+        assert list(result) == ["umamax", "muryou-keiba-ai"]
+
 
 class TestRunPipeline:
     def test_予想とオッズから買い目を生成(self):
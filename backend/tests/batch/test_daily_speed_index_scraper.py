@@ -260,6 +260,7 @@ class TestSaveIndices:
 
         assert item["race_id"] == "202602080511"
         assert item["source"] == "daily-speed"
+        assert item["race_date"] == "20260208"
         assert item["venue"] == "東京"
         assert item["indices"] == indices
         assert "ttl" in item
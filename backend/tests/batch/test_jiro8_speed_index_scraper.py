@@ -192,6 +192,7 @@ class TestSaveIndices:
 
         assert item["race_id"] == "202602080511"
         assert item["source"] == "jiro8-speed"
+        assert item["race_date"] == "20260208"
         assert item["venue"] == "東京"
         assert item["race_number"] == 11
         assert len(item["indices"]) == 1
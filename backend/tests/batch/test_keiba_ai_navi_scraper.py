@@ -252,6 +252,7 @@ class TestSavePredictions:
 
         assert item["race_id"] == "202602080511"
         assert item["source"] == "keiba-ai-navi"
+        assert item["race_date"] == "20260208"
         assert item["venue"] == "東京"
         assert item["race_number"] == 11
         assert len(item["predictions"]) == 1
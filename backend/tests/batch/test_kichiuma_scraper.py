@@ -278,6 +278,7 @@ class TestSaveIndices:
 
         assert item["race_id"] == "202602080511"
         assert item["source"] == "kichiuma-speed"
+        assert item["race_date"] == "20260208"
         assert item["venue"] == "東京"
         assert item["race_number"] == 11
         assert item["indices"] == indices
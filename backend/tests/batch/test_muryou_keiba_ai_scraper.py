@@ -470,6 +470,7 @@ class TestSavePredictions:
 
         assert item["race_id"] == "202602080811"
         assert item["source"] == "muryou-keiba-ai"
+        assert item["race_date"] == "20260208"
         assert item["venue"] == "京都"
         assert item["race_number"] == 11
         # float→Decimal変換されていることを確認
@@ -276,6 +276,7 @@ class TestSavePredictions:
 
         assert item["race_id"] == "202602080807"
         assert item["source"] == "umamax"
+        assert item["race_date"] == "20260208"
         assert item["venue"] == "京都"
         assert item["race_number"] == 7
         assert "ttl" in item
@@ -0,0 +1,43 @@
+"""エージェントのコールドスタートのベンチマーク.
+
+新しいインタプリタで agent を import し、初回リクエストが負担する初期化
+（ツール import・エージェント生成・クライアント生成）の時間を、
+ping によるウォームアップなし / ありで比較する。あわせて import 時間の上位を表示する。
+
+実行: ``python tests/benchmarks/bench_cold_start.py``（backend ディレクトリから）
+"""
+
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from startup_profile import format_report, measure_cold_start, profile_imports  # noqa: E402
+
+RUNS = 5
+
+
+def _median(runs: list[dict], key: str) -> float | None:
+    values = [r[key] for r in runs if r[key] is not None]
+    return round(statistics.median(values), 1) if values else None
+
+
+def main() -> None:
+    print(format_report(profile_imports("import agent; import tool_router; tool_router.get_tools()"), top=15))
+    print()
+    print(f"cold start (median of {RUNS} fresh interpreters, ms)")
+    print(f"{'':<12}{'import':>10}{'warm-up':>10}{'1st request':>14}")
+    for warm_up in (False, True):
+        runs = [measure_cold_start(warm_up=warm_up) for _ in range(RUNS)]
+        warm = _median(runs, "warm_up_ms")
+        print(
+            f"{'warm-up' if warm_up else 'lazy':<12}"
+            f"{_median(runs, 'import_ms'):>10}"
+            f"{warm if warm is not None else '-':>10}"
+            f"{_median(runs, 'first_request_init_ms'):>14}"
+        )
+
+
+if __name__ == "__main__":
+    main()
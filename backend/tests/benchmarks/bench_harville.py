@@ -0,0 +1,168 @@
+"""Harville確率計算のベンチマーク.
+
+18頭立てで7券種すべての組合せ（_generate_ev_candidates と同じ列挙）について、
+従来の組合せごとの計算と HarvilleTables による一括計算を比較する。
+あわせて _generate_ev_candidates の全件探索と EV 上位 K 件探索の時間を測る。
+
+実行: ``python tests/benchmarks/bench_harville.py``（backend ディレクトリから）
+"""
+
+import random
+import statistics
+import sys
+import time
+from itertools import combinations, permutations
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from tools import ev_proposer  # noqa: E402
+from tools.bet_analysis import _harville_exacta, _harville_trifecta  # noqa: E402
+from tools.ev_proposer import EV_THRESHOLD, _generate_ev_candidates  # noqa: E402
+from tools.harville import HarvilleTables, _cached_tables  # noqa: E402
+
+FIELD_SIZE = 18
+ITERATIONS = 20
+SEED = 42
+BET_TYPES = ["win", "place", "quinella", "exacta", "quinella_place", "trio", "trifecta"]
+
+
+def _legacy_probability(horse_numbers: list[int], bet_type: str, win_probs: dict[int, float]) -> float:
+    """従来の ev_proposer._calculate_combination_probability."""
+    if bet_type == "win":
+        return win_probs.get(horse_numbers[0], 0.0)
+    if bet_type == "place":
+        return min(1.0, win_probs.get(horse_numbers[0], 0.0) * 3)
+    p_a = win_probs.get(horse_numbers[0], 0.0)
+    p_b = win_probs.get(horse_numbers[1], 0.0)
+    if bet_type == "quinella":
+        return _harville_exacta(p_a, p_b) + _harville_exacta(p_b, p_a)
+    if bet_type == "exacta":
+        return _harville_exacta(p_a, p_b)
+    if bet_type == "quinella_place":
+        prob = 0.0
+        for hn_c, p_c in win_probs.items():
+            if hn_c in set(horse_numbers):
+                continue
+            prob += _harville_trifecta(p_a, p_b, p_c)
+            prob += _harville_trifecta(p_a, p_c, p_b)
+            prob += _harville_trifecta(p_b, p_a, p_c)
+            prob += _harville_trifecta(p_b, p_c, p_a)
+            prob += _harville_trifecta(p_c, p_a, p_b)
+            prob += _harville_trifecta(p_c, p_b, p_a)
+        return prob
+    p_c = win_probs.get(horse_numbers[2], 0.0)
+    if bet_type == "trio":
+        return sum(_harville_trifecta(pa, pb, pc) for pa, pb, pc in permutations([p_a, p_b, p_c]))
+    return _harville_trifecta(p_a, p_b, p_c)
+
+
+class _LegacyEngine:
+    """_generate_ev_candidates に従来の計算を差し込むためのアダプタ."""
+
+    def __init__(self, win_probs: dict[int, float]):
+        self._win_probs = win_probs
+
+    def probability(self, horse_numbers: list[int], bet_type: str) -> float:
+        return _legacy_probability(horse_numbers, bet_type, self._win_probs)
+
+
+def _combos(horses: list[int], bet_type: str) -> list[list[int]]:
+    if bet_type in ("win", "place"):
+        return [[h] for h in horses]
+    if bet_type in ("quinella", "exacta", "quinella_place"):
+        return [list(c) for c in combinations(horses, 2)]
+    return [list(c) for c in combinations(horses, 3)]
+
+
+def _win_probs(rng: random.Random) -> dict[int, float]:
+    weights = [rng.random() ** 2 for _ in range(FIELD_SIZE)]
+    total = sum(weights)
+    return {i + 1: w / total for i, w in enumerate(weights)}
+
+
+def _all_odds(rng: random.Random) -> dict:
+    horses = range(1, FIELD_SIZE + 1)
+
+    def odds() -> float:
+        return round(rng.uniform(1.5, 999.9), 1)
+
+    return {
+        "win": {f"{h}": odds() for h in horses},
+        "place": {f"{h}": {"min": odds(), "max": odds()} for h in horses},
+        "quinella": {f"{a}-{b}": odds() for a, b in combinations(horses, 2)},
+        "quinella_place": {f"{a}-{b}": odds() for a, b in combinations(horses, 2)},
+        "exacta": {f"{a}-{b}": odds() for a, b in permutations(horses, 2)},
+        "trio": {f"{a}-{b}-{c}": odds() for a, b, c in combinations(horses, 3)},
+        "trifecta": {f"{a}-{b}-{c}": odds() for a, b, c in permutations(horses, 3)},
+    }
+
+
+def _time(func, iterations: int = ITERATIONS) -> float:
+    """中央値（ms）を返す."""
+    func()
+    times = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000
+
+
+def main() -> None:
+    rng = random.Random(SEED)
+    win_probs = _win_probs(rng)
+    horses = sorted(win_probs, key=win_probs.get, reverse=True)
+    combos = {bet_type: _combos(horses, bet_type) for bet_type in BET_TYPES}
+
+    print(f"field={FIELD_SIZE}")
+    print(f"{'bet_type':<16}{'combos':>8}{'legacy(ms)':>12}{'tables(ms)':>12}{'speedup':>10}")
+    total_legacy = total_tables = 0.0
+    for bet_type in BET_TYPES:
+        def legacy(bet_type=bet_type):
+            for hn in combos[bet_type]:
+                _legacy_probability(hn, bet_type, win_probs)
+
+        def batched(bet_type=bet_type):
+            tables = HarvilleTables(win_probs)
+            for hn in combos[bet_type]:
+                tables.probability(hn, bet_type)
+
+        legacy_ms, tables_ms = _time(legacy), _time(batched)
+        total_legacy += legacy_ms
+        total_tables += tables_ms
+        print(f"{bet_type:<16}{len(combos[bet_type]):>8}{legacy_ms:>12.2f}{tables_ms:>12.2f}"
+              f"{legacy_ms / tables_ms:>9.1f}x")
+    print(f"{'total':<16}{sum(map(len, combos.values())):>8}{total_legacy:>12.2f}{total_tables:>12.2f}"
+          f"{total_legacy / total_tables:>9.1f}x")
+
+    # 好み設定なしのデフォルトフィルター（EV >= 1.0）
+    all_odds = _all_odds(rng)
+    runners_map = {h: {"horse_name": f"馬{h}"} for h in win_probs}
+    ev_filter = (0.0, EV_THRESHOLD, None, None)
+
+    def generate():
+        _cached_tables.cache_clear()
+        _generate_ev_candidates(win_probs, runners_map, BET_TYPES, FIELD_SIZE, all_odds, ev_filter)
+
+    def generate_legacy():
+        with patch.object(ev_proposer, "get_harville_tables", lambda probs: _LegacyEngine(probs)):
+            _generate_ev_candidates(win_probs, runners_map, BET_TYPES, FIELD_SIZE, all_odds, ev_filter)
+
+    print(f"_generate_ev_candidates (7 bet types, EV>={EV_THRESHOLD}): "
+          f"legacy={_time(generate_legacy):.2f} ms engine={_time(generate):.2f} ms")
+
+    # 予算配分時の EV 上位探索（予算1,000円 / 3,000円 相当）
+    for top_k in (10, 30):
+        def generate_top_k(top_k=top_k):
+            _cached_tables.cache_clear()
+            _generate_ev_candidates(
+                win_probs, runners_map, BET_TYPES, FIELD_SIZE, all_odds, ev_filter, top_k=top_k,
+            )
+
+        print(f"_generate_ev_candidates top_k={top_k}: {_time(generate_top_k):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""オッズ履歴の変動分析のベンチマーク.
+
+18頭・1分ごとのスナップショット（発売開始から締切まで最大600件）について、
+OddsSeries への変換と、変動分析（_analyze_movements / _analyze_time_based_movements）
+の所要時間を測る。
+
+実行: ``python tests/benchmarks/bench_odds_series.py``（backend ディレクトリから）
+"""
+
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from tools.odds_analysis import _analyze_movements, _analyze_time_based_movements  # noqa: E402
+from tools.odds_series import OddsSeries  # noqa: E402
+
+FIELD_SIZE = 18
+SNAPSHOT_COUNTS = [60, 200, 600]
+ITERATIONS = 20
+SEED = 42
+
+
+def _history(rng: random.Random, snapshots: int) -> list[dict]:
+    """1分ごとのランダムウォークの単勝オッズ履歴."""
+    odds = {hn: rng.uniform(2.0, 100.0) for hn in range(1, FIELD_SIZE + 1)}
+    opened = datetime(2026, 2, 1, 9, 0)
+    history = []
+    for i in range(snapshots):
+        odds = {hn: max(1.1, o * rng.uniform(0.97, 1.03)) for hn, o in odds.items()}
+        history.append({
+            "timestamp": (opened + timedelta(minutes=i)).isoformat(),
+            "odds": [
+                {"horse_number": hn, "horse_name": f"馬{hn}", "odds": round(o, 1)}
+                for hn, o in odds.items()
+            ],
+        })
+    return history
+
+
+def _median_ms(func) -> float:
+    samples = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    rng = random.Random(SEED)
+    print(f"{'snapshots':>10}{'build ms':>12}{'analyze ms':>12}")
+    for count in SNAPSHOT_COUNTS:
+        history = _history(rng, count)
+        series = OddsSeries.from_history(history)
+        build_ms = _median_ms(lambda history=history: OddsSeries.from_history(history))
+        analyze_ms = _median_ms(lambda series=series: (
+            _analyze_movements(series, None),
+            _analyze_time_based_movements(series, None),
+        ))
+        print(f"{count:>10}{build_ms:>12.2f}{analyze_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""LLM に返すツール結果のトークン数のベンチマーク.
+
+analyze_race_for_betting / propose_bets の結果について、従来の入れ子の辞書と
+コンパクト表現（tools.compact_payload）の入力トークン数を比較する。
+
+トークナイザは同梱していないため、英数字の連続（数字は3桁ずつ）・記号・
+非ASCII文字を1トークンとする近似で数える。比較には十分な精度がある。
+
+レースは既定では固定シードで生成する（10/16/18頭立て、AI予想5ソース、スピード指数3ソース）。
+記録したツール結果を使う場合は、AGENT_COMPACT_TOOL_RESULTS=false で得た
+{"analysis": {...}, "proposal": {...}} の JSON ファイルを引数に渡す。
+
+実行: ``python tests/benchmarks/bench_payload_tokens.py [recorded.json ...]``（backend ディレクトリから）
+"""
+
+import json
+import random
+import re
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from tools.compact_payload import compact_bet_proposal, compact_race_analysis  # noqa: E402
+from tools.ev_proposer import _propose_bets_impl  # noqa: E402
+from tools.race_analyzer import _analyze_race_impl  # noqa: E402
+
+SEED = 42
+FIELD_SIZES = [10, 16, 18]
+AI_SOURCES = ["AI-A", "AI-B", "AI-C", "AI-D", "AI-E"]
+SPEED_SOURCES = ["jiro8-speed", "kichiuma-speed", "daily-speed"]
+STYLES = ["逃げ", "先行", "差し", "追込"]
+
+_TOKEN = re.compile(r"[A-Za-z_]+|\d{1,3}|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(payload: dict) -> int:
+    """ツール結果をモデルに渡す JSON にしたときの概算トークン数."""
+    return len(_TOKEN.findall(json.dumps(payload, ensure_ascii=False)))
+
+
+def _ranked(rng: random.Random, horses: list[int], key: str, low: float, high: float) -> list[dict]:
+    values = {hn: round(rng.uniform(low, high), 1) for hn in horses}
+    order = sorted(horses, key=values.get, reverse=True)
+    return [{"horse_number": hn, "rank": i + 1, key: values[hn]} for i, hn in enumerate(order)]
+
+
+def _synthetic_race(rng: random.Random, field_size: int) -> dict:
+    """記録したツール結果と同じ形の、生成したレース."""
+    horses = list(range(1, field_size + 1))
+    runners = [
+        {"horse_number": hn, "horse_name": f"テストホース{hn}", "odds": round(rng.uniform(1.5, 150.0), 1)}
+        for hn in horses
+    ]
+    ai_result = {"sources": [{"source": s, "predictions": _ranked(rng, horses, "score", 30, 100)} for s in AI_SOURCES]}
+    speed = {"sources": [{"source": s, "indices": _ranked(rng, horses, "value", 60, 110)} for s in SPEED_SOURCES]}
+    analysis = _analyze_race_impl(
+        race_id=f"2026020105{field_size:02d}",
+        race_name="テストステークス",
+        venue="東京",
+        distance="1600m",
+        surface="芝",
+        total_runners=field_size,
+        race_conditions=["G3"],
+        runners_data=runners,
+        ai_result=ai_result,
+        running_styles=[{"horse_number": hn, "running_style": rng.choice(STYLES)} for hn in horses],
+        speed_index_data=speed,
+    )
+
+    weights = [rng.random() ** 2 for _ in horses]
+    win_probs = {hn: w / sum(weights) for hn, w in zip(horses, weights, strict=True)}
+    win_odds = {str(r["horse_number"]): r["odds"] for r in runners}
+    pairs = {f"{a}-{b}": round(rng.uniform(3, 300), 1) for a in horses for b in horses if a < b}
+    with patch("tools.ev_proposer._invoke_haiku_narrator", return_value=None):
+        proposal = _propose_bets_impl(
+            race_id=analysis["race_info"]["race_id"],
+            win_probabilities=win_probs,
+            runners_data=runners,
+            total_runners=field_size,
+            budget=3000,
+            preferred_bet_types=["win", "quinella", "quinella_place"],
+            all_odds={"win": win_odds, "place": {}, "quinella": pairs, "quinella_place": pairs,
+                      "exacta": {}, "trio": {}, "trifecta": {}},
+        )
+    return {"analysis": analysis, "proposal": proposal}
+
+
+def main(paths: list[str]) -> None:
+    if paths:
+        races = {Path(p).stem: json.loads(Path(p).read_text()) for p in paths}
+    else:
+        rng = random.Random(SEED)
+        races = {f"synthetic-{n}頭": _synthetic_race(rng, n) for n in FIELD_SIZES}
+
+    print(f"{'race':<20}{'payload':<10}{'verbose':>10}{'compact':>10}{'saved':>8}")
+    totals = [0, 0]
+    for name, race in races.items():
+        for payload, compact in (("analysis", compact_race_analysis), ("proposal", compact_bet_proposal)):
+            verbose_tokens = estimate_tokens(race[payload])
+            compact_tokens = estimate_tokens(compact(race[payload]))
+            totals[0] += verbose_tokens
+            totals[1] += compact_tokens
+            print(f"{name:<20}{payload:<10}{verbose_tokens:>10}{compact_tokens:>10}"
+                  f"{1 - compact_tokens / verbose_tokens:>8.0%}")
+    print(f"{'total':<30}{totals[0]:>10}{totals[1]:>10}{1 - totals[1] / totals[0]:>8.0%}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,453 @@
+"""ツールチェーン（analyze_race_for_betting → propose_bets）のリプレイベンチマーク.
+
+実レースの JRA-VAN API レスポンスと DynamoDB（AI予想・スピード指数）の読み込み結果を
+フィクスチャに記録し、AWS・JRA-VAN なしでツールチェーンを再実行する。
+LLM の代わりに統合勝率（AI指数の平均）を propose_bets に渡し、ナレーションは定型文にする。
+
+レースごとにステージ（analyze / probabilities / propose）の所要時間、
+トレースのスパン（ev_candidates・allocate_budget 等）の所要時間、任意でメモリ確保量を測り、
+記録時の買い目（baseline）との差分を数える。レースはプロセスプールで並列に実行する。
+
+    # 実レースを記録（AWS 認証情報と JRA-VAN API への到達性が必要）
+    python tests/benchmarks/bench_tool_chain_replay.py record --date 20260201
+    python tests/benchmarks/bench_tool_chain_replay.py record 202602010511 202602010512
+
+    # 記録したレースを再実行
+    python tests/benchmarks/bench_tool_chain_replay.py run [--workers 8] [--allocations]
+
+    # 生成したレースで再実行（記録なしで試す）。--baseline のファイルがなければ結果を書き出し、
+    # あれば買い目を比較する（変更前に書き出し、変更後に比較する）
+    python tests/benchmarks/bench_tool_chain_replay.py run --synthetic 300 --baseline /tmp/baseline.json
+
+実行は backend ディレクトリから。フィクスチャの既定の置き場所は
+tests/benchmarks/replay_fixtures/（実データのためコミットしない）。
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import patch
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agentcore"))
+
+from tools import ai_prediction, http_client, jravan_client, race_signals, speed_index  # noqa: E402
+from tools.api_cache import get_session_cache, make_cache_key  # noqa: E402
+from tools.bet_proposal import _compute_unified_win_probabilities  # noqa: E402
+from tools.ev_proposer import get_last_ev_proposal_result, propose_bets, set_betting_preference  # noqa: E402
+from tools.narration import get_narrator  # noqa: E402
+from tools.race_analyzer import analyze_race_for_betting  # noqa: E402
+from tools.race_signals import AI_PREDICTION, get_race_signal_loader, load_race_signals  # noqa: E402
+from tools.tracing import start_trace  # noqa: E402
+
+DEFAULT_FIXTURES = Path(__file__).parent / "replay_fixtures"
+BUDGET = 3000
+SEED = 42
+STAGES = ("analyze", "probabilities", "propose")
+
+# DynamoDB テーブル（race_signals の種別 → テーブルを返すモジュール）
+SIGNAL_TABLE_MODULES = {"ai_prediction": ai_prediction, "speed_index": speed_index}
+
+
+# =============================================================================
+# フィクスチャ
+# =============================================================================
+
+
+def _api_path(url: str) -> str:
+    """ベースURLを除いたパス（記録時と再実行時で API の URL が違っても引けるように）."""
+    return url.removeprefix(jravan_client.get_api_url())
+
+
+def _json_default(value: object) -> object:
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class _RecordingHttpClient:
+    """実クライアントに委譲し、レスポンスを記録する."""
+
+    def __init__(self, inner, responses: dict):
+        self._inner = inner
+        self._responses = responses
+
+    def get(self, url: str, *, params: dict | None = None, headers: dict | None = None, timeout: float = 10):
+        response = self._inner.get(url, params=params, headers=headers, timeout=timeout)
+        self._responses[make_cache_key(_api_path(url), params)] = {
+            "status": response.status_code,
+            "body": response.text,
+        }
+        return response
+
+
+class _ReplayHttpClient:
+    """記録したレスポンスを返す. 記録にないリクエストは 404."""
+
+    def __init__(self, responses: dict):
+        self._responses = responses
+
+    def get(self, url: str, *, params: dict | None = None, headers: dict | None = None, timeout: float = 10):
+        recorded = self._responses.get(make_cache_key(_api_path(url), params), {"status": 404, "body": ""})
+        response = requests.Response()
+        response.status_code = recorded["status"]
+        response.url = url
+        response._content = recorded["body"].encode()
+        response.encoding = "utf-8"
+        return response
+
+
+class _ReplayTable:
+    """race_id のクエリだけに答える DynamoDB テーブルの代替."""
+
+    def __init__(self, items: list[dict]):
+        self._items = items
+
+    def query(self, **kwargs) -> dict:
+        _, race_id = kwargs["KeyConditionExpression"].get_expression()["values"]
+        return {"Items": [item for item in self._items if item.get("race_id") == race_id]}
+
+
+@contextmanager
+def _quiet_externals():
+    """共有キャッシュ・事前計算・ナレーション（Bedrock）・APIキー取得を切り離す."""
+    with ExitStack() as stack:
+        stack.enter_context(patch.object(jravan_client, "get_shared_cache", return_value=None))
+        stack.enter_context(patch.object(jravan_client, "_cached_api_key", ""))
+        stack.enter_context(patch("tools.precompute.get_precompute_store", return_value=None))
+        stack.enter_context(patch("tools.ev_proposer._invoke_haiku_narrator", return_value=None))
+        yield
+
+
+def _reset_caches() -> None:
+    """レース間でキャッシュを持ち越さない（毎回コールドで測る）."""
+    get_session_cache().clear()
+    get_race_signal_loader().clear()
+    get_narrator().clear()
+
+
+# =============================================================================
+# ツールチェーン
+# =============================================================================
+
+
+class _Stages:
+    """ステージごとの所要時間とメモリ確保量（tracemalloc のピーク）を測る."""
+
+    def __init__(self, allocations: bool):
+        self.allocations = allocations
+        self.timings_ms: dict[str, float] = {}
+        self.peak_kb: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        if self.allocations:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings_ms[name] = (time.perf_counter() - start) * 1000
+            if self.allocations:
+                self.peak_kb[name] = (tracemalloc.get_traced_memory()[1] - base) / 1024
+
+
+def run_chain(race_id: str, allocations: bool = False) -> dict:
+    """1レース分のツールチェーンを実行し、計測値と買い目を返す."""
+    _reset_caches()
+    set_betting_preference(None)
+    stages = _Stages(allocations)
+    with start_trace("replay", race_id=race_id) as trace:
+        with stages.stage("analyze"):
+            analysis = analyze_race_for_betting(race_id=race_id)
+        with stages.stage("probabilities"):
+            ai_result = load_race_signals([race_id], kinds=(AI_PREDICTION,))[race_id][AI_PREDICTION]
+            win_probs = _compute_unified_win_probabilities(ai_result) if "error" not in ai_result else {}
+        proposal = None
+        if win_probs and "error" not in analysis:
+            with stages.stage("propose"):
+                propose_bets(
+                    race_id=race_id,
+                    win_probabilities={str(hn): p for hn, p in win_probs.items()},
+                    budget=BUDGET,
+                )
+                proposal = get_last_ev_proposal_result()
+
+    spans: dict[str, float] = defaultdict(float)
+    for s in trace.spans:
+        if s.parent_id is not None and s.kind in ("compute", "phase"):
+            spans[s.name] += s.duration_ms
+    return {
+        "race_id": race_id,
+        "error": analysis.get("error"),
+        "stages_ms": stages.timings_ms,
+        "peak_kb": stages.peak_kb,
+        "spans_ms": dict(spans),
+        "bets": _bet_summary(proposal),
+    }
+
+
+def _bet_summary(proposal: dict | None) -> list[list]:
+    """差分比較用の買い目（券種・馬番・金額・EV）."""
+    if not proposal:
+        return []
+    return [
+        [b["bet_type"], b["horse_numbers"], b.get("amount", 0), b.get("expected_value")]
+        for b in proposal.get("proposed_bets", [])
+    ]
+
+
+def _diff(baseline: list[list], replayed: list[list]) -> dict | None:
+    """買い目の差分（なければNone）."""
+    if baseline == replayed:
+        return None
+    key = lambda b: (b[0], tuple(b[1]))  # noqa: E731
+    before = {key(b): b for b in baseline}
+    after = {key(b): b for b in replayed}
+    return {
+        "added": len(after.keys() - before.keys()),
+        "removed": len(before.keys() - after.keys()),
+        "changed": sum(1 for k in before.keys() & after.keys() if before[k] != after[k]),
+    }
+
+
+# =============================================================================
+# 記録
+# =============================================================================
+
+
+def record(race_ids: list[str], fixtures: Path) -> None:
+    """実レースを実行し、レスポンスと買い目をフィクスチャに書き出す."""
+    fixtures.mkdir(parents=True, exist_ok=True)
+    real_query = race_signals._query_items
+    for race_id in race_ids:
+        responses: dict = {}
+        tables: dict[str, list[dict]] = defaultdict(list)
+
+        def recording_query(table, rid, tables=tables):
+            items = real_query(table, rid)
+            kind = next(k for k, m in SIGNAL_TABLE_MODULES.items() if m.get_dynamodb_table().name == table.name)
+            tables[kind].extend(items)
+            return items
+
+        client = _RecordingHttpClient(http_client.get_http_client(), responses)
+        with patch.object(http_client, "get_http_client", return_value=client), \
+                patch.object(race_signals, "_query_items", recording_query), \
+                patch.object(jravan_client, "get_shared_cache", return_value=None), \
+                patch("tools.precompute.get_precompute_store", return_value=None), \
+                patch("tools.ev_proposer._invoke_haiku_narrator", return_value=None):
+            result = run_chain(race_id)
+        fixture = {"race_id": race_id, "http": responses, "dynamodb": dict(tables), "baseline": result["bets"]}
+        path = fixtures / f"{race_id}.json"
+        path.write_text(json.dumps(fixture, ensure_ascii=False, default=_json_default))
+        print(f"recorded {race_id}: {len(responses)} requests, {len(result['bets'])} bets -> {path}")
+
+
+# =============================================================================
+# 生成したレース
+# =============================================================================
+
+
+def synthetic_fixture(rng: random.Random, race_id: str) -> dict:
+    """記録と同じ形の、生成したレースのフィクスチャ（baseline なし）."""
+    field_size = rng.choice([8, 10, 12, 14, 16, 18])
+    horses = list(range(1, field_size + 1))
+    strength = {hn: rng.random() ** 2 + 0.02 for hn in horses}
+    total = sum(strength.values())
+    win_odds = {hn: round(max(1.1, 0.8 * total / strength[hn] * rng.uniform(0.8, 1.25)), 1) for hn in horses}
+
+    def pair_odds(keys) -> dict[str, float]:
+        return {
+            "-".join(map(str, k)): round(max(1.1, 0.75 / (strength[k[0]] * strength[k[1]] / total ** 2)
+                                             / (len(k) * 4) * rng.uniform(0.7, 1.3)), 1)
+            for k in keys
+        }
+
+    pairs = [(a, b) for a in horses for b in horses if a < b]
+    ordered = [(a, b) for a in horses for b in horses if a != b]
+    trios = [(a, b, c) for a in horses for b in horses for c in horses if a < b < c]
+    odds = {
+        "win": {str(hn): o for hn, o in win_odds.items()},
+        "place": {str(hn): {"min": round(max(1.0, o / 3.5), 1), "max": round(max(1.1, o / 2.5), 1)}
+                  for hn, o in win_odds.items()},
+        "quinella": pair_odds(pairs),
+        "quinella_place": {k: round(max(1.1, v / 3), 1) for k, v in pair_odds(pairs).items()},
+        "exacta": pair_odds(ordered),
+        "trio": pair_odds(trios),
+        "trifecta": {},
+    }
+    race = {
+        "race": {"race_name": "テストステークス", "venue": race_id[8:10], "distance": 1600,
+                 "track_type": "芝", "horse_count": field_size},
+        "runners": [{"horse_number": hn, "horse_name": f"テストホース{hn}", "odds": win_odds[hn],
+                     "popularity": i + 1} for i, hn in enumerate(sorted(horses, key=win_odds.get))],
+    }
+    styles = [{"horse_number": hn, "running_style": rng.choice(["逃げ", "先行", "差し", "追込"])} for hn in horses]
+
+    def ranked(field: str, key: str, low: float, high: float) -> list[dict]:
+        values = {hn: round(rng.uniform(low, high) * (0.5 + strength[hn]), 1) for hn in horses}
+        order = sorted(horses, key=values.get, reverse=True)
+        return [{"horse_number": hn, "rank": i + 1, key: values[hn]} for i, hn in enumerate(order)]
+
+    base = f"/races/{race_id}"
+    http = {
+        make_cache_key(base, None): {"status": 200, "body": json.dumps(race, ensure_ascii=False)},
+        make_cache_key(f"{base}/running-styles", None): {"status": 200, "body": json.dumps(styles, ensure_ascii=False)},
+        make_cache_key(f"{base}/odds", None): {"status": 200, "body": json.dumps(odds)},
+    }
+    dynamodb = {
+        "ai_prediction": [
+            {"race_id": race_id, "source": f"ai-{i}", "predictions": ranked("predictions", "score", 30, 100)}
+            for i in range(rng.randint(2, 5))
+        ],
+        "speed_index": [{"race_id": race_id, "source": f"speed-{i}", "indices": ranked("indices", "value", 60, 110)}
+                        for i in range(rng.randint(1, 3))],
+    }
+    return {"race_id": race_id, "http": http, "dynamodb": dynamodb, "baseline": None}
+
+
+# =============================================================================
+# 再実行
+# =============================================================================
+
+_worker_stack: ExitStack | None = None
+
+
+def _init_worker(allocations: bool) -> None:
+    """ワーカープロセスで外部接続を切り離す."""
+    global _worker_stack
+    _worker_stack = ExitStack()
+    _worker_stack.enter_context(_quiet_externals())
+    if allocations:
+        tracemalloc.start()
+
+
+def replay(fixture: dict, allocations: bool = False) -> dict:
+    """1レース分のフィクスチャでツールチェーンを再実行する."""
+    race_id = fixture["race_id"]
+    tables = {kind: _ReplayTable(fixture["dynamodb"].get(kind, [])) for kind in SIGNAL_TABLE_MODULES}
+    with patch.object(http_client, "get_http_client", return_value=_ReplayHttpClient(fixture["http"])), \
+            patch.object(ai_prediction, "get_dynamodb_table", return_value=tables["ai_prediction"]), \
+            patch.object(speed_index, "get_dynamodb_table", return_value=tables["speed_index"]):
+        result = run_chain(race_id, allocations=allocations)
+    result["key"] = race_id
+    if fixture["baseline"] is not None:
+        result["diff"] = _diff(fixture["baseline"], result["bets"])
+    return result
+
+
+def _replay_path(path: str, allocations: bool) -> dict:
+    return replay(json.loads(Path(path).read_text()), allocations)
+
+
+def _replay_synthetic(index: int, allocations: bool) -> dict:
+    race_id = f"2026020105{index % 100:02d}"
+    fixture = synthetic_fixture(random.Random(SEED + index), race_id)
+    result = replay(fixture, allocations)
+    result["key"] = f"synthetic-{index}"
+    return result
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def report(results: list[dict], wall_s: float) -> None:
+    """ステージ・スパン別の所要時間、メモリ確保量、差分を出力する."""
+    ok = [r for r in results if not r["error"]]
+    print(f"races: {len(results)}  errors: {len(results) - len(ok)}  wall: {wall_s:.1f}s")
+    print(f"\n{'stage':<22}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'peak KB p50':>14}")
+    for name in STAGES:
+        values = [r["stages_ms"][name] for r in ok if name in r["stages_ms"]]
+        if not values:
+            continue
+        peaks = [r["peak_kb"][name] for r in ok if name in r["peak_kb"]]
+        peak = f"{statistics.median(peaks):>14.0f}" if peaks else f"{'-':>14}"
+        print(f"{name:<22}{statistics.median(values):>10.1f}{_percentile(values, 0.95):>10.1f}"
+              f"{max(values):>10.1f}{peak}")
+
+    span_names = sorted({name for r in ok for name in r["spans_ms"]})
+    if span_names:
+        print(f"\n{'span':<22}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for name in span_names:
+            values = [r["spans_ms"].get(name, 0.0) for r in ok]
+            print(f"{name:<22}{statistics.median(values):>10.1f}{_percentile(values, 0.95):>10.1f}{max(values):>10.1f}")
+
+    diffs = [r for r in ok if r.get("diff")]
+    print(f"\nbaseline diffs: {len(diffs)} / {sum(1 for r in ok if 'diff' in r)}")
+    for r in diffs[:10]:
+        print(f"  {r['race_id']}: {r['diff']}")
+
+
+def _apply_baseline(results: list[dict], baseline: Path) -> None:
+    """baseline のファイルがあれば買い目を比較し、なければ今回の買い目を書き出す."""
+    if not baseline.exists():
+        baseline.write_text(json.dumps({r["key"]: r["bets"] for r in results}, ensure_ascii=False))
+        print(f"baseline written: {baseline}")
+        return
+    saved = json.loads(baseline.read_text())
+    for r in results:
+        if r["key"] in saved:
+            r["diff"] = _diff(saved[r["key"]], r["bets"])
+
+
+def run(
+    fixtures: Path, synthetic: int, workers: int | None, allocations: bool, baseline: Path | None = None,
+) -> list[dict]:
+    """フィクスチャ（または生成したレース）をプロセスプールで再実行する."""
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(allocations,)) as pool:
+        if synthetic:
+            futures = [pool.submit(_replay_synthetic, i, allocations) for i in range(synthetic)]
+        else:
+            paths = sorted(str(p) for p in fixtures.glob("*.json"))
+            if not paths:
+                raise SystemExit(f"no fixtures in {fixtures} (record first, or use --synthetic N)")
+            futures = [pool.submit(_replay_path, p, allocations) for p in paths]
+        results = [f.result() for f in futures]
+    if baseline is not None:
+        _apply_baseline(results, baseline)
+    report(results, time.perf_counter() - start)
+    return results
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURES)
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="実レースのレスポンスを記録する")
+    rec.add_argument("race_ids", nargs="*")
+    rec.add_argument("--date", help="開催日（AI予想テーブルの日付GSIから全レースを記録）")
+    rp = sub.add_parser("run", help="記録（または生成）したレースで再実行する")
+    rp.add_argument("--synthetic", type=int, default=0, help="生成したレース数（記録の代わりに使う）")
+    rp.add_argument("--workers", type=int, default=None)
+    rp.add_argument("--allocations", action="store_true", help="ステージごとのメモリ確保量を測る（遅くなる）")
+    rp.add_argument("--baseline", type=Path, help="買い目の比較先（なければ今回の結果を書き出す）")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        race_ids = list(args.race_ids)
+        if args.date:
+            from tools.precompute import _race_ids_for_date
+            race_ids += _race_ids_for_date(args.date)
+        if not race_ids:
+            parser.error("race_ids か --date が必要です")
+        record(race_ids, args.fixtures)
+    else:
+        run(args.fixtures, args.synthetic, args.workers, args.allocations, args.baseline)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -7,6 +7,7 @@ from src.domain.services.betting_pipeline import (
     SOURCES,
     WIN_WEIGHTS,
     compute_agree_counts,
+    compute_agree_counts_by_top_n,
     log_opinion_pool,
     market_implied_probs,
     softmax,
@@ -122,3 +123,13 @@ class TestComputeAgreeCounts:
         assert result[3] == 4
         assert result[5] == 3
         assert result[4] == 1
+
+    def test_複数のTopNをまとめて計算しても個別の計算と一致(self):
+        source_probs = [
+            {1: 0.3, 2: 0.25, 3: 0.2, 4: 0.15, 5: 0.1},
+            {1: 0.3, 3: 0.25, 5: 0.2, 2: 0.15, 4: 0.1},
+            {3: 0.3, 1: 0.25, 2: 0.2, 5: 0.15, 4: 0.1},
+        ]
+        result = compute_agree_counts_by_top_n(source_probs, [3, 4])
+        assert result[3] == compute_agree_counts(source_probs, top_n=3)
+        assert result[4] == compute_agree_counts(source_probs, top_n=4)
@@ -453,7 +453,7 @@ class TestGetAllOdds:
         }
 
     _PATCH_TARGET = (
-        "src.infrastructure.providers.dynamodb_race_data_provider.requests.get"
+        "src.infrastructure.providers.dynamodb_race_data_provider.http_get"
     )
 
     def test_JRA_VAN_APIからオッズを取得してAllOddsDataを返す(self):
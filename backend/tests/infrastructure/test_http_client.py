@@ -0,0 +1,149 @@
+"""共有HTTPクライアントのテスト."""
+
+import http.server
+import importlib
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from src.infrastructure import http_client
+from src.infrastructure.http_client import get_http_client
+
+BACKEND_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(BACKEND_DIR / "agentcore"))
+
+# AgentCore は別デプロイのため同じ実装を2か所に置いている
+_COPIES = {
+    "src": "src/infrastructure/http_client.py",
+    "agentcore": "agentcore/tools/http_client.py",
+}
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """キープアライブ対応のテスト用ハンドラー."""
+
+    protocol_version = "HTTP/1.1"
+    # path -> 返すステータスの列（尽きたら 200）
+    scripted: dict[str, list[int]] = {}
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+            statuses = cls.scripted.get(self.path, [])
+            status = statuses.pop(0) if statuses else 200
+        if self.path.startswith("/slow"):
+            time.sleep(0.1)
+        body = b'{"ok": true}' if status == 200 else b""
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with cls.lock:
+            cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.scripted = {}
+    _Handler.active = 0
+    _Handler.max_active = 0
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{srv.server_port}"
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture(params=["src", "agentcore"])
+def impl(request):
+    """src 側と agentcore 側の両方の実装で同じテストを実行する."""
+    if request.param == "src":
+        return http_client
+    return importlib.import_module("tools.http_client")
+
+
+@pytest.fixture
+def client(impl):
+    c = impl.PooledHttpClient()
+    yield c
+    c.close()
+
+
+def test_src側とagentcore側の実装が同一():
+    src, agentcore = (
+        (BACKEND_DIR / path).read_text(encoding="utf-8") for path in _COPIES.values()
+    )
+    assert src == agentcore
+
+
+class TestPooledHttpClient:
+    """PooledHttpClient のテスト."""
+
+    def test_接続を再利用する(self, server, client):
+        for _ in range(5):
+            assert client.get(f"{server}/ok").json() == {"ok": True}
+
+        stats = client.stats
+        assert stats["requests"] == 5
+        assert stats["new_connections"] == 1
+        assert stats["reused_connections"] == 4
+
+    def test_5xxは再試行する(self, server, impl):
+        _Handler.scripted = {"/flaky": [503, 502]}
+        with patch.object(impl, "BACKOFF_FACTOR", 0), patch.object(impl, "BACKOFF_JITTER", 0):
+            client = impl.PooledHttpClient()
+
+        response = client.get(f"{server}/flaky")
+
+        assert response.status_code == 200
+        assert client.stats["retries"] == 2
+        client.close()
+
+    def test_再試行回数を超えたら最後のレスポンスを返す(self, server, impl):
+        _Handler.scripted = {"/down": [503, 503, 503]}
+        client = impl.PooledHttpClient(max_retries=1)
+
+        response = client.get(f"{server}/down")
+
+        assert response.status_code == 503
+        assert client.stats["retries"] == 1
+        client.close()
+
+    def test_4xxは再試行しない(self, server, client):
+        _Handler.scripted = {"/missing": [404]}
+
+        response = client.get(f"{server}/missing")
+
+        assert response.status_code == 404
+        assert client.stats["retries"] == 0
+
+    def test_ホストごとの同時リクエスト数を制限する(self, server, impl):
+        client = impl.PooledHttpClient(max_connections_per_host=2)
+        threads = [threading.Thread(target=client.get, args=(f"{server}/slow",)) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert _Handler.max_active <= 2
+        assert client.stats["requests"] == 6
+        client.close()
+
+
+class TestGetHttpClient:
+    """get_http_client のテスト."""
+
+    def test_同一インスタンスを返す(self):
+        assert get_http_client() is get_http_client()
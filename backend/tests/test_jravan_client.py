@@ -1,6 +1,7 @@
 """JRA-VAN API クライアント共通モジュールのテスト."""
 
 import sys
+import time
 from pathlib import Path
 
 import pytest
@@ -21,6 +22,13 @@ def reset_cache():
     jravan_client._cached_api_key = None
 
 
+@pytest.fixture(autouse=True)
+def no_shared_cache():
+    """共有キャッシュ層を無効化（個別テストで差し替える）."""
+    with patch.object(jravan_client, "get_shared_cache", return_value=None):
+        yield
+
+
 class TestGetApiKey:
     """get_api_key 関数のテスト."""
 
@@ -114,13 +122,11 @@ class TestCachedGet:
     def reset_session_cache(self):
         """テストごとにセッションキャッシュをリセット."""
         from tools.api_cache import get_session_cache
-        cache = get_session_cache()
-        cache._cache.clear()
-        cache._hits = 0
-        cache._misses = 0
+        get_session_cache().clear()
         yield
+        get_session_cache().clear()
 
-    @patch("tools.jravan_client.requests.get")
+    @patch("tools.jravan_client.http_get")
     @patch.object(jravan_client, "get_headers", return_value={"x-api-key": "test"})
     def test_キャッシュミス時はrequests_getが呼ばれる(self, mock_headers, mock_get):
         """初回呼び出し時はAPIリクエストが実行される."""
@@ -133,12 +139,13 @@ class TestCachedGet:
         mock_get.assert_called_once()
         assert result is mock_response
 
-    @patch("tools.jravan_client.requests.get")
+    @patch("tools.jravan_client.http_get")
     @patch.object(jravan_client, "get_headers", return_value={"x-api-key": "test"})
     def test_キャッシュヒット時はrequests_getが呼ばれない(self, mock_headers, mock_get):
         """2回目の同一URLではAPIリクエストが省略される."""
         mock_response = MagicMock()
         mock_response.ok = True
+        mock_response.json.return_value = {"race": {"race_id": "1"}}
         mock_get.return_value = mock_response
 
         jravan_client.cached_get("https://api.example.com/races/1")
@@ -147,9 +154,26 @@ class TestCachedGet:
         result = jravan_client.cached_get("https://api.example.com/races/1")
 
         mock_get.assert_not_called()
-        assert result is mock_response
+        assert result.status_code == 200
+        assert result.json() == {"race": {"race_id": "1"}}
 
-    @patch("tools.jravan_client.requests.get")
+    @patch("tools.jravan_client.http_get")
+    @patch.object(jravan_client, "get_headers", return_value={"x-api-key": "test"})
+    def test_キャッシュヒット時はJSONを再エンコードしない(self, mock_headers, mock_get):
+        """json() だけを使う呼び出しでは本文のバイト列を作らない."""
+        mock_response = MagicMock()
+        mock_response.ok = True
+        mock_response.json.return_value = {"race": {"race_id": "1"}}
+        mock_get.return_value = mock_response
+        jravan_client.cached_get("https://api.example.com/races/1")
+
+        with patch("tools.jravan_client.json.dumps", side_effect=AssertionError("re-encoded")):
+            result = jravan_client.cached_get("https://api.example.com/races/1")
+            assert result.json() == {"race": {"race_id": "1"}}
+
+        assert result.text == '{"race": {"race_id": "1"}}'
+
+    @patch("tools.jravan_client.http_get")
     @patch.object(jravan_client, "get_headers", return_value={"x-api-key": "test"})
     def test_異なるURLはキャッシュされない(self, mock_headers, mock_get):
         """異なるURLでは再度APIリクエストが実行される."""
@@ -162,7 +186,7 @@ class TestCachedGet:
 
         assert mock_get.call_count == 2
 
-    @patch("tools.jravan_client.requests.get")
+    @patch("tools.jravan_client.http_get")
     @patch.object(jravan_client, "get_headers", return_value={"x-api-key": "test"})
     def test_エラーレスポンスはキャッシュされない(self, mock_headers, mock_get):
         """APIエラー時はレスポンスをキャッシュしない."""
@@ -176,7 +200,7 @@ class TestCachedGet:
 
         assert mock_get.call_count == 2
 
-    @patch("tools.jravan_client.requests.get")
+    @patch("tools.jravan_client.http_get")
     @patch.object(jravan_client, "get_headers", return_value={"x-api-key": "test"})
     def test_パラメータがキャッシュキーに含まれる(self, mock_headers, mock_get):
         """同じURLでもパラメータが違えば別キャッシュ."""
@@ -189,7 +213,7 @@ class TestCachedGet:
 
         assert mock_get.call_count == 2
 
-    @patch("tools.jravan_client.requests.get")
+    @patch("tools.jravan_client.http_get")
     @patch.object(jravan_client, "get_headers", return_value={"x-api-key": "test"})
     def test_ヘッダーが正しく付与される(self, mock_headers, mock_get):
         """cached_getがget_headersのヘッダーを使用する."""
@@ -201,3 +225,132 @@ class TestCachedGet:
 
         call_kwargs = mock_get.call_args
         assert call_kwargs.kwargs["headers"] == {"x-api-key": "test"}
+
+
+class TestCachedGetJson:
+    """cached_get_json 関数のテスト."""
+
+    @pytest.fixture(autouse=True)
+    def reset_session_cache(self):
+        """テストごとにセッションキャッシュをリセット."""
+        from tools.api_cache import get_session_cache
+        get_session_cache().clear()
+        yield
+        get_session_cache().clear()
+
+    @patch("tools.jravan_client.http_get")
+    @patch.object(jravan_client, "get_headers", return_value={})
+    def test_デコード済みJSONを返しヒット時は再デコードしない(self, mock_headers, mock_get):
+        """2回目はAPIリクエストもJSONデコードも行わない."""
+        mock_response = MagicMock()
+        mock_response.ok = True
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"odds": [1, 2]}
+        mock_get.return_value = mock_response
+
+        first = jravan_client.cached_get_json("https://api.example.com/races/1/odds")
+        second = jravan_client.cached_get_json("https://api.example.com/races/1/odds")
+
+        assert first == {"odds": [1, 2]}
+        assert second is first
+        mock_get.assert_called_once()
+        mock_response.json.assert_called_once()
+
+    @patch("tools.jravan_client.http_get")
+    @patch.object(jravan_client, "get_headers", return_value={})
+    def test_404はNoneを返しキャッシュしない(self, mock_headers, mock_get):
+        """404の場合はNoneを返す."""
+        mock_response = MagicMock()
+        mock_response.ok = False
+        mock_response.status_code = 404
+        mock_get.return_value = mock_response
+
+        assert jravan_client.cached_get_json("https://api.example.com/races/1") is None
+        assert jravan_client.cached_get_json("https://api.example.com/races/1") is None
+        assert mock_get.call_count == 2
+
+    @patch("tools.jravan_client.http_get")
+    @patch.object(jravan_client, "get_headers", return_value={})
+    def test_404以外のエラーは例外を送出する(self, mock_headers, mock_get):
+        """サーバーエラーはHTTPErrorとして送出する."""
+        mock_response = MagicMock()
+        mock_response.ok = False
+        mock_response.status_code = 500
+        mock_response.raise_for_status.side_effect = requests.HTTPError("500 Server Error")
+        mock_get.return_value = mock_response
+
+        with pytest.raises(requests.HTTPError):
+            jravan_client.cached_get_json("https://api.example.com/races/1")
+
+    @patch("tools.jravan_client.http_get")
+    @patch.object(jravan_client, "get_headers", return_value={})
+    def test_レスポンスのバイト数をサイズとして記録する(self, mock_headers, mock_get):
+        """概算サイズにはレスポンスボディの長さを使う."""
+        from tools.api_cache import get_session_cache
+        mock_response = MagicMock()
+        mock_response.ok = True
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"a": 1}
+        mock_response.content = b'{"a": 1}'
+        mock_get.return_value = mock_response
+
+        jravan_client.cached_get_json("https://api.example.com/races/1")
+
+        assert get_session_cache().stats["cache_bytes"] == len(b'{"a": 1}')
+
+
+class TestSharedCacheTier:
+    """セッション内 → 共有層 → API の参照順のテスト."""
+
+    @pytest.fixture(autouse=True)
+    def reset_session_cache(self):
+        """テストごとにセッションキャッシュをリセット."""
+        from tools.api_cache import get_session_cache
+        get_session_cache().clear()
+        yield
+        get_session_cache().clear()
+
+    @pytest.fixture
+    def shared(self, tmp_path):
+        from tools.shared_cache import SharedCache, SQLiteCacheBackend
+        backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"))
+        shared = SharedCache(backend)
+        with patch.object(jravan_client, "get_shared_cache", return_value=shared):
+            yield shared
+        backend.close()
+
+    @patch("tools.jravan_client.http_get")
+    @patch.object(jravan_client, "get_headers", return_value={})
+    def test_APIから取得したデータを共有層に書き込む(self, mock_headers, mock_get, shared):
+        """別セッション（メモリキャッシュが空）でも共有層からヒットする."""
+        from tools.api_cache import get_session_cache
+        mock_response = MagicMock()
+        mock_response.ok = True
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"horse": {"name": "テスト馬"}}
+        mock_get.return_value = mock_response
+
+        jravan_client.cached_get_json("https://api.example.com/horses/001")
+        shared.flush()
+        get_session_cache().clear()
+
+        result = jravan_client.cached_get_json("https://api.example.com/horses/001")
+
+        assert result == {"horse": {"name": "テスト馬"}}
+        mock_get.assert_called_once()
+        assert shared.stats["hits"] == 1
+
+    @patch("tools.jravan_client.http_get")
+    @patch.object(jravan_client, "get_headers", return_value={})
+    def test_共有層のヒットはセッション内キャッシュにも載せる(self, mock_headers, mock_get, shared):
+        """2回目以降は共有層を参照しない."""
+        shared._put(
+            jravan_client.get_session_cache()._make_key("https://api.example.com/jockeys/01"),
+            {"jockey": "テスト騎手"}, int(time.time()) + 60, "jockey_info",
+        )
+
+        jravan_client.cached_get_json("https://api.example.com/jockeys/01")
+        jravan_client.cached_get_json("https://api.example.com/jockeys/01")
+
+        mock_get.assert_not_called()
+        assert shared.stats["hits"] == 1
@@ -88,6 +88,18 @@ class BakenKaigiApiStack(Stack):
             removal_policy=RemovalPolicy.DESTROY,  # 開発環境用
             time_to_live_attribute="ttl",
         )
+        # 日付別一覧（race_date + source）用 GSI
+        ai_predictions_table.add_global_secondary_index(
+            index_name="race_date-source-index",
+            partition_key=dynamodb.Attribute(
+                name="race_date",
+                type=dynamodb.AttributeType.STRING,
+            ),
+            sort_key=dynamodb.Attribute(
+                name="source",
+                type=dynamodb.AttributeType.STRING,
+            ),
+        )
 
         # スピード指数テーブル
         speed_indices_table = dynamodb.Table(
@@ -106,6 +118,32 @@ class BakenKaigiApiStack(Stack):
             removal_policy=RemovalPolicy.DESTROY,
             time_to_live_attribute="ttl",
         )
+        # 日付別一覧（race_date + source）用 GSI
+        speed_indices_table.add_global_secondary_index(
+            index_name="race_date-source-index",
+            partition_key=dynamodb.Attribute(
+                name="race_date",
+                type=dynamodb.AttributeType.STRING,
+            ),
+            sort_key=dynamodb.Attribute(
+                name="source",
+                type=dynamodb.AttributeType.STRING,
+            ),
+        )
+
+        # エージェントツールのセッション間共有キャッシュテーブル
+        agent_tool_cache_table = dynamodb.Table(
+            self,
+            "AgentToolCacheTable",
+            table_name="baken-kaigi-agent-tool-cache",
+            partition_key=dynamodb.Attribute(
+                name="cache_key",
+                type=dynamodb.AttributeType.STRING,
+            ),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            removal_policy=RemovalPolicy.DESTROY,  # キャッシュのため再作成可
+            time_to_live_attribute="ttl",
+        )
 
         # Agent テーブル
         agent_table = dynamodb.Table(
@@ -449,6 +487,9 @@ class BakenKaigiApiStack(Stack):
         races_table.grant_read_data(agentcore_runtime_role)
         runners_table.grant_read_data(agentcore_runtime_role)
 
+        # 共有キャッシュ読み書き権限
+        agent_tool_cache_table.grant_read_write_data(agentcore_runtime_role)
+
         # API Gateway - API Key 取得権限
         agentcore_runtime_role.add_to_policy(
             iam.PolicyStatement(
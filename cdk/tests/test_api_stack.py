@@ -154,6 +154,30 @@ class TestApiStack:
             },
         )
 
+    def test_get_all_odds_endpoint(self, template):
+        """GET /races/{race_id}/odds エンドポイントが存在すること.
+
+        AgentCore の買い目提案（ev_proposer / proposal_cache）はこのルートでオッズを取得する。
+        """
+        from aws_cdk.assertions import Match
+
+        template.has_resource_properties(
+            "AWS::Lambda::Function",
+            {
+                "FunctionName": "baken-kaigi-get-all-odds",
+                "Handler": "src.api.handlers.races.get_all_odds",
+            },
+        )
+        template.has_resource_properties("AWS::ApiGateway::Resource", {"PathPart": "odds"})
+        template.has_resource_properties(
+            "AWS::ApiGateway::Method",
+            {
+                "HttpMethod": "GET",
+                # odds-history ではなく odds のリソース（論理IDの末尾はハッシュ8桁）
+                "ResourceId": {"Ref": Match.string_like_regexp("racesraceidodds[0-9A-F]{8}$")},
+            },
+        )
+
     def test_cart_endpoints(self, template):
         """カートAPIのLambda関数が存在すること."""
         template.has_resource_properties(
@@ -357,6 +381,47 @@ class TestApiStack:
             },
         )
 
+    def test_signal_tables_date_index(self, template):
+        """AI予想・スピード指数テーブルに日付別一覧用のGSIがあること."""
+        from aws_cdk.assertions import Match
+
+        for table_name in ("baken-kaigi-ai-predictions", "baken-kaigi-speed-indices"):
+            template.has_resource_properties(
+                "AWS::DynamoDB::Table",
+                {
+                    "TableName": table_name,
+                    "GlobalSecondaryIndexes": [
+                        Match.object_like(
+                            {
+                                "IndexName": "race_date-source-index",
+                                "KeySchema": [
+                                    {"AttributeName": "race_date", "KeyType": "HASH"},
+                                    {"AttributeName": "source", "KeyType": "RANGE"},
+                                ],
+                                "Projection": {"ProjectionType": "ALL"},
+                            }
+                        ),
+                    ],
+                },
+            )
+
+    def test_agent_tool_cache_dynamodb_table(self, template):
+        """エージェントツール共有キャッシュ用DynamoDBテーブルが存在すること."""
+        template.has_resource_properties(
+            "AWS::DynamoDB::Table",
+            {
+                "TableName": "baken-kaigi-agent-tool-cache",
+                "KeySchema": [
+                    {"AttributeName": "cache_key", "KeyType": "HASH"},
+                ],
+                "BillingMode": "PAY_PER_REQUEST",
+                "TimeToLiveSpecification": {
+                    "AttributeName": "ttl",
+                    "Enabled": True,
+                },
+            },
+        )
+
     def test_betting_record_endpoint(self, template):
         """賭け履歴APIの統合Lambda関数が存在すること."""
         template.has_resource_properties(
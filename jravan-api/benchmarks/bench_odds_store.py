@@ -0,0 +1,143 @@
+"""全券種オッズ時系列ストアのベンチマーク.
+
+18頭立てのレースで 2 時間分（1 分間隔 120 スナップショット）のオッズ変動を
+合成し、JRA-VAN の生文字列（jvd_o1〜o6 形式）のまま保存した場合と
+odds_store の圧縮形式のサイズ・復元時間を比較する。
+
+実行: ``python benchmarks/bench_odds_store.py``
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from itertools import combinations, permutations
+from pathlib import Path
+from unittest.mock import MagicMock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.modules.setdefault("pg8000", MagicMock())
+for _name in ("PCKEIBA_HOST", "PCKEIBA_PORT", "PCKEIBA_DATABASE", "PCKEIBA_USER"):
+    os.environ.setdefault(_name, "0")
+
+import database as db  # noqa: E402
+from odds_store import POOLS, OddsHistoryStore  # noqa: E402
+
+FIELD_SIZE = 18
+SNAPSHOTS = 120
+# 1 スナップショットで値が動く組番の割合
+CHANGE_RATIO = 0.3
+QUERY_COUNT = 200
+SEED = 42
+
+
+def _base_odds(rng: random.Random) -> dict[str, dict[str, float]]:
+    """券種ごとの初期オッズを作る."""
+    horses = range(1, FIELD_SIZE + 1)
+    strength = {h: rng.uniform(0.5, 5.0) for h in horses}
+
+    def price(*hs: int) -> float:
+        return round(max(1.0, sum(1 / strength[h] for h in hs) ** len(hs) * rng.uniform(1.5, 3.0)), 1)
+
+    return {
+        "win": {f"{h}": price(h) for h in horses},
+        "place": {f"{h}": round(max(1.0, price(h) / 3), 1) for h in horses},
+        "quinella": {f"{a}-{b}": price(a, b) for a, b in combinations(horses, 2)},
+        "quinella_place": {f"{a}-{b}": round(max(1.0, price(a, b) / 3), 1) for a, b in combinations(horses, 2)},
+        "exacta": {f"{a}-{b}": price(a, b) for a, b in permutations(horses, 2)},
+        "trio": {f"{a}-{b}-{c}": price(a, b, c) for a, b, c in combinations(horses, 3)},
+        "trifecta": {f"{a}-{b}-{c}": price(a, b, c) for a, b, c in permutations(horses, 3)},
+    }
+
+
+def _drift(rng: random.Random, odds: dict[str, float]) -> dict[str, float]:
+    """一部の組番のオッズを少し動かす."""
+    return {
+        key: round(min(9999.9, max(1.0, value * rng.uniform(0.95, 1.05))), 1)
+        if rng.random() < CHANGE_RATIO else value
+        for key, value in odds.items()
+    }
+
+
+def _raw_string(pool: str, odds: dict[str, float]) -> str:
+    """JRA-VAN の連結文字列形式に戻す（人気順は 0 埋め）."""
+    parts = []
+    for key, value in odds.items():
+        nums = "".join(f"{int(h):02d}" for h in key.split("-"))
+        tenths = int(round(value * 10))
+        if pool == "win":
+            parts.append(f"{nums}{tenths:04d}00")
+        elif pool == "place":
+            parts.append(f"{nums}{tenths:04d}{tenths:04d}00")
+        elif pool == "quinella_place":
+            parts.append(f"{nums}{tenths:05d}{tenths:05d}000")
+        else:
+            parts.append(f"{nums}{tenths:06d}000")
+    return "".join(parts)
+
+
+def _parse_raw(pool: str, raw: str) -> dict:
+    """生文字列を get_all_odds と同じ形式に解析する."""
+    if pool == "win":
+        return {str(e["horse_number"]): e["odds"] for e in db._parse_tansho_odds(raw, {})}
+    if pool == "place":
+        return {
+            str(e["horse_number"]): {"min": e["odds_min"], "max": e["odds_max"]}
+            for e in db._parse_fukusho_odds(raw)
+        }
+    if pool == "quinella_place":
+        return db._parse_wide_odds(raw)
+    if pool in ("quinella", "exacta"):
+        return db._parse_combination_odds_2h(raw)
+    return db._parse_combination_odds_3h(raw)
+
+
+def main() -> None:
+    rng = random.Random(SEED)
+    race_id = "202605240511"
+    start = datetime(2026, 5, 24, 13, 40)
+    current = _base_odds(rng)
+
+    raw_bytes = dict.fromkeys(POOLS, 0)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = OddsHistoryStore(Path(tmp) / "bench.sqlite3")
+
+        append_seconds = 0.0
+        for i in range(SNAPSHOTS):
+            captured_at = (start + timedelta(minutes=i)).isoformat(timespec="seconds")
+            for pool in POOLS:
+                raw = _raw_string(pool, current[pool])
+                raw_bytes[pool] += len(raw.encode())
+                parsed = _parse_raw(pool, raw)
+                t0 = time.perf_counter()
+                store.append(race_id, pool, parsed, captured_at)
+                append_seconds += time.perf_counter() - t0
+            current = {pool: _drift(rng, odds) for pool, odds in current.items()}
+
+        stored = {pool: store.storage_bytes(race_id, pool) for pool in POOLS}
+
+        query_times = []
+        for _ in range(QUERY_COUNT):
+            at = (start + timedelta(minutes=rng.uniform(0, SNAPSHOTS))).isoformat(timespec="seconds")
+            t0 = time.perf_counter()
+            store.get_pool_at(race_id, "trifecta", at=at)
+            query_times.append(time.perf_counter() - t0)
+        store.close()
+
+    print(f"field={FIELD_SIZE} snapshots={SNAPSHOTS} change_ratio={CHANGE_RATIO}")
+    print(f"{'pool':<16}{'raw(KB)':>12}{'stored(KB)':>12}{'ratio':>10}")
+    for pool in POOLS:
+        print(f"{pool:<16}{raw_bytes[pool] / 1024:>12.1f}{stored[pool] / 1024:>12.1f}"
+              f"{raw_bytes[pool] / stored[pool]:>9.1f}x")
+    total_raw = sum(raw_bytes.values())
+    total_stored = sum(stored.values())
+    print(f"{'total':<16}{total_raw / 1024:>12.1f}{total_stored / 1024:>12.1f}{total_raw / total_stored:>9.1f}x")
+    query_times.sort()
+    print(f"append: {append_seconds / SNAPSHOTS * 1000:.1f} ms/snapshot (all pools)")
+    print(f"get_pool_at(trifecta): p50={query_times[len(query_times) // 2] * 1000:.2f} ms "
+          f"p95={query_times[int(len(query_times) * 0.95)] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""大きなレスポンスのエンコード・圧縮ベンチマーク.
+
+18頭立ての全券種オッズ（/races/{race_id}/odds）と枠順統計
+（/statistics/gate-position）について、従来の経路（レスポンスモデル構築 +
+標準 JSON、非圧縮）と現在の経路（fast_json + orjson + 圧縮）の
+レイテンシと転送量を比較する。データアクセス層はモックし、HTTP 層だけを測る。
+
+実行: ``python benchmarks/bench_responses.py``
+"""
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from itertools import combinations, permutations
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.modules.setdefault("pg8000", MagicMock())
+for _name in ("PCKEIBA_HOST", "PCKEIBA_PORT", "PCKEIBA_DATABASE", "PCKEIBA_USER"):
+    os.environ.setdefault(_name, "0")
+
+import main  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+# main が INFO で basicConfig するため、リクエストごとのログを抑止する
+logging.getLogger().setLevel(logging.WARNING)
+
+FIELD_SIZE = 18
+ITERATIONS = 200
+SEED = 42
+RACE_ID = "202605240511"
+
+
+def _all_odds(rng: random.Random) -> dict:
+    horses = range(1, FIELD_SIZE + 1)
+
+    def odds() -> float:
+        return round(rng.uniform(1.1, 9999.9), 1)
+
+    return {
+        "win": {f"{h}": odds() for h in horses},
+        "place": {f"{h}": {"min": odds(), "max": odds()} for h in horses},
+        "quinella": {f"{a}-{b}": odds() for a, b in combinations(horses, 2)},
+        "quinella_place": {f"{a}-{b}": odds() for a, b in combinations(horses, 2)},
+        "exacta": {f"{a}-{b}": odds() for a, b in permutations(horses, 2)},
+        "trio": {f"{a}-{b}-{c}": odds() for a, b, c in combinations(horses, 3)},
+        "trifecta": {f"{a}-{b}-{c}": odds() for a, b, c in permutations(horses, 3)},
+    }
+
+
+def _gate_stats(rng: random.Random) -> dict:
+    return {
+        "conditions": {"venue": "東京", "track_type": "芝", "distance": 1600, "track_condition": None},
+        "total_races": 200,
+        "by_gate": [
+            {
+                "gate": g, "gate_range": f"{g}枠", "starts": 400, "wins": rng.randint(20, 40),
+                "places": rng.randint(80, 120), "win_rate": 7.5, "place_rate": 22.5, "avg_finish": 8.1,
+            }
+            for g in range(1, 9)
+        ],
+        "by_horse_number": [
+            {"horse_number": n, "starts": 200, "wins": rng.randint(5, 20), "win_rate": 6.0}
+            for n in range(1, 19)
+        ],
+        "analysis": {"favorable_gates": [1], "unfavorable_gates": [8], "comment": "1枠が有利、8枠が不利"},
+    }
+
+
+def _legacy_app() -> FastAPI:
+    """従来の実装（モデル構築 + 標準 JSON、非圧縮）を再現したアプリ."""
+    app = FastAPI()
+
+    @app.get("/races/{race_id}/odds", response_model=main.AllOddsResponse)
+    def get_all_odds(race_id: str):
+        data = main.db.get_all_odds(race_id)
+        return main.AllOddsResponse(race_id=race_id, **data)
+
+    @app.get("/statistics/gate-position", response_model=main.GatePositionResponse)
+    def get_gate_position_stats(venue: str):
+        return main.GatePositionResponse(**main.db.get_gate_position_stats(venue=venue))
+
+    return app
+
+
+def _measure(client: TestClient, url: str, headers: dict[str, str]) -> tuple[float, float, int]:
+    """(p50 ms, p95 ms, 転送バイト数) を返す."""
+    client.get(url, headers=headers)
+    times = []
+    wire_bytes = 0
+    for _ in range(ITERATIONS):
+        t0 = time.perf_counter()
+        response = client.get(url, headers=headers)
+        times.append(time.perf_counter() - t0)
+        wire_bytes = int(response.headers["content-length"])
+    times.sort()
+    return statistics.median(times) * 1000, times[int(len(times) * 0.95)] * 1000, wire_bytes
+
+
+def main_() -> None:
+    rng = random.Random(SEED)
+    cases = [
+        ("odds", f"/races/{RACE_ID}/odds"),
+        ("gate-position", "/statistics/gate-position?venue=東京"),
+    ]
+    variants = [
+        ("before", _legacy_app(), {"Accept-Encoding": "identity"}),
+        ("after (identity)", main.app, {"Accept-Encoding": "identity"}),
+        ("after (gzip)", main.app, {"Accept-Encoding": "gzip"}),
+        ("after (br)", main.app, {"Accept-Encoding": "br, gzip"}),
+    ]
+
+    with patch.object(main.db, "get_all_odds", return_value=_all_odds(rng)), \
+            patch.object(main.db, "get_gate_position_stats", return_value=_gate_stats(rng)):
+        print(f"{'endpoint':<16}{'variant':<20}{'p50(ms)':>10}{'p95(ms)':>10}{'bytes':>10}")
+        for name, url in cases:
+            for label, app, headers in variants:
+                p50, p95, size = _measure(TestClient(app), url, headers)
+                print(f"{name:<16}{label:<20}{p50:>10.2f}{p95:>10.2f}{size:>10}")
+
+
+if __name__ == "__main__":
+    main_()
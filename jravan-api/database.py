@@ -5,13 +5,15 @@ pg8000 (pure Python PostgreSQL driver) を使用。
 """
 import logging
 import os
-from contextlib import contextmanager
+from contextlib import ExitStack, contextmanager
 from datetime import datetime, timedelta, timezone
 
 from pathlib import Path
 from dotenv import load_dotenv
 import pg8000
 
+import stats_snapshot
+
 # .env ファイルから環境変数を読み込み（このファイルと同じディレクトリ）
 load_dotenv(Path(__file__).parent / ".env")
 
@@ -100,6 +102,83 @@ def get_db():
             conn.close()
 
 
+@contextmanager
+def get_stats_db():
+    """統計クエリ用 DB 接続のコンテキストマネージャー.
+
+    夜間エクスポートされたカラムナスナップショット（DuckDB + Parquet）が
+    利用可能ならそちらを返し、なければ PostgreSQL（get_db）にフォールバックする。
+    スナップショットでのクエリが実行時に失敗した場合も、そのクエリ以降は PostgreSQL で実行する。
+    ライブのレース・オッズ取得は常に get_db を使うこと。
+    """
+    try:
+        snapshot_conn = stats_snapshot.get_store().connect()
+    except Exception as e:
+        logger.warning(f"Stats snapshot unavailable, using PostgreSQL: {e}")
+        snapshot_conn = None
+    if snapshot_conn is None:
+        with get_db() as conn:
+            yield conn
+        return
+
+    with ExitStack() as stack:
+        try:
+            yield _StatsConnection(snapshot_conn, lambda: stack.enter_context(get_db()))
+        finally:
+            snapshot_conn.close()
+
+
+class _StatsConnection:
+    """スナップショット接続. クエリが失敗したら PostgreSQL 接続に切り替える."""
+
+    def __init__(self, snapshot_conn, open_postgres):
+        self._snapshot_conn = snapshot_conn
+        self._open_postgres = open_postgres
+        self._pg_conn = None
+
+    def postgres(self):
+        """PostgreSQL 接続（初回に開く）."""
+        if self._pg_conn is None:
+            self._pg_conn = self._open_postgres()
+        return self._pg_conn
+
+    def cursor(self) -> "_StatsCursor":
+        if self._pg_conn is not None:
+            return _StatsCursor(self, self._pg_conn.cursor(), on_postgres=True)
+        return _StatsCursor(self, self._snapshot_conn.cursor(), on_postgres=False)
+
+
+class _StatsCursor:
+    """スナップショットのカーソル. execute が失敗したら PostgreSQL で実行し直す."""
+
+    def __init__(self, conn: _StatsConnection, cursor, on_postgres: bool):
+        self._conn = conn
+        self._cursor = cursor
+        self._on_postgres = on_postgres
+
+    def execute(self, query: str, params=None):
+        if not self._on_postgres:
+            try:
+                self._cursor.execute(query, params)
+                return self
+            except Exception as e:
+                logger.warning(f"Stats snapshot query failed, falling back to PostgreSQL: {e}")
+                self._cursor = self._conn.postgres().cursor()
+                self._on_postgres = True
+        self._cursor.execute(query, params)
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+
 def _fetch_all_as_dicts(cursor) -> list[dict]:
     """カーソル結果を辞書のリストとして取得."""
     if cursor.description is None:
@@ -1456,7 +1535,7 @@ def get_past_race_statistics(
         }
     """
     try:
-        with get_db() as conn:
+        with get_stats_db() as conn:
             cur = conn.cursor()
 
             # 基本的な条件でレースを絞り込む
@@ -1656,7 +1735,7 @@ def get_jockey_course_stats(
         }
     """
     try:
-        with get_db() as conn:
+        with get_stats_db() as conn:
             cur = conn.cursor()
 
             # 騎手名を取得
@@ -1669,12 +1748,9 @@ def get_jockey_course_stats(
             jockey_row = cur.fetchone()
             jockey_name = jockey_row[0].strip() if jockey_row else "不明"
 
-            # 成績集計クエリ
+            # 成績集計クエリ（直近 limit_races 騎乗をサブクエリで絞ってから集計）
             stats_query = """
-                SELECT
-                    COUNT(*) AS total_rides,
-                    SUM(CASE WHEN se.kakutei_chakujun = '1' THEN 1 ELSE 0 END) AS wins,
-                    SUM(CASE WHEN se.kakutei_chakujun IN ('1', '2', '3') THEN 1 ELSE 0 END) AS places
+                SELECT se.kakutei_chakujun
                 FROM jvd_se se
                 INNER JOIN jvd_ra ra ON
                     se.kaisai_nen = ra.kaisai_nen AND
@@ -1699,6 +1775,13 @@ def get_jockey_course_stats(
                 LIMIT %s
             """
             params.append(limit_races)
+            stats_query = f"""
+                SELECT
+                    COUNT(*) AS total_rides,
+                    SUM(CASE WHEN recent.kakutei_chakujun = '1' THEN 1 ELSE 0 END) AS wins,
+                    SUM(CASE WHEN recent.kakutei_chakujun IN ('1', '2', '3') THEN 1 ELSE 0 END) AS places
+                FROM ({stats_query}) recent
+            """
 
             cur.execute(stats_query, params)
             row = cur.fetchone()
@@ -1758,7 +1841,7 @@ def get_popularity_payout_stats(
         }
     """
     try:
-        with get_db() as conn:
+        with get_stats_db() as conn:
             cur = conn.cursor()
 
             # 指定人気の馬の成績と配当を集計
@@ -1982,7 +2065,7 @@ def get_jockey_stats(
         }
     """
     try:
-        with get_db() as conn:
+        with get_stats_db() as conn:
             cur = conn.cursor()
 
             # 騎手名を取得
@@ -2165,7 +2248,7 @@ def get_horse_course_aptitude(horse_id: str) -> dict | None:
         コース適性データ。データがない場合はNone。
     """
     try:
-        with get_db() as conn:
+        with get_stats_db() as conn:
             cur = conn.cursor()
 
             # 馬名を取得
@@ -2395,7 +2478,7 @@ def get_gate_position_stats(
         return None
 
     try:
-        with get_db() as conn:
+        with get_stats_db() as conn:
             cur = conn.cursor()
 
             # レース絞り込み条件を構築
@@ -0,0 +1,3 @@
+@echo off
+cd /d C:\jravan-api
+python stats_snapshot.py
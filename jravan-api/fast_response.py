@@ -0,0 +1,172 @@
+"""大きなレスポンス向けの高速 JSON エンコードと圧縮.
+
+- FastJSONResponse: orjson があれば orjson で、なければ標準 json でシリアライズする
+- fast_json: レスポンスモデルのトップレベルのキーだけを射影して直接返す
+  （数千キーのオッズや入れ子の統計リストで要素ごとのモデル構築を避ける）
+- CompressionMiddleware: Accept-Encoding に応じて brotli / gzip で圧縮する
+  （brotli パッケージがなければ gzip のみ）
+"""
+import gzip
+import json
+import os
+from typing import Any
+
+import anyio.to_thread
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson は任意依存
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli は任意依存
+    brotli = None
+
+# これより小さいレスポンスは圧縮しない（ヘッダ分で元が取れない）
+COMPRESSION_MINIMUM_SIZE = 1024
+# 100KB 級の全券種オッズで 2〜3ms に収まる圧縮レベル（gzip 6 / br 5 は 4〜11ms）
+GZIP_COMPRESS_LEVEL = 4
+BROTLI_QUALITY = 3
+# これより大きいボディはイベントループを塞がないようワーカースレッドで圧縮する
+THREAD_COMPRESSION_MINIMUM_SIZE = 128 * 1024
+# true なら fast_json でもレスポンスモデルで入れ子まで検証する（テスト・検証環境用）
+FAST_JSON_VALIDATE = os.environ.get("JRAVAN_FAST_JSON_VALIDATE", "false").lower() == "true"
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson でシリアライズする JSONResponse."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_json(data: dict, model: type[BaseModel]) -> FastJSONResponse:
+    """レスポンスモデルを構築せずに dict をそのまま返す.
+
+    データアクセス層がモデルと同じ形の dict を返すエンドポイント専用。
+    トップレベルのキーだけをモデルのフィールドに射影し、入れ子の要素は検証しない
+    （FAST_JSON_VALIDATE が true なら model_validate で全体を検証する）。
+    必須フィールドが欠けていれば ValueError、任意フィールドはモデルの既定値で埋める。
+    エンドポイントには OpenAPI 用に response_model を残しておくこと。
+
+    Raises:
+        ValueError: 必須フィールドが欠けている
+        pydantic.ValidationError: FAST_JSON_VALIDATE が true で検証に失敗した
+    """
+    if FAST_JSON_VALIDATE:
+        model.model_validate(data)
+    content = {}
+    missing = []
+    for name, field in model.model_fields.items():
+        if name in data:
+            content[name] = data[name]
+        elif field.is_required():
+            missing.append(name)
+        else:
+            content[name] = field.get_default(call_default_factory=True)
+    if missing:
+        raise ValueError(f"{model.__name__} is missing required fields: {', '.join(missing)}")
+    return FastJSONResponse(content)
+
+
+def _parse_accept_encoding(header: str) -> dict[str, float]:
+    """Accept-Encoding を エンコーディング → q値 に分解する."""
+    accepted: dict[str, float] = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[token.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """クライアントが受け付ける中から圧縮方式を選ぶ（br を優先）."""
+    accepted = _parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    for encoding in candidates:
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """指定方式で圧縮する."""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_COMPRESS_LEVEL)
+
+
+class CompressionMiddleware:
+    """一定サイズ以上のレスポンスを brotli / gzip で圧縮する ASGI ミドルウェア.
+
+    ボディを一括で返すレスポンスだけを対象とし、ストリーミングや
+    Content-Encoding 設定済みのレスポンスはそのまま通す。
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                if "content-encoding" in Headers(raw=message["headers"]):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            if passthrough or start_message is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            initial, start_message = start_message, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=initial["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                passthrough = True
+                await send(initial)
+                await send(message)
+                return
+
+            if len(body) >= THREAD_COMPRESSION_MINIMUM_SIZE:
+                compressed = await anyio.to_thread.run_sync(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            await send(initial)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
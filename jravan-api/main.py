@@ -11,6 +11,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
 import database as db
+import odds_store
+from fast_response import CompressionMiddleware, fast_json
+import stats_snapshot
 from jra_checksum_scraper import scrape_jra_checksums
 
 logging.basicConfig(level=logging.INFO)
@@ -31,6 +34,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 大きなレスポンス（全券種オッズ・統計）を Accept-Encoding に応じて圧縮
+app.add_middleware(CompressionMiddleware)
+
 
 @app.on_event("startup")
 def startup():
@@ -51,6 +57,7 @@ class HealthResponse(BaseModel):
     status: str
     database: str
     last_sync: str | None
+    stats_snapshot: str | None = None
 
 
 class RaceResponse(BaseModel):
@@ -163,6 +170,14 @@ class OddsHistoryResponse(BaseModel):
     odds_history: list[OddsTimestamp]
 
 
+class PoolOddsSnapshotResponse(BaseModel):
+    """券種別オッズ時系列のスナップショットレスポンス."""
+    race_id: str
+    bet_type: str
+    timestamp: str
+    odds: dict[str, float] | dict[str, dict[str, float]]
+
+
 class JraChecksumResponse(BaseModel):
     """JRAチェックサムレスポンス."""
     checksum: int | None
@@ -362,6 +377,7 @@ def health_check():
         status="ok" if connected else "error",
         database="PC-KEIBA PostgreSQL",
         last_sync=sync_status.get("last_sync_at"),
+        stats_snapshot=(stats_snapshot.read_manifest() or {}).get("created_at"),
     )
 
 
@@ -534,7 +550,7 @@ def get_course_aptitude(horse_id: str):
                 detail="コース適性データが見つかりませんでした"
             )
 
-        return CourseAptitudeResponse(**data)
+        return fast_json(data, CourseAptitudeResponse)
     except HTTPException:
         raise
     except Exception:
@@ -604,16 +620,7 @@ def get_all_odds(race_id: str):
     if data is None:
         raise HTTPException(status_code=404, detail="オッズデータが見つかりません")
 
-    return AllOddsResponse(
-        race_id=race_id,
-        win=data["win"],
-        place=data["place"],
-        quinella=data["quinella"],
-        quinella_place=data["quinella_place"],
-        exacta=data["exacta"],
-        trio=data["trio"],
-        trifecta=data["trifecta"],
-    )
+    return fast_json({"race_id": race_id, **data}, AllOddsResponse)
 
 
 @app.get("/races/{race_id}/odds-history", response_model=OddsHistoryResponse)
@@ -643,6 +650,25 @@ def get_odds_history(race_id: str):
     )
 
 
+@app.get("/races/{race_id}/odds-history/{bet_type}", response_model=PoolOddsSnapshotResponse)
+def get_pool_odds_history(
+    race_id: str,
+    bet_type: Literal["win", "place", "quinella", "quinella_place", "exacta", "trio", "trifecta"],
+    at: str | None = Query(None, description="時刻（ISO8601）。省略時は最新のキャプチャ"),
+):
+    """キャプチャ済みの券種オッズを指定時刻時点で復元する."""
+    if at is not None:
+        try:
+            at = odds_store.normalize_timestamp(at)
+        except ValueError:
+            raise HTTPException(status_code=422, detail="at はISO8601形式の時刻で指定してください") from None
+    snapshot = odds_store.get_store().get_pool_at(race_id, bet_type, at=at)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="オッズ履歴が見つかりません")
+
+    return fast_json({"race_id": race_id, "bet_type": bet_type, **snapshot}, PoolOddsSnapshotResponse)
+
+
 @app.get("/jra-checksum", response_model=JraChecksumResponse)
 def get_jra_checksum(
     venue_code: str = Query(..., description="競馬場コード（01-10）"),
@@ -759,7 +785,7 @@ def get_gate_position_stats(
                 detail="枠順統計データが見つかりませんでした"
             )
 
-        return GatePositionResponse(**data)
+        return fast_json(data, GatePositionResponse)
     except HTTPException:
         raise
     except Exception:
@@ -792,16 +818,7 @@ def get_past_race_stats(
                 detail="統計データが見つかりませんでした"
             )
 
-        return PastStatsResponse(
-            total_races=stats["total_races"],
-            popularity_stats=[
-                PopularityStatResponse(**stat)
-                for stat in stats["popularity_stats"]
-            ],
-            avg_win_payout=stats["avg_win_payout"],
-            avg_place_payout=stats["avg_place_payout"],
-            conditions=stats["conditions"],
-        )
+        return fast_json(stats, PastStatsResponse)
     except HTTPException:
         raise
     except Exception as e:
@@ -836,16 +853,7 @@ def get_jockey_course_stats(
                 detail="騎手成績データが見つかりませんでした"
             )
 
-        return JockeyCourseStatsResponse(
-            jockey_id=stats["jockey_id"],
-            jockey_name=stats["jockey_name"],
-            total_rides=stats["total_rides"],
-            wins=stats["wins"],
-            places=stats["places"],
-            win_rate=stats["win_rate"],
-            place_rate=stats["place_rate"],
-            conditions=stats["conditions"],
-        )
+        return fast_json(stats, JockeyCourseStatsResponse)
     except HTTPException:
         raise
     except Exception as e:
@@ -878,15 +886,7 @@ def get_popularity_payout_stats(
                 detail="配当統計データが見つかりませんでした"
             )
 
-        return PopularityPayoutResponse(
-            popularity=stats["popularity"],
-            total_races=stats["total_races"],
-            win_count=stats["win_count"],
-            avg_win_payout=stats["avg_win_payout"],
-            avg_place_payout=stats["avg_place_payout"],
-            estimated_roi_win=stats["estimated_roi_win"],
-            estimated_roi_place=stats["estimated_roi_place"],
-        )
+        return fast_json(stats, PopularityPayoutResponse)
     except HTTPException:
         raise
     except Exception as e:
@@ -960,18 +960,7 @@ def get_jockey_stats(
                 detail="騎手成績データが見つかりませんでした"
             )
 
-        return JockeyStatsResponse(
-            jockey_id=stats["jockey_id"],
-            jockey_name=stats["jockey_name"],
-            total_rides=stats["total_rides"],
-            wins=stats["wins"],
-            second_places=stats["second_places"],
-            third_places=stats["third_places"],
-            win_rate=stats["win_rate"],
-            place_rate=stats["place_rate"],
-            period=stats["period"],
-            year=stats.get("year"),
-        )
+        return fast_json(stats, JockeyStatsResponse)
     except HTTPException:
         raise
     except Exception as e:
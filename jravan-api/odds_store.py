@@ -0,0 +1,461 @@
+"""全券種オッズ時系列の圧縮ストア.
+
+get_all_odds（jvd_o1〜o6 の最新値）を定期的にスナップショットし、
+券種ごとに次の形式で SQLite に保存する。
+
+- 組番リスト: レース×券種ごとに 1 回だけ保存し、以降は添字で参照する
+- 値: オッズを 0.1 倍単位の整数にし、varint でパックして zlib 圧縮
+- 差分: キーフレーム以外は直前スナップショットから変化した組番だけを
+  (添字の差, zigzag 化した差分) の組で保存する
+
+任意時刻の券種オッズは直前のキーフレームから差分を適用して復元する
+（最大 KEYFRAME_INTERVAL - 1 フレーム分）。
+
+定期実行: ``python odds_store.py``（発走前のレースを 1 回キャプチャする。
+タスクスケジューラで 1〜2 分おきに起動する）
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import database as db
+
+logger = logging.getLogger(__name__)
+
+# 保存対象の券種（get_all_odds のキー）
+POOLS = ("win", "place", "quinella", "quinella_place", "exacta", "trio", "trifecta")
+
+# 保存先
+ODDS_STORE_PATH = Path(
+    os.environ.get("JRAVAN_ODDS_STORE_PATH", str(Path(__file__).parent / "odds_history.sqlite3"))
+)
+
+# キーフレームの間隔（フレーム数）。復元時に適用する差分の上限を決める
+KEYFRAME_INTERVAL = 16
+
+# キャプチャ対象とする発走前の時間幅
+CAPTURE_WINDOW_MINUTES = 120
+
+# 発走後もこの時間はキャプチャを続ける（締切・確定オッズの取り込み用）
+CAPTURE_GRACE_MINUTES = 5
+
+ZLIB_LEVEL = 6
+
+# 複勝の最低/最高オッズを平坦化するときのサフィックス
+_PLACE_BOUNDS = ("min", "max")
+
+
+# ========================================
+# エンコード
+# ========================================
+
+
+def _zigzag(n: int) -> int:
+    """符号付き整数を非負整数に写像する."""
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+
+def _unzigzag(n: int) -> int:
+    """_zigzag の逆変換."""
+    return n >> 1 if n % 2 == 0 else -((n + 1) >> 1)
+
+
+def _pack_varints(values: list[int]) -> bytes:
+    """非負整数列を varint でパックする."""
+    out = bytearray()
+    for value in values:
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def _unpack_varints(data: bytes) -> list[int]:
+    """_pack_varints の逆変換."""
+    values: list[int] = []
+    value = 0
+    shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append(value)
+        value = 0
+        shift = 0
+    return values
+
+
+def encode_keyframe(values: list[int]) -> bytes:
+    """全組番の値をキーフレームとしてエンコードする."""
+    return zlib.compress(_pack_varints(values), ZLIB_LEVEL)
+
+
+def decode_keyframe(payload: bytes) -> list[int]:
+    """encode_keyframe の逆変換."""
+    return _unpack_varints(zlib.decompress(payload))
+
+
+def encode_delta(previous: list[int], current: list[int]) -> bytes:
+    """変化した組番だけを差分フレームとしてエンコードする.
+
+    current は previous と同じ長さか、末尾に組番が追加された長さであること。
+    """
+    packed: list[int] = []
+    last_index = -1
+    for index, value in enumerate(current):
+        before = previous[index] if index < len(previous) else 0
+        if value == before:
+            continue
+        packed.append(index - last_index - 1)
+        packed.append(_zigzag(value - before))
+        last_index = index
+    return zlib.compress(_pack_varints(packed), ZLIB_LEVEL)
+
+
+def apply_delta(values: list[int], payload: bytes, size: int) -> list[int]:
+    """差分フレームを適用した新しい値リストを返す."""
+    result = values + [0] * (size - len(values))
+    packed = _unpack_varints(zlib.decompress(payload))
+    index = -1
+    for i in range(0, len(packed), 2):
+        index += packed[i] + 1
+        result[index] += _unzigzag(packed[i + 1])
+    return result
+
+
+def _to_tenths(odds: float) -> int:
+    return int(round(odds * 10))
+
+
+def flatten_pool(pool: str, odds: dict) -> dict[str, int]:
+    """券種オッズを 組番 → 0.1 倍単位の整数 に平坦化する."""
+    if pool == "place":
+        flat: dict[str, int] = {}
+        for horse, bounds in odds.items():
+            for bound in _PLACE_BOUNDS:
+                if bounds.get(bound) is not None:
+                    flat[f"{horse}:{bound}"] = _to_tenths(bounds[bound])
+        return flat
+    return {key: _to_tenths(value) for key, value in odds.items() if value is not None}
+
+
+def unflatten_pool(pool: str, flat: dict[str, int]) -> dict:
+    """flatten_pool の逆変換（値 0 は欠損として落とす）."""
+    if pool == "place":
+        place: dict[str, dict[str, float]] = {}
+        for key, value in flat.items():
+            if value <= 0:
+                continue
+            horse, bound = key.split(":")
+            place.setdefault(horse, {})[bound] = value / 10.0
+        return place
+    return {key: value / 10.0 for key, value in flat.items() if value > 0}
+
+
+# ========================================
+# ストア
+# ========================================
+
+
+def normalize_timestamp(value: str) -> str:
+    """ISO8601 の時刻を保存形式（ローカル時刻・タイムゾーンなし・秒精度）にそろえる.
+
+    captured_at は文字列で比較するため、区切りや精度・タイムゾーンの違う時刻を
+    そのまま比較すると前後を誤る。
+
+    Args:
+        value: 時刻（ISO8601。日付のみなら 0 時、タイムゾーン付きはローカル時刻に変換）
+
+    Returns:
+        "YYYY-MM-DDTHH:MM:SS" 形式の時刻
+
+    Raises:
+        ValueError: ISO8601 として解釈できない場合
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.isoformat(timespec="seconds")
+
+
+class OddsHistoryStore:
+    """全券種オッズ時系列の SQLite ストア."""
+
+    def __init__(self, path: Path | str | None = None):
+        self._path = str(path or ODDS_STORE_PATH)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pool_keys (
+                race_id TEXT NOT NULL,
+                pool TEXT NOT NULL,
+                keys TEXT NOT NULL,
+                PRIMARY KEY (race_id, pool)
+            );
+            CREATE TABLE IF NOT EXISTS pool_frames (
+                race_id TEXT NOT NULL,
+                pool TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                captured_at TEXT NOT NULL,
+                keyframe INTEGER NOT NULL,
+                payload BLOB NOT NULL,
+                PRIMARY KEY (race_id, pool, seq)
+            );
+            CREATE INDEX IF NOT EXISTS idx_pool_frames_time
+                ON pool_frames (race_id, pool, captured_at);
+        """)
+        # 書き込み側の直近状態: (race_id, pool) -> (keys, values, seq, 直近キーフレームの seq)
+        self._latest: dict[tuple[str, str], tuple[list[str], list[int], int, int]] = {}
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _load_keys(self, race_id: str, pool: str) -> list[str]:
+        row = self._conn.execute(
+            "SELECT keys FROM pool_keys WHERE race_id = ? AND pool = ?", (race_id, pool),
+        ).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def _load_latest(self, race_id: str, pool: str) -> tuple[list[str], list[int], int, int]:
+        cache_key = (race_id, pool)
+        if cache_key not in self._latest:
+            keys = self._load_keys(race_id, pool)
+            rebuilt = self._rebuild(race_id, pool, at=None, size=len(keys))
+            if rebuilt is None:
+                self._latest[cache_key] = (keys, [], -1, -1)
+            else:
+                _, values, seq, keyframe_seq = rebuilt
+                self._latest[cache_key] = (keys, values, seq, keyframe_seq)
+        return self._latest[cache_key]
+
+    def append(self, race_id: str, pool: str, odds: dict, captured_at: str) -> bool:
+        """券種オッズのスナップショットを追記する.
+
+        Args:
+            race_id: レースID
+            pool: 券種（POOLS のいずれか）
+            odds: get_all_odds と同じ形式の券種オッズ
+            captured_at: キャプチャ時刻（ISO8601、秒精度）
+
+        Returns:
+            フレームを書き込んだ場合 True（前回から変化がなければ False）
+        """
+        flat = flatten_pool(pool, odds)
+        if not flat:
+            return False
+
+        with self._lock:
+            keys, values, seq, keyframe_seq = self._load_latest(race_id, pool)
+            known = set(keys)
+            new_keys = [key for key in flat if key not in known]
+            keys = keys + new_keys
+            current = [flat.get(key, 0) for key in keys]
+            if seq >= 0 and not new_keys and current == values:
+                return False
+
+            next_seq = seq + 1
+            is_keyframe = seq < 0 or bool(new_keys) or next_seq - keyframe_seq >= KEYFRAME_INTERVAL
+            payload = encode_keyframe(current) if is_keyframe else encode_delta(values, current)
+
+            with self._conn:
+                if new_keys:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO pool_keys (race_id, pool, keys) VALUES (?, ?, ?)",
+                        (race_id, pool, json.dumps(keys)),
+                    )
+                self._conn.execute(
+                    "INSERT INTO pool_frames (race_id, pool, seq, captured_at, keyframe, payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (race_id, pool, next_seq, captured_at, int(is_keyframe), payload),
+                )
+            self._latest[(race_id, pool)] = (
+                keys, current, next_seq, next_seq if is_keyframe else keyframe_seq,
+            )
+            return True
+
+    def _rebuild(
+        self, race_id: str, pool: str, at: str | None, size: int,
+    ) -> tuple[str, list[int], int, int] | None:
+        """指定時刻以前の最新フレームまでを復元する.
+
+        Returns:
+            (キャプチャ時刻, 値リスト, seq, 起点キーフレームの seq)。該当なしは None。
+        """
+        time_filter = "" if at is None else "AND captured_at <= ?"
+        params: tuple = (race_id, pool) if at is None else (race_id, pool, at)
+        target = self._conn.execute(
+            f"SELECT seq, captured_at FROM pool_frames WHERE race_id = ? AND pool = ? {time_filter} "
+            "ORDER BY seq DESC LIMIT 1",
+            params,
+        ).fetchone()
+        if target is None:
+            return None
+        target_seq, captured_at = target
+
+        frames = self._conn.execute(
+            """
+            SELECT seq, keyframe, payload FROM pool_frames
+            WHERE race_id = ? AND pool = ? AND seq <= ? AND seq >= (
+                SELECT MAX(seq) FROM pool_frames
+                WHERE race_id = ? AND pool = ? AND keyframe = 1 AND seq <= ?
+            )
+            ORDER BY seq
+            """,
+            (race_id, pool, target_seq, race_id, pool, target_seq),
+        ).fetchall()
+
+        values: list[int] = []
+        keyframe_seq = target_seq
+        for seq, keyframe, payload in frames:
+            if keyframe:
+                values = decode_keyframe(payload)
+                keyframe_seq = seq
+            else:
+                values = apply_delta(values, payload, size)
+        return captured_at, values + [0] * (size - len(values)), target_seq, keyframe_seq
+
+    def get_pool_at(self, race_id: str, pool: str, at: str | None = None) -> dict | None:
+        """指定時刻時点の券種オッズを復元する.
+
+        Args:
+            race_id: レースID
+            pool: 券種
+            at: 時刻（ISO8601）。省略時は最新。
+
+        Returns:
+            {"timestamp": キャプチャ時刻, "odds": get_all_odds と同じ形式}。該当なしは None。
+
+        Raises:
+            ValueError: at が ISO8601 として解釈できない場合
+        """
+        if at is not None:
+            at = normalize_timestamp(at)
+        with self._lock:
+            keys = self._load_keys(race_id, pool)
+            rebuilt = self._rebuild(race_id, pool, at=at, size=len(keys))
+        if rebuilt is None:
+            return None
+        captured_at, values, _, _ = rebuilt
+        return {
+            "timestamp": captured_at,
+            "odds": unflatten_pool(pool, dict(zip(keys, values, strict=True))),
+        }
+
+    def get_pool_series(self, race_id: str, pool: str) -> list[dict]:
+        """券種オッズの全スナップショットを古い順に復元する.
+
+        Returns:
+            [{"timestamp": str, "odds": dict}, ...]
+        """
+        with self._lock:
+            keys = self._load_keys(race_id, pool)
+            frames = self._conn.execute(
+                "SELECT captured_at, keyframe, payload FROM pool_frames "
+                "WHERE race_id = ? AND pool = ? ORDER BY seq",
+                (race_id, pool),
+            ).fetchall()
+
+        series = []
+        values: list[int] = []
+        for captured_at, keyframe, payload in frames:
+            values = decode_keyframe(payload) if keyframe else apply_delta(values, payload, len(keys))
+            series.append({
+                "timestamp": captured_at,
+                # 古いフレームは後から増えた組番の分だけ短い
+                "odds": unflatten_pool(pool, dict(zip(keys, values, strict=False))),
+            })
+        return series
+
+    def storage_bytes(self, race_id: str, pool: str | None = None) -> int:
+        """保存サイズ（組番リスト + フレームのペイロード）を返す.
+
+        Args:
+            race_id: レースID
+            pool: 券種。省略時はレースの全券種の合計。
+        """
+        pool_filter = "" if pool is None else "AND pool = ?"
+        params: tuple = (race_id,) if pool is None else (race_id, pool)
+        with self._lock:
+            frames = self._conn.execute(
+                f"SELECT COALESCE(SUM(LENGTH(payload)), 0) FROM pool_frames WHERE race_id = ? {pool_filter}",
+                params,
+            ).fetchone()[0]
+            keys = self._conn.execute(
+                f"SELECT COALESCE(SUM(LENGTH(keys)), 0) FROM pool_keys WHERE race_id = ? {pool_filter}",
+                params,
+            ).fetchone()[0]
+        return int(frames) + int(keys)
+
+
+_store: OddsHistoryStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> OddsHistoryStore:
+    """プロセス共有の OddsHistoryStore を返す."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = OddsHistoryStore()
+        return _store
+
+
+# ========================================
+# キャプチャジョブ
+# ========================================
+
+
+def capture_race_odds(store: OddsHistoryStore, race_id: str, captured_at: str | None = None) -> int:
+    """1レースの全券種オッズをキャプチャする.
+
+    Returns:
+        書き込んだフレーム数
+    """
+    all_odds = db.get_all_odds(race_id)
+    if all_odds is None:
+        return 0
+
+    captured_at = captured_at or datetime.now().isoformat(timespec="seconds")
+    return sum(
+        store.append(race_id, pool, all_odds.get(pool) or {}, captured_at)
+        for pool in POOLS
+    )
+
+
+def capture_upcoming_races(store: OddsHistoryStore, now: datetime | None = None) -> dict[str, int]:
+    """発走前（CAPTURE_WINDOW_MINUTES 以内）のレースをキャプチャする.
+
+    Returns:
+        レースID → 書き込んだフレーム数
+    """
+    now = now or datetime.now()
+    window_start = now - timedelta(minutes=CAPTURE_GRACE_MINUTES)
+    window_end = now + timedelta(minutes=CAPTURE_WINDOW_MINUTES)
+
+    results: dict[str, int] = {}
+    for race in db.get_races_by_date(now.strftime("%Y%m%d")):
+        start_time = race.get("start_time")
+        if not start_time:
+            continue
+        if not window_start <= datetime.fromisoformat(start_time) <= window_end:
+            continue
+        try:
+            results[race["race_id"]] = capture_race_odds(store, race["race_id"])
+        except Exception as e:
+            logger.error(f"Failed to capture odds for {race['race_id']}: {e}")
+    return results
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    captured = capture_upcoming_races(get_store())
+    for captured_race_id, frame_count in captured.items():
+        print(f"{captured_race_id}: {frame_count} frames")
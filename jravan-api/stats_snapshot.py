@@ -0,0 +1,262 @@
+"""統計用カラムナスナップショット.
+
+統計系エンドポイントの集計クエリ（GROUP BY over 数年分の jvd_se/jvd_ra/jvd_hr）が
+オッズ配信と同じ PostgreSQL を圧迫しないよう、履歴テーブルを夜間に Parquet へ
+書き出し、埋め込み DuckDB から読み出す。
+
+- エクスポート: ``python stats_snapshot.py``（タスクスケジューラで夜間実行）
+- 読み出し: ``database.get_stats_db()`` がスナップショットの有無・鮮度を見て
+  DuckDB と PostgreSQL を振り分ける
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+JST = timezone(timedelta(hours=9))
+
+# スナップショット対象テーブル（統計クエリが参照するもの）
+SNAPSHOT_TABLES = ("jvd_ra", "jvd_se", "jvd_hr", "jvd_ks", "jvd_um")
+
+# スナップショット保存先
+SNAPSHOT_DIR = Path(
+    os.environ.get("JRAVAN_STATS_SNAPSHOT_DIR", str(Path(__file__).parent / "snapshot_data"))
+)
+
+# この時間を超えて古いスナップショットは使わず PostgreSQL にフォールバックする
+SNAPSHOT_MAX_AGE_HOURS = int(os.environ.get("JRAVAN_STATS_SNAPSHOT_MAX_AGE_HOURS", "48"))
+
+# 残しておく世代数（読み出し中の旧世代を消さないため 2 以上）
+SNAPSHOT_KEEP_VERSIONS = 2
+
+MANIFEST_FILE = "manifest.json"
+PARQUET_COMPRESSION = "zstd"
+
+
+def _postgres_dsn() -> str:
+    """PostgreSQL 接続文字列（libpq 形式）を環境変数から組み立てる."""
+    return " ".join([
+        f"host={os.environ['PCKEIBA_HOST']}",
+        f"port={os.environ['PCKEIBA_PORT']}",
+        f"dbname={os.environ['PCKEIBA_DATABASE']}",
+        f"user={os.environ['PCKEIBA_USER']}",
+        f"password={os.environ['PCKEIBA_PASSWORD']}",
+    ])
+
+
+def _attach_postgres(con) -> str:
+    """DuckDB に PC-KEIBA Database を読み取り専用でアタッチする.
+
+    Returns:
+        テーブル参照に使うスキーマ修飾子
+    """
+    con.execute("INSTALL postgres")
+    con.execute("LOAD postgres")
+    con.execute("ATTACH ? AS pg (TYPE postgres, READ_ONLY)", [_postgres_dsn()])
+    return "pg.public"
+
+
+def read_manifest(snapshot_dir: Path | None = None) -> dict | None:
+    """現在のスナップショットのマニフェストを読み込む.
+
+    Returns:
+        マニフェスト辞書。スナップショットがない・壊れている場合は None。
+    """
+    manifest_path = (snapshot_dir or SNAPSHOT_DIR) / MANIFEST_FILE
+    try:
+        return json.loads(manifest_path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Invalid stats snapshot manifest: {e}")
+        return None
+
+
+def export_snapshot(
+    snapshot_dir: Path | None = None,
+    attach_source: Callable | None = None,
+    tables: tuple[str, ...] = SNAPSHOT_TABLES,
+) -> dict:
+    """履歴テーブルを Parquet に書き出し、マニフェストを差し替える.
+
+    新しい世代ディレクトリに全テーブルを書き終えてからマニフェストを
+    アトミックに置き換えるため、実行中も読み出し側は旧世代を使い続けられる。
+
+    Args:
+        snapshot_dir: 保存先ディレクトリ
+        attach_source: DuckDB 接続にソース DB をアタッチしスキーマ修飾子を返す関数
+            （テスト用。省略時は PostgreSQL をアタッチ）
+        tables: 書き出すテーブル
+
+    Returns:
+        書き出したスナップショットのマニフェスト
+    """
+    import duckdb
+
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    attach_source = attach_source or _attach_postgres
+
+    created_at = datetime.now(JST)
+    version = created_at.strftime("%Y%m%d%H%M%S")
+    version_dir = snapshot_dir / version
+    version_dir.mkdir(parents=True, exist_ok=True)
+
+    row_counts: dict[str, int] = {}
+    con = duckdb.connect()
+    try:
+        source = attach_source(con)
+        for table in tables:
+            path = version_dir / f"{table}.parquet"
+            con.execute(
+                f"COPY (SELECT * FROM {source}.{table}) TO '{path.as_posix()}' "
+                f"(FORMAT parquet, COMPRESSION {PARQUET_COMPRESSION})"
+            )
+            row_counts[table] = con.execute(
+                f"SELECT COUNT(*) FROM read_parquet('{path.as_posix()}')"
+            ).fetchone()[0]
+            logger.info(f"Exported {table}: {row_counts[table]} rows")
+    except Exception:
+        con.close()
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+    con.close()
+
+    manifest = {
+        "version": version,
+        "created_at": created_at.isoformat(),
+        "tables": row_counts,
+    }
+    tmp_path = snapshot_dir / f"{MANIFEST_FILE}.tmp"
+    tmp_path.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, snapshot_dir / MANIFEST_FILE)
+
+    _prune_old_versions(snapshot_dir, keep=SNAPSHOT_KEEP_VERSIONS)
+    return manifest
+
+
+def _prune_old_versions(snapshot_dir: Path, keep: int) -> None:
+    """古い世代ディレクトリを削除する."""
+    versions = sorted(
+        (p for p in snapshot_dir.iterdir() if p.is_dir() and p.name.isdigit()),
+        key=lambda p: p.name,
+    )
+    for old in versions[:-keep]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+class _SnapshotCursor:
+    """pg8000 互換（%s プレースホルダ）の DuckDB カーソル."""
+
+    def __init__(self, con):
+        self._con = con
+
+    def execute(self, query: str, params=None):
+        self._con.execute(query.replace("%s", "?"), list(params) if params else [])
+        return self
+
+    def fetchone(self):
+        return self._con.fetchone()
+
+    def fetchall(self):
+        return self._con.fetchall()
+
+    @property
+    def description(self):
+        return self._con.description
+
+
+class _SnapshotConnection:
+    """get_db() が返す接続と同じ使い方ができる DuckDB 接続ラッパー."""
+
+    def __init__(self, con):
+        self._con = con
+
+    def cursor(self) -> _SnapshotCursor:
+        return _SnapshotCursor(self._con)
+
+    def close(self) -> None:
+        self._con.close()
+
+
+class SnapshotStore:
+    """スナップショットを参照する DuckDB データベースを管理する.
+
+    プロセス内で 1 つのインメモリ DuckDB に Parquet のビューを張り、
+    リクエストごとにカーソルを払い出す。マニフェストの世代が変われば張り直す。
+    """
+
+    def __init__(self, snapshot_dir: Path | None = None, max_age_hours: int = SNAPSHOT_MAX_AGE_HOURS):
+        self._snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+        self._max_age = timedelta(hours=max_age_hours)
+        self._lock = threading.Lock()
+        self._con = None
+        self._version: str | None = None
+
+    def _is_fresh(self, manifest: dict) -> bool:
+        try:
+            created_at = datetime.fromisoformat(manifest["created_at"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return datetime.now(JST) - created_at <= self._max_age
+
+    def _open(self, manifest: dict):
+        import duckdb
+
+        version_dir = self._snapshot_dir / manifest["version"]
+        con = duckdb.connect()
+        for table in manifest["tables"]:
+            path = version_dir / f"{table}.parquet"
+            con.execute(f"CREATE VIEW {table} AS SELECT * FROM read_parquet('{path.as_posix()}')")
+        return con
+
+    def connect(self) -> _SnapshotConnection | None:
+        """スナップショットへの接続を返す.
+
+        Returns:
+            接続。スナップショットがない・古い・開けない場合は None。
+        """
+        manifest = read_manifest(self._snapshot_dir)
+        if manifest is None or not self._is_fresh(manifest):
+            return None
+
+        with self._lock:
+            if self._version != manifest.get("version"):
+                try:
+                    con = self._open(manifest)
+                except Exception as e:
+                    logger.warning(f"Failed to open stats snapshot: {e}")
+                    return None
+                if self._con is not None:
+                    self._con.close()
+                self._con = con
+                self._version = manifest["version"]
+            return _SnapshotConnection(self._con.cursor())
+
+    @property
+    def version(self) -> str | None:
+        """現在開いているスナップショットの世代."""
+        return self._version
+
+
+_store = SnapshotStore()
+
+
+def get_store() -> SnapshotStore:
+    """プロセス共有の SnapshotStore を返す."""
+    return _store
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    logging.basicConfig(level=logging.INFO)
+    load_dotenv(Path(__file__).parent / ".env")
+
+    result = export_snapshot()
+    print(f"Stats snapshot exported: {result['version']} {result['tables']}")
@@ -3,9 +3,13 @@
 JV-Link (win32com) のモックを設定し、Linux環境でもテストを実行可能にする。
 pg8000 のモックを設定し、DB依存なしでテストを実行可能にする。
 """
+import os
 import sys
 from unittest.mock import MagicMock
 
+# fast_json のレスポンスもテストではレスポンスモデルで検証する
+os.environ.setdefault("JRAVAN_FAST_JSON_VALIDATE", "true")
+
 # win32com と pythoncom のモックを作成
 mock_win32com = MagicMock()
 mock_pythoncom = MagicMock()
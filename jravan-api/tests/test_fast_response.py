@@ -0,0 +1,156 @@
+"""高速 JSON レスポンスと圧縮ミドルウェアのテスト."""
+import gzip
+import json
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, Field, ValidationError
+
+# pg8000 のモックを追加（Linuxテスト環境用）
+mock_pg8000 = MagicMock()
+sys.modules['pg8000'] = mock_pg8000
+
+# テスト対象モジュールへのパスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import fast_response  # noqa: E402
+from fast_response import CompressionMiddleware, FastJSONResponse, choose_encoding, fast_json  # noqa: E402
+
+
+def _make_app(size: int) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/payload")
+    def payload():
+        return FastJSONResponse({"data": "x" * size})
+
+    return app
+
+
+class TestChooseEncoding:
+    """choose_encoding のテスト."""
+
+    def test_brotliを優先する(self):
+        with patch.object(fast_response, "brotli", MagicMock()):
+            assert choose_encoding("gzip, deflate, br") == "br"
+
+    def test_brotliがなければgzip(self):
+        with patch.object(fast_response, "brotli", None):
+            assert choose_encoding("gzip, br") == "gzip"
+
+    def test_q0は受け付けない(self):
+        with patch.object(fast_response, "brotli", MagicMock()):
+            assert choose_encoding("br;q=0, gzip;q=0.5") == "gzip"
+
+    def test_圧縮非対応ならNone(self):
+        assert choose_encoding("") is None
+        assert choose_encoding("identity") is None
+
+    def test_ワイルドカードを扱う(self):
+        with patch.object(fast_response, "brotli", None):
+            assert choose_encoding("*") == "gzip"
+
+
+class TestCompressionMiddleware:
+    """CompressionMiddleware のテスト."""
+
+    def test_しきい値以上はgzip圧縮する(self):
+        client = TestClient(_make_app(1000))
+
+        with patch.object(fast_response, "brotli", None):
+            response = client.get("/payload", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.json() == {"data": "x" * 1000}
+
+    def test_brotliで圧縮する(self):
+        pytest.importorskip("brotli")
+        client = TestClient(_make_app(1000))
+
+        response = client.get("/payload", headers={"Accept-Encoding": "br"})
+
+        assert response.headers["content-encoding"] == "br"
+        # brotli がインストールされていれば httpx が展開する
+        assert response.json() == {"data": "x" * 1000}
+
+    def test_しきい値未満は圧縮しない(self):
+        client = TestClient(_make_app(10))
+
+        response = client.get("/payload", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.json() == {"data": "x" * 10}
+
+    def test_非対応クライアントには圧縮しない(self):
+        client = TestClient(_make_app(1000))
+
+        response = client.get("/payload", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+
+    def test_圧縮後のContentLengthが正しい(self):
+        client = TestClient(_make_app(5000))
+
+        with patch.object(fast_response, "brotli", None):
+            response = client.get("/payload", headers={"Accept-Encoding": "gzip"})
+
+        assert int(response.headers["content-length"]) == len(gzip.compress(
+            json.dumps({"data": "x" * 5000}, separators=(",", ":")).encode(),
+            compresslevel=fast_response.GZIP_COMPRESS_LEVEL,
+        ))
+
+
+class _Payload(BaseModel):
+    race_id: str
+    items: list[int]
+    note: str | None = None
+    tags: list[str] = Field(default_factory=list)
+
+
+class TestFastJson:
+    """fast_json のテスト."""
+
+    def test_任意フィールドはモデルの既定値で埋める(self):
+        with patch.object(fast_response, "FAST_JSON_VALIDATE", False):
+            response = fast_json({"race_id": "R1", "items": [1], "extra": 1}, _Payload)
+
+        assert json.loads(response.body) == {"race_id": "R1", "items": [1], "note": None, "tags": []}
+
+    def test_必須フィールドが欠けていればエラー(self):
+        with patch.object(fast_response, "FAST_JSON_VALIDATE", False), pytest.raises(ValueError, match="items"):
+            fast_json({"race_id": "R1"}, _Payload)
+
+    def test_検証を有効にすれば入れ子の型も検証する(self):
+        with patch.object(fast_response, "FAST_JSON_VALIDATE", True), pytest.raises(ValidationError):
+            fast_json({"race_id": "R1", "items": ["x"]}, _Payload)
+
+
+class TestFastJsonEndpoints:
+    """レスポンスモデルを経由しないエンドポイントのテスト."""
+
+    @patch("database.get_all_odds")
+    def test_全券種オッズをモデルと同じ形で返す(self, mock_get_all_odds):
+        from main import AllOddsResponse, app
+
+        data = {
+            "win": {"1": 2.5, "2": 4.0},
+            "place": {"1": {"min": 1.1, "max": 1.3}},
+            "quinella": {"1-2": 5.0},
+            "quinella_place": {"1-2": 2.0},
+            "exacta": {"1-2": 8.0},
+            "trio": {},
+            "trifecta": {},
+        }
+        mock_get_all_odds.return_value = data
+
+        response = TestClient(app).get("/races/202605240511/odds")
+
+        assert response.status_code == 200
+        expected = AllOddsResponse(race_id="202605240511", **data).model_dump()
+        assert response.json() == expected
@@ -0,0 +1,236 @@
+"""全券種オッズ時系列ストアのテスト."""
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# pg8000 のモックを追加（Linuxテスト環境用）
+mock_pg8000 = MagicMock()
+sys.modules['pg8000'] = mock_pg8000
+
+# テスト対象モジュールへのパスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import odds_store  # noqa: E402
+from odds_store import (  # noqa: E402
+    KEYFRAME_INTERVAL,
+    OddsHistoryStore,
+    apply_delta,
+    capture_race_odds,
+    capture_upcoming_races,
+    decode_keyframe,
+    encode_delta,
+    encode_keyframe,
+    flatten_pool,
+    normalize_timestamp,
+    unflatten_pool,
+)
+
+RACE_ID = "202605240511"
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = OddsHistoryStore(tmp_path / "odds.sqlite3")
+    yield s
+    s.close()
+
+
+def _ts(minute: int) -> str:
+    return datetime(2026, 5, 24, 15, minute).isoformat(timespec="seconds")
+
+
+class TestCodec:
+    """エンコード/デコードのテスト."""
+
+    def test_キーフレームを往復変換できる(self):
+        values = [0, 1, 127, 128, 16383, 16384, 9999999]
+        assert decode_keyframe(encode_keyframe(values)) == values
+
+    def test_差分フレームで変化分だけを復元できる(self):
+        previous = [35, 120, 4500, 0]
+        current = [32, 120, 5100, 0, 77]
+
+        assert apply_delta(previous, encode_delta(previous, current), len(current)) == current
+
+    def test_変化がない差分は空に近いサイズになる(self):
+        values = list(range(1, 5000))
+        assert len(encode_delta(values, values)) < 16
+
+    def test_複勝は最低最高オッズを平坦化して戻せる(self):
+        place = {"1": {"min": 1.2, "max": 1.5}, "2": {"min": 3.0, "max": 4.8}}
+
+        flat = flatten_pool("place", place)
+
+        assert flat == {"1:min": 12, "1:max": 15, "2:min": 30, "2:max": 48}
+        assert unflatten_pool("place", flat) == place
+
+    def test_値0の組番は欠損として落とす(self):
+        assert unflatten_pool("trio", {"1-2-3": 3419, "1-2-4": 0}) == {"1-2-3": 341.9}
+
+
+class TestOddsHistoryStore:
+    """OddsHistoryStore のテスト."""
+
+    def test_任意時刻の券種オッズを復元できる(self, store):
+        store.append(RACE_ID, "quinella", {"1-2": 10.0, "1-3": 20.0}, _ts(0))
+        store.append(RACE_ID, "quinella", {"1-2": 9.5, "1-3": 21.0}, _ts(5))
+        store.append(RACE_ID, "quinella", {"1-2": 8.8, "1-3": 21.0}, _ts(10))
+
+        assert store.get_pool_at(RACE_ID, "quinella", at=_ts(7)) == {
+            "timestamp": _ts(5),
+            "odds": {"1-2": 9.5, "1-3": 21.0},
+        }
+        assert store.get_pool_at(RACE_ID, "quinella")["odds"] == {"1-2": 8.8, "1-3": 21.0}
+
+    def test_最初のキャプチャより前はNone(self, store):
+        store.append(RACE_ID, "win", {"1": 2.5}, _ts(10))
+
+        assert store.get_pool_at(RACE_ID, "win", at=_ts(0)) is None
+        assert store.get_pool_at("202605240512", "win") is None
+
+    def test_変化がなければフレームを書かない(self, store):
+        assert store.append(RACE_ID, "win", {"1": 2.5, "2": 4.0}, _ts(0)) is True
+        assert store.append(RACE_ID, "win", {"1": 2.5, "2": 4.0}, _ts(1)) is False
+
+        assert len(store.get_pool_series(RACE_ID, "win")) == 1
+
+    def test_新しい組番と取消を扱える(self, store):
+        store.append(RACE_ID, "trio", {"1-2-3": 100.0}, _ts(0))
+        store.append(RACE_ID, "trio", {"1-2-3": 90.0, "1-2-4": 300.0}, _ts(1))
+        store.append(RACE_ID, "trio", {"1-2-4": 280.0}, _ts(2))
+
+        series = store.get_pool_series(RACE_ID, "trio")
+
+        assert [s["odds"] for s in series] == [
+            {"1-2-3": 100.0},
+            {"1-2-3": 90.0, "1-2-4": 300.0},
+            {"1-2-4": 280.0},
+        ]
+
+    def test_キーフレーム間隔を超えても正しく復元できる(self, store):
+        for i in range(KEYFRAME_INTERVAL * 2 + 3):
+            store.append(RACE_ID, "exacta", {"1-2": 10.0 + i, "2-1": 50.0 - i}, _ts(i))
+
+        snapshot = store.get_pool_at(RACE_ID, "exacta", at=_ts(KEYFRAME_INTERVAL + 4))
+
+        assert snapshot["odds"] == {"1-2": 10.0 + KEYFRAME_INTERVAL + 4, "2-1": 50.0 - KEYFRAME_INTERVAL - 4}
+
+    def test_再オープン後も差分を続けて書ける(self, tmp_path):
+        path = tmp_path / "odds.sqlite3"
+        first = OddsHistoryStore(path)
+        first.append(RACE_ID, "win", {"1": 2.5}, _ts(0))
+        first.close()
+
+        second = OddsHistoryStore(path)
+        second.append(RACE_ID, "win", {"1": 2.2}, _ts(1))
+
+        assert [s["odds"] for s in second.get_pool_series(RACE_ID, "win")] == [{"1": 2.5}, {"1": 2.2}]
+        second.close()
+
+
+class TestNormalizeTimestamp:
+    """normalize_timestamp のテスト."""
+
+    def test_保存形式にそろえる(self):
+        assert normalize_timestamp("2026-05-24T15:01:30.500") == "2026-05-24T15:01:30"
+        assert normalize_timestamp("2026-05-24 15:01") == "2026-05-24T15:01:00"
+        assert normalize_timestamp("2026-05-24") == "2026-05-24T00:00:00"
+
+    def test_タイムゾーン付きはローカル時刻に変換する(self):
+        aware = datetime(2026, 5, 24, 6, 1, tzinfo=UTC)
+        expected = aware.astimezone().replace(tzinfo=None).isoformat(timespec="seconds")
+
+        assert normalize_timestamp("2026-05-24T06:01:00Z") == expected
+
+    def test_解釈できなければValueError(self):
+        with pytest.raises(ValueError):
+            normalize_timestamp("15:01")
+        with pytest.raises(ValueError):
+            normalize_timestamp("yesterday")
+
+
+class TestCapture:
+    """キャプチャジョブのテスト."""
+
+    @patch("database.get_all_odds")
+    def test_全券種をキャプチャする(self, mock_get_all_odds, store):
+        mock_get_all_odds.return_value = {
+            "win": {"1": 2.5},
+            "place": {"1": {"min": 1.1, "max": 1.3}},
+            "quinella": {"1-2": 5.0},
+            "quinella_place": {"1-2": 2.0},
+            "exacta": {"1-2": 8.0},
+            "trio": {"1-2-3": 12.0},
+            "trifecta": {},
+        }
+
+        assert capture_race_odds(store, RACE_ID, captured_at=_ts(0)) == 6
+        assert store.get_pool_at(RACE_ID, "place")["odds"] == {"1": {"min": 1.1, "max": 1.3}}
+
+    @patch("odds_store.capture_race_odds", return_value=7)
+    @patch("database.get_races_by_date")
+    def test_発走前のレースだけをキャプチャする(self, mock_get_races, mock_capture, store):
+        mock_get_races.return_value = [
+            {"race_id": "202605240501", "start_time": "2026-05-24T10:00:00"},
+            {"race_id": "202605240511", "start_time": "2026-05-24T15:40:00"},
+            {"race_id": "202605240512", "start_time": "2026-05-24T18:30:00"},
+            {"race_id": "202605240599", "start_time": None},
+        ]
+
+        result = capture_upcoming_races(store, now=datetime(2026, 5, 24, 15, 0))
+
+        assert result == {"202605240511": 7}
+
+
+class TestPoolOddsHistoryEndpoint:
+    """GET /races/{race_id}/odds-history/{bet_type} のテスト."""
+
+    def test_指定時刻の券種オッズを返す(self, store):
+        from fastapi.testclient import TestClient
+        from main import app
+
+        store.append(RACE_ID, "trio", {"1-2-3": 12.0}, _ts(0))
+        store.append(RACE_ID, "trio", {"1-2-3": 11.0}, _ts(3))
+
+        with patch.object(odds_store, "get_store", return_value=store):
+            response = TestClient(app).get(f"/races/{RACE_ID}/odds-history/trio", params={"at": _ts(1)})
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "race_id": RACE_ID, "bet_type": "trio", "timestamp": _ts(0), "odds": {"1-2-3": 12.0},
+        }
+
+    def test_履歴がなければ404(self, store):
+        from fastapi.testclient import TestClient
+        from main import app
+
+        with patch.object(odds_store, "get_store", return_value=store):
+            response = TestClient(app).get(f"/races/{RACE_ID}/odds-history/win")
+
+        assert response.status_code == 404
+
+    def test_形式の違う時刻も保存形式で比較する(self, store):
+        from fastapi.testclient import TestClient
+        from main import app
+
+        store.append(RACE_ID, "trio", {"1-2-3": 12.0}, _ts(0))
+        store.append(RACE_ID, "trio", {"1-2-3": 11.0}, _ts(3))
+
+        with patch.object(odds_store, "get_store", return_value=store):
+            # 文字列のままなら "2026-05-24 15:03" < "2026-05-24T15:00:00" で該当なしになる
+            response = TestClient(app).get(f"/races/{RACE_ID}/odds-history/trio", params={"at": "2026-05-24 15:03"})
+
+        assert response.status_code == 200
+        assert response.json()["timestamp"] == _ts(3)
+
+    def test_解釈できない時刻は422(self, store):
+        from fastapi.testclient import TestClient
+        from main import app
+
+        with patch.object(odds_store, "get_store", return_value=store):
+            response = TestClient(app).get(f"/races/{RACE_ID}/odds-history/trio", params={"at": "not-a-time"})
+
+        assert response.status_code == 422
@@ -0,0 +1,238 @@
+"""統計用カラムナスナップショットのテスト.
+
+DuckDB 上にフィクスチャの履歴テーブルを作り、Parquet へのエクスポートと
+統計関数のスナップショット経由の読み出しを確認する。
+"""
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+duckdb = pytest.importorskip("duckdb")
+
+# pg8000 のモックを追加（Linuxテスト環境用）
+mock_pg8000 = MagicMock()
+sys.modules['pg8000'] = mock_pg8000
+
+# テスト対象モジュールへのパスを追加
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import database  # noqa: E402
+import stats_snapshot  # noqa: E402
+from stats_snapshot import SnapshotStore, export_snapshot, read_manifest  # noqa: E402
+
+RACE_KEYS = "kaisai_nen VARCHAR, kaisai_tsukihi VARCHAR, keibajo_code VARCHAR, race_bango VARCHAR"
+
+
+def _attach_fixture(con) -> str:
+    """PostgreSQL の代わりにフィクスチャデータを持つ DuckDB をアタッチする."""
+    con.execute("ATTACH ':memory:' AS src")
+    con.execute("CREATE SCHEMA src.public")
+    con.execute(f"""
+        CREATE TABLE src.public.jvd_ra (
+            {RACE_KEYS}, track_code VARCHAR, kyori INTEGER, grade_code VARCHAR,
+            babajotai_code_shiba VARCHAR, babajotai_code_dirt VARCHAR
+        )
+    """)
+    con.execute(f"""
+        CREATE TABLE src.public.jvd_se (
+            {RACE_KEYS}, umaban VARCHAR, wakuban VARCHAR, tansho_ninkijun VARCHAR,
+            kakutei_chakujun VARCHAR, kishu_code VARCHAR, ketto_toroku_bango VARCHAR, run_time VARCHAR
+        )
+    """)
+    con.execute(f"""
+        CREATE TABLE src.public.jvd_hr (
+            {RACE_KEYS}, tansho_haraimodoshi_1 VARCHAR,
+            fukusho_umaban_1 VARCHAR, fukusho_haraimodoshi_1 VARCHAR,
+            fukusho_umaban_2 VARCHAR, fukusho_haraimodoshi_2 VARCHAR,
+            fukusho_umaban_3 VARCHAR, fukusho_haraimodoshi_3 VARCHAR
+        )
+    """)
+    con.execute("CREATE TABLE src.public.jvd_ks (kishu_code VARCHAR, kishumei VARCHAR)")
+    con.execute("CREATE TABLE src.public.jvd_um (ketto_toroku_bango VARCHAR, bamei VARCHAR)")
+
+    # 東京芝1600mのレースを2つ
+    con.execute("""
+        INSERT INTO src.public.jvd_ra VALUES
+            ('2025', '0601', '05', '11', '11', 1600, 'A', '1', '0'),
+            ('2025', '0602', '05', '11', '11', 1600, ' ', '1', '0')
+    """)
+    con.execute("""
+        INSERT INTO src.public.jvd_se VALUES
+            ('2025', '0601', '05', '11', '01', '1', '1', '1', '00001', 'H001', '1336'),
+            ('2025', '0601', '05', '11', '02', '2', '2', '3', '00002', 'H002', '1337'),
+            ('2025', '0601', '05', '11', '03', '3', '3', '2', '00003', 'H003', '1338'),
+            ('2025', '0601', '05', '11', '04', '4', '4', '4', '00004', 'H004', '1340'),
+            ('2025', '0602', '05', '11', '01', '1', '2', '1', '00001', 'H001', '1335'),
+            ('2025', '0602', '05', '11', '02', '2', '1', '2', '00002', 'H005', '1336'),
+            ('2025', '0602', '05', '11', '03', '3', '3', '3', '00003', 'H006', '1337'),
+            ('2025', '0602', '05', '11', '04', '4', '4', '中止', '00004', 'H007', '')
+    """)
+    con.execute("""
+        INSERT INTO src.public.jvd_hr VALUES
+            ('2025', '0601', '05', '11', '000000200', '01', '000000120', '03', '000000150', '02', '000000180'),
+            ('2025', '0602', '05', '11', '000000400', '01', '000000140', '02', '000000110', '03', '000000160')
+    """)
+    con.execute("INSERT INTO src.public.jvd_ks VALUES ('00001', 'ルメール　　')")
+    con.execute("INSERT INTO src.public.jvd_um VALUES ('H001', 'テストホース　')")
+    return "src.public"
+
+
+@pytest.fixture
+def snapshot_store(tmp_path):
+    """フィクスチャをエクスポートしたスナップショットを database に差し込む."""
+    export_snapshot(snapshot_dir=tmp_path, attach_source=_attach_fixture)
+    store = SnapshotStore(snapshot_dir=tmp_path)
+    with patch.object(stats_snapshot, "_store", store), \
+            patch("database.get_db", side_effect=AssertionError("PostgreSQL must not be used")):
+        yield store
+
+
+class TestExportSnapshot:
+    """export_snapshot のテスト."""
+
+    def test_全テーブルをParquetに書き出しマニフェストを作る(self, tmp_path):
+        manifest = export_snapshot(snapshot_dir=tmp_path, attach_source=_attach_fixture)
+
+        assert read_manifest(tmp_path) == manifest
+        assert manifest["tables"] == {"jvd_ra": 2, "jvd_se": 8, "jvd_hr": 2, "jvd_ks": 1, "jvd_um": 1}
+        for table in manifest["tables"]:
+            assert (tmp_path / manifest["version"] / f"{table}.parquet").exists()
+
+    def test_古い世代は削除される(self, tmp_path):
+        for version in ("20250101000000", "20250102000000", "20250103000000"):
+            (tmp_path / version).mkdir()
+
+        manifest = export_snapshot(snapshot_dir=tmp_path, attach_source=_attach_fixture)
+
+        versions = sorted(p.name for p in tmp_path.iterdir() if p.is_dir())
+        assert versions == ["20250103000000", manifest["version"]]
+
+    def test_エクスポート失敗時はマニフェストを更新しない(self, tmp_path):
+        def broken_source(con):
+            raise RuntimeError("connection refused")
+
+        with pytest.raises(RuntimeError):
+            export_snapshot(snapshot_dir=tmp_path, attach_source=broken_source)
+
+        assert read_manifest(tmp_path) is None
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestSnapshotStore:
+    """SnapshotStore のテスト."""
+
+    def test_スナップショットがなければNone(self, tmp_path):
+        assert SnapshotStore(snapshot_dir=tmp_path).connect() is None
+
+    def test_古すぎるスナップショットは使わない(self, tmp_path):
+        manifest = export_snapshot(snapshot_dir=tmp_path, attach_source=_attach_fixture)
+        stale = dict(manifest, created_at=(datetime.now(stats_snapshot.JST) - timedelta(hours=49)).isoformat())
+        (tmp_path / "manifest.json").write_text(json.dumps(stale), encoding="utf-8")
+
+        assert SnapshotStore(snapshot_dir=tmp_path, max_age_hours=48).connect() is None
+
+    def test_pg8000互換のプレースホルダで問い合わせできる(self, tmp_path):
+        manifest = export_snapshot(snapshot_dir=tmp_path, attach_source=_attach_fixture)
+        store = SnapshotStore(snapshot_dir=tmp_path)
+
+        conn = store.connect()
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*) AS n FROM jvd_se WHERE kishu_code = %s", ("00001",))
+        assert cur.description[0][0] == "n"
+        assert cur.fetchone() == (2,)
+        conn.close()
+        assert store.version == manifest["version"]
+
+
+class TestGetStatsDb:
+    """get_stats_db のルーティングテスト."""
+
+    @patch("database.get_db")
+    def test_スナップショットがなければPostgreSQLを使う(self, mock_get_db, tmp_path):
+        pg_conn = MagicMock()
+        mock_get_db.return_value.__enter__.return_value = pg_conn
+
+        store = SnapshotStore(snapshot_dir=tmp_path)
+        with patch.object(stats_snapshot, "_store", store), database.get_stats_db() as conn:
+            assert conn is pg_conn
+
+    @patch("database.get_db")
+    def test_スナップショットが開けなければPostgreSQLを使う(self, mock_get_db):
+        pg_conn = MagicMock()
+        mock_get_db.return_value.__enter__.return_value = pg_conn
+        broken = MagicMock()
+        broken.connect.side_effect = OSError("disk error")
+
+        with patch.object(stats_snapshot, "_store", broken), database.get_stats_db() as conn:
+            assert conn is pg_conn
+
+    @patch("database.get_db")
+    def test_スナップショットのクエリが失敗したらPostgreSQLで実行し直す(self, mock_get_db, tmp_path):
+        pg_cursor = MagicMock()
+        pg_cursor.fetchall.return_value = [("2025", "0601", "05", "11")]
+        pg_cursor.fetchone.return_value = (20.0, 14.0)
+        pg_cursor.description = [("popularity",), ("total_runs",), ("wins",), ("places",)]
+        mock_get_db.return_value.__enter__.return_value.cursor.return_value = pg_cursor
+        manifest = export_snapshot(snapshot_dir=tmp_path, attach_source=_attach_fixture)
+        store = SnapshotStore(snapshot_dir=tmp_path)
+        store.connect().close()
+        # 開いた後に Parquet が消えると、ビューの参照が実行時に失敗する
+        for path in (tmp_path / manifest["version"]).iterdir():
+            path.unlink()
+
+        with patch.object(stats_snapshot, "_store", store):
+            result = database.get_past_race_statistics(track_code="1", distance=1600)
+
+        assert result["total_races"] == 1
+        assert result["avg_win_payout"] == 20.0
+        assert pg_cursor.execute.call_count == 3
+        mock_get_db.assert_called_once()
+
+    def test_過去レース統計をスナップショットから集計する(self, snapshot_store):
+        result = database.get_past_race_statistics(track_code="1", distance=1600)
+
+        assert result["total_races"] == 2
+        first = next(s for s in result["popularity_stats"] if s["popularity"] == 1)
+        assert first == {
+            "popularity": 1, "total_runs": 2, "wins": 1, "places": 2,
+            "win_rate": 50.0, "place_rate": 100.0,
+        }
+        assert result["avg_win_payout"] == 30.0
+        assert result["avg_place_payout"] == 14.3
+
+    def test_騎手コース成績をスナップショットから集計する(self, snapshot_store):
+        result = database.get_jockey_course_stats(jockey_id="00001", track_code="1", distance=1600)
+
+        assert result["jockey_name"] == "ルメール"
+        assert result["total_rides"] == 2
+        assert result["wins"] == 2
+
+    def test_人気別配当をスナップショットから集計する(self, snapshot_store):
+        result = database.get_popularity_payout_stats(track_code="1", distance=1600, popularity=1)
+
+        assert result["total_races"] == 2
+        assert result["win_count"] == 1
+        assert result["avg_win_payout"] == 20.0
+
+    def test_騎手成績をスナップショットから集計する(self, snapshot_store):
+        result = database.get_jockey_stats(jockey_id="00004", period="all")
+
+        # 「中止」は着順として数えない
+        assert result["total_rides"] == 1
+
+    def test_コース適性をスナップショットから集計する(self, snapshot_store):
+        result = database.get_horse_course_aptitude("H001")
+
+        assert result is not None
+        assert result["horse_name"] == "テストホース"
+
+    def test_枠順統計をスナップショットから集計する(self, snapshot_store):
+        result = database.get_gate_position_stats(venue="東京", track_type="芝", distance=1600)
+
+        assert result["total_races"] == 2
+        gate1 = next(g for g in result["by_gate"] if g["gate"] == 1)
+        assert gate1["wins"] == 2